@@ -0,0 +1,212 @@
+"""Compare the HNSW-first vector search and the NumPy backend with an exact scan of the allowed chunks.
+
+A throwaway index database is filled with clustered random vectors spread over several datasources, then the same
+queries are run with every search path, for a few datasource filters of decreasing selectivity.
+
+Usage:
+    uv run python devtools/vector_search_benchmark.py --vectors 100000
+    uv run python devtools/vector_search_benchmark.py --vectors 1000000 --dim 128
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import numpy as np
+
+from databao_context_engine.datasources.datasource_context import DatasourceContextHash
+from databao_context_engine.datasources.types import DatasourceId
+from databao_context_engine.llm.config import EmbeddingModelDetails
+from databao_context_engine.search_context.chunk_search_repository import ChunkSearchRepository
+from databao_context_engine.search_context.numpy_vector_search import NumpyVectorSearchBackend
+from databao_context_engine.services.embedding_shard_resolver import EmbeddingShardResolver
+from databao_context_engine.storage.connection import connect_duckdb
+from databao_context_engine.storage.migrate import migrate
+from databao_context_engine.storage.repositories.embedding_model_registry_repository import (
+    EmbeddingModelRegistryRepository,
+)
+
+_CLUSTERS = 256
+_CLUSTER_NOISE = 0.3
+
+
+def _datasource_id(index: int) -> str:
+    return f"databases/datasource_{index}.yaml"
+
+
+def _fill_database(conn: duckdb.DuckDBPyConnection, *, vectors: int, dim: int, datasources: int) -> str:
+    resolver = EmbeddingShardResolver(conn=conn, registry_repo=EmbeddingModelRegistryRepository(conn))
+    table_name = resolver.resolve_or_create(
+        embedder="benchmark",
+        embedding_model_details=EmbeddingModelDetails(model_id="random", model_dim=dim),
+    )
+    # Building the HNSW index once all vectors are inserted is much faster than maintaining it row by row
+    conn.execute(f"DROP INDEX emb_hnsw_{table_name}")
+
+    conn.execute(
+        """
+        INSERT INTO datasource_context_hash (datasource_context_hash_id, datasource_id, hash_algorithm, hash, hashed_at)
+        SELECT
+            i + 1,
+            'databases/datasource_' || i || '.yaml',
+            'benchmark',
+            'hash',
+            now()
+        FROM
+            range(?) t(i)
+        """,
+        [datasources],
+    )
+    conn.execute(
+        """
+        INSERT INTO chunk (
+            chunk_id, full_type, datasource_id, embeddable_text, datasource_context_hash_id, chunk_type
+        )
+        SELECT
+            i,
+            'databases/duckdb',
+            'databases/datasource_' || (i % ?) || '.yaml',
+            'chunk ' || i,
+            (i % ?) + 1,
+            CASE WHEN i % 5 = 0 THEN 'table' ELSE 'column' END
+        FROM
+            range(?) t(i)
+        """,
+        [datasources, datasources, vectors],
+    )
+    conn.execute(
+        f"""
+        CREATE TEMP TABLE centroid AS
+        SELECT
+            i AS cluster,
+            [random() - 0.5 FOR _ IN range({dim})] AS vec
+        FROM
+            range({_CLUSTERS}) t(i)
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO {table_name} (chunk_id, vec)
+        SELECT
+            t.i,
+            CAST([x + (random() - 0.5) * {_CLUSTER_NOISE} FOR x IN c.vec] AS FLOAT[{dim}])
+        FROM
+            range(?) t(i)
+            JOIN centroid c ON c.cluster = hash(t.i) % {_CLUSTERS}
+        """,
+        [vectors],
+    )
+
+    started_at = time.perf_counter()
+    resolver.rebuild_index(table_name)
+    print(f"Built the HNSW index of {vectors} vectors in {time.perf_counter() - started_at:.1f}s")
+    return table_name
+
+
+def _query_vectors(conn: duckdb.DuckDBPyConnection, *, table_name: str, queries: int, seed: int) -> list[list[float]]:
+    rng = np.random.default_rng(seed)
+    rows = conn.execute(f"SELECT vec FROM {table_name} USING SAMPLE reservoir({queries} ROWS)").fetchall()
+    return [(np.asarray(row[0]) + rng.normal(0, 0.05, len(row[0]))).tolist() for row in rows]
+
+
+def _run(search, query_vectors: list[list[float]]) -> tuple[list[list[int]], np.ndarray]:
+    results = []
+    durations = []
+    for query_vector in query_vectors:
+        started_at = time.perf_counter()
+        chunk_ids = search(query_vector)
+        durations.append(time.perf_counter() - started_at)
+        results.append(chunk_ids)
+    return results, np.asarray(durations) * 1000
+
+
+def _recall(approximate: list[list[int]], exact: list[list[int]]) -> float:
+    found = sum(len(set(a) & set(e)) for a, e in zip(approximate, exact, strict=True))
+    expected = sum(len(e) for e in exact)
+    return found / expected if expected else 1.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--datasources", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "benchmark.duckdb"
+        migrate(db_path)
+        conn = connect_duckdb(db_path)
+        try:
+            conn.execute(f"SELECT setseed({1 / (args.seed + 1)})")
+            table_name = _fill_database(conn, vectors=args.vectors, dim=args.dim, datasources=args.datasources)
+            query_vectors = _query_vectors(conn, table_name=table_name, queries=args.queries, seed=args.seed)
+            repo = ChunkSearchRepository(conn)
+            numpy_backend = NumpyVectorSearchBackend(conn, index_dir=Path(tmp_dir) / "vector_index")
+            started_at = time.perf_counter()
+            numpy_backend.warm_up(table_name=table_name, dimension=args.dim)
+            print(f"Copied {args.vectors} vectors to the NumPy index in {time.perf_counter() - started_at:.1f}s")
+
+            print(
+                f"{'allowed datasources':>20} {'recall@k':>9} {'exact p50/p99 ms':>18} {'hnsw p50/p99 ms':>18} "
+                f"{'recall@k':>9} {'numpy p50/p99 ms':>18}"
+            )
+            for allowed_datasources in sorted({args.datasources, max(args.datasources // 4, 1), 1}, reverse=True):
+                context_hashes = [
+                    DatasourceContextHash(
+                        datasource_id=DatasourceId.from_string_repr(_datasource_id(index)),
+                        hash="hash",
+                        hash_algorithm="benchmark",
+                        hashed_at=datetime.now(),
+                    )
+                    for index in range(allowed_datasources)
+                ]
+                search_kwargs = {
+                    "table_name": table_name,
+                    "dimension": args.dim,
+                    "limit": args.limit,
+                    "datasource_context_hashes": context_hashes,
+                }
+                exact_results, exact_ms = _run(
+                    lambda vec: [
+                        c.chunk_id for c in repo._get_exact_vector_candidates(search_vec=vec, **search_kwargs)
+                    ],
+                    query_vectors,
+                )
+                hnsw_results, hnsw_ms = _run(
+                    lambda vec: [c.chunk_id for c in repo._get_vector_candidates(search_vec=vec, **search_kwargs)],
+                    query_vectors,
+                )
+                numpy_results, numpy_ms = _run(
+                    lambda vec: [
+                        chunk_id
+                        for chunk_id, _ in numpy_backend.search(
+                            search_vecs=[vec],
+                            chunk_types=None,
+                            distance_threshold=repo._DEFAULT_DISTANCE_THRESHOLD,
+                            **search_kwargs,
+                        )[0]
+                    ],
+                    query_vectors,
+                )
+                print(
+                    f"{allowed_datasources:>20} {_recall(hnsw_results, exact_results):>9.3f} "
+                    f"{np.percentile(exact_ms, 50):>8.1f}/{np.percentile(exact_ms, 99):<9.1f} "
+                    f"{np.percentile(hnsw_ms, 50):>8.1f}/{np.percentile(hnsw_ms, 99):<9.1f} "
+                    f"{_recall(numpy_results, exact_results):>9.3f} "
+                    f"{np.percentile(numpy_ms, 50):>8.1f}/{np.percentile(numpy_ms, 99):<9.1f}"
+                )
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
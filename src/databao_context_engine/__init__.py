@@ -29,6 +29,7 @@ from databao_context_engine.pluginlib.build_plugin import (
     DatasourceType,
 )
 from databao_context_engine.pluginlib.config import ConfigPropertyDefinition
+from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionLimits
 from databao_context_engine.plugins.databases.athena.config_file import (
     AthenaConfigFile,
     AthenaConnectionProperties,
@@ -78,6 +79,7 @@ from databao_context_engine.project.info import (
 )
 from databao_context_engine.project.init_project import InitDomainError, InitErrorReason
 from databao_context_engine.search_context.search_service import ContextSearchMode
+from databao_context_engine.services.garbage_collection_service import GarbageCollectionResult
 
 __all__ = [
     "DatabaoContextEngine",
@@ -90,6 +92,7 @@ __all__ = [
     "UserInputCallback",
     "Choice",
     "ContextSearchMode",
+    "SqlExecutionLimits",
     "DatasourceConnectionStatus",
     "DatasourceType",
     "get_databao_context_engine_info",
@@ -115,6 +118,7 @@ __all__ = [
     "DatasourceStatus",
     "EnrichContextResult",
     "IndexDatasourceResult",
+    "GarbageCollectionResult",
     "CheckDatasourceConnectionResult",
     "AthenaConfigFile",
     "AthenaConnectionProperties",
@@ -1,5 +1,6 @@
 from databao_context_engine.build_sources.build_wiring import (
     build_all_datasources,
+    collect_garbage,
     enrich_built_contexts,
     index_built_contexts,
 )
@@ -13,6 +14,7 @@ from databao_context_engine.build_sources.types import (
 
 __all__ = [
     "build_all_datasources",
+    "collect_garbage",
     "DatasourceStatus",
     "DatasourceResult",
     "BuildDatasourceResult",
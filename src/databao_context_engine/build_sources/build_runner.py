@@ -1,5 +1,10 @@
 import logging
+import threading
+from contextlib import ExitStack
+from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
+from typing import Callable
 
 from pydantic import TypeAdapter
 
@@ -9,22 +14,31 @@ from databao_context_engine.build_sources.export_results import (
     delete_all_results_file,
     export_build_result,
 )
+from databao_context_engine.build_sources.plugin_execution import BuiltDatasourceContext
 from databao_context_engine.build_sources.types import (
     BuildDatasourceResult,
     DatasourceStatus,
     EnrichContextResult,
     IndexDatasourceResult,
 )
+from databao_context_engine.concurrency import PipelineStage, PipelineStageStats, run_pipeline
 from databao_context_engine.datasources.datasource_context import (
     DatasourceContext,
+    DatasourceContextHash,
     hash_context_file,
 )
 from databao_context_engine.datasources.datasource_discovery import discover_datasources, prepare_source
 from databao_context_engine.datasources.types import DatasourceId, PreparedConfig, PreparedDatasource
-from databao_context_engine.pluginlib.build_plugin import DatasourceType
+from databao_context_engine.pluginlib.build_plugin import DatasourceType, EmbeddableChunk
 from databao_context_engine.plugins.plugin_loader import NoPluginFoundForDatasource
-from databao_context_engine.progress.progress import ProgressCallback, ProgressEmitter, ProgressStep
+from databao_context_engine.progress.progress import (
+    ProgressCallback,
+    ProgressEmitter,
+    ProgressStep,
+    synchronized_progress,
+)
 from databao_context_engine.project.layout import ProjectLayout
+from databao_context_engine.services.models import ChunkEmbedding
 
 logger = logging.getLogger(__name__)
 
@@ -58,11 +72,16 @@ def _emit_all_build_step_as_completed(
         )
 
 
+# Maximum number of datasources waiting between two stages of the build pipeline
+_BUILD_PIPELINE_QUEUE_SIZE = 2
+
+
 @perf.perf_run(
     operation="build",
-    attrs=lambda *, should_index, should_enrich_context, **_: {
+    attrs=lambda *, should_index, should_enrich_context, max_parallel_datasources=1, **_: {
         "should_index": should_index,
         "should_enrich_context": should_enrich_context,
+        "max_parallel_datasources": max_parallel_datasources,
     },
 )
 @perf.perf_span("build.total")
@@ -74,6 +93,8 @@ def build(
     should_index: bool,
     should_enrich_context: bool,
     progress: ProgressCallback | None = None,
+    max_parallel_datasources: int = 1,
+    force: bool = False,
 ) -> list[BuildDatasourceResult]:
     """Build the context for all datasources in the project.
 
@@ -82,7 +103,19 @@ def build(
 
     1) Load available plugins
     2) Discover sources
-    3) For each source, call process_source
+    3) Run each source through the build pipeline
+
+    The build is a pipeline whose stages run concurrently: introspect (plugin execution and enrichment), export (write
+    and hash the context file) and, when indexing, chunk, embed and persist. While a datasource is being embedded,
+    the next one is already being introspected.
+    Up to `max_parallel_datasources` datasources are introspected at the same time, while the other stages handle one
+    datasource at a time. All DuckDB accesses are serialized since they go through the single connection of the
+    BuildService.
+    The results are always returned in the order of the datasources.
+
+    Before being introspected, datasources whose plugin can fingerprint them are skipped if their fingerprint is the same
+    as during their previous build, unless `force` is set: their previous context is kept as-is. Otherwise, plugins
+    able to do it only rebuild the parts of the previous context that changed, unless `force` is set as well.
 
     Returns:
         A list of per-datasource build results.
@@ -90,6 +123,7 @@ def build(
     if not datasource_ids:
         datasource_ids = discover_datasources(project_layout)
 
+    progress = synchronized_progress(progress)
     emitter = ProgressEmitter(progress)
 
     if not datasource_ids:
@@ -100,51 +134,34 @@ def build(
 
     emitter.operation_started(operation="build", total=len(datasource_ids))
 
-    results: list[BuildDatasourceResult] = []
-    failed = 0
-    skipped = 0
     delete_all_results_file(project_layout)
-    for datasource_index, datasource_id in enumerate(datasource_ids, start=1):
-        emitter.datasource_started(
-            datasource_id=str(datasource_id),
-            index=datasource_index,
-            total=len(datasource_ids),
-        )
-        try:
-            result = _build_one_datasource(
-                project_layout=project_layout,
-                build_service=build_service,
-                datasource_id=datasource_id,
-                should_index=should_index,
-                should_enrich_context=should_enrich_context,
-                progress=progress,
-            )
-            results.append(result)
-            if result.status == DatasourceStatus.SKIPPED:
-                skipped += 1
 
-            emitter.datasource_finished(
-                datasource_id=str(datasource_id),
-                index=datasource_index,
-                total=len(datasource_ids),
-                status=result.status.value,
-                error=result.error,
-            )
-        except Exception as e:
-            logger.debug(str(e), exc_info=True, stack_info=True)
-            logger.info(f"Failed to build source at ({datasource_id.relative_path_to_config_file()}): {str(e)}")
+    pipeline = _DatasourceBuildPipeline(
+        project_layout=project_layout,
+        build_service=build_service,
+        total=len(datasource_ids),
+        should_index=should_index,
+        should_enrich_context=should_enrich_context,
+        progress=progress,
+        force=force,
+    )
+    builds = [
+        _DatasourceBuild(index=datasource_index, datasource_id=datasource_id)
+        for datasource_index, datasource_id in enumerate(datasource_ids, start=1)
+    ]
+    stage_stats = run_pipeline(
+        builds,
+        pipeline.stages(max_parallel_datasources=max_parallel_datasources),
+        queue_size=_BUILD_PIPELINE_QUEUE_SIZE,
+    )
+    _record_stage_stats(stage_stats)
+    build_service.record_description_cache_stats()
+    build_service.evict_description_cache()
+    build_service.evict_embedding_cache()
 
-            failed += 1
-            results.append(
-                BuildDatasourceResult(datasource_id=datasource_id, status=DatasourceStatus.FAILED, error=str(e))
-            )
-            emitter.datasource_finished(
-                datasource_id=str(datasource_id),
-                index=datasource_index,
-                total=len(datasource_ids),
-                status=DatasourceStatus.FAILED.value,
-                error=str(e),
-            )
+    results = [datasource_build.result for datasource_build in builds if datasource_build.result is not None]
+    skipped = sum(1 for result in results if result.status == DatasourceStatus.SKIPPED)
+    failed = sum(1 for result in results if result.status == DatasourceStatus.FAILED)
 
     ok = sum(1 for result in results if result.status == DatasourceStatus.OK)
     logger.debug(
@@ -158,80 +175,292 @@ def build(
     return results
 
 
-@perf.perf_span(
-    "datasource.total",
-    datasource_id=lambda *, datasource_id, **_: str(datasource_id),
-)
-def _build_one_datasource(
-    *,
-    project_layout: ProjectLayout,
-    build_service: BuildService,
-    datasource_id,
-    should_index: bool,
-    should_enrich_context: bool,
-    progress: ProgressCallback | None = None,
-) -> BuildDatasourceResult:
-    prepared_source = prepare_source(project_layout, datasource_id)
-    if not _is_datasource_enabled(prepared_source):
-        logger.info(f"Skipping disabled datasource {prepared_source.datasource_id.datasource_path}")
-        return BuildDatasourceResult(datasource_id=datasource_id, status=DatasourceStatus.SKIPPED)
-
-    perf.set_attribute("datasource_type", prepared_source.datasource_type.full_type)
-
-    logger.info(
-        f'Found datasource of type "{prepared_source.datasource_type.full_type}" with name {prepared_source.datasource_id.datasource_path}'
-    )
-
-    ProgressEmitter(progress).datasource_step_plan_set(
-        datasource_id=str(datasource_id),
-        step_plan=_build_step_plan(
-            should_index=should_index,
-            should_enrich_context=should_enrich_context,
-        ),
-    )
-
-    try:
-        result = build_service.build_context(
-            prepared_source=prepared_source,
-            progress=progress,
+def _record_stage_stats(stage_stats: list[PipelineStageStats]) -> None:
+    for stats in stage_stats:
+        logger.debug(
+            "Build stage %s processed %d datasource(s) in %.2fs (busy for %.2fs)",
+            stats.name,
+            stats.items,
+            stats.wall_seconds,
+            stats.busy_seconds,
         )
 
-        if should_enrich_context:
-            result = build_service.enrich_built_context(built_context=result, progress=progress)
+    perf.set_attribute(
+        "pipeline_stages",
+        {
+            stats.name: {
+                "workers": stats.workers,
+                "items": stats.items,
+                "busy_ms": round(stats.busy_seconds * 1000),
+                "wall_ms": round(stats.wall_seconds * 1000),
+                "items_per_s": round(stats.items_per_second, 3),
+            }
+            for stats in stage_stats
+        },
+    )
 
-        output_dir = project_layout.output_dir
-        context_file_path = export_build_result(output_dir, result)
 
-        perf.set_attribute("context_size_bytes", context_file_path.stat().st_size)
+@dataclass
+class _DatasourceBuild:
+    """The state of a datasource going through the build pipeline."""
+
+    index: int
+    datasource_id: DatasourceId
+    # Holds the `datasource.total` perf span, opened by the first stage and closed once the datasource leaves the pipeline
+    perf_span: ExitStack = field(default_factory=ExitStack)
+    built_context: BuiltDatasourceContext | None = None
+    context_file_path: Path | None = None
+    context_hash: DatasourceContextHash | None = None
+    fingerprint: str | None = None
+    chunks: list[EmbeddableChunk] = field(default_factory=list)
+    chunk_embeddings: list[ChunkEmbedding] = field(default_factory=list)
+    result: BuildDatasourceResult | None = None
+
+    def get_built_context(self) -> BuiltDatasourceContext:
+        if self.built_context is None:
+            raise ValueError(f"The context of {self.datasource_id} has not been built yet")
+        return self.built_context
+
+    def get_context_hash(self) -> DatasourceContextHash:
+        if self.context_hash is None:
+            raise ValueError(f"The context of {self.datasource_id} has not been hashed yet")
+        return self.context_hash
+
+
+class _DatasourceBuildPipeline:
+    def __init__(
+        self,
+        *,
+        project_layout: ProjectLayout,
+        build_service: BuildService,
+        total: int,
+        should_index: bool,
+        should_enrich_context: bool,
+        progress: ProgressCallback | None,
+        force: bool = False,
+    ) -> None:
+        self._project_layout = project_layout
+        self._build_service = build_service
+        self._total = total
+        self._should_index = should_index
+        self._should_enrich_context = should_enrich_context
+        self._progress = progress
+        self._force = force
+        self._emitter = ProgressEmitter(progress)
+        # DuckDB connections can't be used concurrently: guards every stage reading or writing the index
+        self._db_lock = threading.Lock()
+
+    def stages(self, *, max_parallel_datasources: int) -> list[PipelineStage[_DatasourceBuild]]:
+        steps: list[tuple[str, Callable[[_DatasourceBuild], bool], int]] = [
+            ("introspect", self._introspect, max_parallel_datasources),
+            ("export", self._export, 1),
+        ]
+        if self._should_index:
+            steps.extend(
+                [
+                    ("chunk", self._chunk, 1),
+                    ("embed", self._embed, 1),
+                    ("persist", self._persist, 1),
+                ]
+            )
 
-        if should_index:
-            context_hash = hash_context_file(
-                datasource_id=prepared_source.datasource_id, context_path=context_file_path
+        return [
+            PipelineStage(
+                name=name,
+                process=self._guarded(process, is_last_stage=stage_index == len(steps) - 1),
+                workers=workers,
             )
-            build_service.index_built_context(built_context=result, context_hash=context_hash, progress=progress)
+            for stage_index, (name, process, workers) in enumerate(steps)
+        ]
+
+    def _guarded(
+        self, process: Callable[[_DatasourceBuild], bool], *, is_last_stage: bool
+    ) -> Callable[[_DatasourceBuild], bool]:
+        def guarded_process(datasource_build: _DatasourceBuild) -> bool:
+            try:
+                should_continue = process(datasource_build)
+            except NoPluginFoundForDatasource as e:
+                logger.warning(
+                    "No plugin for '%s' (datasource=%s) — skipping.",
+                    e.datasource_type.full_type,
+                    datasource_build.datasource_id.relative_path_to_config_file(),
+                )
+                # Since the plugin was not found, no build steps were emitted but the plan was set:
+                # we need to emit all steps as completed
+                _emit_all_build_step_as_completed(
+                    progress=self._progress,
+                    datasource_id=datasource_build.datasource_id,
+                    should_index=self._should_index,
+                    should_enrich_context=self._should_enrich_context,
+                )
+                self._finish(
+                    datasource_build,
+                    BuildDatasourceResult(
+                        datasource_id=datasource_build.datasource_id, status=DatasourceStatus.SKIPPED
+                    ),
+                )
+                return False
+            except Exception as e:
+                logger.debug(str(e), exc_info=True, stack_info=True)
+                logger.info(
+                    f"Failed to build source at ({datasource_build.datasource_id.relative_path_to_config_file()}): {str(e)}"
+                )
+                self._finish(
+                    datasource_build,
+                    BuildDatasourceResult(
+                        datasource_id=datasource_build.datasource_id, status=DatasourceStatus.FAILED, error=str(e)
+                    ),
+                    error=e,
+                )
+                return False
+
+            if should_continue and not is_last_stage:
+                return True
+
+            self._finish(datasource_build, datasource_build.result or self._ok_result(datasource_build))
+            return False
+
+        return guarded_process
+
+    def _finish(
+        self, datasource_build: _DatasourceBuild, result: BuildDatasourceResult, error: Exception | None = None
+    ) -> None:
+        datasource_build.result = result
+        if error is None:
+            datasource_build.perf_span.close()
+        else:
+            datasource_build.perf_span.__exit__(type(error), error, error.__traceback__)
+
+        self._emitter.datasource_finished(
+            datasource_id=str(datasource_build.datasource_id),
+            index=datasource_build.index,
+            total=self._total,
+            status=result.status.value,
+            error=result.error,
+        )
 
+    @staticmethod
+    def _ok_result(datasource_build: _DatasourceBuild) -> BuildDatasourceResult:
         return BuildDatasourceResult(
-            datasource_id=datasource_id,
+            datasource_id=datasource_build.datasource_id,
             status=DatasourceStatus.OK,
-            datasource_type=DatasourceType(full_type=result.datasource_type),
+            datasource_type=DatasourceType(full_type=datasource_build.get_built_context().datasource_type),
             context_built_at=datetime.now(),
-            context_file_path=context_file_path,
+            context_file_path=datasource_build.context_file_path,
         )
-    except NoPluginFoundForDatasource as e:
-        logger.warning(
-            "No plugin for '%s' (datasource=%s) — skipping.",
-            e.datasource_type.full_type,
-            prepared_source.datasource_id.relative_path_to_config_file(),
+
+    def _introspect(self, datasource_build: _DatasourceBuild) -> bool:
+        datasource_id = datasource_build.datasource_id
+        datasource_build.perf_span.enter_context(perf.span("datasource.total", datasource_id=str(datasource_id)))
+        self._emitter.datasource_started(
+            datasource_id=str(datasource_id),
+            index=datasource_build.index,
+            total=self._total,
         )
-        # Since the plugin was not found, no build steps were emitted but the plan was set:
-        # we need to emit all steps as completed
-        _emit_all_build_step_as_completed(
-            progress=progress,
-            datasource_id=datasource_id,
-            should_index=should_index,
-            should_enrich_context=should_enrich_context,
+
+        prepared_source = prepare_source(self._project_layout, datasource_id)
+        if not _is_datasource_enabled(prepared_source):
+            logger.info(f"Skipping disabled datasource {prepared_source.datasource_id.datasource_path}")
+            datasource_build.result = BuildDatasourceResult(
+                datasource_id=datasource_id, status=DatasourceStatus.SKIPPED
+            )
+            return False
+
+        perf.set_attribute("datasource_type", prepared_source.datasource_type.full_type)
+
+        logger.info(
+            f'Found datasource of type "{prepared_source.datasource_type.full_type}" with name {prepared_source.datasource_id.datasource_path}'
+        )
+
+        self._emitter.datasource_step_plan_set(
+            datasource_id=str(datasource_id),
+            step_plan=_build_step_plan(
+                should_index=self._should_index,
+                should_enrich_context=self._should_enrich_context,
+            ),
+        )
+
+        datasource_build.fingerprint = self._build_service.get_source_fingerprint(
+            prepared_source=prepared_source, should_enrich_context=self._should_enrich_context
+        )
+        if datasource_build.fingerprint is not None and not self._force:
+            with self._db_lock:
+                unchanged_build = self._build_service.find_unchanged_build(
+                    datasource_id=datasource_id,
+                    fingerprint=datasource_build.fingerprint,
+                    should_index=self._should_index,
+                )
+            if unchanged_build is not None:
+                logger.info(f"Skipping unchanged datasource {datasource_id.datasource_path}")
+                perf.set_attribute("unchanged", True)
+                _emit_all_build_step_as_completed(
+                    progress=self._progress,
+                    datasource_id=datasource_id,
+                    should_index=self._should_index,
+                    should_enrich_context=self._should_enrich_context,
+                )
+                datasource_build.result = BuildDatasourceResult(
+                    datasource_id=datasource_id,
+                    status=DatasourceStatus.OK,
+                    datasource_type=prepared_source.datasource_type,
+                    context_built_at=unchanged_build.built_at,
+                    context_file_path=datasource_id.absolute_path_to_context_file(self._project_layout),
+                )
+                return False
+
+        result = self._build_service.build_context(
+            prepared_source=prepared_source, progress=self._progress, incremental=not self._force
+        )
+
+        if self._should_enrich_context:
+            result = self._build_service.enrich_built_context(built_context=result, progress=self._progress)
+
+        datasource_build.built_context = result
+        return True
+
+    def _export(self, datasource_build: _DatasourceBuild) -> bool:
+        context_file_path = export_build_result(self._project_layout.output_dir, datasource_build.get_built_context())
+        perf.set_attribute("context_size_bytes", context_file_path.stat().st_size)
+        datasource_build.context_file_path = context_file_path
+
+        if self._should_index or datasource_build.fingerprint is not None:
+            datasource_build.context_hash = hash_context_file(
+                datasource_id=datasource_build.datasource_id, context_path=context_file_path
+            )
+
+        if datasource_build.fingerprint is not None:
+            with self._db_lock:
+                self._build_service.record_source_fingerprint(
+                    context_hash=datasource_build.get_context_hash(), fingerprint=datasource_build.fingerprint
+                )
+        return True
+
+    def _chunk(self, datasource_build: _DatasourceBuild) -> bool:
+        with self._db_lock:
+            datasource_build.chunks = self._build_service.chunk_built_context(
+                built_context=datasource_build.get_built_context(),
+                context_hash=datasource_build.get_context_hash(),
+                progress=self._progress,
+            )
+        return bool(datasource_build.chunks)
+
+    def _embed(self, datasource_build: _DatasourceBuild) -> bool:
+        datasource_build.chunk_embeddings = self._build_service.embed_chunks(
+            built_context=datasource_build.get_built_context(),
+            chunks=datasource_build.chunks,
+            progress=self._progress,
         )
-        return BuildDatasourceResult(datasource_id=datasource_id, status=DatasourceStatus.SKIPPED)
+        return True
+
+    def _persist(self, datasource_build: _DatasourceBuild) -> bool:
+        with self._db_lock:
+            self._build_service.persist_chunk_embeddings(
+                built_context=datasource_build.get_built_context(),
+                context_hash=datasource_build.get_context_hash(),
+                chunk_embeddings=datasource_build.chunk_embeddings,
+                progress=self._progress,
+            )
+        return True
 
 
 def _is_datasource_enabled(prepared_source: PreparedDatasource) -> bool:
@@ -285,6 +514,8 @@ def run_enrich_context(
                 EnrichContextResult(datasource_id=context.datasource_id, status=DatasourceStatus.FAILED, error=str(e))
             )
 
+    build_service.record_description_cache_stats()
+    build_service.evict_description_cache()
     logger.debug(
         "Successfully indexed %d/%d datasource(s). %s",
         ok,
@@ -404,6 +635,7 @@ def run_indexing(
         f"Skipped {skipped}. Failed {failed}." if (skipped or failed) else "",
     )
 
+    build_service.evict_embedding_cache()
     emitter.operation_finished(operation="index")
     return results
 
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import json
 import logging
 from dataclasses import replace
 from typing import Any
 
+import xxhash
+
 import databao_context_engine.perf.core as perf
 from databao_context_engine.build_sources.context_loader import (
     deserialize_built_context,
@@ -15,17 +18,33 @@ from databao_context_engine.datasources.datasource_context import (
     DatasourceContext,
     DatasourceContextHash,
     get_datasource_context,
+    hash_context_file,
 )
-from databao_context_engine.datasources.types import DatasourceId, PreparedDatasource
+from databao_context_engine.datasources.types import DatasourceId, PreparedConfig, PreparedDatasource
 from databao_context_engine.llm.descriptions.provider import DescriptionProvider
 from databao_context_engine.pluginlib.build_plugin import (
+    BuildDatasourcePlugin,
     BuildPlugin,
     DatasourceType,
+    EmbeddableChunk,
 )
+from databao_context_engine.pluginlib.plugin_utils import get_source_fingerprint_for_datasource
 from databao_context_engine.plugins.plugin_loader import DatabaoContextPluginLoader
-from databao_context_engine.progress.progress import ProgressCallback, ProgressEmitter, ProgressStep
+from databao_context_engine.progress.progress import (
+    ProgressCallback,
+    ProgressEmitter,
+    ProgressStep,
+    reporting_step_progress,
+)
+from databao_context_engine.project.info import get_dce_version
 from databao_context_engine.project.layout import ProjectLayout
 from databao_context_engine.services.chunk_embedding_service import ChunkEmbeddingService
+from databao_context_engine.services.description_cache import CachingDescriptionProvider
+from databao_context_engine.services.models import ChunkEmbedding
+from databao_context_engine.storage.models import DatasourceFingerprintDTO
+from databao_context_engine.storage.repositories.datasource_fingerprint_repository import (
+    DatasourceFingerprintRepository,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -38,20 +57,26 @@ class BuildService:
         chunk_embedding_service: ChunkEmbeddingService,
         plugin_loader: DatabaoContextPluginLoader,
         description_provider: DescriptionProvider | None = None,
+        fingerprint_repo: DatasourceFingerprintRepository | None = None,
     ) -> None:
         self._project_layout = project_layout
         self._chunk_embedding_service = chunk_embedding_service
         self._plugin_loader = plugin_loader
         self._description_provider = description_provider
+        self._fingerprint_repo = fingerprint_repo
 
     def build_context(
         self,
         *,
         prepared_source: PreparedDatasource,
         progress: ProgressCallback | None = None,
+        incremental: bool = False,
     ) -> BuiltDatasourceContext:
         """Process a single source to build its context.
 
+        When `incremental` is set, the context built by the previous build of the datasource is given to the plugin,
+        which can reuse the parts of it that didn't change.
+
         Returns:
             The built context.
         """
@@ -60,7 +85,10 @@ class BuildService:
         plugin = get_plugin_for_datasource_type(
             plugin_loader=self._plugin_loader, datasource_type=prepared_source.datasource_type
         )
-        result = self._execute_plugin(prepared_source=prepared_source, plugin=plugin)
+        previous_context = (
+            self._load_previous_context(prepared_source=prepared_source, plugin=plugin) if incremental else None
+        )
+        result = self._execute_plugin(prepared_source=prepared_source, plugin=plugin, previous_context=previous_context)
 
         emitter.datasource_step_completed(
             datasource_id=result.datasource_id,
@@ -70,8 +98,119 @@ class BuildService:
         return result
 
     @perf.perf_span("plugin.execute")
-    def _execute_plugin(self, *, prepared_source: PreparedDatasource, plugin: BuildPlugin) -> BuiltDatasourceContext:
-        return execute_plugin(self._project_layout, prepared_source, plugin)
+    def _execute_plugin(
+        self, *, prepared_source: PreparedDatasource, plugin: BuildPlugin, previous_context: Any | None = None
+    ) -> BuiltDatasourceContext:
+        return execute_plugin(self._project_layout, prepared_source, plugin, previous_context)
+
+    @perf.perf_span("plugin.load_previous_context")
+    def _load_previous_context(self, *, prepared_source: PreparedDatasource, plugin: BuildPlugin) -> Any | None:
+        # Loading the previous context is only worth it for plugins able to reuse it
+        if (
+            not isinstance(prepared_source, PreparedConfig)
+            or not isinstance(plugin, BuildDatasourcePlugin)
+            or getattr(type(plugin), "update_context", None) in (None, BuildDatasourcePlugin.update_context)
+        ):
+            return None
+
+        datasource_id = prepared_source.datasource_id
+        if not datasource_id.absolute_path_to_context_file(self._project_layout).is_file():
+            return None
+
+        try:
+            previous_build = self._deserialize_built_context(
+                context=get_datasource_context(self._project_layout, datasource_id),
+                context_type=plugin.context_type,
+            )
+        except Exception:
+            logger.debug("Ignoring the previous context of %s, which can't be loaded", datasource_id, exc_info=True)
+            return None
+
+        if previous_build.datasource_type != prepared_source.datasource_type.full_type:
+            return None
+        return previous_build.context
+
+    @perf.perf_span("plugin.source_fingerprint")
+    def get_source_fingerprint(self, *, prepared_source: PreparedDatasource, should_enrich_context: bool) -> str | None:
+        """Compute the fingerprint of a datasource, used to skip its build when it didn't change since the previous one.
+
+        Besides the fingerprint computed by the plugin, it covers everything else changing the built context: the config
+        of the datasource, the version of the engine and whether the context is enriched.
+
+        Returns:
+            The fingerprint, or None if the datasource can't be fingerprinted.
+        """
+        if self._fingerprint_repo is None or not isinstance(prepared_source, PreparedConfig):
+            return None
+
+        plugin = get_plugin_for_datasource_type(
+            plugin_loader=self._plugin_loader, datasource_type=prepared_source.datasource_type
+        )
+        if not isinstance(plugin, BuildDatasourcePlugin):
+            return None
+
+        try:
+            source_fingerprint = get_source_fingerprint_for_datasource(
+                plugin=plugin, datasource_type=prepared_source.datasource_type, config=prepared_source.config
+            )
+        except Exception:
+            # The datasource is built anyway, which reports the error if there is a real issue with the datasource
+            logger.debug("Failed to fingerprint %s", prepared_source.datasource_id, exc_info=True)
+            return None
+
+        if source_fingerprint is None:
+            return None
+
+        return xxhash.xxh3_128_hexdigest(
+            json.dumps(
+                [
+                    get_dce_version(),
+                    prepared_source.datasource_type.full_type,
+                    prepared_source.config,
+                    should_enrich_context,
+                    source_fingerprint,
+                ],
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        )
+
+    def find_unchanged_build(
+        self, *, datasource_id: DatasourceId, fingerprint: str, should_index: bool
+    ) -> DatasourceFingerprintDTO | None:
+        """Find the previous build of a datasource, if the datasource didn't change since then.
+
+        The previous build is only reused if it recorded the same fingerprint, if its context file was not modified since
+        then and, when `should_index` is set, if that context is indexed.
+
+        Returns:
+            The fingerprint recorded by the previous build, or None if the datasource needs to be built again.
+        """
+        if self._fingerprint_repo is None:
+            return None
+
+        previous_build = self._fingerprint_repo.get(datasource_id=str(datasource_id))
+        if previous_build is None or previous_build.fingerprint != fingerprint:
+            return None
+
+        context_path = datasource_id.absolute_path_to_context_file(self._project_layout)
+        if not context_path.is_file():
+            return None
+
+        context_hash = hash_context_file(datasource_id=datasource_id, context_path=context_path)
+        if context_hash.hash != previous_build.context_hash:
+            return None
+
+        if should_index and not self._chunk_embedding_service.is_context_already_indexed(context_hash=context_hash):
+            return None
+
+        return previous_build
+
+    def record_source_fingerprint(self, *, context_hash: DatasourceContextHash, fingerprint: str) -> None:
+        if self._fingerprint_repo is not None:
+            self._fingerprint_repo.put(
+                datasource_id=str(context_hash.datasource_id), fingerprint=fingerprint, context_hash=context_hash.hash
+            )
 
     def index_datasource_context(
         self,
@@ -126,11 +265,67 @@ class BuildService:
         force_index: bool = False,
         progress: ProgressCallback | None,
     ) -> None:
+        chunks = self._chunk_built_context(
+            built_context=built_context,
+            context_hash=context_hash,
+            plugin=plugin,
+            force_index=force_index,
+            progress=progress,
+        )
+        if not chunks:
+            return
+
+        self._chunk_embedding_service.embed_chunks(
+            chunks=chunks,
+            context_hash=context_hash,
+            full_type=built_context.datasource_type,
+            datasource_id=built_context.datasource_id,
+            override=force_index,
+            progress=progress,
+        )
+
+    def chunk_built_context(
+        self,
+        *,
+        built_context: BuiltDatasourceContext,
+        context_hash: DatasourceContextHash,
+        force_index: bool = False,
+        progress: ProgressCallback | None = None,
+    ) -> list[EmbeddableChunk]:
+        """Divide a built context into the chunks to index.
+
+        This is the first step of `index_built_context`, for callers running the embedding and the persistence of the
+        chunks as separate steps (see `embed_chunks` and `persist_chunk_embeddings`).
+
+        Returns:
+            The chunks to index, or an empty list if the context has already been indexed or has nothing to index.
+        """
+        plugin = get_plugin_for_datasource_type(
+            plugin_loader=self._plugin_loader, datasource_type=DatasourceType(full_type=built_context.datasource_type)
+        )
+
+        return self._chunk_built_context(
+            built_context=built_context,
+            context_hash=context_hash,
+            plugin=plugin,
+            force_index=force_index,
+            progress=progress,
+        )
+
+    def _chunk_built_context(
+        self,
+        *,
+        built_context: BuiltDatasourceContext,
+        context_hash: DatasourceContextHash,
+        plugin: BuildPlugin,
+        force_index: bool = False,
+        progress: ProgressCallback | None,
+    ) -> list[EmbeddableChunk]:
         if not force_index and self._chunk_embedding_service.is_context_already_indexed(context_hash=context_hash):
             logger.info(f"Context for {str(context_hash.datasource_id)} has already been indexed, skipping indexing.")
             # Make sure to emit all step completed events
             BuildService.emit_all_index_step_as_completed(progress=progress, datasource_id=built_context.datasource_id)
-            return
+            return []
 
         perf.set_attribute("datasource_type", built_context.datasource_type)
 
@@ -139,10 +334,33 @@ class BuildService:
 
         if not chunks:
             logger.info("No chunks for %s — skipping indexing.", built_context.datasource_id)
-            return
 
-        self._chunk_embedding_service.embed_chunks(
+        return chunks
+
+    def embed_chunks(
+        self,
+        *,
+        built_context: BuiltDatasourceContext,
+        chunks: list[EmbeddableChunk],
+        progress: ProgressCallback | None = None,
+    ) -> list[ChunkEmbedding]:
+        return self._chunk_embedding_service.embed(
             chunks=chunks,
+            datasource_id=built_context.datasource_id,
+            progress=progress,
+        )
+
+    def persist_chunk_embeddings(
+        self,
+        *,
+        built_context: BuiltDatasourceContext,
+        context_hash: DatasourceContextHash,
+        chunk_embeddings: list[ChunkEmbedding],
+        force_index: bool = False,
+        progress: ProgressCallback | None = None,
+    ) -> None:
+        self._chunk_embedding_service.persist(
+            chunk_embeddings=chunk_embeddings,
             context_hash=context_hash,
             full_type=built_context.datasource_type,
             datasource_id=built_context.datasource_id,
@@ -157,7 +375,9 @@ class BuildService:
         context_type: type[Any],
     ) -> BuiltDatasourceContext:
         """Parse the YAML payload and return a BuiltDatasourceContext with a typed `.context`."""
-        return deserialize_built_context(context=context, context_type=context_type)
+        return deserialize_built_context(
+            context=context, context_type=context_type, project_layout=self._project_layout
+        )
 
     def enrich_datasource_context(
         self, context: DatasourceContext, progress: ProgressCallback | None = None
@@ -187,7 +407,10 @@ class BuildService:
         emitter = ProgressEmitter(progress)
         perf.set_attribute("datasource_type", built_context.datasource_type)
 
-        new_context = plugin.enrich_context(built_context.context, self._description_provider)
+        with reporting_step_progress(
+            emitter, datasource_id=built_context.datasource_id, step=ProgressStep.CONTEXT_ENRICHMENT
+        ):
+            new_context = plugin.enrich_context(built_context.context, self._description_provider)
 
         result = replace(built_context, context=new_context)
 
@@ -198,20 +421,60 @@ class BuildService:
 
         return result
 
+    def evict_description_cache(self) -> None:
+        """Bound the description cache once the descriptions of the build have been generated."""
+        if isinstance(self._description_provider, CachingDescriptionProvider):
+            self._description_provider.evict_cache()
+
+    def evict_embedding_cache(self) -> None:
+        """Bound the embedding cache once the chunks of the build have been embedded."""
+        self._chunk_embedding_service.evict_embedding_cache()
+
+    def record_description_cache_stats(self) -> None:
+        """Record how many of the descriptions generated since the creation of the service came from the cache."""
+        if not isinstance(self._description_provider, CachingDescriptionProvider):
+            return
+
+        stats = self._description_provider.cache_stats
+        if stats.hits + stats.misses == 0:
+            return
+
+        perf.add_attributes(
+            {
+                "description_cache.hits": stats.hits,
+                "description_cache.misses": stats.misses,
+                "description_cache.hit_ratio": round(stats.hit_ratio, 3),
+            }
+        )
+        logger.info(
+            "%d/%d descriptions were served from the description cache (%.0f%%)",
+            stats.hits,
+            stats.hits + stats.misses,
+            stats.hit_ratio * 100,
+        )
+
+    def get_contexts_not_indexed(
+        self, datasource_context_hashes: list[DatasourceContextHash]
+    ) -> list[DatasourceContextHash]:
+        return self._chunk_embedding_service.get_contexts_not_indexed(datasource_context_hashes)
+
     def index_context_if_necessary(self, datasource_context_hashes: list[DatasourceContextHash]) -> None:
-        for datasource_context_hash in datasource_context_hashes:
-            if not self._chunk_embedding_service.is_context_already_indexed(context_hash=datasource_context_hash):
-                logger.info(
-                    f"Index is missing for the current context of datasource {str(datasource_context_hash.datasource_id)}, it will be re-indexed."
-                )
-
-                context = get_datasource_context(self._project_layout, datasource_context_hash.datasource_id)
-
-                self.index_datasource_context(
-                    context=context,
-                    # Forcing the index prevents checking for the datasource context hash again since we just did
-                    force_index=True,
-                )
+        contexts_not_indexed = self.get_contexts_not_indexed(datasource_context_hashes)
+        for datasource_context_hash in contexts_not_indexed:
+            logger.info(
+                f"Index is missing for the current context of datasource {str(datasource_context_hash.datasource_id)}, it will be re-indexed."
+            )
+
+            context = get_datasource_context(self._project_layout, datasource_context_hash.datasource_id)
+
+            self.index_datasource_context(
+                context=context,
+                # Forcing the index prevents checking for the datasource context hash again since we just did
+                force_index=True,
+            )
+
+        if contexts_not_indexed:
+            self.evict_embedding_cache()
 
     @staticmethod
     def build_context_step_plan() -> tuple[ProgressStep, ...]:
@@ -9,7 +9,12 @@ from databao_context_engine.build_sources.build_runner import (
 )
 from databao_context_engine.build_sources.build_service import BuildService
 from databao_context_engine.build_sources.types import BuildDatasourceResult, EnrichContextResult, IndexDatasourceResult
-from databao_context_engine.datasources.datasource_context import DatasourceContext
+from databao_context_engine.datasources.datasource_context import (
+    DatasourceContext,
+    get_all_datasource_context_hashes,
+    get_introspected_datasource_list,
+)
+from databao_context_engine.datasources.datasource_discovery import discover_datasources
 from databao_context_engine.datasources.types import DatasourceId
 from databao_context_engine.llm.factory import (
     create_ollama_description_provider,
@@ -19,9 +24,16 @@ from databao_context_engine.llm.factory import (
 from databao_context_engine.plugins.plugin_loader import DatabaoContextPluginLoader
 from databao_context_engine.progress.progress import ProgressCallback
 from databao_context_engine.project.layout import ProjectLayout
-from databao_context_engine.services.factories import create_chunk_embedding_service
+from databao_context_engine.services.description_cache import CachingDescriptionProvider
+from databao_context_engine.services.factories import (
+    create_chunk_embedding_service,
+    create_description_cache,
+    create_garbage_collection_service,
+)
+from databao_context_engine.services.garbage_collection_service import GarbageCollectionResult
 from databao_context_engine.storage.connection import open_duckdb_connection
 from databao_context_engine.storage.migrate import migrate
+from databao_context_engine.storage.repositories.factories import create_datasource_fingerprint_repository
 
 logger = logging.getLogger(__name__)
 
@@ -33,11 +45,15 @@ def build_all_datasources(
     should_index: bool,
     should_enrich_context: bool,
     progress: ProgressCallback | None = None,
+    max_parallel_datasources: int = 1,
+    keep_previous_context_hashes: int = 0,
+    force: bool = False,
 ) -> list[BuildDatasourceResult]:
     """Build the context for all datasources in the project.
 
     - Instantiates the build service
     - Delegates the actual build logic to the build runner
+    - If the context was indexed, garbage collects the stale context hashes from the database
 
     Returns:
         A list of all the contexts built.
@@ -57,16 +73,33 @@ def build_all_datasources(
             project_layout=project_layout,
             plugin_loader=plugin_loader,
             should_enrich_context=should_enrich_context,
+            keep_previous_context_hashes=keep_previous_context_hashes,
         )
-        return build(
+        results = build(
             project_layout=project_layout,
             build_service=build_service,
             datasource_ids=datasource_ids,
             should_index=should_index,
             should_enrich_context=should_enrich_context,
             progress=progress,
+            max_parallel_datasources=max_parallel_datasources,
+            force=force,
         )
 
+        if should_index:
+            gc_result = create_garbage_collection_service(conn).collect(
+                keep_previous_hashes=keep_previous_context_hashes,
+                existing_datasource_ids=_get_project_datasource_ids(project_layout),
+                current_context_hashes=get_all_datasource_context_hashes(project_layout),
+            )
+            logger.info(
+                "Deleted %d stale context hash(es) from the index, reclaiming %d bytes",
+                gc_result.deleted_context_hashes,
+                gc_result.bytes_reclaimed,
+            )
+
+        return results
+
 
 def enrich_built_contexts(
     project_layout: ProjectLayout,
@@ -129,22 +162,56 @@ def index_built_contexts(
         )
 
 
+def collect_garbage(project_layout: ProjectLayout, *, keep_previous_context_hashes: int = 0) -> GarbageCollectionResult:
+    """Delete the stale context hashes, chunks and vectors from the database and compact it.
+
+    Returns:
+        A summary of the garbage collection.
+    """
+    logger.debug("Starting to garbage collect the index of project %s", project_layout.project_dir.resolve())
+
+    db_path = project_layout.db_path
+    migrate(db_path)
+
+    with open_duckdb_connection(db_path) as conn:
+        return create_garbage_collection_service(conn).collect(
+            keep_previous_hashes=keep_previous_context_hashes,
+            existing_datasource_ids=_get_project_datasource_ids(project_layout),
+            current_context_hashes=get_all_datasource_context_hashes(project_layout),
+        )
+
+
+def _get_project_datasource_ids(project_layout: ProjectLayout) -> set[str]:
+    # A datasource whose config was deleted is still searched while its context file exists
+    return {str(datasource_id) for datasource_id in discover_datasources(project_layout)} | {
+        str(datasource.id) for datasource in get_introspected_datasource_list(project_layout)
+    }
+
+
 def create_build_service(
     conn: DuckDBPyConnection,
     *,
     project_layout: ProjectLayout,
     plugin_loader: DatabaoContextPluginLoader,
     should_enrich_context: bool,
+    keep_previous_context_hashes: int = 0,
 ) -> BuildService:
     ollama_service = create_ollama_service()
     embedding_provider = create_ollama_embedding_provider(
         ollama_service, model_details=project_layout.project_config.ollama_embedding_model_details
     )
-    description_provider = create_ollama_description_provider(ollama_service) if should_enrich_context else None
+    description_provider = (
+        CachingDescriptionProvider(
+            create_ollama_description_provider(ollama_service), cache=create_description_cache(conn)
+        )
+        if should_enrich_context
+        else None
+    )
 
     chunk_embedding_service = create_chunk_embedding_service(
         conn,
         embedding_provider=embedding_provider,
+        keep_previous_context_hashes=keep_previous_context_hashes,
     )
 
     return BuildService(
@@ -152,4 +219,5 @@ def create_build_service(
         chunk_embedding_service=chunk_embedding_service,
         plugin_loader=plugin_loader,
         description_provider=description_provider,
+        fingerprint_repo=create_datasource_fingerprint_repository(conn),
     )
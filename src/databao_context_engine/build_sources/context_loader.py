@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
 from typing import Any
 
-import yaml
 from pydantic import TypeAdapter
 
+from databao_context_engine.build_sources.context_sidecar import read_context_sidecar
 from databao_context_engine.build_sources.plugin_execution import BuiltDatasourceContext
 from databao_context_engine.datasources.datasource_context import (
     DatasourceContext,
@@ -14,9 +17,14 @@ from databao_context_engine.datasources.datasource_context import (
 )
 from databao_context_engine.datasources.types import DatasourceId
 from databao_context_engine.pluginlib.build_plugin import BuildPlugin, DatasourceType
-from databao_context_engine.plugins.databases.databases_types import DatabaseIntrospectionResult
+from databao_context_engine.plugins.databases.database_context_explorer import (
+    DatabaseTableKey,
+    index_database_tables,
+)
+from databao_context_engine.plugins.databases.databases_types import DatabaseIntrospectionResult, DatabaseTable
 from databao_context_engine.plugins.plugin_loader import DatabaoContextPluginLoader, NoPluginFoundForDatasource
 from databao_context_engine.project.layout import ProjectLayout
+from databao_context_engine.serialization.yaml import load_yaml
 
 
 def get_plugin_for_context(plugin_loader: DatabaoContextPluginLoader, context: DatasourceContext) -> BuildPlugin:
@@ -41,11 +49,37 @@ def deserialize_built_context(
     *,
     context: DatasourceContext,
     context_type: type[Any],
+    project_layout: ProjectLayout | None = None,
 ) -> BuiltDatasourceContext:
-    """Parse a datasource output YAML payload and type the embedded context."""
-    raw_context = yaml.safe_load(context.context)
+    """Parse a datasource output YAML payload and type the embedded context.
+
+    When a project layout is given, the context is read from the sidecar of the context file instead, if it is in sync.
+
+    Returns:
+        The built context, with its context typed as `context_type`.
+    """
+    raw_context = None
+    if project_layout is not None:
+        raw_context = read_context_sidecar(
+            context.datasource_id.absolute_path_to_context_file(project_layout),
+            context_hash=context.context_hash.hash,
+        )
+    if raw_context is None:
+        raw_context = load_yaml(context.context)
+
+    return _built_context_type_adapter(context_type).validate_python(raw_context)
+
+
+# Building a TypeAdapter compiles the validator of the whole context type: it is done once per plugin context type
+_BUILT_CONTEXT_TYPE_ADAPTERS: dict[type[Any], TypeAdapter[BuiltDatasourceContext]] = {}
 
-    return TypeAdapter(BuiltDatasourceContext[context_type]).validate_python(raw_context)  # type: ignore[valid-type]
+
+def _built_context_type_adapter(context_type: type[Any]) -> TypeAdapter[BuiltDatasourceContext]:
+    adapter = _BUILT_CONTEXT_TYPE_ADAPTERS.get(context_type)
+    if adapter is None:
+        adapter = TypeAdapter(BuiltDatasourceContext[context_type])  # type: ignore[valid-type]
+        _BUILT_CONTEXT_TYPE_ADAPTERS[context_type] = adapter
+    return adapter
 
 
 def _load_typed_built_context(
@@ -57,7 +91,9 @@ def _load_typed_built_context(
     datasource_context = get_datasource_context(project_layout=project_layout, datasource_id=datasource_id)
     plugin = get_plugin_for_context(plugin_loader=plugin_loader, context=datasource_context)
 
-    return deserialize_built_context(context=datasource_context, context_type=plugin.context_type)
+    return deserialize_built_context(
+        context=datasource_context, context_type=plugin.context_type, project_layout=project_layout
+    )
 
 
 def load_database_built_context(
@@ -79,3 +115,61 @@ def load_database_built_context(
     if not isinstance(built.context, DatabaseIntrospectionResult):
         raise ValueError(f"Datasource {datasource_id} is not database-capable")
     return built
+
+
+@dataclass(frozen=True)
+class CachedDatabaseContext:
+    """A parsed database context, with its tables indexed by (catalog, schema, table) names.
+
+    The context is shared by all the callers of the cache: it must not be modified.
+    """
+
+    built: BuiltDatasourceContext
+    table_index: Mapping[DatabaseTableKey, DatabaseTable]
+    file_signature: tuple[int, int, int]
+
+
+class DatabaseContextCache:
+    """Cache of the parsed database contexts of a domain, invalidated when their context file changes.
+
+    Context files can be several MB of YAML, while metadata lookups only need a single table: a context is only parsed
+    again once the modification time, size or inode of its context file changed, e.g. after a new build.
+    """
+
+    def __init__(self, *, project_layout: ProjectLayout, plugin_loader: DatabaoContextPluginLoader):
+        self._project_layout = project_layout
+        self._plugin_loader = plugin_loader
+        self._lock = threading.Lock()
+        self._entries: dict[DatasourceId, CachedDatabaseContext] = {}
+
+    def get(self, datasource_id: DatasourceId) -> CachedDatabaseContext:
+        """Get the parsed database context of a datasource, parsing its context file if it changed since the last call.
+
+        Returns:
+            The parsed context and its table index.
+        """
+        file_signature = self._get_file_signature(datasource_id)
+        with self._lock:
+            entry = self._entries.get(datasource_id)
+        if entry is not None and entry.file_signature == file_signature:
+            return entry
+
+        built = load_database_built_context(
+            project_layout=self._project_layout,
+            plugin_loader=self._plugin_loader,
+            datasource_id=datasource_id,
+        )
+        entry = CachedDatabaseContext(
+            built=built, table_index=index_database_tables(built), file_signature=file_signature
+        )
+        with self._lock:
+            self._entries[datasource_id] = entry
+        return entry
+
+    def _get_file_signature(self, datasource_id: DatasourceId) -> tuple[int, int, int]:
+        try:
+            stat = datasource_id.absolute_path_to_context_file(self._project_layout).stat()
+        except OSError:
+            # Loading the context raises the error for a missing context file
+            return (-1, -1, -1)
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
@@ -0,0 +1,92 @@
+import base64
+import json
+import logging
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_SIDECAR_SUFFIX = ".sidecar.json"
+
+# JSON has no type for these values, which are loaded back as such from the YAML context
+_DATETIME_TAG = "__dce_datetime__"
+_DATE_TAG = "__dce_date__"
+_BYTES_TAG = "__dce_bytes__"
+
+
+def is_context_sidecar_enabled() -> bool:
+    env_var = os.environ.get("DCE_CONTEXT_SIDECAR")
+    if not env_var:
+        return False
+
+    if env_var.lower() in ("1", "true", "yes"):
+        return True
+    if env_var.lower() not in ("0", "false", "no"):
+        logger.warning("Ignoring invalid DCE_CONTEXT_SIDECAR value: %s", env_var)
+    return False
+
+
+def get_context_sidecar_path(context_path: Path) -> Path:
+    return context_path.with_name(context_path.name + _SIDECAR_SUFFIX)
+
+
+def write_context_sidecar(context_path: Path, *, plain_context: Any, context_hash: str) -> None:
+    """Write the sidecar of a context file: a JSON copy of the context, which is loaded much faster than the YAML.
+
+    The sidecar records the hash of the context file it was written for, and is ignored once the context file changes.
+    """
+    sidecar_path = get_context_sidecar_path(context_path)
+    tmp_path = sidecar_path.with_name(sidecar_path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as sidecar_file:
+        json.dump({"context_hash": context_hash, "context": plain_context}, sidecar_file, default=_encode_value)
+    tmp_path.replace(sidecar_path)
+
+
+def read_context_sidecar(context_path: Path, *, context_hash: str) -> Any | None:
+    """Read the context from the sidecar of a context file.
+
+    Returns:
+        The context as dicts, lists and built-in primitives, or None if there is no sidecar in sync with the context file.
+    """
+    sidecar_path = get_context_sidecar_path(context_path)
+    try:
+        with sidecar_path.open("r", encoding="utf-8") as sidecar_file:
+            sidecar = json.load(sidecar_file, object_hook=_decode_value)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring the invalid context sidecar %s: %s", sidecar_path, e)
+        return None
+
+    if not isinstance(sidecar, dict) or sidecar.get("context_hash") != context_hash:
+        logger.debug("Ignoring the context sidecar %s: it is out of sync with its context file", sidecar_path)
+        return None
+    return sidecar.get("context")
+
+
+def delete_context_sidecar(context_path: Path) -> None:
+    get_context_sidecar_path(context_path).unlink(missing_ok=True)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    if isinstance(value, date):
+        return {_DATE_TAG: value.isoformat()}
+    if isinstance(value, bytes):
+        return {_BYTES_TAG: base64.b64encode(value).decode("ascii")}
+    # Same as the YAML serialization: unknown types are written as their string representation
+    return str(value)
+
+
+def _decode_value(obj: dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if _DATETIME_TAG in obj:
+            return datetime.fromisoformat(obj[_DATETIME_TAG])
+        if _DATE_TAG in obj:
+            return date.fromisoformat(obj[_DATE_TAG])
+        if _BYTES_TAG in obj:
+            return base64.b64decode(obj[_BYTES_TAG])
+    return obj
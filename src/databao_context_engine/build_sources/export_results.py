@@ -1,10 +1,16 @@
 import logging
 from pathlib import Path
 
+from databao_context_engine.build_sources.context_sidecar import (
+    delete_context_sidecar,
+    is_context_sidecar_enabled,
+    write_context_sidecar,
+)
 from databao_context_engine.build_sources.plugin_execution import BuiltDatasourceContext
+from databao_context_engine.datasources.datasource_context import hash_context_file
 from databao_context_engine.datasources.types import DatasourceId
 from databao_context_engine.project.layout import DEPRECATED_ALL_RESULTS_FILE_NAME, ProjectLayout
-from databao_context_engine.serialization.yaml import write_yaml_to_stream
+from databao_context_engine.serialization.yaml import to_plain_python, write_yaml_to_stream
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +22,15 @@ def export_build_result(output_dir: Path, result: BuiltDatasourceContext) -> Pat
     # Make sure the parent folder exists
     export_file_path.parent.mkdir(parents=True, exist_ok=True)
 
+    plain_result = to_plain_python(result)
     with export_file_path.open("w") as export_file:
-        write_yaml_to_stream(data=result, file_stream=export_file)
+        write_yaml_to_stream(data=plain_result, file_stream=export_file)
+
+    if is_context_sidecar_enabled():
+        context_hash = hash_context_file(datasource_id=datasource_id, context_path=export_file_path)
+        write_context_sidecar(export_file_path, plain_context=plain_result, context_hash=context_hash.hash)
+    else:
+        delete_context_sidecar(export_file_path)
 
     logger.info(f"Exported result to {export_file_path.resolve()}")
 
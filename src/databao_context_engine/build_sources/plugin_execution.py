@@ -35,9 +35,12 @@ class BuiltDatasourceContext(Generic[ContextT]):
 
 
 def execute_plugin(
-    project_layout: ProjectLayout, prepared_datasource: PreparedDatasource, plugin: BuildPlugin
+    project_layout: ProjectLayout,
+    prepared_datasource: PreparedDatasource,
+    plugin: BuildPlugin,
+    previous_context: Any | None = None,
 ) -> BuiltDatasourceContext:
-    built_context = _execute(project_layout, prepared_datasource, plugin)
+    built_context = _execute(project_layout, prepared_datasource, plugin, previous_context)
     return BuiltDatasourceContext(
         datasource_id=str(prepared_datasource.datasource_id),
         datasource_type=prepared_datasource.datasource_type.full_type,
@@ -45,7 +48,12 @@ def execute_plugin(
     )
 
 
-def _execute(project_layout: ProjectLayout, prepared_datasource: PreparedDatasource, plugin: BuildPlugin) -> Any:
+def _execute(
+    project_layout: ProjectLayout,
+    prepared_datasource: PreparedDatasource,
+    plugin: BuildPlugin,
+    previous_context: Any | None,
+) -> Any:
     """Run a prepared source through the plugin."""
     if isinstance(prepared_datasource, PreparedConfig):
         ds_plugin = cast(BuildDatasourcePlugin, plugin)
@@ -55,6 +63,7 @@ def _execute(project_layout: ProjectLayout, prepared_datasource: PreparedDatasou
             datasource_type=prepared_datasource.datasource_type,
             config=prepared_datasource.config,
             datasource_name=prepared_datasource.datasource_name,
+            previous_context=previous_context,
         )
 
     file_plugin = cast(BuildFilePlugin, plugin)
@@ -154,10 +154,34 @@ def run_sql_query(ctx: Context, datasource_config_file: str, sql: str) -> None:
     show_default=True,
     help="Whether to index the context. If disabled, the context will be built but not indexed.",
 )
+@click.option(
+    "-j",
+    "--max-parallel-datasources",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Maximum number of datasources to build at the same time.",
+)
+@click.option(
+    "--keep-previous-contexts",
+    "keep_previous_context_hashes",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Number of previous contexts of each datasource to keep in the index when cleaning it up after the build.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Build every datasource, including the ones that didn't change since their previous build.",
+)
 @click.pass_context
 def build(
     ctx: Context,
     should_index: bool,
+    max_parallel_datasources: int,
+    keep_previous_context_hashes: int,
+    force: bool,
 ) -> None:
     """Build context for all datasources.
 
@@ -168,6 +192,9 @@ def build(
     results = DatabaoContextDomainManager(domain_dir=ctx.obj["project_dir"]).build_context(
         datasource_ids=None,
         should_index=should_index,
+        max_parallel_datasources=max_parallel_datasources,
+        keep_previous_context_hashes=keep_previous_context_hashes,
+        force=force,
     )
 
     _echo_operation_result(
@@ -207,6 +234,41 @@ def index(ctx: Context, datasources_config_files: tuple[str, ...]) -> None:
     )
 
 
+@dce.command()
+@click.option(
+    "--keep-previous-contexts",
+    "keep_previous_context_hashes",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Number of previous contexts of each datasource to keep in the index.",
+)
+@click.pass_context
+def gc(ctx: Context, keep_previous_context_hashes: int) -> None:
+    """Remove outdated contexts from the index and compact it.
+
+    Only the current context of each datasource, the one of its context file, is kept (plus the number of most recently
+    indexed previous ones given with --keep-previous-contexts; previous contexts are only kept by a build run with the
+    same option). The contexts of the datasources that were removed from the project are deleted too, with the chunks
+    and embeddings of all the deleted contexts.
+    """
+    result = DatabaoContextDomainManager(domain_dir=ctx.obj["project_dir"]).collect_garbage(
+        keep_previous_context_hashes=keep_previous_context_hashes
+    )
+
+    click.echo(
+        f"Garbage collection complete. Deleted {result.deleted_context_hashes} context(s), "
+        f"{result.deleted_chunks} chunk(s) and {result.deleted_embeddings} embedding(s)."
+    )
+    click.echo(
+        f"Reclaimed {result.bytes_reclaimed} bytes ({result.bytes_before} bytes before, {result.bytes_after} after)."
+    )
+    click.echo(
+        f"Index query time: {result.query_seconds_before * 1000:.1f} ms before, "
+        f"{result.query_seconds_after * 1000:.1f} ms after."
+    )
+
+
 @dce.command()
 @click.argument(
     "retrieve-text",
@@ -252,7 +314,10 @@ def retrieve(
 
     databao_engine = DatabaoContextEngine(domain_dir=ctx.obj["project_dir"])
 
-    retrieve_results = databao_engine.search_context(search_text=text, limit=limit, datasource_ids=datasource_ids)
+    try:
+        retrieve_results = databao_engine.search_context(search_text=text, limit=limit, datasource_ids=datasource_ids)
+    finally:
+        databao_engine.close()
 
     display_texts = [context_search_result.context_result for context_search_result in retrieve_results]
     if output_file is not None:
@@ -0,0 +1,4 @@
+from databao_context_engine.concurrency.parallel import map_in_parallel
+from databao_context_engine.concurrency.pipeline import PipelineStage, PipelineStageStats, run_pipeline
+
+__all__ = ["map_in_parallel", "PipelineStage", "PipelineStageStats", "run_pipeline"]
@@ -0,0 +1,27 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_in_parallel(fn: Callable[[T], R], items: Iterable[T], *, max_workers: int) -> list[R]:
+    """Apply `fn` to every item using at most `max_workers` threads.
+
+    The results are returned in the same order as the items, no matter in which order they complete.
+    Each call runs in a copy of the caller's context, so that context variables (e.g. the current perf span)
+    are propagated to the worker threads.
+
+    If `max_workers` is 1 or less, the items are processed sequentially in the calling thread.
+
+    Returns:
+        The results of `fn` for each item, in the order of the items.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, fn, item) for item in items]
+        return [future.result() for future in futures]
@@ -0,0 +1,128 @@
+import contextvars
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Generic, Iterable, Sequence, TypeVar
+
+T = TypeVar("T")
+
+_END_OF_STAGE = object()
+
+
+@dataclass(frozen=True)
+class PipelineStage(Generic[T]):
+    """A step of a pipeline, applied to every item by `workers` threads.
+
+    `process` returns whether the item should move on to the next stage: returning False drops the item.
+    """
+
+    name: str
+    process: Callable[[T], bool]
+    workers: int = 1
+
+
+@dataclass
+class PipelineStageStats:
+    name: str
+    workers: int
+    items: int = 0
+    busy_seconds: float = 0.0
+    first_started_at: float | None = None
+    last_finished_at: float | None = None
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.first_started_at is None or self.last_finished_at is None:
+            return 0.0
+        return self.last_finished_at - self.first_started_at
+
+    @property
+    def items_per_second(self) -> float:
+        wall_seconds = self.wall_seconds
+        return self.items / wall_seconds if wall_seconds > 0 else 0.0
+
+
+def run_pipeline(
+    items: Iterable[T], stages: Sequence[PipelineStage[T]], *, queue_size: int
+) -> list[PipelineStageStats]:
+    """Push every item through the stages, each stage running in its own threads.
+
+    Consecutive stages are connected by queues holding at most `queue_size` items: a stage that is ahead of the next
+    one blocks instead of accumulating items, which bounds the number of items held in memory.
+    All stages run concurrently, so that a stage can process an item while the other stages process the previous or
+    the next items.
+
+    Each item is processed in its own copy of the caller's context, shared by all stages. This propagates context
+    variables (e.g. the current perf span) to the worker threads and lets a stage see the context variables set by the
+    previous stages for the same item.
+
+    If a stage raises, the item is dropped and the first error is re-raised once all the other items went through
+    the pipeline.
+
+    Returns:
+        The processing statistics of each stage, in the order of the stages.
+    """
+    if not stages:
+        return []
+
+    inboxes: list[queue.Queue] = [queue.Queue(maxsize=max(queue_size, 1)) for _ in stages]
+    stats = [PipelineStageStats(name=stage.name, workers=max(stage.workers, 1)) for stage in stages]
+    remaining_workers = [stage_stats.workers for stage_stats in stats]
+    errors: list[BaseException] = []
+    lock = threading.Lock()
+
+    def work(stage_index: int) -> None:
+        stage = stages[stage_index]
+        stage_stats = stats[stage_index]
+        inbox = inboxes[stage_index]
+        outbox = inboxes[stage_index + 1] if stage_index + 1 < len(stages) else None
+
+        while (entry := inbox.get()) is not _END_OF_STAGE:
+            context, item = entry
+            started_at = time.perf_counter()
+            try:
+                should_continue = context.run(stage.process, item)
+            except BaseException as e:
+                with lock:
+                    errors.append(e)
+                should_continue = False
+            finished_at = time.perf_counter()
+
+            with lock:
+                stage_stats.items += 1
+                stage_stats.busy_seconds += finished_at - started_at
+                if stage_stats.first_started_at is None:
+                    stage_stats.first_started_at = started_at
+                stage_stats.last_finished_at = finished_at
+
+            if should_continue and outbox is not None:
+                outbox.put((context, item))
+
+        with lock:
+            remaining_workers[stage_index] -= 1
+            is_last_worker = remaining_workers[stage_index] == 0
+        if is_last_worker and outbox is not None:
+            for _ in range(stats[stage_index + 1].workers):
+                outbox.put(_END_OF_STAGE)
+
+    threads = [
+        threading.Thread(target=work, args=(stage_index,), name=f"pipeline-{stage_stats.name}-{worker}", daemon=True)
+        for stage_index, stage_stats in enumerate(stats)
+        for worker in range(stage_stats.workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    for item in items:
+        inboxes[0].put((contextvars.copy_context(), item))
+    for _ in range(stats[0].workers):
+        inboxes[0].put(_END_OF_STAGE)
+
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    return stats
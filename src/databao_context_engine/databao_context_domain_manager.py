@@ -8,6 +8,7 @@ from databao_context_engine.build_sources import (
     EnrichContextResult,
     IndexDatasourceResult,
     build_all_datasources,
+    collect_garbage,
     enrich_built_contexts,
     index_built_contexts,
 )
@@ -37,6 +38,7 @@ from databao_context_engine.project.layout import (
     create_datasource_config_file as create_datasource_config_file_internal,
 )
 from databao_context_engine.serialization.yaml import to_yaml_string
+from databao_context_engine.services.garbage_collection_service import GarbageCollectionResult
 
 
 class DatabaoContextDomainManager:
@@ -82,6 +84,9 @@ class DatabaoContextDomainManager:
         should_index: bool = True,
         should_enrich_context: bool = False,
         progress: ProgressCallback | None = None,
+        max_parallel_datasources: int = 1,
+        keep_previous_context_hashes: int = 0,
+        force: bool = False,
     ) -> list[BuildDatasourceResult]:
         """Build the context for datasources in the domain.
 
@@ -92,6 +97,11 @@ class DatabaoContextDomainManager:
             should_index: Whether to build a semantic index for the context.
             should_enrich_context: Whether to enrich the context with LLM-generated content.
             progress: The progress callback to use for the build process.
+                When building datasources in parallel, it can be called from several threads (but never concurrently).
+            max_parallel_datasources: The maximum number of datasources to build at the same time.
+            keep_previous_context_hashes: The number of previous contexts of each datasource to keep in the index
+                when garbage collecting it after the build.
+            force: Whether to build every datasource, including the ones that didn't change since their previous build.
 
         Returns:
             The list of all built results.
@@ -103,6 +113,9 @@ class DatabaoContextDomainManager:
             should_index=should_index,
             should_enrich_context=should_enrich_context,
             progress=progress,
+            max_parallel_datasources=max_parallel_datasources,
+            keep_previous_context_hashes=keep_previous_context_hashes,
+            force=force,
         )
 
     def enrich_built_contexts(
@@ -162,6 +175,21 @@ class DatabaoContextDomainManager:
             progress=progress,
         )
 
+    def collect_garbage(self, *, keep_previous_context_hashes: int = 0) -> GarbageCollectionResult:
+        """Delete the outdated contexts from the embeddings database and compact it.
+
+        Only the current context of each datasource, the one of its context file, is kept, along with the
+        `keep_previous_context_hashes` most recently indexed previous ones. The contexts of the datasources that were removed from the project are deleted too, with the
+        chunks and embeddings of all the deleted contexts.
+
+        Args:
+            keep_previous_context_hashes: The number of previous contexts of each datasource to keep.
+
+        Returns:
+            The summary of the garbage collection.
+        """
+        return collect_garbage(self._project_layout, keep_previous_context_hashes=keep_previous_context_hashes)
+
     def check_datasource_connection(
         self, datasource_ids: list[DatasourceId] | None = None
     ) -> dict[DatasourceId, CheckDatasourceConnectionResult]:
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Collection
 
-from databao_context_engine.build_sources.context_loader import load_database_built_context
+from databao_context_engine.build_sources.context_loader import DatabaseContextCache
 from databao_context_engine.datasources.datasource_context import (
     DatasourceContext,
     get_all_contexts,
@@ -15,7 +15,7 @@ from databao_context_engine.datasources.datasource_context import (
 from databao_context_engine.datasources.execute_sql_query import run_sql
 from databao_context_engine.datasources.types import Datasource, DatasourceId
 from databao_context_engine.pluginlib.build_plugin import DatasourceType
-from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionResult
+from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionLimits, SqlExecutionResult
 from databao_context_engine.plugins.databases.database_context_explorer import (
     DatabaseSchemaLite,
     DatabaseTableDetails,
@@ -24,8 +24,10 @@ from databao_context_engine.plugins.databases.database_context_explorer import (
 )
 from databao_context_engine.plugins.plugin_loader import DatabaoContextPluginLoader
 from databao_context_engine.project.layout import ProjectLayout, ensure_project_dir
+from databao_context_engine.search_context import SearchContextSession
 from databao_context_engine.search_context import search_context as search_context_internal
-from databao_context_engine.search_context.chunk_search_repository import ChunkType
+from databao_context_engine.search_context import search_context_many as search_context_many_internal
+from databao_context_engine.search_context.chunk_search_repository import ChunkType, SearchResult
 from databao_context_engine.search_context.search_service import ContextSearchMode
 
 
@@ -61,6 +63,8 @@ class DatabaoContextEngine:
     domain_dir: Path
     _project_layout: ProjectLayout
     _plugin_loader: DatabaoContextPluginLoader
+    _search_session: SearchContextSession
+    _database_context_cache: DatabaseContextCache
 
     def __init__(self, domain_dir: Path, plugin_loader: DatabaoContextPluginLoader | None = None) -> None:
         """Initialize the DatabaoContextEngine.
@@ -73,6 +77,12 @@ class DatabaoContextEngine:
         self._project_layout = ensure_project_dir(project_dir=domain_dir)
         self.domain_dir = domain_dir
         self._plugin_loader = plugin_loader or DatabaoContextPluginLoader()
+        self._search_session = SearchContextSession(
+            project_layout=self._project_layout, plugin_loader=self._plugin_loader
+        )
+        self._database_context_cache = DatabaseContextCache(
+            project_layout=self._project_layout, plugin_loader=self._plugin_loader
+        )
 
     def get_introspected_datasource_list(self) -> list[Datasource]:
         """Return the list of datasources for which a context is available.
@@ -157,17 +167,61 @@ class DatabaoContextEngine:
             datasource_ids=datasource_ids,
             context_search_mode=context_search_mode,
             chunk_types=chunk_types,
+            session=self._search_session,
         )
 
-        return [
-            ContextSearchResult(
-                datasource_id=result.datasource_id,
-                datasource_type=result.datasource_type,
-                score=result.score.score,
-                context_result=result.display_text,
-            )
-            for result in results
-        ]
+        return [_to_context_search_result(result) for result in results]
+
+    def search_context_many(
+        self,
+        search_texts: list[str],
+        limit: int | None = None,
+        datasource_ids: list[DatasourceId] | None = None,
+        context_search_mode: ContextSearchMode | None = None,
+        chunk_types: list[ChunkType] | None = None,
+    ) -> list[list[ContextSearchResult]]:
+        """Search in the available context for the closest matches to each of the given texts.
+
+        This is faster than calling `search_context` for each text: the contexts are checked once, all the texts are
+        embedded in a single batch, and the vector searches of all the texts are run in a single query.
+
+        Args:
+            search_texts: The texts to search for in the contexts.
+            limit: The maximum number of results to return for each text. If None is provided, a default limit of 10
+                will be used.
+            datasource_ids: If provided, the search results will only come from the datasources with these IDs.
+            context_search_mode: Search strategy to use. Defaults to HYBRID_SEARCH if None is provided.
+            chunk_types: If provided, the search results will only come from the chunks of these types.
+
+        Returns:
+            For each text, in the same order as `search_texts`, a list of the results found for it, sorted by score.
+        """
+        if context_search_mode is None:
+            context_search_mode = ContextSearchMode.HYBRID_SEARCH
+
+        results_per_text = search_context_many_internal(
+            project_layout=self._project_layout,
+            plugin_loader=self._plugin_loader,
+            search_texts=search_texts,
+            limit=limit,
+            datasource_ids=datasource_ids,
+            context_search_mode=context_search_mode,
+            chunk_types=chunk_types,
+            session=self._search_session,
+        )
+
+        return [[_to_context_search_result(result) for result in results] for results in results_per_text]
+
+    def warm_up_search(self) -> None:
+        """Prepare everything needed to search the context, so that the next search is faster.
+
+        The engine keeps the index database open between searches, until it has not been used for a while.
+        """
+        self._search_session.warm_up()
+
+    def close(self) -> None:
+        """Release the resources kept open by the engine between searches, such as the index database."""
+        self._search_session.close()
 
     def run_sql(
         self,
@@ -175,16 +229,18 @@ class DatabaoContextEngine:
         sql: str,
         params: list[Any] | None = None,
         read_only: bool = True,
+        limits: SqlExecutionLimits | None = None,
     ) -> SqlExecutionResult:
         """Execute a SQL query against a datasource if it supports it.
 
         - Optional per plugin: raises NotSupportedError for datasources that don’t support SQL.
         - Read-only by default: set read_only=False to permit mutating statements.
+        - Unbounded by default: set limits to cap the number and size of the returned rows, and the query duration.
 
         Returns:
-            Sql execution result containing columns and rows.
+            Sql execution result containing columns and rows, and whether the rows were truncated by the limits.
         """
-        return run_sql(self._project_layout, self._plugin_loader, datasource_id, sql, params, read_only)
+        return run_sql(self._project_layout, self._plugin_loader, datasource_id, sql, params, read_only, limits)
 
     def list_database_datasources(self) -> list[Datasource]:
         database_types = self._plugin_loader.list_database_capable_datasource_types()
@@ -195,11 +251,7 @@ class DatabaoContextEngine:
         ]
 
     def list_database_schemas_and_tables(self, datasource_id: DatasourceId) -> list[DatabaseSchemaLite]:
-        built_context = load_database_built_context(
-            project_layout=self._project_layout,
-            plugin_loader=self._plugin_loader,
-            datasource_id=datasource_id,
-        )
+        built_context = self._database_context_cache.get(datasource_id).built
 
         return list_database_schemas_and_tables(context=built_context)
 
@@ -210,12 +262,21 @@ class DatabaoContextEngine:
         schema_name: str,
         table_name: str,
     ) -> DatabaseTableDetails:
-        built_context = load_database_built_context(
-            project_layout=self._project_layout,
-            plugin_loader=self._plugin_loader,
-            datasource_id=datasource_id,
-        )
+        cached_context = self._database_context_cache.get(datasource_id)
 
         return get_database_table_details(
-            context=built_context, catalog_name=catalog_name, schema_name=schema_name, table_name=table_name
+            context=cached_context.built,
+            catalog_name=catalog_name,
+            schema_name=schema_name,
+            table_name=table_name,
+            table_index=cached_context.table_index,
         )
+
+
+def _to_context_search_result(result: SearchResult) -> ContextSearchResult:
+    return ContextSearchResult(
+        datasource_id=result.datasource_id,
+        datasource_type=result.datasource_type,
+        score=result.score.score,
+        context_result=result.display_text,
+    )
@@ -1,8 +1,11 @@
 import logging
 import os
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from stat import S_ISREG
 from typing import Collection, Iterable
 
 import xxhash
@@ -13,6 +16,10 @@ from databao_context_engine.project.layout import DEPRECATED_ALL_RESULTS_FILE_NA
 
 logger = logging.getLogger(__name__)
 
+# A file modified less than this long before it was hashed is not cached: it could be modified again without its
+# mtime changing, on file systems with a coarse mtime resolution
+_HASH_CACHE_RACY_WINDOW_NS = 2_000_000_000
+
 
 @dataclass(eq=True, frozen=True)
 class DatasourceContextHash:
@@ -148,9 +155,79 @@ def get_all_datasource_context_hashes(project_layout: ProjectLayout) -> list[Dat
 
 
 def hash_context_file(datasource_id: DatasourceId, context_path: Path) -> DatasourceContextHash:
-    if not context_path.is_file():
+    """Hash the content of a context file.
+
+    Hashes are cached in memory by path, and reused as long as the size, mtime and inode of the file don't change.
+    This avoids reading every context file again for every search.
+
+    Returns:
+        The hash of the context file.
+
+    Raises:
+        ValueError: If the context file doesn't exist.
+    """
+    try:
+        stat = context_path.stat()
+    except FileNotFoundError:
+        raise ValueError(f"Context file not found for datasource {str(datasource_id)}") from None
+    if not S_ISREG(stat.st_mode):
         raise ValueError(f"Context file not found for datasource {str(datasource_id)}")
 
+    return _context_hash_cache.get_or_compute(datasource_id, context_path, stat)
+
+
+@dataclass(frozen=True)
+class _FileSignature:
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @staticmethod
+    def of(stat: os.stat_result) -> "_FileSignature":
+        return _FileSignature(size=stat.st_size, mtime_ns=stat.st_mtime_ns, inode=stat.st_ino)
+
+
+class _ContextHashCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[Path, DatasourceId], tuple[_FileSignature, DatasourceContextHash]] = {}
+
+    def get_or_compute(
+        self, datasource_id: DatasourceId, context_path: Path, stat: os.stat_result
+    ) -> DatasourceContextHash:
+        key = (context_path.resolve(), datasource_id)
+        signature = _FileSignature.of(stat)
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        hashing_started_at_ns = time.time_ns()
+        context_hash = _hash_file(datasource_id, context_path)
+
+        # The file might have changed while it was read: only cache the hash if it was not
+        if (
+            _FileSignature.of(context_path.stat()) == signature
+            and hashing_started_at_ns - signature.mtime_ns > _HASH_CACHE_RACY_WINDOW_NS
+        ):
+            with self._lock:
+                self._entries[key] = (signature, context_hash)
+        else:
+            with self._lock:
+                self._entries.pop(key, None)
+
+        return context_hash
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_context_hash_cache = _ContextHashCache()
+
+
+def _hash_file(datasource_id: DatasourceId, context_path: Path) -> DatasourceContextHash:
     h = xxhash.xxh3_128()
     with open(context_path, "rb") as f:
         while bytes := f.read(65536):
@@ -5,7 +5,7 @@ from databao_context_engine.datasources.sql_read_only import is_read_only_sql
 from databao_context_engine.datasources.types import DatasourceId, PreparedConfig
 from databao_context_engine.pluginlib.build_plugin import BuildDatasourcePlugin, NotSupportedError
 from databao_context_engine.pluginlib.plugin_utils import execute_sql_for_datasource
-from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionResult
+from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionLimits, SqlExecutionResult
 from databao_context_engine.plugins.plugin_loader import DatabaoContextPluginLoader
 from databao_context_engine.project.layout import ProjectLayout, logger
 
@@ -17,6 +17,7 @@ def run_sql(
     sql: str,
     params: list[Any] | None = None,
     read_only: bool = True,
+    limits: SqlExecutionLimits | None = None,
 ) -> SqlExecutionResult:
     if read_only and not is_read_only_sql(sql):
         # we could use SqlReadOnlyDecision in the future
@@ -40,4 +41,5 @@ def run_sql(
         sql=sql,
         params=params,
         read_only=read_only,
+        limits=limits,
     )
@@ -1,8 +1,13 @@
+import logging
+from collections.abc import Sequence
+
 from typing_extensions import override
 
-from databao_context_engine.llm.descriptions.provider import DescriptionProvider
+from databao_context_engine.llm.descriptions.provider import DescriptionProvider, complete_batch_descriptions
 from databao_context_engine.llm.service import OllamaService
 
+logger = logging.getLogger(__name__)
+
 
 class OllamaDescriptionProvider(DescriptionProvider):
     def __init__(self, *, service: OllamaService, model_id: str):
@@ -23,6 +28,18 @@ class OllamaDescriptionProvider(DescriptionProvider):
 
         return self._service.prompt(model=self._model_id, prompt=description_prompt)
 
+    @override
+    def describe_many(self, texts: Sequence[str], context: str) -> list[str | None]:
+        description_prompt = self.default_batch_description_prompt(texts=texts, context=context)
+
+        try:
+            answer = self._service.prompt(model=self._model_id, prompt=description_prompt, json_format=True)
+        except Exception as e:
+            logger.debug("Batch description prompt failed, describing texts one by one: %s", e, exc_info=True)
+            answer = ""
+
+        return complete_batch_descriptions(self, texts=texts, context=context, answer=answer)
+
     @override
     def prompt_for_description(self, prompt: str) -> str:
         return self._service.prompt(model=self._model_id, prompt=prompt)
@@ -1,6 +1,13 @@
+import json
+import logging
 import textwrap
+from collections.abc import Sequence
 from typing import Protocol
 
+import databao_context_engine.perf.core as perf
+
+logger = logging.getLogger(__name__)
+
 
 class DescriptionProvider(Protocol):
     @property
@@ -15,6 +22,23 @@ class DescriptionProvider(Protocol):
         """
         ...
 
+    def describe_many(self, texts: Sequence[str], context: str) -> list[str | None]:
+        """Describe all the given texts according to the same context, with a single prompt.
+
+        The LLM is asked for a JSON answer containing the description of every text. The texts missing from the
+        answer, or all of them if it can't be parsed, are then described one by one with `describe`.
+
+        Returns:
+            The description of each text, in the order of the texts, or None if it could not be generated.
+        """
+        try:
+            answer = self.prompt_for_description(self.default_batch_description_prompt(texts=texts, context=context))
+        except Exception as e:
+            logger.debug("Batch description prompt failed, describing texts one by one: %s", e, exc_info=True)
+            answer = ""
+
+        return complete_batch_descriptions(self, texts=texts, context=context, answer=answer)
+
     def prompt_for_description(self, prompt: str) -> str:
         """Prompt the LLM with the given prompt.
 
@@ -43,3 +67,74 @@ class DescriptionProvider(Protocol):
             """
 
         return textwrap.dedent(base).format(context=context, text=text).strip()
+
+    @staticmethod
+    def default_batch_description_prompt(texts: Sequence[str], context: str) -> str:
+        base = """
+            You are a helpful assistant.
+
+            I will give you a CONTEXT and numbered ITEMS.
+            Write a concise, human-readable description of each ITEM suitable for displaying in a UI.
+            - 1-2 sentences per ITEM
+            - Be factual and avoid speculation
+            - No markdown
+            - Your entire reply MUST be a JSON object mapping the number of each ITEM to its description, like
+              {{"1": <description of ITEM 1>, "2": <description of ITEM 2>, ...}}. No extra commentary.
+
+            CONTEXT:
+            {context}
+
+            """
+        items = "\n".join(f"ITEM {index}:\n{text}" for index, text in enumerate(texts, start=1))
+
+        return (textwrap.dedent(base).format(context=context) + items).strip()
+
+
+def parse_batch_descriptions(answer: str, count: int) -> list[str | None]:
+    """Parse the answer to a `default_batch_description_prompt` made of `count` items.
+
+    Returns:
+        The description of each item, or None for the items missing from the answer.
+    """
+    start = answer.find("{")
+    end = answer.rfind("}")
+    if start == -1 or end < start:
+        return [None] * count
+
+    try:
+        parsed = json.loads(answer[start : end + 1])
+    except json.JSONDecodeError:
+        return [None] * count
+    if not isinstance(parsed, dict):
+        return [None] * count
+
+    descriptions: list[str | None] = []
+    for index in range(1, count + 1):
+        description = parsed.get(str(index))
+        descriptions.append(description.strip() if isinstance(description, str) and description.strip() else None)
+    return descriptions
+
+
+def complete_batch_descriptions(
+    description_provider: DescriptionProvider, *, texts: Sequence[str], context: str, answer: str
+) -> list[str | None]:
+    """Parse the answer to a batch description prompt and describe the texts it's missing one by one.
+
+    Returns:
+        The description of each text, or None if it could not be generated.
+    """
+    descriptions = parse_batch_descriptions(answer, len(texts))
+
+    fallback_count = 0
+    for index, text in enumerate(texts):
+        if descriptions[index] is not None:
+            continue
+
+        fallback_count += 1
+        try:
+            descriptions[index] = description_provider.describe(text=text, context=context)
+        except Exception as e:
+            logger.debug(str(e), exc_info=True, stack_info=True)
+
+    perf.add_attributes({"batch_size": len(texts), "fallback_count": fallback_count})
+    return descriptions
@@ -1,15 +1,42 @@
+import logging
+import time
 from collections.abc import Sequence
 
+from databao_context_engine.concurrency import map_in_parallel
 from databao_context_engine.llm.config import EmbeddingModelDetails
 from databao_context_engine.llm.embeddings.provider import EmbeddingProvider
+from databao_context_engine.llm.errors import OllamaTransientError
 from databao_context_engine.llm.service import OllamaService
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBED_BATCH_SIZE = 128
+DEFAULT_EMBED_BATCH_TOKEN_BUDGET = 16_384
+DEFAULT_MAX_IN_FLIGHT_BATCHES = 4
+
+# Rough number of characters per token, used to estimate the size of a batch without tokenizing its texts
+_CHARS_PER_TOKEN = 4
+
 
 class OllamaEmbeddingProvider(EmbeddingProvider):
-    def __init__(self, *, service: OllamaService, model_details: EmbeddingModelDetails, embed_batch_size: int = 128):
+    def __init__(
+        self,
+        *,
+        service: OllamaService,
+        model_details: EmbeddingModelDetails,
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        embed_batch_token_budget: int = DEFAULT_EMBED_BATCH_TOKEN_BUDGET,
+        max_in_flight_batches: int = DEFAULT_MAX_IN_FLIGHT_BATCHES,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 0.5,
+    ):
         self._service = service
         self._model_details = model_details
         self._embed_batch_size: int = embed_batch_size
+        self._embed_batch_token_budget = embed_batch_token_budget
+        self._max_in_flight_batches = max_in_flight_batches
+        self._max_retries = max_retries
+        self._retry_backoff_seconds = retry_backoff_seconds
 
     @property
     def embedder(self) -> str:
@@ -28,15 +55,72 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
         return [float(x) for x in vec]
 
     def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Embed all texts, sending up to `max_in_flight_batches` batches to Ollama at the same time.
+
+        Ollama serves several requests in parallel (see `OLLAMA_NUM_PARALLEL`), so keeping a few batches in flight
+        uses its throughput a lot better than sending them one after the other.
+
+        Returns:
+            One vector per text, in the same order as the texts.
+
+        Raises:
+            ValueError: If Ollama did not return one vector per text.
+        """
         if not texts:
             return []
 
-        vecs: list[list[float]] = []
-        for i in range(0, len(texts), self._embed_batch_size):
-            batch = texts[i : i + self._embed_batch_size]
-            vecs.extend(self._service.embed_many(model=self._model_details.model_id, texts=batch))
+        batches = self._split_in_batches(texts)
+        vecs = [
+            vec
+            for batch_vecs in map_in_parallel(self._embed_batch, batches, max_workers=self._max_in_flight_batches)
+            for vec in batch_vecs
+        ]
 
         if len(vecs) != len(texts):
             raise ValueError(f"provider returned {len(vecs)} vectors for {len(texts)} texts")
 
         return vecs
+
+    def _split_in_batches(self, texts: list[str]) -> list[list[str]]:
+        # Consecutive texts are grouped in batches of at most `embed_batch_size` texts and `embed_batch_token_budget`
+        # estimated tokens. A text bigger than the token budget gets a batch of its own.
+        batches: list[list[str]] = []
+        batch: list[str] = []
+        batch_tokens = 0
+        for text in texts:
+            text_tokens = len(text) // _CHARS_PER_TOKEN + 1
+            if batch and (
+                len(batch) >= self._embed_batch_size or batch_tokens + text_tokens > self._embed_batch_token_budget
+            ):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+
+            batch.append(text)
+            batch_tokens += text_tokens
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        attempt = 0
+        while True:
+            try:
+                return self._service.embed_many(model=self._model_details.model_id, texts=batch)
+            except OllamaTransientError as e:
+                if attempt >= self._max_retries:
+                    raise
+
+                backoff_seconds = self._retry_backoff_seconds * 2**attempt
+                attempt += 1
+                logger.debug(
+                    "Embedding a batch of %d texts failed (%s), retrying in %.1fs (attempt %d/%d)",
+                    len(batch),
+                    e,
+                    backoff_seconds,
+                    attempt,
+                    self._max_retries,
+                )
+                time.sleep(backoff_seconds)
@@ -1,12 +1,17 @@
+import logging
+import os
+
 from databao_context_engine.llm.config import EmbeddingModelDetails, OllamaConfig
 from databao_context_engine.llm.descriptions.ollama import OllamaDescriptionProvider
-from databao_context_engine.llm.embeddings.ollama import OllamaEmbeddingProvider
+from databao_context_engine.llm.embeddings.ollama import DEFAULT_MAX_IN_FLIGHT_BATCHES, OllamaEmbeddingProvider
 from databao_context_engine.llm.install import resolve_ollama_bin
 from databao_context_engine.llm.prompts.ollama import OllamaPromptProvider
 from databao_context_engine.llm.prompts.provider import PromptProvider
 from databao_context_engine.llm.runtime import OllamaRuntime
 from databao_context_engine.llm.service import OllamaService
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_PROMPT_GENERATOR_MODEL = "llama3.2:3b"
 
 
@@ -45,11 +50,28 @@ def create_ollama_embedding_provider(
     *,
     model_details: EmbeddingModelDetails,
     pull_if_needed: bool = True,
+    max_in_flight_batches: int | None = None,
 ) -> OllamaEmbeddingProvider:
     if pull_if_needed:
         service.pull_model_if_needed(model=model_details.model_id, timeout=900)
 
-    return OllamaEmbeddingProvider(service=service, model_details=model_details)
+    return OllamaEmbeddingProvider(
+        service=service,
+        model_details=model_details,
+        max_in_flight_batches=max_in_flight_batches or _get_embed_max_in_flight_batches(),
+    )
+
+
+def _get_embed_max_in_flight_batches() -> int:
+    # Should usually match the OLLAMA_NUM_PARALLEL setting of the Ollama server
+    env_var = os.environ.get("DCE_OLLAMA_EMBED_PARALLELISM")
+    if env_var:
+        try:
+            return max(int(env_var), 1)
+        except ValueError:
+            logger.warning("Ignoring invalid DCE_OLLAMA_EMBED_PARALLELISM value: %s", env_var)
+
+    return DEFAULT_MAX_IN_FLIGHT_BATCHES
 
 
 def create_ollama_description_provider(
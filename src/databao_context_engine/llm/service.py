@@ -4,11 +4,15 @@ from typing import Any
 
 import requests
 
+import databao_context_engine.perf.core as perf
 from databao_context_engine.llm.config import OllamaConfig
 from databao_context_engine.llm.errors import OllamaPermanentError, OllamaTransientError
 
 logger = logging.getLogger(__name__)
 
+# Ollama answers 503 when its request queue is full (see `OLLAMA_MAX_QUEUE`): the request can be sent again later
+_TRANSIENT_STATUS_CODES = frozenset({429, 503})
+
 
 class OllamaService:
     def __init__(self, config: OllamaConfig, session: requests.Session | None = None):
@@ -42,7 +46,15 @@ class OllamaService:
 
         return [[float(n) for n in vec] for vec in vectors]
 
-    def prompt(self, *, model: str, prompt: str, temperature: float = 0.1, timeout: float | None = None) -> str:
+    def prompt(
+        self,
+        *,
+        model: str,
+        prompt: str,
+        temperature: float = 0.1,
+        timeout: float | None = None,
+        json_format: bool = False,
+    ) -> str:
         """Ask Ollama to generate a response for `text`."""
         payload: dict[str, Any] = {
             "model": model,
@@ -50,8 +62,19 @@ class OllamaService:
             "stream": False,
             "options": {"temperature": temperature},
         }
+        if json_format:
+            # Constrains the model to answer with valid JSON
+            payload["format"] = "json"
         data = self._request_json(method="POST", path="/api/generate", json=payload, timeout=timeout)
 
+        perf.add_attributes(
+            {
+                "prompt_tokens": data.get("prompt_eval_count"),
+                "completion_tokens": data.get("eval_count"),
+                "llm_duration_ms": (data.get("total_duration") or 0) // 1_000_000,
+            }
+        )
+
         response_text = data.get("response")
         if not isinstance(response_text, str):
             raise ValueError("Unexpected Ollama generate response schema (missing 'response' string)")
@@ -123,6 +146,9 @@ class OllamaService:
         except requests.RequestException as e:
             raise OllamaTransientError(f"Ollama request to {path} failed: {e}") from e
 
+        if resp.status_code in _TRANSIENT_STATUS_CODES:
+            raise OllamaTransientError(f"Ollama is busy ({resp.status_code}) for {path}: {resp.text}")
+
         try:
             resp.raise_for_status()
         except requests.HTTPError as e:
@@ -1,4 +1,5 @@
 import logging
+import threading
 from contextlib import asynccontextmanager
 from datetime import date
 from pathlib import Path
@@ -7,13 +8,18 @@ from typing import Literal
 from mcp.server import FastMCP
 from mcp.types import ToolAnnotations
 
-from databao_context_engine import DatabaoContextEngine, DatasourceId
+from databao_context_engine import DatabaoContextEngine, DatasourceId, SqlExecutionLimits
 from databao_context_engine.serialization.yaml import to_plain_python
 
 logger = logging.getLogger(__name__)
 
 McpTransport = Literal["stdio", "streamable-http"]
 
+# The results of the SQL queries of agents are bounded: a single unbounded query could exhaust the memory of the server
+MCP_SQL_DEFAULT_MAX_ROWS = 1000
+MCP_SQL_MAX_BYTES = 8 * 1024 * 1024
+MCP_SQL_TIMEOUT_SECONDS = 60.0
+
 
 @asynccontextmanager
 async def mcp_server_lifespan(server: FastMCP):
@@ -133,13 +139,14 @@ Use "run_sql_on_database" only when you need live query results or need to valid
 
         @mcp.tool(
             name="run_sql_on_database",
-            description="Execute SQL against a configured database-capable datasource. Use this when you need live rows, aggregates, or query validation against the actual datasource. Prefer the metadata tools for schema discovery and table inspection. Defaults to read-only queries; set read_only=false only when mutations are intentionally required. If datasource_id is omitted, it will only work when exactly one datasource is configured in the project.",
+            description="Execute SQL against a configured database-capable datasource. Use this when you need live rows, aggregates, or query validation against the actual datasource. Prefer the metadata tools for schema discovery and table inspection. Defaults to read-only queries; set read_only=false only when mutations are intentionally required. At most max_rows rows are returned: truncated is true in the result when the query returned more rows, or when the rows were too large. If datasource_id is omitted, it will only work when exactly one datasource is configured in the project.",
             annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=False, openWorldHint=True),
         )
         async def run_sql_tool(
             sql: str,
             datasource_id: str | None = None,
             read_only: bool = True,
+            max_rows: int = MCP_SQL_DEFAULT_MAX_ROWS,
         ):
             # If no datasource_id provided, try to use the only one available
             if datasource_id is None:
@@ -156,10 +163,29 @@ Use "run_sql_on_database" only when you need live query results or need to valid
             else:
                 ds = DatasourceId.from_string_repr(datasource_id)
 
-            res = self._databao_context_engine.run_sql(ds, sql, read_only=read_only)
-            return {"columns": res.columns, "rows": res.rows}
+            limits = SqlExecutionLimits(
+                max_rows=max_rows, max_bytes=MCP_SQL_MAX_BYTES, timeout_seconds=MCP_SQL_TIMEOUT_SECONDS
+            )
+            res = self._databao_context_engine.run_sql(ds, sql, read_only=read_only, limits=limits)
+            return {
+                "columns": res.columns,
+                "rows": res.rows,
+                "truncated": res.truncated,
+                "truncated_by": res.truncated_by.value if res.truncated_by is not None else None,
+            }
 
         return mcp
 
     def run(self, transport: McpTransport):
-        self._mcp_server.run(transport=transport)
+        # Searches are served by a resident engine: prepare it in the background rather than on the first search
+        threading.Thread(target=self._warm_up_search, name="search-warm-up", daemon=True).start()
+        try:
+            self._mcp_server.run(transport=transport)
+        finally:
+            self._databao_context_engine.close()
+
+    def _warm_up_search(self) -> None:
+        try:
+            self._databao_context_engine.warm_up_search()
+        except Exception:
+            logger.warning("Failed to prepare the context search, the first search will be slower", exc_info=True)
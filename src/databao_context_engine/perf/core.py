@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 import time
 import uuid
 from contextlib import contextmanager
@@ -48,6 +49,8 @@ class _JsonlExporter:
     def __init__(self, file_path: Path):
         self._file_path = file_path
         self._fp: Any | None = None
+        # Spans can be closed concurrently when datasources are processed in parallel
+        self._lock = threading.Lock()
 
     def open(self) -> None:
         self._file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -63,8 +66,9 @@ class _JsonlExporter:
             return
         try:
             line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
-            self._fp.write(line + "\n")
-            self._fp.flush()
+            with self._lock:
+                self._fp.write(line + "\n")
+                self._fp.flush()
         except Exception:
             logger.debug("Failed to write perf record", exc_info=True)
 
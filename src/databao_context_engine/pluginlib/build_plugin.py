@@ -4,7 +4,7 @@ from io import BufferedReader
 from typing import Any, Mapping, Protocol, TypeVar, runtime_checkable
 
 from databao_context_engine.llm.descriptions.provider import DescriptionProvider
-from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionResult
+from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionLimits, SqlExecutionResult
 
 
 @dataclass(kw_only=True)
@@ -15,12 +15,16 @@ class EmbeddableChunk:
         type: The type of the chunk, e.g. "table", "column" to allow for search by chunk type.
         embeddable_text: The text to embed as a vector for search usage
         content: The content to return as a response when the embedding has been selected in a search
+        key: An optional identifier of the chunk, stable across builds of the datasource (e.g. "catalog.schema.table").
+            When re-indexing a datasource, a chunk with the same key and content as an already indexed one is kept as-is
+            instead of being deleted and inserted again.
     """
 
     type: str | None = None
     embeddable_text: str
     keyword_indexable_text: str | None = None
     content: Any
+    key: str | None = None
 
 
 class BaseBuildPlugin(Protocol):
@@ -111,6 +115,26 @@ class BuildDatasourcePlugin(BaseBuildPlugin, Protocol[T]):
         """
         ...
 
+    def update_context(self, full_type: str, datasource_name: str, file_config: T, previous_context: Any) -> Any:
+        """Build the context of a datasource whose context was already built before.
+
+        Plugins can override this method to only rebuild the parts of the context that changed since `previous_context`
+        was built, and reuse the rest. By default, the whole context is built again.
+
+        Args:
+            full_type: The type of the datasource to build.
+              This type should be exactly the same as the one found in the file_config
+            datasource_name: The name of the datasource to build
+            file_config: The config file of the datasource to build.
+                This argument will be an object of type `self.config_file_type`.
+            previous_context: The context built by the previous build of the datasource.
+                This argument will be an object of type `self.context_type`.
+
+        Returns:
+            The context for this datasource as an object of type `self.context_type`
+        """
+        return self.build_context(full_type=full_type, datasource_name=datasource_name, file_config=file_config)
+
     def check_connection(self, full_type: str, file_config: T) -> None:
         """Check whether the configuration to the datasource is working.
 
@@ -128,18 +152,41 @@ class BuildDatasourcePlugin(BaseBuildPlugin, Protocol[T]):
         """
         raise NotSupportedError("This method is not implemented for this plugin")
 
+    def get_source_fingerprint(self, full_type: str, file_config: T) -> str | None:
+        """Compute a cheap fingerprint of the datasource, without building its context.
+
+        The fingerprint must change whenever building the context of the datasource could give a different result
+        (e.g. when a table is created, dropped or altered). When it is the same as during the previous build, the
+        datasource is not built again.
+
+        Args:
+            full_type: The type of the datasource.
+              This type should be exactly the same as the one found in the file_config
+            file_config: The config file of the datasource.
+                This argument will be an object of type `self.config_file_type`.
+
+        Returns:
+            The fingerprint of the datasource, or None if the plugin can't compute one, in which case the datasource
+            is always built.
+        """
+        return None
+
     def run_sql(
         self,
         file_config: T,
         sql: str,
         params: list[Any] | None = None,
         read_only: bool = True,
+        limits: SqlExecutionLimits | None = None,
     ) -> SqlExecutionResult:
         """Execute SQL against the datasource represented by `file_config`.
 
         Implementations should honor `read_only=True` by default and refuse mutating statements
         unless explicitly allowed.
 
+        When `limits` are given, implementations should stop fetching rows past them and report it in
+        `SqlExecutionResult.truncated_by`. `limits` is only passed to the plugin when it is not None.
+
         Raises:
             NotSupportedError: If the plugin doesn't support this method.
         """
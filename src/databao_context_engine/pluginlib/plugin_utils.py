@@ -11,19 +11,31 @@ from databao_context_engine.pluginlib.build_plugin import (
     BuildFilePlugin,
     DatasourceType,
 )
-from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionResult
+from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionLimits, SqlExecutionResult
 
 logger = logging.getLogger(__name__)
 
 
 def execute_datasource_plugin(
-    plugin: BuildDatasourcePlugin, datasource_type: DatasourceType, config: Mapping[str, Any], datasource_name: str
+    plugin: BuildDatasourcePlugin,
+    datasource_type: DatasourceType,
+    config: Mapping[str, Any],
+    datasource_name: str,
+    previous_context: Any | None = None,
 ) -> Any:
     if not isinstance(plugin, BuildDatasourcePlugin):
         raise ValueError("This method can only execute a BuildDatasourcePlugin")
 
     validated_config = _validate_datasource_config_file(config, plugin)
 
+    if previous_context is not None:
+        return plugin.update_context(
+            full_type=datasource_type.full_type,
+            datasource_name=datasource_name,
+            file_config=validated_config,
+            previous_context=previous_context,
+        )
+
     return plugin.build_context(
         full_type=datasource_type.full_type,
         datasource_name=datasource_name,
@@ -45,6 +57,20 @@ def check_connection_for_datasource(
     )
 
 
+def get_source_fingerprint_for_datasource(
+    plugin: BuildDatasourcePlugin, datasource_type: DatasourceType, config: Mapping[str, Any]
+) -> str | None:
+    if not isinstance(plugin, BuildDatasourcePlugin):
+        raise ValueError("Fingerprints can only be computed by a BuildDatasourcePlugin")
+
+    validated_config = _validate_datasource_config_file(config, plugin)
+
+    return plugin.get_source_fingerprint(
+        full_type=datasource_type.full_type,
+        file_config=validated_config,
+    )
+
+
 def _validate_datasource_config_file(config: Mapping[str, Any], plugin: BuildDatasourcePlugin) -> Any:
     return TypeAdapter(plugin.config_file_type).validate_python(config)
 
@@ -79,12 +105,16 @@ def execute_sql_for_datasource(
     sql: str,
     params: list[Any] | None = None,
     read_only: bool = True,
+    limits: SqlExecutionLimits | None = None,
 ) -> SqlExecutionResult:
     validated_config = _validate_datasource_config_file(config, plugin)
 
+    # Plugins written before the limits were introduced don't accept them
+    limits_kwargs = {"limits": limits} if limits is not None else {}
     return plugin.run_sql(
         file_config=validated_config,
         sql=sql,
         params=params,
         read_only=read_only,
+        **limits_kwargs,
     )
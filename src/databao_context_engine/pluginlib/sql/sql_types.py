@@ -1,8 +1,37 @@
 from dataclasses import dataclass
+from enum import Enum
 from typing import Any
 
 
+class SqlTruncationReason(str, Enum):
+    MAX_ROWS = "max_rows"
+    MAX_BYTES = "max_bytes"
+
+
+@dataclass(frozen=True)
+class SqlExecutionLimits:
+    """Bounds of the result of a SQL query.
+
+    Attributes:
+        max_rows: The maximum number of rows to return. The other rows are not fetched from the database.
+        max_bytes: The maximum estimated size of the returned rows. Only the size of the text and binary values is
+            counted in full, other values are counted as 8 bytes.
+        timeout_seconds: The maximum duration of the query, including fetching its rows. A TimeoutError is raised past
+            that duration.
+    """
+
+    max_rows: int | None = None
+    max_bytes: int | None = None
+    timeout_seconds: float | None = None
+
+
 @dataclass
 class SqlExecutionResult:
     columns: list[str]
     rows: list[tuple[Any, ...]]
+    truncated_by: SqlTruncationReason | None = None
+
+    @property
+    def truncated(self) -> bool:
+        """Whether some rows of the query result were left out because of the SqlExecutionLimits."""
+        return self.truncated_by is not None
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-from contextlib import AbstractContextManager, closing
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, closing, contextmanager
 from typing import Any
 
 from pyathena import connect
-from pyathena.cursor import DictCursor
+from pyathena.cursor import Cursor, DictCursor
 
 from databao_context_engine.plugins.databases.athena.config_file import AthenaConfigFile
-from databao_context_engine.plugins.databases.base_connector import BaseConnector
+from databao_context_engine.plugins.databases.base_connector import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    BaseConnector,
+    SqlRowStream,
+    interrupt_on_timeout,
+)
 
 
 class AthenaConnector(BaseConnector[AthenaConfigFile]):
@@ -18,3 +24,18 @@ class AthenaConnector(BaseConnector[AthenaConfigFile]):
         with connection.cursor() as cur:
             cur.execute(sql, params or {})
             return cur.fetchall()
+
+    @contextmanager
+    def execute_streaming(
+        self,
+        connection,
+        sql: str,
+        params,
+        *,
+        batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+        timeout_seconds: float | None = None,
+    ) -> Iterator[SqlRowStream]:
+        with connection.cursor(Cursor) as cur, interrupt_on_timeout(timeout_seconds, cur.cancel):
+            cur.execute(sql, params or {})
+            columns = [d[0].lower() for d in cur.description] if cur.description else []
+            yield SqlRowStream(columns=columns, batches=iter(lambda: cur.fetchmany(batch_size), []))
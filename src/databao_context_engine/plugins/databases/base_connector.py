@@ -1,11 +1,29 @@
 from __future__ import annotations
 
+import threading
 from abc import ABC, abstractmethod
-from contextlib import AbstractContextManager
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
 from typing import Any, Generic, TypeVar
 
 T = TypeVar("T")
 
+DEFAULT_FETCH_BATCH_SIZE = 1000
+
+
+@dataclass
+class SqlRowStream:
+    """The result of a query, fetched from the database one batch of rows at a time.
+
+    Attributes:
+        columns: The names of the columns of the result. Empty if the query returns no result set.
+        batches: The rows of the result. Each batch is only fetched from the database when iterating on it.
+    """
+
+    columns: list[str]
+    batches: Iterator[Sequence[tuple[Any, ...]]]
+
 
 class BaseConnector(Generic[T], ABC):
     @abstractmethod
@@ -19,9 +37,65 @@ class BaseConnector(Generic[T], ABC):
     @abstractmethod
     def execute(self, connection, sql: str, params) -> list[dict]: ...
 
+    @contextmanager
+    def execute_streaming(
+        self,
+        connection,
+        sql: str,
+        params,
+        *,
+        batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+        timeout_seconds: float | None = None,
+    ) -> Iterator[SqlRowStream]:
+        """Execute a query and fetch its rows in batches of at most `batch_size` rows.
+
+        The rows are only valid within the context: the cursor is closed when exiting it, even if not all rows were
+        fetched. Connectors should override this method with their driver's cursor: this default implementation fetches
+        all the rows at once with `execute`.
+
+        If the query runs for longer than `timeout_seconds`, it is cancelled where the driver supports it, and a
+        TimeoutError is raised.
+
+        Yields:
+            The columns of the result, and an iterator on its batches of rows.
+        """
+        rows = self.execute(connection, sql, params)
+        columns = list(rows[0].keys()) if rows else []
+        yield SqlRowStream(columns=columns, batches=iter([[tuple(row.get(col) for col in columns) for row in rows]]))
+
     def check_connection(self, file_config: T) -> None:
         with self.connect(file_config) as connection:
             self.execute(connection, self._connection_check_sql_query(), None)
 
     def _connection_check_sql_query(self) -> str:
         return "SELECT 1 as test"
+
+
+@contextmanager
+def interrupt_on_timeout(timeout_seconds: float | None, interrupt: Callable[[], None]) -> Iterator[None]:
+    """Call `interrupt` from another thread if the block is still running after `timeout_seconds`.
+
+    Raises:
+        TimeoutError: If the block failed after being interrupted.
+    """
+    if timeout_seconds is None:
+        yield
+        return
+
+    interrupted = threading.Event()
+
+    def _interrupt() -> None:
+        interrupted.set()
+        interrupt()
+
+    timer = threading.Timer(timeout_seconds, _interrupt)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    except Exception as e:
+        if interrupted.is_set():
+            raise TimeoutError(f"The query was cancelled after {timeout_seconds} seconds") from e
+        raise
+    finally:
+        timer.cancel()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import time
 from abc import ABC
+from collections.abc import Sequence
 from typing import Annotated, Any, TypeVar
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -12,8 +14,16 @@ from databao_context_engine.pluginlib.build_plugin import (
     EmbeddableChunk,
 )
 from databao_context_engine.pluginlib.config import ConfigPropertyAnnotation
-from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionResult
-from databao_context_engine.plugins.databases.base_connector import BaseConnector
+from databao_context_engine.pluginlib.sql.sql_types import (
+    SqlExecutionLimits,
+    SqlExecutionResult,
+    SqlTruncationReason,
+)
+from databao_context_engine.plugins.databases.base_connector import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    BaseConnector,
+    SqlRowStream,
+)
 from databao_context_engine.plugins.databases.base_introspector import BaseIntrospector
 from databao_context_engine.plugins.databases.context_enricher import enrich_database_context
 from databao_context_engine.plugins.databases.database_chunker import build_database_chunks
@@ -22,6 +32,8 @@ from databao_context_engine.plugins.databases.introspection_scope import Introsp
 from databao_context_engine.plugins.databases.profiling_config import ProfilingConfig
 from databao_context_engine.plugins.databases.sampling_scope import SamplingConfig
 
+MAX_PARALLEL_CATALOGS = 16
+
 
 class BaseDatabaseConfigFile(BaseModel, AbstractConfigFile):
     model_config = ConfigDict(populate_by_name=True)
@@ -34,6 +46,14 @@ class BaseDatabaseConfigFile(BaseModel, AbstractConfigFile):
         default=None
     )
     profiling: Annotated[ProfilingConfig | None, ConfigPropertyAnnotation(required=True)] = Field(default=None)
+    max_parallel_catalogs: Annotated[int, ConfigPropertyAnnotation(ignored_for_config_wizard=True)] = Field(
+        default=1, ge=1, le=MAX_PARALLEL_CATALOGS, alias="max-parallel-catalogs"
+    )
+    # The maximum number of connections opened at once by the introspection, shared by the catalogs and the tables
+    # introspected in parallel. Defaults to the largest of `max_parallel_catalogs` and `sampling.max_parallel_tables`
+    max_connections: Annotated[int | None, ConfigPropertyAnnotation(ignored_for_config_wizard=True)] = Field(
+        default=None, ge=1, le=MAX_PARALLEL_CATALOGS, alias="max-connections"
+    )
 
 
 T = TypeVar("T", bound="BaseDatabaseConfigFile")
@@ -54,25 +74,63 @@ class BaseDatabasePlugin(BuildDatasourcePlugin[T], ABC):
     def build_context(self, full_type: str, datasource_name: str, file_config: T) -> Any:
         return self._introspector.introspect_database(file_config)
 
+    def update_context(self, full_type: str, datasource_name: str, file_config: T, previous_context: Any) -> Any:
+        previous_result = previous_context if isinstance(previous_context, DatabaseIntrospectionResult) else None
+        return self._introspector.introspect_database(file_config, previous_result=previous_result)
+
     def enrich_context(self, context: Any, description_provider: DescriptionProvider) -> Any:
         return enrich_database_context(context, description_provider)
 
     def check_connection(self, full_type: str, file_config: T) -> None:
         self._connector.check_connection(file_config)
 
+    def get_source_fingerprint(self, full_type: str, file_config: T) -> str | None:
+        return self._introspector.get_catalog_fingerprint(file_config)
+
     def divide_context_into_chunks(self, context: Any) -> list[EmbeddableChunk]:
         return build_database_chunks(context)
 
     def run_sql(
-        self, file_config: T, sql: str, params: list[Any] | None = None, read_only: bool = True
+        self,
+        file_config: T,
+        sql: str,
+        params: list[Any] | None = None,
+        read_only: bool = True,
+        limits: SqlExecutionLimits | None = None,
     ) -> SqlExecutionResult:
+        limits = limits or SqlExecutionLimits()
+        # Fetching one more row than max_rows tells whether the result was truncated
+        batch_size = (
+            DEFAULT_FETCH_BATCH_SIZE if limits.max_rows is None else min(DEFAULT_FETCH_BATCH_SIZE, limits.max_rows + 1)
+        )
+
         # for now, we don't have any read-only related logic implemented on the database side
         with self._connector.connect(file_config) as connection:
-            rows_dicts: list[dict] = self._connector.execute(connection, sql, params)
-
-        if not rows_dicts:
-            return SqlExecutionResult(columns=[], rows=[])
-
-        columns: list[str] = list(rows_dicts[0].keys())
-        rows: list[tuple[Any, ...]] = [tuple(row.get(col) for col in columns) for row in rows_dicts]
-        return SqlExecutionResult(columns=columns, rows=rows)
+            with self._connector.execute_streaming(
+                connection, sql, params, batch_size=batch_size, timeout_seconds=limits.timeout_seconds
+            ) as stream:
+                return _collect_rows(stream, limits)
+
+
+def _collect_rows(stream: SqlRowStream, limits: SqlExecutionLimits) -> SqlExecutionResult:
+    deadline = time.monotonic() + limits.timeout_seconds if limits.timeout_seconds is not None else None
+    rows: list[tuple[Any, ...]] = []
+    size = 0
+    for batch in stream.batches:
+        for row in batch:
+            if limits.max_rows is not None and len(rows) >= limits.max_rows:
+                return SqlExecutionResult(columns=stream.columns, rows=rows, truncated_by=SqlTruncationReason.MAX_ROWS)
+            size += _estimate_row_size(row)
+            if limits.max_bytes is not None and size > limits.max_bytes:
+                return SqlExecutionResult(columns=stream.columns, rows=rows, truncated_by=SqlTruncationReason.MAX_BYTES)
+            rows.append(tuple(row))
+
+        # Drivers without a query timeout can still be stopped while fetching the rows
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"The query was cancelled after {limits.timeout_seconds} seconds")
+
+    return SqlExecutionResult(columns=stream.columns, rows=rows)
+
+
+def _estimate_row_size(row: Sequence[Any]) -> int:
+    return sum(len(value) if isinstance(value, (str, bytes, bytearray)) else 8 for value in row)
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import contextlib
+import contextvars
 import json
 import logging
+import queue
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Generic, Iterable, Mapping, Protocol, Sequence, TypeVar, Union
 
+import xxhash
+
 import databao_context_engine.perf.core as perf
+from databao_context_engine.concurrency.parallel import map_in_parallel
 from databao_context_engine.plugins.databases.base_connector import BaseConnector
 from databao_context_engine.plugins.databases.databases_types import (
     CardinalityBucket,
@@ -16,6 +25,7 @@ from databao_context_engine.plugins.databases.databases_types import (
     DatabaseCatalog,
     DatabaseIntrospectionResult,
     DatabaseSchema,
+    DatabaseTable,
     SchemaRef,
     TableRef,
     TableStatsEntry,
@@ -44,7 +54,18 @@ class SupportsProfilingScope(Protocol):
     profiling: ProfilingConfig | None
 
 
-class SupportsDatabaseScopes(SupportsIntrospectionScope, SupportsSamplingScope, SupportsProfilingScope, Protocol):
+class SupportsIntrospectionParallelism(Protocol):
+    max_parallel_catalogs: int
+    max_connections: int | None
+
+
+class SupportsDatabaseScopes(
+    SupportsIntrospectionScope,
+    SupportsSamplingScope,
+    SupportsProfilingScope,
+    SupportsIntrospectionParallelism,
+    Protocol,
+):
     """Marker protocol for configs usable with BaseIntrospector."""
 
 
@@ -61,7 +82,53 @@ class BaseIntrospector(Generic[T], ABC):
         self._connector = connector
 
     @perf.perf_span("db.introspect_database")
-    def introspect_database(self, file_config: T) -> DatabaseIntrospectionResult:
+    def introspect_database(
+        self, file_config: T, previous_result: DatabaseIntrospectionResult | None = None
+    ) -> DatabaseIntrospectionResult:
+        """Introspect the catalogs and schemas of the database that are in the introspection scope.
+
+        When the result of a previous introspection is given, the schemas whose fingerprint didn't change since then
+        are taken as-is from the previous result, with their samples and statistics: only the other schemas are
+        introspected.
+
+        Returns:
+            The introspected catalogs.
+        """
+        previous_schemas = {
+            catalog.name: catalog.schemas for catalog in (previous_result.catalogs if previous_result else [])
+        }
+
+        # Shared by all the threads introspecting the database, so that the catalogs and tables introspected in
+        # parallel never open more than `max_connections` connections to the database at once
+        connection_slots = threading.BoundedSemaphore(self._get_max_connections(file_config))
+
+        with self._connect(file_config, connection_slots) as root_connection:
+            catalogs = self._get_catalogs_adapted(root_connection, file_config)
+
+        catalog_results = map_in_parallel(
+            lambda catalog: self._introspect_catalog(
+                file_config,
+                catalog=catalog,
+                previous_schemas=previous_schemas.get(catalog, []),
+                connection_slots=connection_slots,
+            ),
+            catalogs,
+            max_workers=file_config.max_parallel_catalogs,
+        )
+
+        introspected_catalogs = [catalog for catalog, _ in catalog_results if catalog is not None]
+        perf.set_attribute("unchanged_schema_count", sum(unchanged_count for _, unchanged_count in catalog_results))
+        return DatabaseIntrospectionResult(catalogs=introspected_catalogs)
+
+    @perf.perf_span("db.introspect_catalog", attrs=lambda self, file_config, *, catalog, **_: {"catalog": catalog})
+    def _introspect_catalog(
+        self,
+        file_config: T,
+        *,
+        catalog: str,
+        previous_schemas: list[DatabaseSchema],
+        connection_slots: threading.BoundedSemaphore,
+    ) -> tuple[DatabaseCatalog | None, int]:
         sampling_matcher = SamplingScopeMatcher(file_config.sampling, ignored_schemas=self._ignored_schemas())
         profiling_enabled = bool(file_config.profiling and file_config.profiling.enabled)
         scope_matcher = IntrospectionScopeMatcher(
@@ -69,34 +136,137 @@ class BaseIntrospector(Generic[T], ABC):
             ignored_schemas=self._ignored_schemas(),
         )
 
+        with self._connect(file_config, connection_slots, catalog=catalog) as conn:
+            all_schemas = self._list_schemas_for_catalog(conn, catalog)
+            schemas_to_introspect = scope_matcher.filter_schemas_for_catalog(catalog, all_schemas)
+
+            if not schemas_to_introspect:
+                return None, 0
+
+            schema_fingerprints = self._try_get_schema_fingerprints(
+                connection=conn, catalog=catalog, schemas=schemas_to_introspect, file_config=file_config
+            )
+            unchanged_schemas = {
+                schema.name: schema
+                for schema in previous_schemas
+                if schema.fingerprint is not None and schema.fingerprint == schema_fingerprints.get(schema.name)
+            }
+            changed_schemas = [schema for schema in schemas_to_introspect if schema not in unchanged_schemas]
+
+            introspected_schemas: list[DatabaseSchema] = []
+            if changed_schemas:
+                introspected_schemas = (
+                    self._collect_catalog_model_timed(connection=conn, catalog=catalog, schemas=changed_schemas) or []
+                )
+
+            if introspected_schemas:
+                self._collect_samples_for_schemas(
+                    connection=conn,
+                    catalog=catalog,
+                    schemas=introspected_schemas,
+                    sampling_matcher=sampling_matcher,
+                    file_config=file_config,
+                    connection_slots=connection_slots,
+                )
+
+                if profiling_enabled:
+                    self._collect_statistics_for_schemas(connection=conn, catalog=catalog, schemas=introspected_schemas)
+
+        for schema in introspected_schemas:
+            schema.fingerprint = schema_fingerprints.get(schema.name)
+
+        schemas_by_name = {**unchanged_schemas, **{schema.name: schema for schema in introspected_schemas}}
+        schemas = [schemas_by_name[name] for name in schemas_to_introspect if name in schemas_by_name]
+        if not schemas:
+            return None, len(unchanged_schemas)
+
+        return DatabaseCatalog(name=catalog, schemas=schemas), len(unchanged_schemas)
+
+    @staticmethod
+    def _get_max_connections(file_config: T) -> int:
+        if file_config.max_connections is not None:
+            return file_config.max_connections
+        sampling = file_config.sampling or SamplingConfig()
+        return max(file_config.max_parallel_catalogs, sampling.max_parallel_tables)
+
+    @contextlib.contextmanager
+    def _connect(
+        self, file_config: T, connection_slots: threading.BoundedSemaphore, *, catalog: str | None = None
+    ) -> Iterator[Any]:
+        with connection_slots, self._connector.connect(file_config, catalog=catalog) as connection:
+            yield connection
+
+    @perf.perf_span("db.catalog_fingerprint")
+    def get_catalog_fingerprint(self, file_config: T) -> str | None:
+        """Compute a fingerprint of the schemas in the introspection scope, without introspecting them.
+
+        Each catalog is fingerprinted with a single query listing the state of its relations (e.g. their DDL or their
+        last modification time): only the rows of the schemas in the introspection scope are part of the fingerprint.
+
+        Returns:
+            The fingerprint of the catalogs, or None if there is no query to fingerprint the catalogs of this database.
+        """
+        scope_matcher = IntrospectionScopeMatcher(
+            file_config.introspection_scope,
+            ignored_schemas=self._ignored_schemas(),
+        )
+
         with self._connector.connect(file_config) as root_connection:
             catalogs = self._get_catalogs_adapted(root_connection, file_config)
 
-        introspected_catalogs: list[DatabaseCatalog] = []
+        fingerprint = xxhash.xxh3_128()
         for catalog in catalogs:
             with self._connector.connect(file_config, catalog=catalog) as conn:
                 all_schemas = self._list_schemas_for_catalog(conn, catalog)
-                schemas_to_introspect = scope_matcher.filter_schemas_for_catalog(catalog, all_schemas)
-
-                if not schemas_to_introspect:
-                    continue
-
-                schemas = self._collect_catalog_model_timed(
-                    connection=conn, catalog=catalog, schemas=schemas_to_introspect
+                schemas = scope_matcher.filter_schemas_for_catalog(catalog, all_schemas)
+                schema_fingerprints = self._get_schema_fingerprints(
+                    connection=conn, catalog=catalog, schemas=schemas, file_config=file_config
                 )
-                if not schemas:
-                    continue
 
-                self._collect_samples_for_schemas(
-                    connection=conn, catalog=catalog, schemas=schemas, sampling_matcher=sampling_matcher
-                )
+            if schema_fingerprints is None:
+                return None
+            fingerprint.update(json.dumps([catalog, sorted(schema_fingerprints.items())]).encode("utf-8"))
 
-                if profiling_enabled:
-                    self._collect_statistics_for_schemas(connection=conn, catalog=catalog, schemas=schemas)
+        return fingerprint.hexdigest()
 
-                introspected_catalogs.append(DatabaseCatalog(name=catalog, schemas=schemas))
+    def _get_schema_fingerprints(
+        self, *, connection: Any, catalog: str, schemas: list[str], file_config: T
+    ) -> dict[str, str] | None:
+        sql_query = self.get_catalog_fingerprint_sql_query(catalog)
+        if sql_query is None:
+            return None
 
-        return DatabaseIntrospectionResult(catalogs=introspected_catalogs)
+        rows = self._connector.execute(connection, sql_query.sql, sql_query.params)
+
+        # The schemas are introspected differently when these settings change, unlike when their parallelism changes
+        settings = [
+            config.model_dump(mode="json", exclude={"max_parallel_tables"}) if config is not None else None
+            for config in (file_config.sampling, file_config.profiling)
+        ]
+        schema_states: dict[str, list[str]] = {schema: [] for schema in schemas}
+        for row in rows:
+            schema_state = schema_states.get(str(row.get("schema_name")))
+            if schema_state is not None:
+                schema_state.append(json.dumps(row, sort_keys=True, default=str))
+
+        # The rows are sorted since their order is not guaranteed without an ORDER BY
+        return {
+            schema: xxhash.xxh3_128_hexdigest(json.dumps([settings, sorted(schema_state)]).encode("utf-8"))
+            for schema, schema_state in schema_states.items()
+        }
+
+    def _try_get_schema_fingerprints(
+        self, *, connection: Any, catalog: str, schemas: list[str], file_config: T
+    ) -> dict[str, str]:
+        try:
+            schema_fingerprints = self._get_schema_fingerprints(
+                connection=connection, catalog=catalog, schemas=schemas, file_config=file_config
+            )
+        except Exception as e:
+            # Without fingerprints, every schema is introspected and none will be reused by the next introspection
+            logger.warning("Failed to fingerprint the schemas of catalog %s: %s", catalog, e)
+            return {}
+        return schema_fingerprints or {}
 
     @perf.perf_span("db.collect_samples", attrs=lambda self, *, catalog, **_: {"catalog": catalog})
     def _collect_samples_for_schemas(
@@ -106,23 +276,74 @@ class BaseIntrospector(Generic[T], ABC):
         catalog: str,
         schemas: list[DatabaseSchema],
         sampling_matcher: SamplingScopeMatcher,
+        file_config: T,
+        connection_slots: threading.BoundedSemaphore,
     ) -> None:
+        tables_to_sample: queue.SimpleQueue[tuple[str, DatabaseTable]] = queue.SimpleQueue()
         for schema in schemas:
             for table in schema.tables:
                 if sampling_matcher.should_sample(catalog, schema.name, table.name):
-                    collected_table_samples = self._collect_samples_for_table(
-                        connection, catalog, schema.name, table.name
-                    )
-
-                    normalized_samples = []
-                    for sample in collected_table_samples:
-                        normalized_samples.append(
-                            {
-                                column_key: self._normalize_sample_value(sample_value)
-                                for column_key, sample_value in sample.items()
-                            }
+                    tables_to_sample.put((schema.name, table))
+
+        sampling = file_config.sampling or SamplingConfig()
+        worker_count = min(sampling.max_parallel_tables, tables_to_sample.qsize())
+        perf.set_attribute("table_count", tables_to_sample.qsize())
+
+        def sample_tables(worker_connection: Any) -> None:
+            while True:
+                try:
+                    schema_name, table = tables_to_sample.get_nowait()
+                except queue.Empty:
+                    return
+
+                collected_table_samples = self._collect_samples_for_table(
+                    worker_connection,
+                    catalog,
+                    schema_name,
+                    table.name,
+                    timeout_seconds=sampling.table_timeout_seconds,
+                )
+                table.samples = [
+                    {
+                        column_key: self._normalize_sample_value(sample_value)
+                        for column_key, sample_value in sample.items()
+                    }
+                    for sample in collected_table_samples
+                ]
+
+        def sample_tables_on_own_connection() -> None:
+            # Only takes a free connection slot: the tables are left to the other workers when there is none
+            if not connection_slots.acquire(blocking=False):
+                return
+            try:
+                with contextlib.ExitStack() as exit_stack:
+                    try:
+                        worker_connection = exit_stack.enter_context(
+                            self._connector.connect(file_config, catalog=catalog)
                         )
-                    table.samples = normalized_samples
+                    except Exception as e:
+                        logger.warning("Failed to open a sampling connection to catalog %s: %s", catalog, e)
+                        return
+                    sample_tables(worker_connection)
+            finally:
+                connection_slots.release()
+
+        # The tables are taken from a shared queue, so that a slow table only holds up the worker sampling it
+        extra_worker_count = worker_count - 1
+        if extra_worker_count <= 0:
+            sample_tables(connection)
+            return
+
+        with ThreadPoolExecutor(max_workers=extra_worker_count, thread_name_prefix="sample") as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, sample_tables_on_own_connection)
+                for _ in range(extra_worker_count)
+            ]
+            # The connection of the catalog is used from this thread only: some drivers (e.g. sqlite3) refuse to use
+            # a connection from another thread than the one that opened it
+            sample_tables(connection)
+            for future in futures:
+                future.result()
 
     @perf.perf_span(
         "db.collect_catalog_model",
@@ -324,6 +545,17 @@ class BaseIntrospector(Generic[T], ABC):
     def get_partitions_sql_query(self, catalog: str, schemas: list[str]) -> SQLQuery | None:
         return None
 
+    def get_catalog_fingerprint_sql_query(self, catalog: str) -> SQLQuery | None:
+        """Get the query listing the state of all the relations of a catalog, used to fingerprint it.
+
+        The query must return a `schema_name` column, and should be much cheaper than introspecting the catalog:
+        typically the DDL or the last modification time of every relation, read from the system tables.
+
+        Returns:
+            The query, or None if the catalogs of this database can't be fingerprinted.
+        """
+        return None
+
     def collect_stats(
         self,
         connection,
@@ -332,12 +564,17 @@ class BaseIntrospector(Generic[T], ABC):
     ) -> tuple[list[TableStatsEntry] | None, list[ColumnStatsEntry] | None]:
         return None, None
 
-    def _collect_samples_for_table(self, connection, catalog: str, schema: str, table: str) -> list[dict[str, Any]]:
+    def _collect_samples_for_table(
+        self, connection, catalog: str, schema: str, table: str, *, timeout_seconds: float | None = None
+    ) -> list[dict[str, Any]]:
         samples: list[dict[str, Any]] = []
         if self._SAMPLE_LIMIT > 0:
             try:
                 sql_query = self._sql_sample_rows(catalog, schema, table, self._SAMPLE_LIMIT)
-                samples = self._connector.execute(connection, sql_query.sql, sql_query.params)
+                if timeout_seconds is None:
+                    samples = self._connector.execute(connection, sql_query.sql, sql_query.params)
+                else:
+                    samples = self._fetch_rows_with_timeout(connection, sql_query, timeout_seconds)
             except NotImplementedError:
                 samples = []
             except Exception as e:
@@ -345,6 +582,15 @@ class BaseIntrospector(Generic[T], ABC):
                 samples = []
         return samples
 
+    def _fetch_rows_with_timeout(
+        self, connection: Any, sql_query: SQLQuery, timeout_seconds: float
+    ) -> list[dict[str, Any]]:
+        with self._connector.execute_streaming(
+            connection, sql_query.sql, sql_query.params, batch_size=self._SAMPLE_LIMIT, timeout_seconds=timeout_seconds
+        ) as stream:
+            rows = [row for batch in stream.batches for row in batch]
+        return [dict(zip(stream.columns, row)) for row in rows]
+
     @staticmethod
     def _compute_cardinality_stats(
         distinct_count: int | None,
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import json
-from contextlib import AbstractContextManager, closing
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, closing, contextmanager
 from typing import Any
 
 from google.cloud import bigquery
 
-from databao_context_engine.plugins.databases.base_connector import BaseConnector
+from databao_context_engine.plugins.databases.base_connector import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    BaseConnector,
+    SqlRowStream,
+)
 from databao_context_engine.plugins.databases.bigquery.config_file import (
     BigQueryConfigFile,
     BigQueryConnectionProperties,
@@ -63,6 +68,30 @@ class BigQueryConnector(BaseConnector[BigQueryConfigFile]):
         query_job = connection.query(sql, job_config=job_config)
         return [dict(row) for row in query_job.result()]
 
+    @contextmanager
+    def execute_streaming(
+        self,
+        connection,
+        sql: str,
+        params,
+        *,
+        batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+        timeout_seconds: float | None = None,
+    ) -> Iterator[SqlRowStream]:
+        job_config = None
+        if params is not None:
+            job_config = bigquery.QueryJobConfig(query_parameters=[self._to_query_param(v) for v in params])
+        query_job = connection.query(sql, job_config=job_config)
+        try:
+            # The result is downloaded one page at a time, when iterating on the pages
+            rows = query_job.result(page_size=batch_size, timeout=timeout_seconds)
+        except TimeoutError:
+            query_job.cancel()
+            raise
+
+        columns = [field.name for field in rows.schema]
+        yield SqlRowStream(columns=columns, batches=([tuple(row) for row in page] for page in rows.pages))
+
     @staticmethod
     def _infer_bq_type(v: Any) -> str:
         if isinstance(v, bool):
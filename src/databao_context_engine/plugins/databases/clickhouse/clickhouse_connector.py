@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from contextlib import AbstractContextManager, closing
+import math
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, closing, contextmanager
 from typing import Any
 
 import clickhouse_connect
 
-from databao_context_engine.plugins.databases.base_connector import BaseConnector
+from databao_context_engine.plugins.databases.base_connector import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    BaseConnector,
+    SqlRowStream,
+)
 from databao_context_engine.plugins.databases.clickhouse.config_file import ClickhouseConfigFile
 
 
@@ -21,3 +27,24 @@ class ClickhouseConnector(BaseConnector[ClickhouseConfigFile]):
         res = connection.query(sql, parameters=params) if params else connection.query(sql)
         cols = [c.lower() for c in res.column_names]
         return [dict(zip(cols, row)) for row in res.result_rows]
+
+    @contextmanager
+    def execute_streaming(
+        self,
+        connection,
+        sql: str,
+        params,
+        *,
+        batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+        timeout_seconds: float | None = None,
+    ) -> Iterator[SqlRowStream]:
+        settings = {}
+        # Settings can't be changed by readonly users
+        max_execution_time = connection.server_settings.get("max_execution_time")
+        if timeout_seconds is not None and max_execution_time is not None and not max_execution_time.readonly:
+            settings["max_execution_time"] = math.ceil(timeout_seconds)
+
+        # The rows are decoded one block at a time, as the server sends them
+        with connection.query_row_block_stream(sql, parameters=params or None, settings=settings) as stream:
+            columns = [c.lower() for c in stream.source.column_names]
+            yield SqlRowStream(columns=columns, batches=stream)
@@ -130,6 +130,24 @@ class ClickhouseIntrospector(BaseIntrospector[ClickhouseConfigFile]):
             {"schemas": schemas},
         )
 
+    @override
+    def get_catalog_fingerprint_sql_query(self, catalog: str) -> SQLQuery:
+        return SQLQuery(
+            r"""
+            SELECT
+                t.database AS schema_name,
+                t.name AS relation_name,
+                t.metadata_modification_time AS metadata_modification_time,
+                t.total_rows AS total_rows,
+                t.comment AS description
+            FROM 
+                system.tables t
+            WHERE 
+                NOT t.is_temporary
+        """,
+            None,
+        )
+
     def _sql_sample_rows(self, catalog: str, schema: str, table: str, limit: int) -> SQLQuery:
         sql = f'SELECT * FROM "{schema}"."{table}" LIMIT %s'
         return SQLQuery(sql, (limit,))
@@ -1,6 +1,12 @@
+import contextvars
 import dataclasses
+import functools
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Sequence, TypeVar
 
+import databao_context_engine.perf.core as perf
 from databao_context_engine.llm.descriptions.provider import DescriptionProvider
 from databao_context_engine.plugins.databases.databases_types import (
     DatabaseCatalog,
@@ -9,26 +15,211 @@ from databao_context_engine.plugins.databases.databases_types import (
     DatabaseSchema,
     DatabaseTable,
 )
+from databao_context_engine.progress.progress import report_step_progress
 from databao_context_engine.serialization.yaml import to_yaml_string
 
 logger = logging.getLogger(__name__)
 
+# Should usually match the OLLAMA_NUM_PARALLEL setting of the Ollama server
+DEFAULT_MAX_PARALLEL_DESCRIPTIONS = 4
+# Maximum number of columns of a table described with a single prompt
+DEFAULT_COLUMN_BATCH_SIZE = 50
+
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 def enrich_database_context(
-    context: DatabaseIntrospectionResult, description_provider: DescriptionProvider
+    context: DatabaseIntrospectionResult,
+    description_provider: DescriptionProvider,
+    *,
+    max_parallel_descriptions: int = DEFAULT_MAX_PARALLEL_DESCRIPTIONS,
+    column_batch_size: int = DEFAULT_COLUMN_BATCH_SIZE,
 ) -> DatabaseIntrospectionResult:
-    enriched_catalogs = []
-    for catalog in context.catalogs:
-        enriched_catalogs.append(_get_enriched_catalog(description_provider, catalog))
+    """Generate the missing descriptions of every catalog, schema, table and column of the context.
+
+    The descriptions are generated bottom-up: a table is only described once all its columns are, so that its prompt
+    contains the freshly generated column descriptions, and the same goes for schemas and catalogs. Descriptions that
+    don't depend on each other (e.g. the columns of all tables) are generated concurrently, with at most
+    `max_parallel_descriptions` requests to the LLM at the same time.
+
+    The columns of a table are described together, by batches of `column_batch_size` columns, so that the table is
+    only sent once per batch to the LLM instead of once per column.
+
+    Returns:
+        A copy of the context, with the generated descriptions.
+    """
+    total_units = sum(
+        1 + len(schema.tables) + sum(len(table.columns) for table in schema.tables)
+        for catalog in context.catalogs
+        for schema in catalog.schemas
+    ) + len(context.catalogs)
+    perf.set_attribute("description_units", total_units)
+
+    with _DescriptionScheduler(max_workers=max_parallel_descriptions, total_units=total_units) as scheduler:
+        catalog_futures = [
+            _enrich_catalog(scheduler, description_provider, catalog, column_batch_size=column_batch_size)
+            for catalog in context.catalogs
+        ]
+        enriched_catalogs = [future.result() for future in catalog_futures]
 
     return dataclasses.replace(context, catalogs=enriched_catalogs)
 
 
-def _get_enriched_catalog(description_provider: DescriptionProvider, catalog: DatabaseCatalog) -> DatabaseCatalog:
-    enriched_schemas = []
-    for schema in catalog.schemas:
-        enriched_schemas.append(_get_enriched_schema(description_provider, catalog.name, schema))
+class _DescriptionScheduler:
+    """Runs the description tasks of a context in a thread pool, each task starting once its dependencies are done.
+
+    Every task counts as a number of units of progress, reported with `report_step_progress` when it completes.
+    """
+
+    def __init__(self, *, max_workers: int, total_units: int):
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="describe")
+        self._total_units = total_units
+        self._completed_units = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "_DescriptionScheduler":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, fn: Callable[[], R], *, units: int = 1) -> Future[R]:
+        """Schedule `fn` to run as soon as a worker is available.
+
+        Returns:
+            A future of the result of `fn`.
+        """
+        return self.after([], lambda _: fn(), units=units)
+
+    def after(self, dependencies: Sequence[Future[T]], fn: Callable[[list[T]], R], *, units: int = 1) -> Future[R]:
+        """Schedule `fn` to run with the results of `dependencies`, once they are all done.
+
+        If a dependency failed, `fn` is not called and the returned future fails with the same error.
+
+        Returns:
+            A future of the result of `fn`.
+        """
+        result: Future[R] = Future()
+        context = contextvars.copy_context()
+        remaining = len(dependencies)
+        remaining_lock = threading.Lock()
+
+        def _run() -> None:
+            try:
+                dependency_results = [dependency.result() for dependency in dependencies]
+                result.set_result(fn(dependency_results))
+            except BaseException as e:
+                result.set_exception(e)
+            finally:
+                self._complete_units(units)
+
+        def _on_dependency_done(_: Future) -> None:
+            nonlocal remaining
+            with remaining_lock:
+                remaining -= 1
+                is_last = remaining == 0
+            if is_last:
+                self._executor.submit(context.run, _run)
+
+        if not dependencies:
+            self._executor.submit(context.run, _run)
+        for dependency in dependencies:
+            dependency.add_done_callback(_on_dependency_done)
+
+        return result
+
+    def _complete_units(self, units: int) -> None:
+        with self._lock:
+            self._completed_units += units
+            report_step_progress(completed_units=self._completed_units, total_units=self._total_units)
+
+
+def _enrich_catalog(
+    scheduler: _DescriptionScheduler,
+    description_provider: DescriptionProvider,
+    catalog: DatabaseCatalog,
+    *,
+    column_batch_size: int,
+) -> Future[DatabaseCatalog]:
+    schema_futures = [
+        _enrich_schema(scheduler, description_provider, catalog.name, schema, column_batch_size=column_batch_size)
+        for schema in catalog.schemas
+    ]
+    return scheduler.after(
+        schema_futures,
+        lambda schemas: _get_enriched_catalog(description_provider, dataclasses.replace(catalog, schemas=schemas)),
+    )
+
+
+def _enrich_schema(
+    scheduler: _DescriptionScheduler,
+    description_provider: DescriptionProvider,
+    catalog_name: str,
+    schema: DatabaseSchema,
+    *,
+    column_batch_size: int,
+) -> Future[DatabaseSchema]:
+    table_futures = [
+        _enrich_table(
+            scheduler, description_provider, catalog_name, schema.name, table, column_batch_size=column_batch_size
+        )
+        for table in schema.tables
+    ]
+    return scheduler.after(
+        table_futures,
+        lambda tables: _get_enriched_schema(
+            description_provider, catalog_name, dataclasses.replace(schema, tables=tables)
+        ),
+    )
+
+
+def _enrich_table(
+    scheduler: _DescriptionScheduler,
+    description_provider: DescriptionProvider,
+    catalog_name: str,
+    schema_name: str,
+    table: DatabaseTable,
+    *,
+    column_batch_size: int,
+) -> Future[DatabaseTable]:
+    undescribed_indexes = [index for index, column in enumerate(table.columns) if not column.description]
+    batches = [
+        undescribed_indexes[start : start + column_batch_size]
+        for start in range(0, len(undescribed_indexes), max(column_batch_size, 1))
+    ]
+    batch_futures = [
+        scheduler.submit(
+            functools.partial(
+                _get_enriched_columns,
+                description_provider,
+                catalog_name,
+                schema_name,
+                table,
+                [table.columns[index] for index in batch],
+            ),
+            units=len(batch),
+        )
+        for batch in batches
+    ]
+
+    def _get_table_with_enriched_columns(enriched_batches: list[list[DatabaseColumn]]) -> DatabaseTable:
+        columns = list(table.columns)
+        for batch, enriched_columns in zip(batches, enriched_batches, strict=True):
+            for index, enriched_column in zip(batch, enriched_columns, strict=True):
+                columns[index] = enriched_column
+
+        return _get_enriched_table(
+            description_provider, catalog_name, schema_name, dataclasses.replace(table, columns=columns)
+        )
+
+    # The columns that already had a description are completed along with their table
+    return scheduler.after(
+        batch_futures, _get_table_with_enriched_columns, units=1 + len(table.columns) - len(undescribed_indexes)
+    )
 
+
+def _get_enriched_catalog(description_provider: DescriptionProvider, catalog: DatabaseCatalog) -> DatabaseCatalog:
     try:
         catalog_description = (
             _describe_catalog(description_provider, catalog) if not catalog.description else catalog.description
@@ -39,16 +230,12 @@ def _get_enriched_catalog(description_provider: DescriptionProvider, catalog: Da
 
         catalog_description = catalog.description
 
-    return dataclasses.replace(catalog, schemas=enriched_schemas, description=catalog_description)
+    return dataclasses.replace(catalog, description=catalog_description)
 
 
 def _get_enriched_schema(
     description_provider: DescriptionProvider, catalog_name: str, schema: DatabaseSchema
 ) -> DatabaseSchema:
-    enriched_tables = []
-    for table in schema.tables:
-        enriched_tables.append(_get_enriched_table(description_provider, catalog_name, schema.name, table))
-
     try:
         schema_description = (
             _describe_schema(description_provider, catalog_name, schema)
@@ -61,16 +248,12 @@ def _get_enriched_schema(
 
         schema_description = schema.description
 
-    return dataclasses.replace(schema, tables=enriched_tables, description=schema_description)
+    return dataclasses.replace(schema, description=schema_description)
 
 
 def _get_enriched_table(
     description_provider: DescriptionProvider, catalog_name: str, schema_name: str, table: DatabaseTable
 ) -> DatabaseTable:
-    enriched_columns = []
-    for column in table.columns:
-        enriched_columns.append(_get_enriched_column(description_provider, catalog_name, schema_name, table, column))
-
     try:
         table_description = (
             _describe_table(description_provider, catalog_name, schema_name, table)
@@ -83,28 +266,40 @@ def _get_enriched_table(
 
         table_description = table.description
 
-    return dataclasses.replace(table, columns=enriched_columns, description=table_description)
+    return dataclasses.replace(table, description=table_description)
 
 
-def _get_enriched_column(
+@perf.perf_span(
+    "enrich.describe_columns",
+    attrs=lambda description_provider, catalog_name, schema_name, table, columns: {
+        "table": f"{catalog_name}.{schema_name}.{table.name}",
+        "column_count": len(columns),
+    },
+)
+def _get_enriched_columns(
     description_provider: DescriptionProvider,
     catalog_name: str,
     schema_name: str,
     table: DatabaseTable,
-    column: DatabaseColumn,
-) -> DatabaseColumn:
-    if not column.description:
-        try:
-            column_description = _describe_column(description_provider, catalog_name, schema_name, table, column)
-            return dataclasses.replace(column, description=column_description)
-        except Exception as e:
-            logger.debug(str(e), exc_info=True, stack_info=True)
+    columns: list[DatabaseColumn],
+) -> list[DatabaseColumn]:
+    try:
+        column_descriptions = _describe_columns(description_provider, catalog_name, schema_name, table, columns)
+    except Exception as e:
+        logger.debug(str(e), exc_info=True, stack_info=True)
+        column_descriptions = [None] * len(columns)
+
+    enriched_columns = []
+    for column, column_description in zip(columns, column_descriptions, strict=True):
+        if column_description is None:
             logger.info(
                 f"Failed to generate description for column {catalog_name}.{schema_name}.{table.name}.{column.name}"
             )
-            return column
+            enriched_columns.append(column)
+        else:
+            enriched_columns.append(dataclasses.replace(column, description=column_description))
 
-    return column
+    return enriched_columns
 
 
 def _describe_catalog(description_provider: DescriptionProvider, catalog: DatabaseCatalog) -> str:
@@ -143,14 +338,18 @@ def _describe_table(
     )
 
 
-def _describe_column(
+def _describe_columns(
     description_provider: DescriptionProvider,
     catalog_name: str,
     schema_name: str,
     table: DatabaseTable,
-    column: DatabaseColumn,
-) -> str:
-    return description_provider.describe(
-        text=to_yaml_string(column),
-        context=to_yaml_string({"catalog_name": catalog_name, "schema_name": schema_name, "table": table}),
+    columns: list[DatabaseColumn],
+) -> list[str | None]:
+    table_context = to_yaml_string({"catalog_name": catalog_name, "schema_name": schema_name, "table": table})
+    if len(columns) == 1:
+        return [description_provider.describe(text=to_yaml_string(columns[0]), context=table_context)]
+
+    perf.set_attribute("prompt_chars", len(table_context))
+    return description_provider.describe_many(
+        texts=[to_yaml_string(column) for column in columns], context=table_context
     )
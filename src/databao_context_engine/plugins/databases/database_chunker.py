@@ -40,6 +40,7 @@ def build_database_chunks(result: DatabaseIntrospectionResult) -> list[Embeddabl
 def _create_table_chunk(catalog_name: str, schema_name: str, table: DatabaseTable) -> EmbeddableChunk:
     return EmbeddableChunk(
         type="table",
+        key=f"{catalog_name}.{schema_name}.{table.name}",
         embeddable_text=_build_table_chunk_text(table),
         content=DatabaseTableChunkContent(
             catalog_name=catalog_name,
@@ -54,6 +55,7 @@ def _create_column_chunk(
 ) -> EmbeddableChunk:
     return EmbeddableChunk(
         type="column",
+        key=f"{catalog_name}.{schema_name}.{table.name}.{column.name}",
         embeddable_text=_build_column_chunk_text(table, column),
         content=DatabaseColumnChunkContent(
             catalog_name=catalog_name,
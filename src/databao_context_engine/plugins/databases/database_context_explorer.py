@@ -1,8 +1,12 @@
+from collections.abc import Mapping
 from dataclasses import dataclass
 
 from databao_context_engine.build_sources.plugin_execution import BuiltDatasourceContext
 from databao_context_engine.plugins.databases.databases_types import DatabaseIntrospectionResult, DatabaseTable
 
+# (catalog name, schema name, table name)
+DatabaseTableKey = tuple[str, str, str]
+
 
 @dataclass(kw_only=True, frozen=True)
 class DatabaseTableLite:
@@ -52,8 +56,26 @@ def list_database_schemas_and_tables(context: BuiltDatasourceContext) -> list[Da
     ]
 
 
+def index_database_tables(context: BuiltDatasourceContext) -> dict[DatabaseTableKey, DatabaseTable]:
+    if not isinstance(context.context, DatabaseIntrospectionResult):
+        raise ValueError(
+            f"Impossible to index database's tables for a context that is not a `DatabaseIntrospectionResult` (received: {type(context.context)})"
+        )
+
+    return {
+        (catalog.name, schema.name, table.name): table
+        for catalog in context.context.catalogs
+        for schema in catalog.schemas
+        for table in schema.tables
+    }
+
+
 def get_database_table_details(
-    context: BuiltDatasourceContext, catalog_name: str, schema_name: str, table_name: str
+    context: BuiltDatasourceContext,
+    catalog_name: str,
+    schema_name: str,
+    table_name: str,
+    table_index: Mapping[DatabaseTableKey, DatabaseTable] | None = None,
 ) -> DatabaseTableDetails:
     if not isinstance(context.context, DatabaseIntrospectionResult):
         raise ValueError(
@@ -61,6 +83,16 @@ def get_database_table_details(
         )
 
     datasource_id = context.datasource_id
+    # The index only speeds up finding the table: the scan below explains why an unknown table is not found
+    indexed_table = table_index.get((catalog_name, schema_name, table_name)) if table_index is not None else None
+    if indexed_table is not None:
+        return DatabaseTableDetails(
+            datasource_id=str(datasource_id),
+            catalog_name=catalog_name,
+            schema_name=schema_name,
+            table=indexed_table,
+        )
+
     catalog = next((catalog for catalog in context.context.catalogs if catalog.name == catalog_name), None)
     if catalog is None:
         available_catalogs = [catalog.name for catalog in context.context.catalogs]
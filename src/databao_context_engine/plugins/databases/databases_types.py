@@ -226,6 +226,8 @@ class DatabaseSchema:
     name: str
     tables: list[DatabaseTable]
     description: str | None = None
+    # Fingerprint of the relations of the schema when it was introspected, used to only introspect it again if it changed
+    fingerprint: str | None = field(default=None, compare=False)
 
 
 @dataclass
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from contextlib import AbstractContextManager, closing
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, closing, contextmanager
 from pathlib import Path
 from typing import Any
 
 import duckdb
 
-from databao_context_engine.plugins.databases.base_connector import BaseConnector
+from databao_context_engine.plugins.databases.base_connector import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    BaseConnector,
+    SqlRowStream,
+    interrupt_on_timeout,
+)
 from databao_context_engine.plugins.databases.duckdb.config_file import DuckDBConfigFile
 from databao_context_engine.plugins.duckdb_tools import fetchall_dicts
 
@@ -24,5 +30,21 @@ class DuckDBConnector(BaseConnector[DuckDBConfigFile]):
         cur = connection.cursor()
         return fetchall_dicts(cur, sql, params)
 
+    @contextmanager
+    def execute_streaming(
+        self,
+        connection,
+        sql: str,
+        params,
+        *,
+        batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+        timeout_seconds: float | None = None,
+    ) -> Iterator[SqlRowStream]:
+        # DuckDB streams the result of a query: fetchmany only computes the rows it returns
+        with closing(connection.cursor()) as cur, interrupt_on_timeout(timeout_seconds, cur.interrupt):
+            cur.execute(sql, params or [])
+            columns = [desc[0].lower() for desc in cur.description] if cur.description else []
+            yield SqlRowStream(columns=columns, batches=iter(lambda: cur.fetchmany(batch_size), []))
+
     def _connection_check_sql_query(self) -> str:
         return "SELECT 1 FROM information_schema.tables LIMIT 1"
@@ -386,6 +386,60 @@ class DuckDBIntrospector(BaseIntrospector[DuckDBConfigFile]):
 
         return table_stats, column_stats
 
+    @override
+    def get_catalog_fingerprint_sql_query(self, catalog: str) -> SQLQuery:
+        # The estimated size of the tables makes the fingerprint change when rows are inserted or deleted
+        return SQLQuery(
+            r"""
+            SELECT
+                schema_name,
+                table_name AS relation_name,
+                sql,
+                comment,
+                estimated_size
+            FROM
+                duckdb_tables()
+            WHERE
+                database_name = ?
+            UNION ALL
+            SELECT
+                schema_name,
+                view_name,
+                sql,
+                comment,
+                NULL
+            FROM
+                duckdb_views()
+            WHERE
+                database_name = ?
+                AND NOT internal
+            UNION ALL
+            SELECT
+                schema_name,
+                index_name,
+                sql,
+                comment,
+                NULL
+            FROM
+                duckdb_indexes()
+            WHERE
+                database_name = ?
+            UNION ALL
+            SELECT
+                schema_name,
+                table_name || '.' || column_name,
+                NULL,
+                comment,
+                NULL
+            FROM
+                duckdb_columns()
+            WHERE
+                database_name = ?
+                AND comment IS NOT NULL
+        """,
+            (catalog, catalog, catalog, catalog),
+        )
+
     def _sql_sample_rows(self, catalog: str, schema: str, table: str, limit: int) -> SQLQuery:
         sql = f'SELECT * FROM "{schema}"."{table}" LIMIT ?'
         return SQLQuery(sql, (limit,))
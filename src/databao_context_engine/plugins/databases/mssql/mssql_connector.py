@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from contextlib import AbstractContextManager, closing
+import math
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, closing, contextmanager
 from typing import Any, Mapping
 
 from mssql_python import connect  # type: ignore[import-untyped]
 
-from databao_context_engine.plugins.databases.base_connector import BaseConnector
+from databao_context_engine.plugins.databases.base_connector import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    BaseConnector,
+    SqlRowStream,
+)
 from databao_context_engine.plugins.databases.mssql.config_file import MSSQLConfigFile
 
 
@@ -29,6 +35,23 @@ class MSSQLConnector(BaseConnector[MSSQLConfigFile]):
             columns = [col[0].lower() for col in cursor.description]
             return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
+    @contextmanager
+    def execute_streaming(
+        self,
+        connection,
+        sql: str,
+        params,
+        *,
+        batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+        timeout_seconds: float | None = None,
+    ) -> Iterator[SqlRowStream]:
+        if timeout_seconds is not None:
+            connection.timeout = math.ceil(timeout_seconds)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params or ())
+            columns = [col[0].lower() for col in cursor.description] if cursor.description else []
+            yield SqlRowStream(columns=columns, batches=iter(lambda: cursor.fetchmany(batch_size), []))
+
     def _create_connection_string_for_config(self, file_config: Mapping[str, Any]) -> str:
         def _escape_odbc_value(value: str) -> str:
             return "{" + value.replace("}", "}}").replace("{", "{{") + "}"
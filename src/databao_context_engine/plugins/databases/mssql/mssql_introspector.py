@@ -371,6 +371,37 @@ class MSSQLIntrospector(BaseIntrospector[MSSQLConfigFile]):
             None,
         )
 
+    @override
+    def get_catalog_fingerprint_sql_query(self, catalog: str) -> SQLQuery:
+        # Altering a table, or one of its indexes or constraints, updates its modify_date
+        return SQLQuery(
+            r"""
+            SELECT
+                s.name AS schema_name,
+                o.name AS relation_name,
+                o.type AS kind,
+                o.modify_date AS modify_date,
+                p.row_count AS row_count
+            FROM 
+                sys.objects o
+                JOIN sys.schemas s ON s.schema_id = o.schema_id
+                LEFT JOIN (
+                    SELECT 
+                        object_id, 
+                        SUM(rows) AS row_count
+                    FROM 
+                        sys.partitions
+                    WHERE 
+                        index_id IN (0, 1)
+                    GROUP BY 
+                        object_id
+                ) p ON p.object_id = o.object_id
+            WHERE 
+                o.is_ms_shipped = 0
+        """,
+            None,
+        )
+
     def _quote_literal(self, value: str) -> str:
         return "'" + str(value).replace("'", "''") + "'"
 
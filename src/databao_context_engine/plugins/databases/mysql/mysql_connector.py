@@ -1,32 +1,109 @@
 from __future__ import annotations
 
-from contextlib import AbstractContextManager, closing
+import logging
+import threading
+import weakref
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, closing, contextmanager
 from typing import Any
 
 import pymysql
-from pymysql.constants import CLIENT
+from pymysql.constants import CLIENT, ER
 
-from databao_context_engine.plugins.databases.base_connector import BaseConnector
+from databao_context_engine.plugins.databases.base_connector import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    BaseConnector,
+    SqlRowStream,
+    interrupt_on_timeout,
+)
 from databao_context_engine.plugins.databases.mysql.config_file import MySQLConfigFile
 
+logger = logging.getLogger(__name__)
+
 
 class MySQLConnector(BaseConnector[MySQLConfigFile]):
+    def __init__(self) -> None:
+        # The arguments each open connection was created with, to open a side connection killing its queries
+        self._connection_kwargs: weakref.WeakKeyDictionary[Any, dict[str, Any]] = weakref.WeakKeyDictionary()
+        self._connection_kwargs_lock = threading.Lock()
+
     def connect(self, file_config: MySQLConfigFile, *, catalog: str | None = None) -> AbstractContextManager[Any]:
         connection_kwargs = file_config.connection.to_pymysql_kwargs()
 
         if catalog:
             connection_kwargs["database"] = catalog
 
-        return closing(
-            pymysql.connect(
-                **connection_kwargs,
-                cursorclass=pymysql.cursors.DictCursor,
-                client_flag=CLIENT.MULTI_STATEMENTS | CLIENT.MULTI_RESULTS,
-            )
+        connection = pymysql.connect(
+            **connection_kwargs,
+            cursorclass=pymysql.cursors.DictCursor,
+            client_flag=CLIENT.MULTI_STATEMENTS | CLIENT.MULTI_RESULTS,
         )
+        with self._connection_kwargs_lock:
+            self._connection_kwargs[connection] = connection_kwargs
+        return closing(connection)
 
     def execute(self, connection, sql: str, params) -> list[dict]:
         with connection.cursor(pymysql.cursors.DictCursor) as cur:
             cur.execute(sql, params)
             rows = cur.fetchall()
             return [{k.lower(): v for k, v in row.items()} for row in rows]
+
+    @contextmanager
+    def execute_streaming(
+        self,
+        connection,
+        sql: str,
+        params,
+        *,
+        batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+        timeout_seconds: float | None = None,
+    ) -> Iterator[SqlRowStream]:
+        """Execute a query with an unbuffered cursor, which reads the rows from the server as they are fetched.
+
+        MySQL sends all the rows of a result, and closing an unbuffered cursor reads the ones that were not fetched:
+        when the caller stops before the end of the result, or when the timeout is reached, the query is killed
+        first, so that the rest of the result is not transferred.
+
+        Yields:
+            The columns of the result, and an iterator on its batches of rows.
+
+        Raises:
+            OperationalError: If closing the cursor failed for another reason than the query being killed.
+        """
+        with interrupt_on_timeout(timeout_seconds, lambda: self._kill_query(connection)):
+            cur = connection.cursor(pymysql.cursors.SSCursor)
+            fully_read = True
+            try:
+                cur.execute(sql, params)
+                columns = [d[0].lower() for d in cur.description] if cur.description else []
+                fully_read = not columns
+
+                def fetch_batches() -> Iterator[tuple[tuple[Any, ...], ...]]:
+                    nonlocal fully_read
+                    while batch := cur.fetchmany(batch_size):
+                        yield batch
+                    fully_read = True
+
+                yield SqlRowStream(columns=columns, batches=fetch_batches())
+            finally:
+                if not fully_read:
+                    self._kill_query(connection)
+                try:
+                    cur.close()
+                except pymysql.err.OperationalError as e:
+                    # The error ending the result of the killed query
+                    if e.args[0] != ER.QUERY_INTERRUPTED:
+                        raise
+
+    def _kill_query(self, connection) -> None:
+        with self._connection_kwargs_lock:
+            connection_kwargs = self._connection_kwargs.get(connection)
+        if connection_kwargs is None:
+            return
+
+        try:
+            with closing(pymysql.connect(**connection_kwargs)) as kill_connection:
+                with kill_connection.cursor() as cur:
+                    cur.execute("KILL QUERY %s", (connection.thread_id(),))
+        except pymysql.err.Error as e:
+            logger.warning("Failed to kill the query of MySQL connection %s: %s", connection.thread_id(), e)
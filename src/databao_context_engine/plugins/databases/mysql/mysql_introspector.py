@@ -329,6 +329,43 @@ class MySQLIntrospector(BaseIntrospector[MySQLConfigFile]):
             None,
         )
 
+    @override
+    def get_catalog_fingerprint_sql_query(self, catalog: str) -> SQLQuery:
+        # Some ALTER TABLE statements (e.g. instant ADD COLUMN) don't change the creation time of the table: a checksum
+        # of its columns is added to the fingerprint as well
+        return SQLQuery(
+            r"""
+            SELECT
+                t.TABLE_SCHEMA AS schema_name,
+                t.TABLE_NAME AS relation_name,
+                t.TABLE_TYPE AS kind,
+                t.CREATE_TIME AS create_time,
+                t.UPDATE_TIME AS update_time,
+                t.TABLE_ROWS AS estimated_rows,
+                t.TABLE_COMMENT AS description,
+                c.columns_checksum AS columns_checksum
+            FROM
+                information_schema.TABLES t
+                LEFT JOIN (
+                    SELECT
+                        TABLE_SCHEMA,
+                        TABLE_NAME,
+                        SUM(CRC32(CONCAT_WS('|', ORDINAL_POSITION, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE,
+                                            COLUMN_DEFAULT, COLUMN_KEY, COLUMN_COMMENT))) AS columns_checksum
+                    FROM
+                        information_schema.COLUMNS
+                    WHERE
+                        TABLE_SCHEMA = DATABASE()
+                    GROUP BY
+                        TABLE_SCHEMA,
+                        TABLE_NAME
+                ) c ON c.TABLE_SCHEMA = t.TABLE_SCHEMA AND c.TABLE_NAME = t.TABLE_NAME
+            WHERE
+                t.TABLE_SCHEMA = DATABASE()
+        """,
+            None,
+        )
+
     def _sql_sample_rows(self, catalog: str, schema: str, table: str, limit: int) -> SQLQuery:
         sql = f"SELECT * FROM `{schema}`.`{table}` LIMIT %s"
         return SQLQuery(sql, (limit,))
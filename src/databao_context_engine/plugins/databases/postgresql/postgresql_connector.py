@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import logging
-from contextlib import AbstractContextManager
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
 from typing import Any
 
-from databao_context_engine.plugins.databases.base_connector import BaseConnector
+from databao_context_engine.plugins.databases.base_connector import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    BaseConnector,
+    SqlRowStream,
+)
 from databao_context_engine.plugins.databases.postgresql.config_file import (
     PostgresConfigFile,
     PostgresConnectionProperties,
@@ -24,6 +29,19 @@ class PostgresqlConnector(BaseConnector[PostgresConfigFile]):
     def execute(self, connection: SyncAsyncpgConnection, sql: str, params) -> list[dict]:
         return connection.fetch_rows(sql, params)
 
+    @contextmanager
+    def execute_streaming(
+        self,
+        connection: SyncAsyncpgConnection,
+        sql: str,
+        params,
+        *,
+        batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+        timeout_seconds: float | None = None,
+    ) -> Iterator[SqlRowStream]:
+        with connection.stream_rows(sql, params, batch_size=batch_size, timeout=timeout_seconds) as (columns, batches):
+            yield SqlRowStream(columns=columns, batches=batches)
+
     def _create_connection_kwargs(self, connection_config: PostgresConnectionProperties) -> dict[str, Any]:
         kwargs: dict[str, Any] = {
             "host": connection_config.host,
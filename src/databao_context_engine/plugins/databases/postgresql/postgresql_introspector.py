@@ -430,6 +430,50 @@ class PostgresqlIntrospector(BaseIntrospector[PostgresConfigFile]):
             (schemas,),
         )
 
+    @override
+    def get_catalog_fingerprint_sql_query(self, catalog: str) -> SQLQuery:
+        # The pg_class row of a relation is rewritten (changing its xmin) by any DDL statement on the relation and by
+        # ANALYZE, which also updates its estimated number of rows
+        return SQLQuery(
+            """
+            SELECT
+                n.nspname AS schema_name,
+                c.relname AS relation_name,
+                c.relkind::text AS kind,
+                c.xmin::text AS row_version,
+                c.relfilenode::text AS file_node,
+                c.reltuples::text AS estimated_rows
+            FROM
+                pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE
+                c.relkind IN ('r', 'p', 'v', 'm', 'f', 'i')
+            UNION ALL
+            SELECT
+                n.nspname,
+                con.conname,
+                con.contype::text,
+                con.xmin::text,
+                NULL,
+                NULL
+            FROM
+                pg_constraint con
+                JOIN pg_namespace n ON n.oid = con.connamespace
+            UNION ALL
+            SELECT
+                n.nspname,
+                c.relname || '.' || d.objsubid::text,
+                'comment',
+                d.xmin::text,
+                NULL,
+                NULL
+            FROM
+                pg_description d
+                JOIN pg_class c ON c.oid = d.objoid AND d.classoid = 'pg_catalog.pg_class'::regclass
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+            """,
+        )
+
     def _sql_table_stats(self) -> str:
         return """
             SELECT
@@ -4,7 +4,8 @@ import asyncio
 import concurrent.futures
 import queue
 import threading
-from collections.abc import Coroutine
+from collections.abc import Coroutine, Iterator
+from contextlib import contextmanager
 from typing import Any, Sequence
 
 import asyncpg
@@ -52,6 +53,31 @@ class SyncAsyncpgConnection:
         records = await self._conn.fetch(sql, *query_params)
         return [dict(r) for r in records]
 
+    async def _async_open_cursor(
+        self, sql: str, params: Sequence[Any] | None, timeout: float | None
+    ) -> tuple[asyncpg.transaction.Transaction, list[str], asyncpg.cursor.Cursor]:
+        """Open a cursor on the rows of a query, in a new transaction."""
+        if self._conn is None:
+            raise RuntimeError("Connection is not open")
+        query_params = [] if params is None else list(params)
+        # asyncpg cursors can only be used within a transaction
+        transaction = self._conn.transaction()
+        await transaction.start()
+        try:
+            statement = await self._conn.prepare(sql, timeout=timeout)
+            cursor = await statement.cursor(*query_params, timeout=timeout)
+        except BaseException:
+            await transaction.rollback()
+            raise
+        return transaction, [attribute.name for attribute in statement.get_attributes()], cursor
+
+    async def _async_fetch_batch(
+        self, cursor: asyncpg.cursor.Cursor, batch_size: int, timeout: float | None
+    ) -> list[tuple[Any, ...]]:
+        """Fetch the next rows of a cursor and return them as tuples."""
+        records = await cursor.fetch(batch_size, timeout=timeout)
+        return [tuple(r) for r in records]
+
     async def _async_fetch_scalar_values(self, sql: str) -> list[Any]:
         """Fetch scalar values (first column) from the database."""
         if self._conn is None:
@@ -151,3 +177,23 @@ class SyncAsyncpgConnection:
 
     def fetch_scalar_values(self, sql: str) -> list[Any]:
         return self._run_sync(self._async_fetch_scalar_values(sql))
+
+    @contextmanager
+    def stream_rows(
+        self, sql: str, params: Sequence[Any] | None = None, *, batch_size: int, timeout: float | None = None
+    ) -> Iterator[tuple[list[str], Iterator[list[tuple[Any, ...]]]]]:
+        """Fetch the rows of a query with a cursor, `batch_size` rows at a time.
+
+        The transaction of the cursor is committed when exiting the context, or rolled back if an error was raised.
+        Each database call of the query fails with a TimeoutError after `timeout` seconds.
+
+        Yields:
+            The names of the columns of the query, and an iterator on its batches of rows.
+        """
+        transaction, columns, cursor = self._run_sync(self._async_open_cursor(sql, params, timeout))
+        try:
+            yield columns, iter(lambda: self._run_sync(self._async_fetch_batch(cursor, batch_size, timeout)), [])
+        except BaseException:
+            self._run_sync(transaction.rollback())
+            raise
+        self._run_sync(transaction.commit())
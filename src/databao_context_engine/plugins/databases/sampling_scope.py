@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+MAX_PARALLEL_SAMPLED_TABLES = 16
 
 
 def _normalize_str_or_list(v: Any) -> Any:
@@ -91,9 +93,14 @@ class SamplingConfig(BaseModel):
     Attributes:
         enabled: master switch. If False, sampling is disabled entirely.
         scope: include/exclude rules controlling which tables get sampled.
+        max_parallel_tables: number of tables of a catalog sampled at the same time, each on its own connection.
+        table_timeout_seconds: optional maximum duration of the sampling of a table. A table that takes longer is left
+            without samples, instead of stalling the introspection.
     """
 
     model_config = ConfigDict(extra="forbid")
 
     enabled: bool = True
     scope: SamplingScope | None = None
+    max_parallel_tables: int = Field(default=1, ge=1, le=MAX_PARALLEL_SAMPLED_TABLES)
+    table_timeout_seconds: float | None = Field(default=None, gt=0)
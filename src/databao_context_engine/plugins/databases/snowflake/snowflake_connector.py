@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from contextlib import AbstractContextManager, closing
+import math
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, closing, contextmanager
 from datetime import datetime
 from typing import Any
 
 import snowflake.connector
 
-from databao_context_engine.plugins.databases.base_connector import BaseConnector
+from databao_context_engine.plugins.databases.base_connector import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    BaseConnector,
+    SqlRowStream,
+)
 from databao_context_engine.plugins.databases.snowflake.config_file import SnowflakeConfigFile
 
 
@@ -25,12 +31,34 @@ class SnowflakeConnector(BaseConnector[SnowflakeConfigFile]):
         )
 
     def execute(self, connection, sql: str, params) -> list[dict]:
-        def normalize_value(v):
-            if isinstance(v, datetime):
-                return v.isoformat()
-            return v
-
         with connection.cursor(snowflake.connector.DictCursor) as cur:
             cur.execute(sql, params)
             rows = cur.fetchall()
-            return [{k.lower(): normalize_value(v) for k, v in row.items()} for row in rows]
+            return [{k.lower(): _normalize_value(v) for k, v in row.items()} for row in rows]
+
+    @contextmanager
+    def execute_streaming(
+        self,
+        connection,
+        sql: str,
+        params,
+        *,
+        batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+        timeout_seconds: float | None = None,
+    ) -> Iterator[SqlRowStream]:
+        timeout = math.ceil(timeout_seconds) if timeout_seconds is not None else None
+        # The result chunks of a query are only downloaded when fetching their rows
+        with connection.cursor() as cur:
+            cur.execute(sql, params, timeout=timeout)
+            columns = [d[0].lower() for d in cur.description] if cur.description else []
+            batches = (
+                [tuple(_normalize_value(v) for v in row) for row in batch]
+                for batch in iter(lambda: cur.fetchmany(batch_size), [])
+            )
+            yield SqlRowStream(columns=columns, batches=batches)
+
+
+def _normalize_value(v):
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return v
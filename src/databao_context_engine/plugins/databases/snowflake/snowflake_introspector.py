@@ -330,6 +330,25 @@ class SnowflakeIntrospector(BaseIntrospector[SnowflakeConfigFile]):
             None,
         )
 
+    @override
+    def get_catalog_fingerprint_sql_query(self, catalog: str) -> SQLQuery:
+        # LAST_ALTERED changes on any DDL or DML statement on the table
+        isq = self._qual_is(catalog)
+        return SQLQuery(
+            f"""
+            SELECT
+                t.TABLE_SCHEMA AS "schema_name",
+                t.TABLE_NAME AS "relation_name",
+                t.TABLE_TYPE AS "kind",
+                t.LAST_ALTERED AS "last_altered",
+                t.ROW_COUNT AS "row_count",
+                t.COMMENT AS "description"
+            FROM
+                {isq}.TABLES AS t
+            """,
+            None,
+        )
+
     def _sql_sample_rows(self, catalog: str, schema: str, table: str, limit: int) -> SQLQuery:
         sql = f'SELECT * FROM "{schema}"."{table}" LIMIT ?'
         return SQLQuery(sql, (limit,))
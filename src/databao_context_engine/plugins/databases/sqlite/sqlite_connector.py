@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import sqlite3
-from contextlib import AbstractContextManager, closing
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, closing, contextmanager
 from pathlib import Path
 from typing import Any
 
-from databao_context_engine.plugins.databases.base_connector import BaseConnector
+from databao_context_engine.plugins.databases.base_connector import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    BaseConnector,
+    SqlRowStream,
+    interrupt_on_timeout,
+)
 from databao_context_engine.plugins.databases.sqlite.config_file import SQLiteConfigFile
 
 
@@ -41,3 +47,18 @@ class SQLiteConnector(BaseConnector[SQLiteConfigFile]):
                 cols = [d[0].lower() for d in cur.description]
                 out.append(dict(zip(cols, r)))
         return out
+
+    @contextmanager
+    def execute_streaming(
+        self,
+        connection,
+        sql: str,
+        params,
+        *,
+        batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+        timeout_seconds: float | None = None,
+    ) -> Iterator[SqlRowStream]:
+        with closing(connection.cursor()) as cur, interrupt_on_timeout(timeout_seconds, connection.interrupt):
+            cur.execute(sql, params or ())
+            columns = [d[0].lower() for d in cur.description] if cur.description else []
+            yield SqlRowStream(columns=columns, batches=iter(lambda: cur.fetchmany(batch_size), []))
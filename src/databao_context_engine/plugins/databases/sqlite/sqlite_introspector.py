@@ -187,6 +187,22 @@ class SQLiteIntrospector(BaseIntrospector[SQLiteConfigFile]):
         """
         )
 
+    @override
+    def get_catalog_fingerprint_sql_query(self, catalog: str) -> SQLQuery:
+        return SQLQuery(
+            sql=f"""
+            SELECT
+                '{self._PSEUDO_SCHEMA}' AS schema_name,
+                m.type,
+                m.name AS relation_name,
+                m.sql
+            FROM 
+                sqlite_master m
+            WHERE
+                m.name NOT LIKE 'sqlite_%'
+        """
+        )
+
     def _sql_sample_rows(self, catalog: str, schema: str, table: str, limit: int) -> SQLQuery:
         sql = f"SELECT * FROM {self._quote_ident(table)} LIMIT ?"
         return SQLQuery(sql, (limit,))
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from enum import Enum
-from typing import Callable
+from typing import Callable, Iterator
 
 
 class ProgressKind(str, Enum):
@@ -44,6 +47,30 @@ class ProgressEvent:
 
 ProgressCallback = Callable[[ProgressEvent], None]
 
+StepProgressReporter = Callable[[int, int], None]
+
+_current_step_progress_reporter: ContextVar[StepProgressReporter | None] = ContextVar(
+    "current_step_progress_reporter", default=None
+)
+
+
+def synchronized_progress(cb: ProgressCallback | None) -> ProgressCallback | None:
+    """Wrap a progress callback so that it is never called concurrently from several threads.
+
+    Returns:
+        The wrapped callback, or None if no callback was given.
+    """
+    if cb is None:
+        return None
+
+    lock = threading.Lock()
+
+    def _synchronized(event: ProgressEvent) -> None:
+        with lock:
+            cb(event)
+
+    return _synchronized
+
 
 class ProgressEmitter:
     def __init__(self, cb: ProgressCallback | None):
@@ -135,3 +162,32 @@ class ProgressEmitter:
                 error=error,
             )
         )
+
+
+@contextmanager
+def reporting_step_progress(emitter: ProgressEmitter, *, datasource_id: str, step: ProgressStep) -> Iterator[None]:
+    """Emit the progress reported with `report_step_progress` within the block as the progress of a datasource step.
+
+    This lets code that doesn't know about the current datasource (e.g. a plugin) report fine-grained progress.
+
+    Yields:
+        Nothing, the reporting stops when leaving the block.
+    """
+
+    def _report(completed_units: int, total_units: int) -> None:
+        emitter.datasource_step_progress(
+            datasource_id=datasource_id, step=step, completed_units=completed_units, total_units=total_units
+        )
+
+    token = _current_step_progress_reporter.set(_report)
+    try:
+        yield
+    finally:
+        _current_step_progress_reporter.reset(token)
+
+
+def report_step_progress(*, completed_units: int, total_units: int) -> None:
+    """Report the progress of the current datasource step, if the caller is within `reporting_step_progress`."""
+    reporter = _current_step_progress_reporter.get()
+    if reporter is not None:
+        reporter(completed_units, total_units)
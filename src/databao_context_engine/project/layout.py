@@ -34,6 +34,10 @@ class ProjectLayout:
     def db_path(self) -> Path:
         return self.output_dir / "dce.duckdb"
 
+    @property
+    def vector_index_dir(self) -> Path:
+        return self.output_dir / "dce_vector_index"
+
 
 def ensure_project_dir(project_dir: Path) -> ProjectLayout:
     return _ProjectValidator(project_dir).ensure_project_dir_valid()
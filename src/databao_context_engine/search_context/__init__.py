@@ -1,3 +1,7 @@
-from databao_context_engine.search_context.search_wiring import search_context
+from databao_context_engine.search_context.search_wiring import (
+    SearchContextSession,
+    search_context,
+    search_context_many,
+)
 
-__all__ = ["search_context"]
+__all__ = ["search_context", "search_context_many", "SearchContextSession"]
@@ -1,15 +1,23 @@
 import logging
-from collections.abc import Sequence
+from array import array
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any
+from typing import Any, Protocol
 
 import duckdb
+import pyarrow  # type: ignore[import-untyped]
 
 import databao_context_engine.perf.core as perf
 from databao_context_engine.datasources.datasource_context import DatasourceContextHash
 from databao_context_engine.datasources.types import DatasourceId
 from databao_context_engine.pluginlib.build_plugin import DatasourceType
+from databao_context_engine.storage.embedding_storage_format import EmbeddingStorageFormat, int8_vectors_table_name
+from databao_context_engine.storage.keyword_index import BM25_B, BM25_K, stem_sql, tokenize_sql
+from databao_context_engine.storage.repositories.embedding_model_registry_repository import (
+    EmbeddingModelRegistryRepository,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -83,14 +91,66 @@ class SearchResult:
     score: RrfScore | VectorSearchScore | KeywordSearchScore
 
 
+class VectorSearchBackend(Protocol):
+    """Alternative to DuckDB for the vector searches of `ChunkSearchRepository`."""
+
+    def warm_up(self, *, table_name: str, dimension: int) -> None: ...
+
+    def search(
+        self,
+        *,
+        table_name: str,
+        dimension: int,
+        search_vecs: Sequence[Sequence[float]],
+        limit: int,
+        datasource_context_hashes: list[DatasourceContextHash],
+        chunk_types: list[ChunkType] | None,
+        distance_threshold: float,
+    ) -> list[list[tuple[int, float]]]:
+        """Find the nearest chunks of each searched vector.
+
+        Returns:
+            For each searched vector, in the same order, the ids and cosine distances of at most `limit` chunks, ordered
+            by distance.
+        """
+        ...
+
+
 class ChunkSearchRepository:
     _DEFAULT_DISTANCE_THRESHOLD = 0.75
     _DEFAULT_RRF_K = 60
     _DEFAULT_CANDIDATE_MULTIPLIER = 3
-    _BM25_FTS_SCHEMA = "fts_main_chunk"
+    _DEFAULT_VECTOR_PROBE_MULTIPLIER = 4
+    _MAX_VECTOR_PROBE_LIMIT = 4096
 
-    def __init__(self, conn: duckdb.DuckDBPyConnection):
+    def __init__(self, conn: duckdb.DuckDBPyConnection, *, vector_backend: VectorSearchBackend | None = None):
         self._conn = conn
+        self._vector_backend = vector_backend
+        self._registry_repo = EmbeddingModelRegistryRepository(conn)
+        self._int8_vector_search = _Int8VectorSearch(conn)
+        self._storage_formats: dict[str, EmbeddingStorageFormat] = {}
+
+    @perf.perf_span("chunk_search.warm_up")
+    def warm_up(self, *, table_name: str, dimension: int) -> None:
+        """Run a nearest neighbour query on an embedding shard table, to load its persisted HNSW index in memory."""
+        vector_backend = self._get_vector_backend(table_name)
+        if vector_backend is not None:
+            vector_backend.warm_up(table_name=table_name, dimension=dimension)
+            return
+
+        with _hnsw_index_scan(self._conn):
+            self._conn.execute(
+                f"""
+                SELECT
+                    chunk_id
+                FROM
+                    {table_name}
+                ORDER BY
+                    array_cosine_distance(vec, CAST(? AS FLOAT[{dimension}]))
+                LIMIT 1
+                """,
+                [_to_vector_param([1.0] + [0.0] * (dimension - 1))],
+            ).fetchall()
 
     @perf.perf_span("chunk_search.search_chunks_by_vector_similarity")
     def search_chunks_by_vector_similarity(
@@ -104,6 +164,18 @@ class ChunkSearchRepository:
         chunk_types: list[ChunkType] | None = None,
     ) -> list[SearchResult]:
         """Read only similarity search on a specific embedding shard table."""
+        vector_backend = self._get_vector_backend(table_name)
+        if vector_backend is not None:
+            return self._search_with_vector_backend(
+                vector_backend,
+                table_name=table_name,
+                search_vecs=[search_vec],
+                dimension=dimension,
+                limit=limit,
+                datasource_context_hashes=datasource_context_hashes,
+                chunk_types=chunk_types,
+            )[0]
+
         vector_candidates = self._get_vector_candidates(
             table_name=table_name,
             search_vec=search_vec,
@@ -125,6 +197,234 @@ class ChunkSearchRepository:
             for candidate in vector_candidates
         ]
 
+    @perf.perf_span(
+        "chunk_search.search_chunks_by_vector_similarity_many",
+        attrs=lambda *_, search_vecs, **__: {"queries_number": len(search_vecs)},
+    )
+    def search_chunks_by_vector_similarity_many(
+        self,
+        *,
+        table_name: str,
+        search_vecs: Sequence[Sequence[float]],
+        dimension: int,
+        limit: int,
+        datasource_context_hashes: list[DatasourceContextHash],
+        chunk_types: list[ChunkType] | None = None,
+    ) -> list[list[SearchResult]]:
+        """Read only similarity search of several vectors at once, on a specific embedding shard table.
+
+        The vectors are registered as an Arrow table and compared to every allowed chunk in a single query, which
+        ranks them per searched vector and only reads the texts of the chunks for the top `limit` of each. This
+        doesn't use the HNSW index: the allowed chunks are scanned once for all the searched vectors, instead of the
+        index being probed once per vector.
+
+        Returns:
+            For each searched vector, in the same order, at most `limit` search results ordered by cosine distance.
+        """
+        results: list[list[SearchResult]] = [[] for _ in search_vecs]
+        if not search_vecs or not datasource_context_hashes or limit <= 0:
+            return results
+
+        vector_backend = self._get_vector_backend(table_name)
+        if vector_backend is not None:
+            return self._search_with_vector_backend(
+                vector_backend,
+                table_name=table_name,
+                search_vecs=search_vecs,
+                dimension=dimension,
+                limit=limit,
+                datasource_context_hashes=datasource_context_hashes,
+                chunk_types=chunk_types,
+            )
+
+        allowed_hashes_sql, hash_params = self._build_allowed_hashes_values(datasource_context_hashes)
+
+        chunk_types_param: list[list[ChunkType]]
+        if chunk_types:
+            chunk_type_filter = "WHERE c.chunk_type IN ?"
+            chunk_types_param = [chunk_types]
+        else:
+            chunk_types_param = []
+            chunk_type_filter = ""
+
+        flat = array("f")
+        for vec in search_vecs:
+            flat.extend(vec)
+
+        tbl = pyarrow.table(
+            {
+                "query_index": pyarrow.array(range(len(search_vecs)), type=pyarrow.int32()),
+                "vec": pyarrow.FixedSizeListArray.from_arrays(pyarrow.array(flat), dimension),
+            }
+        )
+
+        params: list[Any] = [*hash_params, *chunk_types_param, self._DEFAULT_DISTANCE_THRESHOLD, limit]
+
+        view_name = "__tmp_search_vectors"
+        self._conn.register(view_name, tbl)
+        try:
+            rows = self._conn.execute(
+                f"""
+                WITH allowed_hashes(datasource_id, hash, hash_algorithm) AS (
+                    VALUES {allowed_hashes_sql}
+                ),
+                allowed_embeddings AS (
+                    SELECT
+                        e.chunk_id,
+                        e.vec
+                    FROM
+                        {table_name} e
+                        JOIN chunk c ON e.chunk_id = c.chunk_id
+                        JOIN datasource_context_hash h ON c.datasource_context_hash_id = h.datasource_context_hash_id
+                        JOIN allowed_hashes ah
+                            ON h.datasource_id = ah.datasource_id
+                            AND h.hash = ah.hash
+                            AND h.hash_algorithm = ah.hash_algorithm
+                    {chunk_type_filter}
+                ),
+                vector_scores AS (
+                    SELECT
+                        q.query_index,
+                        ae.chunk_id,
+                        array_cosine_distance(ae.vec, CAST(q.vec AS FLOAT[{dimension}])) AS cosine_distance
+                    FROM
+                        {view_name} q
+                        CROSS JOIN allowed_embeddings ae
+                ),
+                ranked AS (
+                    SELECT
+                        query_index,
+                        chunk_id,
+                        cosine_distance
+                    FROM
+                        vector_scores
+                    WHERE
+                        cosine_distance < ?
+                    QUALIFY
+                        row_number() OVER (PARTITION BY query_index ORDER BY cosine_distance, chunk_id) <= ?
+                )
+                SELECT
+                    r.query_index,
+                    r.chunk_id,
+                    c.chunk_type,
+                    COALESCE(c.display_text, c.embeddable_text) AS display_text,
+                    c.embeddable_text,
+                    r.cosine_distance,
+                    c.full_type,
+                    c.datasource_id
+                FROM
+                    ranked r
+                    JOIN chunk c ON r.chunk_id = c.chunk_id
+                ORDER BY
+                    r.query_index,
+                    r.cosine_distance,
+                    r.chunk_id
+                """,
+                params,
+            ).fetchall()
+        finally:
+            self._conn.unregister(view_name)
+
+        for row in rows:
+            results[row[0]].append(
+                SearchResult(
+                    chunk_id=row[1],
+                    chunk_type=ChunkType(row[2]) if row[2] else None,
+                    display_text=row[3],
+                    embeddable_text=row[4],
+                    datasource_type=DatasourceType(full_type=row[6]),
+                    datasource_id=DatasourceId.from_string_repr(row[7]),
+                    score=VectorSearchScore(vector_distance=row[5]),
+                )
+            )
+        return results
+
+    def _get_vector_backend(self, table_name: str) -> VectorSearchBackend | None:
+        """Get the backend replacing the DuckDB vector searches on an embedding shard table, if any.
+
+        The configured backend has precedence over the search of the codes of INT8 shards, since it keeps its own copy
+        of the vectors.
+
+        Returns:
+            The vector search backend, or None to search the vectors with the HNSW index.
+        """
+        if self._vector_backend is not None:
+            return self._vector_backend
+
+        if table_name not in self._storage_formats:
+            registered_shard = self._registry_repo.get_by_table_name(table_name=table_name)
+            self._storage_formats[table_name] = (
+                registered_shard.storage_format if registered_shard else EmbeddingStorageFormat.FLOAT32
+            )
+        if self._storage_formats[table_name] == EmbeddingStorageFormat.INT8:
+            return self._int8_vector_search
+        return None
+
+    def _search_with_vector_backend(
+        self,
+        vector_backend: VectorSearchBackend,
+        *,
+        table_name: str,
+        search_vecs: Sequence[Sequence[float]],
+        dimension: int,
+        limit: int,
+        datasource_context_hashes: list[DatasourceContextHash],
+        chunk_types: list[ChunkType] | None,
+    ) -> list[list[SearchResult]]:
+        """Find the nearest chunks with the vector backend, then read the texts of all of them in a single query."""
+        if not search_vecs or not datasource_context_hashes or limit <= 0:
+            return [[] for _ in search_vecs]
+
+        nearest_chunks = vector_backend.search(
+            table_name=table_name,
+            dimension=dimension,
+            search_vecs=search_vecs,
+            limit=limit,
+            datasource_context_hashes=datasource_context_hashes,
+            chunk_types=chunk_types,
+            distance_threshold=self._DEFAULT_DISTANCE_THRESHOLD,
+        )
+
+        chunk_ids = list({chunk_id for chunks in nearest_chunks for chunk_id, _ in chunks})
+        rows = (
+            self._conn.execute(
+                """
+                SELECT
+                    chunk_id,
+                    chunk_type,
+                    COALESCE(display_text, embeddable_text) AS display_text,
+                    embeddable_text,
+                    full_type,
+                    datasource_id
+                FROM
+                    chunk
+                WHERE
+                    chunk_id IN (SELECT unnest(?))
+                """,
+                [chunk_ids],
+            ).fetchall()
+            if chunk_ids
+            else []
+        )
+        rows_by_chunk_id = {row[0]: row for row in rows}
+
+        return [
+            [
+                SearchResult(
+                    chunk_id=chunk_id,
+                    chunk_type=ChunkType(row[1]) if row[1] else None,
+                    display_text=row[2],
+                    embeddable_text=row[3],
+                    datasource_type=DatasourceType(full_type=row[4]),
+                    datasource_id=DatasourceId.from_string_repr(row[5]),
+                    score=VectorSearchScore(vector_distance=cosine_distance),
+                )
+                for chunk_id, cosine_distance in chunks
+                if (row := rows_by_chunk_id.get(chunk_id)) is not None
+            ]
+            for chunks in nearest_chunks
+        ]
+
     @perf.perf_span("chunk_search._get_vector_candidates")
     def _get_vector_candidates(
         self,
@@ -136,10 +436,174 @@ class ChunkSearchRepository:
         datasource_context_hashes: list[DatasourceContextHash],
         chunk_types: list[ChunkType] | None = None,
     ) -> list[VectorSearchCandidate]:
-        """Read only vector candidates on a specific embedding shard table."""
-        if not datasource_context_hashes:
+        """Read only vector candidates on a specific embedding shard table.
+
+        The nearest vectors of the whole shard are first fetched with the HNSW index, over-fetching by
+        `_DEFAULT_VECTOR_PROBE_MULTIPLIER`, and only then filtered on the allowed context hashes and chunk types.
+        When the filters leave less than `limit` candidates, the probe is widened until either enough candidates are
+        found, every vector of the shard was probed, or the farthest probed vector is beyond the distance threshold.
+        Past `_MAX_VECTOR_PROBE_LIMIT`, the filters are selective enough for an exact scan of the allowed chunks to be
+        cheaper, so we fall back to it.
+
+        Returns:
+            At most `limit` candidates, ordered by cosine distance.
+        """
+        if not datasource_context_hashes or limit <= 0:
             return []
 
+        probe_limit = limit * self._DEFAULT_VECTOR_PROBE_MULTIPLIER
+        probe_rounds = 0
+        while probe_limit <= self._MAX_VECTOR_PROBE_LIMIT:
+            probe_rounds += 1
+            probed_count, farthest_distance, candidates = self._probe_vector_candidates(
+                table_name=table_name,
+                search_vec=search_vec,
+                dimension=dimension,
+                probe_limit=probe_limit,
+                limit=limit,
+                datasource_context_hashes=datasource_context_hashes,
+                chunk_types=chunk_types,
+            )
+            if (
+                len(candidates) >= limit
+                or probed_count < probe_limit
+                or farthest_distance >= self._DEFAULT_DISTANCE_THRESHOLD
+            ):
+                perf.add_attributes({"probe_rounds": probe_rounds, "probe_limit": probe_limit, "exact_scan": False})
+                return candidates
+            probe_limit *= self._DEFAULT_VECTOR_PROBE_MULTIPLIER
+
+        perf.add_attributes({"probe_rounds": probe_rounds, "exact_scan": True})
+        return self._get_exact_vector_candidates(
+            table_name=table_name,
+            search_vec=search_vec,
+            dimension=dimension,
+            limit=limit,
+            datasource_context_hashes=datasource_context_hashes,
+            chunk_types=chunk_types,
+        )
+
+    def _probe_vector_candidates(
+        self,
+        *,
+        table_name: str,
+        search_vec: Sequence[float],
+        dimension: int,
+        probe_limit: int,
+        limit: int,
+        datasource_context_hashes: list[DatasourceContextHash],
+        chunk_types: list[ChunkType] | None = None,
+    ) -> tuple[int, float, list[VectorSearchCandidate]]:
+        """Fetch the `probe_limit` nearest vectors with the HNSW index, then filter them.
+
+        The HNSW index is only used by DuckDB when the top-k is computed directly on the shard table, ordered by the
+        distance alias: that is why the probe is isolated in its own CTE, before any join.
+
+        Returns:
+            The number of probed vectors, the distance of the farthest one, and at most `limit` candidates that pass
+            the filters, ordered by distance.
+        """
+        allowed_hashes_sql, hash_params = self._build_allowed_hashes_values(datasource_context_hashes)
+
+        chunk_types_param: list[list[ChunkType]]
+        if chunk_types:
+            chunk_type_filter = "AND c.chunk_type IN ?"
+            chunk_types_param = [chunk_types]
+        else:
+            chunk_types_param = []
+            chunk_type_filter = ""
+
+        params: list[Any] = [
+            _to_vector_param(search_vec),
+            probe_limit,
+            *hash_params,
+            *chunk_types_param,
+            self._DEFAULT_DISTANCE_THRESHOLD,
+        ]
+
+        with _hnsw_index_scan(self._conn):
+            rows = self._conn.execute(
+                f"""
+                WITH probe AS (
+                    SELECT
+                        chunk_id,
+                        array_cosine_distance(vec, CAST(? AS FLOAT[{dimension}])) AS cosine_distance
+                    FROM
+                        {table_name}
+                    ORDER BY
+                        cosine_distance
+                    LIMIT ?
+                ),
+                allowed_hashes(datasource_id, hash, hash_algorithm) AS (
+                    VALUES {allowed_hashes_sql}
+                ),
+                allowed_candidates AS (
+                    SELECT
+                        c.chunk_id,
+                        c.chunk_type,
+                        COALESCE(c.display_text, c.embeddable_text) AS display_text,
+                        c.embeddable_text,
+                        c.full_type,
+                        c.datasource_id
+                    FROM
+                        probe p
+                        JOIN chunk c ON p.chunk_id = c.chunk_id
+                        JOIN datasource_context_hash h ON c.datasource_context_hash_id = h.datasource_context_hash_id
+                        JOIN allowed_hashes ah
+                            ON h.datasource_id = ah.datasource_id
+                            AND h.hash = ah.hash
+                            AND h.hash_algorithm = ah.hash_algorithm
+                    WHERE
+                        p.cosine_distance < ?
+                        {chunk_type_filter}
+                )
+                SELECT
+                    p.chunk_id,
+                    ac.chunk_type,
+                    ac.display_text,
+                    ac.embeddable_text,
+                    p.cosine_distance,
+                    ac.full_type,
+                    ac.datasource_id,
+                    ac.chunk_id IS NOT NULL AS is_allowed
+                FROM
+                    probe p
+                    LEFT JOIN allowed_candidates ac ON p.chunk_id = ac.chunk_id
+                ORDER BY
+                    p.cosine_distance ASC
+                """,
+                params,
+            ).fetchall()
+
+        if not rows:
+            return 0, 0.0, []
+
+        candidates = [
+            VectorSearchCandidate(
+                chunk_id=row[0],
+                chunk_type=ChunkType(row[1]) if row[1] else None,
+                display_text=row[2],
+                embeddable_text=row[3],
+                cosine_distance=row[4],
+                datasource_type=DatasourceType(full_type=row[5]),
+                datasource_id=DatasourceId.from_string_repr(row[6]),
+            )
+            for row in rows
+            if row[7]
+        ]
+        return len(rows), rows[-1][4], candidates[:limit]
+
+    def _get_exact_vector_candidates(
+        self,
+        *,
+        table_name: str,
+        search_vec: Sequence[float],
+        dimension: int,
+        limit: int,
+        datasource_context_hashes: list[DatasourceContextHash],
+        chunk_types: list[ChunkType] | None = None,
+    ) -> list[VectorSearchCandidate]:
+        """Compute the distance of every allowed chunk, without using the HNSW index."""
         allowed_hashes_sql, hash_params = self._build_allowed_hashes_values(datasource_context_hashes)
 
         chunk_types_param: list[list[ChunkType]]
@@ -152,7 +616,7 @@ class ChunkSearchRepository:
 
         params: list[Any] = [
             *hash_params,
-            list(search_vec),
+            _to_vector_param(search_vec),
             *chunk_types_param,
             self._DEFAULT_DISTANCE_THRESHOLD,
             limit,
@@ -225,33 +689,334 @@ class ChunkSearchRepository:
         limit: int,
         datasource_context_hashes: list[DatasourceContextHash],
         chunk_types: list[ChunkType] | None = None,
+        rrf_k: int | None = None,
+        candidate_multiplier: int | None = None,
+        distance_threshold: float | None = None,
     ) -> list[SearchResult]:
         """Hybrid retrieval combining vector similarity and BM25 with Reciprocal Rank Fusion (RRF).
 
+        The `limit * candidate_multiplier` best candidates of each retrieval are ranked and fused in a single query,
+        which only carries chunk ids and scores: the texts of the chunks are only read for the final top `limit`.
+        The vector candidates are probed with the HNSW index like in `_get_vector_candidates`, so the query is run
+        again with a wider probe when the filters leave too few of them.
+
+        The tunables default to the class constants when not given: `rrf_k` is the constant added to the ranks in
+        the RRF formula (higher values flatten the difference between the top ranks), `candidate_multiplier` the
+        number of candidates of each retrieval as a multiple of `limit`, and `distance_threshold` the cosine distance
+        beyond which vectors are not candidates.
+
         Returns:
             A list of ranked search results.
         """
-        candidate_limit = max(limit, limit * self._DEFAULT_CANDIDATE_MULTIPLIER)
-        vector_candidates = self._get_vector_candidates(
-            table_name=table_name,
-            search_vec=search_vec,
-            dimension=dimension,
-            limit=candidate_limit,
-            datasource_context_hashes=datasource_context_hashes,
-            chunk_types=chunk_types,
+        if not datasource_context_hashes or limit <= 0:
+            return []
+
+        rrf_k = self._DEFAULT_RRF_K if rrf_k is None else rrf_k
+        candidate_limit = max(
+            limit,
+            limit * (self._DEFAULT_CANDIDATE_MULTIPLIER if candidate_multiplier is None else candidate_multiplier),
         )
+        distance_threshold = self._DEFAULT_DISTANCE_THRESHOLD if distance_threshold is None else distance_threshold
 
-        bm25_candidates = self._get_bm25_candidates(
-            query_text=search_text,
-            limit=candidate_limit,
-            datasource_context_hashes=datasource_context_hashes,
-            chunk_types=chunk_types,
+        fuse_kwargs: dict[str, Any] = {
+            "table_name": table_name,
+            "search_vec": search_vec,
+            "search_text": search_text,
+            "dimension": dimension,
+            "limit": limit,
+            "candidate_limit": candidate_limit,
+            "datasource_context_hashes": datasource_context_hashes,
+            "chunk_types": chunk_types,
+            "rrf_k": rrf_k,
+            "distance_threshold": distance_threshold,
+        }
+
+        vector_backend = self._get_vector_backend(table_name)
+        if vector_backend is not None:
+            vector_scores = vector_backend.search(
+                table_name=table_name,
+                dimension=dimension,
+                search_vecs=[search_vec],
+                limit=candidate_limit,
+                datasource_context_hashes=datasource_context_hashes,
+                chunk_types=chunk_types,
+                distance_threshold=distance_threshold,
+            )[0]
+            _, results = self._fuse_hybrid_candidates(probe_limit=None, vector_scores=vector_scores, **fuse_kwargs)
+            return results
+
+        probe_limit = candidate_limit * self._DEFAULT_VECTOR_PROBE_MULTIPLIER
+        probe_rounds = 0
+        while probe_limit <= self._MAX_VECTOR_PROBE_LIMIT:
+            probe_rounds += 1
+            probe_stats, results = self._fuse_hybrid_candidates(probe_limit=probe_limit, **fuse_kwargs)
+            if (
+                probe_stats.vector_candidate_count >= candidate_limit
+                or probe_stats.probed_count < probe_limit
+                or probe_stats.farthest_distance >= distance_threshold
+            ):
+                perf.add_attributes({"probe_rounds": probe_rounds, "probe_limit": probe_limit, "exact_scan": False})
+                return results
+            probe_limit *= self._DEFAULT_VECTOR_PROBE_MULTIPLIER
+
+        perf.add_attributes({"probe_rounds": probe_rounds, "exact_scan": True})
+        _, results = self._fuse_hybrid_candidates(probe_limit=None, **fuse_kwargs)
+        return results
+
+    def _fuse_hybrid_candidates(
+        self,
+        *,
+        table_name: str,
+        search_vec: Sequence[float],
+        search_text: str,
+        dimension: int,
+        limit: int,
+        candidate_limit: int,
+        probe_limit: int | None,
+        datasource_context_hashes: list[DatasourceContextHash],
+        chunk_types: list[ChunkType] | None,
+        rrf_k: int,
+        distance_threshold: float,
+        vector_scores: list[tuple[int, float]] | None = None,
+    ) -> tuple["_VectorProbeStats", list[SearchResult]]:
+        """Rank the vector and BM25 candidates and fuse them by RRF, in a single query.
+
+        The vector candidates are filtered from the `probe_limit` nearest vectors of the shard, or from an exact scan
+        of the allowed chunks if `probe_limit` is None. When the nearest vectors were already found by the vector
+        backend, their `vector_scores` are used instead.
+
+        Returns:
+            The statistics of the vector probe, and at most `limit` search results ordered by RRF score.
+        """
+        allowed_hashes_sql, hash_params = self._build_allowed_hashes_values(datasource_context_hashes)
+        bm25_scores_sql, bm25_params = _bm25_scores_sql(search_text)
+
+        chunk_types_param: list[list[ChunkType]]
+        if chunk_types:
+            chunk_type_filter = "AND c.chunk_type IN ?"
+            chunk_types_param = [chunk_types]
+        else:
+            chunk_types_param = []
+            chunk_type_filter = ""
+
+        allowed_chunks_join = """
+                    JOIN chunk c ON c.chunk_id = {alias}.chunk_id
+                    JOIN datasource_context_hash h ON c.datasource_context_hash_id = h.datasource_context_hash_id
+                    JOIN allowed_hashes ah
+                        ON h.datasource_id = ah.datasource_id
+                        AND h.hash = ah.hash
+                        AND h.hash_algorithm = ah.hash_algorithm
+        """
+
+        vector_scores_view_name = "__tmp_vector_scores"
+        if vector_scores is not None:
+            vector_scores_sql = f"""
+            probe_stats AS (
+                SELECT
+                    CAST(NULL AS BIGINT) AS probed_count,
+                    CAST(NULL AS DOUBLE) AS farthest_distance
+            ),
+            vector_scores AS (
+                SELECT
+                    chunk_id,
+                    cosine_distance
+                FROM
+                    {vector_scores_view_name}
+            )"""
+            vector_params: list[Any] = []
+        elif probe_limit is not None:
+            # Like in `_probe_vector_candidates`, the HNSW index is only used when the probe is its own CTE
+            vector_scores_sql = f"""
+            probe AS (
+                SELECT
+                    chunk_id,
+                    array_cosine_distance(vec, CAST(? AS FLOAT[{dimension}])) AS cosine_distance
+                FROM
+                    {table_name}
+                ORDER BY
+                    cosine_distance
+                LIMIT ?
+            ),
+            probe_stats AS (
+                SELECT
+                    count(*) AS probed_count,
+                    max(cosine_distance) AS farthest_distance
+                FROM
+                    probe
+            ),
+            vector_scores AS (
+                SELECT
+                    *
+                FROM
+                    probe
+            )"""
+            vector_params = [_to_vector_param(search_vec), probe_limit]
+        else:
+            vector_scores_sql = f"""
+            probe_stats AS (
+                SELECT
+                    CAST(NULL AS BIGINT) AS probed_count,
+                    CAST(NULL AS DOUBLE) AS farthest_distance
+            ),
+            vector_scores AS (
+                SELECT
+                    e.chunk_id,
+                    array_cosine_distance(e.vec, CAST(? AS FLOAT[{dimension}])) AS cosine_distance
+                FROM
+                    {table_name} e
+                    {allowed_chunks_join.format(alias="e")}
+            )"""
+            vector_params = [_to_vector_param(search_vec)]
+
+        params: list[Any] = [
+            *hash_params,
+            *vector_params,
+            distance_threshold,
+            *chunk_types_param,
+            candidate_limit,
+            *bm25_params,
+            *chunk_types_param,
+            candidate_limit,
+            rrf_k,
+            rrf_k,
+            limit,
+        ]
+
+        if vector_scores is not None:
+            self._conn.register(
+                vector_scores_view_name,
+                pyarrow.table(
+                    {
+                        "chunk_id": pyarrow.array([chunk_id for chunk_id, _ in vector_scores], type=pyarrow.int64()),
+                        "cosine_distance": pyarrow.array(
+                            [cosine_distance for _, cosine_distance in vector_scores], type=pyarrow.float64()
+                        ),
+                    }
+                ),
+            )
+        hnsw_index_scan = (
+            _hnsw_index_scan(self._conn) if vector_scores is None and probe_limit is not None else nullcontext()
         )
-        return self._fuse_by_rrf(
-            vector_candidates=vector_candidates,
-            bm25_candidates=bm25_candidates,
-            limit=limit,
+        try:
+            with hnsw_index_scan:
+                rows = self._conn.execute(
+                    f"""
+                    WITH allowed_hashes(datasource_id, hash, hash_algorithm) AS (
+                        VALUES {allowed_hashes_sql}
+                    ),
+                    {vector_scores_sql},
+                    vector_candidates AS (
+                        SELECT
+                            chunk_id,
+                            cosine_distance,
+                            row_number() OVER (ORDER BY cosine_distance, chunk_id) AS vector_rank
+                        FROM (
+                            SELECT
+                                s.chunk_id,
+                                s.cosine_distance
+                            FROM
+                                vector_scores s
+                                {allowed_chunks_join.format(alias="s")}
+                            WHERE
+                                s.cosine_distance < ?
+                                {chunk_type_filter}
+                            ORDER BY
+                                s.cosine_distance,
+                                s.chunk_id
+                            LIMIT ?
+                        )
+                    ),
+                    {bm25_scores_sql},
+                    bm25_candidates AS (
+                        SELECT
+                            chunk_id,
+                            bm25_score,
+                            row_number() OVER (ORDER BY bm25_score DESC, chunk_id) AS bm25_rank
+                        FROM (
+                            SELECT
+                                s.chunk_id,
+                                s.bm25_score
+                            FROM
+                                bm25_scores s
+                                {allowed_chunks_join.format(alias="s")}
+                            WHERE
+                                TRUE
+                                {chunk_type_filter}
+                            ORDER BY
+                                s.bm25_score DESC,
+                                s.chunk_id
+                            LIMIT ?
+                        )
+                    ),
+                    fused AS (
+                        SELECT
+                            COALESCE(v.chunk_id, b.chunk_id) AS chunk_id,
+                            v.cosine_distance,
+                            b.bm25_score,
+                            COALESCE(1.0 / (? + v.vector_rank), 0.0) + COALESCE(1.0 / (? + b.bm25_rank), 0.0) AS rrf_score,
+                            v.vector_rank,
+                            b.bm25_rank
+                        FROM
+                            vector_candidates v
+                            FULL OUTER JOIN bm25_candidates b ON v.chunk_id = b.chunk_id
+                        ORDER BY
+                            rrf_score DESC,
+                            v.vector_rank NULLS LAST,
+                            b.bm25_rank
+                        LIMIT ?
+                    ),
+                    vector_stats AS (
+                        SELECT
+                            count(*) AS vector_candidate_count
+                        FROM
+                            vector_candidates
+                    )
+                    SELECT
+                        ps.probed_count,
+                        ps.farthest_distance,
+                        vs.vector_candidate_count,
+                        f.chunk_id,
+                        c.chunk_type,
+                        COALESCE(c.display_text, c.embeddable_text) AS display_text,
+                        c.embeddable_text,
+                        c.full_type,
+                        c.datasource_id,
+                        f.cosine_distance,
+                        f.bm25_score,
+                        f.rrf_score
+                    FROM
+                        probe_stats ps
+                        CROSS JOIN vector_stats vs
+                        LEFT JOIN fused f ON TRUE
+                        LEFT JOIN chunk c ON c.chunk_id = f.chunk_id
+                    ORDER BY
+                        f.rrf_score DESC,
+                        f.vector_rank NULLS LAST,
+                        f.bm25_rank
+                    """,
+                    params,
+                ).fetchall()
+        finally:
+            if vector_scores is not None:
+                self._conn.unregister(vector_scores_view_name)
+
+        probe_stats = _VectorProbeStats(
+            probed_count=rows[0][0] or 0, farthest_distance=rows[0][1] or 0.0, vector_candidate_count=rows[0][2]
         )
+        results = [
+            SearchResult(
+                chunk_id=row[3],
+                chunk_type=ChunkType(row[4]) if row[4] else None,
+                display_text=row[5],
+                embeddable_text=row[6],
+                datasource_type=DatasourceType(full_type=row[7]),
+                datasource_id=DatasourceId.from_string_repr(row[8]),
+                score=RrfScore(vector_distance=row[9], bm25_score=row[10], rrf_score=row[11]),
+            )
+            for row in rows
+            if row[3] is not None
+        ]
+        return probe_stats, results
 
     @perf.perf_span("chunk_search.search_chunks_by_keyword_relevance")
     def search_chunks_by_keyword_relevance(
@@ -304,11 +1069,13 @@ class ChunkSearchRepository:
             chunk_types_param = []
             search_candidates_chunk_type_filter = ""
 
-        params: list[Any] = [*hash_params, query_text, *chunk_types_param, limit]
+        bm25_scores_sql, bm25_params = _bm25_scores_sql(query_text)
+        params: list[Any] = [*bm25_params, *hash_params, *chunk_types_param, limit]
 
         rows = self._conn.execute(
             f"""
-            WITH allowed_hashes(datasource_id, hash, hash_algorithm) AS (
+            WITH {bm25_scores_sql},
+            allowed_hashes(datasource_id, hash, hash_algorithm) AS (
                 VALUES {allowed_hashes_sql}
             ),
             bm25_candidates AS (
@@ -319,12 +1086,10 @@ class ChunkSearchRepository:
                     c.embeddable_text,
                     c.full_type,
                     c.datasource_id,
-                    {self._BM25_FTS_SCHEMA}.match_bm25(
-                        c.chunk_id,
-                        ?
-                    ) AS bm25_score
+                    s.bm25_score
                 FROM
-                    chunk c
+                    bm25_scores s
+                    JOIN chunk c ON c.chunk_id = s.chunk_id
                     JOIN datasource_context_hash h ON c.datasource_context_hash_id = h.datasource_context_hash_id
                     JOIN allowed_hashes ah
                         ON h.datasource_id = ah.datasource_id
@@ -342,8 +1107,6 @@ class ChunkSearchRepository:
                 b.datasource_id
             FROM
                 bm25_candidates b
-            WHERE
-                b.bm25_score IS NOT NULL
             ORDER BY
                 b.bm25_score DESC
             LIMIT ?
@@ -378,51 +1141,297 @@ class ChunkSearchRepository:
             )
         return allowed_hashes_sql, params
 
-    @perf.perf_span("chunk_search._fuse_by_rrf")
-    def _fuse_by_rrf(
+
+class _Int8VectorSearch:
+    """Vector search on the INT8 shards, see `EmbeddingStorageFormat`.
+
+    A first query scans the codes of the allowed chunks, 4 times smaller than their vectors, for the
+    `limit * _RERANK_MULTIPLIER` nearest candidates of each searched vector. A second query then reads the full
+    precision vectors of only those candidates, from the table kept apart for them, to compute their exact distance and
+    re-rank them. The two queries are kept separate: when joined in a single query, DuckDB reads every vector of the
+    shard to match the candidates.
+    """
+
+    _RERANK_MULTIPLIER = 4
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection):
+        self._conn = conn
+
+    def warm_up(self, *, table_name: str, dimension: int) -> None:
+        self._conn.execute(
+            f"""
+            SELECT
+                chunk_id
+            FROM
+                {table_name}
+            ORDER BY
+                array_cosine_distance(CAST(code AS FLOAT[{dimension}]), CAST(? AS FLOAT[{dimension}]))
+            LIMIT 1
+            """,
+            [_to_vector_param([1.0] + [0.0] * (dimension - 1))],
+        ).fetchall()
+
+    @perf.perf_span(
+        "chunk_search.int8_vector_search",
+        attrs=lambda *_, search_vecs, **__: {"queries_number": len(search_vecs)},
+    )
+    def search(
         self,
         *,
-        vector_candidates: list[VectorSearchCandidate],
-        bm25_candidates: list[Bm25SearchCandidate],
+        table_name: str,
+        dimension: int,
+        search_vecs: Sequence[Sequence[float]],
         limit: int,
-    ) -> list[SearchResult]:
-        scores_by_chunk_id: dict[int, float] = {}
-        vector_by_chunk_id = {candidate.chunk_id: candidate for candidate in vector_candidates}
-        bm25_by_chunk_id = {candidate.chunk_id: candidate for candidate in bm25_candidates}
-
-        for rank, candidate in enumerate(vector_candidates, start=1):
-            chunk_id = candidate.chunk_id
-            scores_by_chunk_id[chunk_id] = scores_by_chunk_id.get(chunk_id, 0.0) + (1.0 / (self._DEFAULT_RRF_K + rank))
-
-        for rank, candidate in enumerate(bm25_candidates, start=1):
-            chunk_id = candidate.chunk_id
-            scores_by_chunk_id[chunk_id] = scores_by_chunk_id.get(chunk_id, 0.0) + (1.0 / (self._DEFAULT_RRF_K + rank))
-
-        ranked_chunk_ids = sorted(
-            scores_by_chunk_id.keys(),
-            key=lambda chunk_id: scores_by_chunk_id[chunk_id],
-            reverse=True,
+        datasource_context_hashes: list[DatasourceContextHash],
+        chunk_types: list[ChunkType] | None,
+        distance_threshold: float,
+    ) -> list[list[tuple[int, float]]]:
+        """Find the nearest chunks of each searched vector.
+
+        Returns:
+            For each searched vector, in the same order, the ids and cosine distances of at most `limit` chunks, ordered
+            by distance.
+        """
+        results: list[list[tuple[int, float]]] = [[] for _ in search_vecs]
+        if not search_vecs or not datasource_context_hashes or limit <= 0:
+            return results
+
+        flat = array("f")
+        for vec in search_vecs:
+            flat.extend(vec)
+
+        search_vectors = pyarrow.table(
+            {
+                "query_index": pyarrow.array(range(len(search_vecs)), type=pyarrow.int32()),
+                "vec": pyarrow.FixedSizeListArray.from_arrays(pyarrow.array(flat), dimension),
+            }
         )
-        results: list[SearchResult] = []
-        for chunk_id in ranked_chunk_ids[0:limit]:
-            vector_candidate = vector_by_chunk_id.get(chunk_id)
-            bm25_candidate = bm25_by_chunk_id.get(chunk_id)
-            data_candidate = vector_candidate or bm25_candidate
-            if data_candidate is None:
-                continue
-            results.append(
-                SearchResult(
-                    chunk_id=chunk_id,
-                    chunk_type=data_candidate.chunk_type,
-                    display_text=data_candidate.display_text,
-                    embeddable_text=data_candidate.embeddable_text,
-                    datasource_type=data_candidate.datasource_type,
-                    datasource_id=data_candidate.datasource_id,
-                    score=RrfScore(
-                        vector_distance=vector_candidate.cosine_distance if vector_candidate is not None else None,
-                        bm25_score=bm25_candidate.bm25_score if bm25_candidate is not None else None,
-                        rrf_score=scores_by_chunk_id[chunk_id],
-                    ),
-                )
+
+        search_vectors_view_name = "__tmp_search_vectors"
+        self._conn.register(search_vectors_view_name, search_vectors)
+        try:
+            candidates = self._get_code_candidates(
+                table_name=table_name,
+                dimension=dimension,
+                search_vectors_view_name=search_vectors_view_name,
+                candidate_limit=limit * self._RERANK_MULTIPLIER,
+                datasource_context_hashes=datasource_context_hashes,
+                chunk_types=chunk_types,
             )
+            perf.set_attribute("candidates_count", len(candidates))
+            if not candidates:
+                return results
+
+            rows = self._rerank(
+                table_name=table_name,
+                dimension=dimension,
+                search_vectors_view_name=search_vectors_view_name,
+                candidates=candidates,
+                limit=limit,
+                distance_threshold=distance_threshold,
+            )
+        finally:
+            self._conn.unregister(search_vectors_view_name)
+
+        for query_index, chunk_id, cosine_distance in rows:
+            results[query_index].append((chunk_id, cosine_distance))
         return results
+
+    def _get_code_candidates(
+        self,
+        *,
+        table_name: str,
+        dimension: int,
+        search_vectors_view_name: str,
+        candidate_limit: int,
+        datasource_context_hashes: list[DatasourceContextHash],
+        chunk_types: list[ChunkType] | None,
+    ) -> list[tuple[int, int]]:
+        allowed_hashes_sql, hash_params = ChunkSearchRepository._build_allowed_hashes_values(datasource_context_hashes)
+
+        chunk_types_param: list[list[ChunkType]]
+        if chunk_types:
+            chunk_type_filter = "WHERE c.chunk_type IN ?"
+            chunk_types_param = [chunk_types]
+        else:
+            chunk_types_param = []
+            chunk_type_filter = ""
+
+        return self._conn.execute(
+            f"""
+            WITH allowed_hashes(datasource_id, hash, hash_algorithm) AS (
+                VALUES {allowed_hashes_sql}
+            ),
+            allowed_codes AS (
+                SELECT
+                    e.chunk_id,
+                    e.code
+                FROM
+                    {table_name} e
+                    JOIN chunk c ON e.chunk_id = c.chunk_id
+                    JOIN datasource_context_hash h ON c.datasource_context_hash_id = h.datasource_context_hash_id
+                    JOIN allowed_hashes ah
+                        ON h.datasource_id = ah.datasource_id
+                        AND h.hash = ah.hash
+                        AND h.hash_algorithm = ah.hash_algorithm
+                {chunk_type_filter}
+            )
+            SELECT
+                q.query_index,
+                ac.chunk_id
+            FROM
+                {search_vectors_view_name} q
+                CROSS JOIN allowed_codes ac
+            QUALIFY
+                row_number() OVER (
+                    PARTITION BY q.query_index
+                    ORDER BY
+                        array_cosine_distance(CAST(ac.code AS FLOAT[{dimension}]), CAST(q.vec AS FLOAT[{dimension}])),
+                        ac.chunk_id
+                ) <= ?
+            """,
+            [*hash_params, *chunk_types_param, candidate_limit],
+        ).fetchall()
+
+    def _rerank(
+        self,
+        *,
+        table_name: str,
+        dimension: int,
+        search_vectors_view_name: str,
+        candidates: list[tuple[int, int]],
+        limit: int,
+        distance_threshold: float,
+    ) -> list[tuple[int, int, float]]:
+        candidates_table = pyarrow.table(
+            {
+                "query_index": pyarrow.array([query_index for query_index, _ in candidates], type=pyarrow.int32()),
+                "chunk_id": pyarrow.array([chunk_id for _, chunk_id in candidates], type=pyarrow.int64()),
+            }
+        )
+        candidate_chunk_ids = list({chunk_id for _, chunk_id in candidates})
+
+        candidates_view_name = "__tmp_rerank_candidates"
+        self._conn.register(candidates_view_name, candidates_table)
+        try:
+            return self._conn.execute(
+                f"""
+                WITH candidate_vectors AS MATERIALIZED (
+                    SELECT
+                        chunk_id,
+                        vec
+                    FROM
+                        {int8_vectors_table_name(table_name)}
+                    WHERE
+                        chunk_id IN (SELECT unnest(?))
+                ),
+                reranked AS (
+                    SELECT
+                        rc.query_index,
+                        rc.chunk_id,
+                        array_cosine_distance(cv.vec, CAST(q.vec AS FLOAT[{dimension}])) AS cosine_distance
+                    FROM
+                        {candidates_view_name} rc
+                        JOIN candidate_vectors cv ON rc.chunk_id = cv.chunk_id
+                        JOIN {search_vectors_view_name} q ON rc.query_index = q.query_index
+                )
+                SELECT
+                    query_index,
+                    chunk_id,
+                    cosine_distance
+                FROM
+                    reranked
+                WHERE
+                    cosine_distance < ?
+                QUALIFY
+                    row_number() OVER (PARTITION BY query_index ORDER BY cosine_distance, chunk_id) <= ?
+                ORDER BY
+                    query_index,
+                    cosine_distance,
+                    chunk_id
+                """,
+                [candidate_chunk_ids, distance_threshold, limit],
+            ).fetchall()
+        finally:
+            self._conn.unregister(candidates_view_name)
+
+
+@dataclass(frozen=True)
+class _VectorProbeStats:
+    probed_count: int
+    farthest_distance: float
+    vector_candidate_count: int
+
+
+def _bm25_scores_sql(query_text: str) -> tuple[str, list[Any]]:
+    """Build the CTEs computing the BM25 score of every chunk containing at least one term of the query.
+
+    Returns:
+        The CTEs, the last one being `bm25_scores(chunk_id, bm25_score)`, and their parameters.
+    """
+    bm25_scores_sql = f"""query_terms AS (
+                SELECT DISTINCT
+                    {stem_sql(f"unnest({tokenize_sql('?')})")} AS term
+            ),
+            stats AS (
+                SELECT
+                    count(*) AS num_docs,
+                    avg(length) AS avgdl
+                FROM
+                    keyword_index_document
+            ),
+            term_postings AS (
+                SELECT
+                    t.term,
+                    t.chunk_id,
+                    t.tf,
+                    count(*) OVER (PARTITION BY t.term) AS df
+                FROM
+                    keyword_index_term t
+                    JOIN query_terms q ON t.term = q.term
+            ),
+            bm25_scores AS (
+                SELECT
+                    p.chunk_id,
+                    sum(
+                        log(((stats.num_docs - p.df + 0.5) / (p.df + 0.5)) + 1)
+                        * ((p.tf * (? + 1)) / (p.tf + ? * ((1 - ?) + ? * (d.length / stats.avgdl))))
+                    ) AS bm25_score
+                FROM
+                    term_postings p
+                    JOIN keyword_index_document d ON d.chunk_id = p.chunk_id
+                    CROSS JOIN stats
+                GROUP BY
+                    p.chunk_id
+            )"""
+    return bm25_scores_sql, [query_text, BM25_K, BM25_K, BM25_B, BM25_B]
+
+
+def _to_vector_param(vec: Sequence[float]) -> str:
+    """Format a vector as a string parameter, to be cast to a `FLOAT[dimension]` in the query.
+
+    Binding a Python list of floats as a query parameter is slow in DuckDB (tens of milliseconds for a 768 dimensions
+    vector), while casting its string representation takes a fraction of that.
+
+    Returns:
+        The vector as a DuckDB list literal.
+    """
+    return "[" + ",".join(str(float(value)) for value in vec) + "]"
+
+
+@contextmanager
+def _hnsw_index_scan(conn: duckdb.DuckDBPyConnection) -> Iterator[None]:
+    """Let DuckDB use the HNSW index of an embedding shard table for the nearest neighbour queries of the block.
+
+    Small top-k queries are otherwise rewritten into a semi-join on rowid that scans every vector of the table. The
+    setting only applies to the connection, and is reset after the block so that the other queries keep the late
+    materialization.
+
+    Yields:
+        Nothing, the queries of the block are run on `conn`.
+    """
+    conn.execute("SET SESSION late_materialization_max_rows = 0")
+    try:
+        yield
+    finally:
+        conn.execute("RESET SESSION late_materialization_max_rows")
@@ -0,0 +1,405 @@
+import logging
+import os
+import shutil
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import numpy as np
+import pyarrow  # type: ignore[import-untyped]
+
+import databao_context_engine.perf.core as perf
+from databao_context_engine.datasources.datasource_context import DatasourceContextHash
+from databao_context_engine.search_context.chunk_search_repository import ChunkType
+from databao_context_engine.storage.embedding_storage_format import EmbeddingStorageFormat, int8_vectors_table_name
+from databao_context_engine.storage.repositories.embedding_model_registry_repository import (
+    EmbeddingModelRegistryRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+# Past this number of segments, or this ratio of deleted vectors, the segments of a shard are merged into one
+_MAX_SEGMENTS = 16
+_MAX_DEAD_RATIO = 0.25
+# The vectors are only gathered before being multiplied when the filters leave less than this ratio of them
+_GATHER_RATIO = 0.25
+# Number of searched vectors multiplied at once, to bound the size of the similarity matrix
+_QUERY_BATCH_SIZE = 32
+
+_CHUNK_TYPE_CODES = {chunk_type.value: code for code, chunk_type in enumerate(ChunkType)}
+_NO_CHUNK_TYPE_CODE = -1
+
+_VECTORS_SUFFIX = ".vectors.npy"
+_CHUNK_IDS_SUFFIX = ".chunk_ids.npy"
+_STORE_ID_FILE_NAME = "store_id"
+
+
+class NumpyVectorSearchBackend:
+    """Exact vector search over the embedding shards, with NumPy instead of DuckDB.
+
+    Each shard is copied in `index_dir` as segments of normalized float32 vectors, stored in `.npy` files that are
+    memory-mapped when searching, along with the ids of their chunks. Only the vectors persisted since the last
+    search are read from DuckDB, into a new segment. The segments are only matched to the chunks by their ids, so they
+    are tied to the identity of the database and dropped when it is rebuilt. The context hash and type of the chunks are small, so they are
+    read again from DuckDB whenever the shard or the context hashes changed: chunks can be moved to another context
+    hash without being embedded again.
+
+    A search is then a matrix product with the normalized searched vectors, with the datasource and chunk type filters
+    applied as boolean masks. For up to around a million chunks, this is faster than a DuckDB query.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, *, index_dir: Path):
+        self._conn = conn
+        self._index_dir = index_dir
+        self._shards: dict[str, _ShardIndex] = {}
+        self._registry_repo = EmbeddingModelRegistryRepository(conn)
+        self._vectors_table_names: dict[str, str] = {}
+        self._store_id: str | None = None
+
+    def warm_up(self, *, table_name: str, dimension: int) -> None:
+        self._get_refreshed_shard(table_name=table_name, dimension=dimension)
+
+    @perf.perf_span(
+        "numpy_vector_search.search",
+        attrs=lambda *_, search_vecs, **__: {"queries_number": len(search_vecs)},
+    )
+    def search(
+        self,
+        *,
+        table_name: str,
+        dimension: int,
+        search_vecs: Sequence[Sequence[float]],
+        limit: int,
+        datasource_context_hashes: list[DatasourceContextHash],
+        chunk_types: list[ChunkType] | None,
+        distance_threshold: float,
+    ) -> list[list[tuple[int, float]]]:
+        """Find the nearest chunks of each searched vector.
+
+        Returns:
+            For each searched vector, in the same order, the ids and cosine distances of at most `limit` chunks, ordered
+            by distance.
+        """
+        if not search_vecs:
+            return []
+
+        shard = self._get_refreshed_shard(table_name=table_name, dimension=dimension)
+
+        mask = shard.live & np.isin(shard.context_hash_ids, self._get_context_hash_ids(datasource_context_hashes))
+        if chunk_types:
+            mask &= np.isin(shard.chunk_type_codes, [_CHUNK_TYPE_CODES[chunk_type.value] for chunk_type in chunk_types])
+        perf.add_attributes({"vectors_number": len(mask), "allowed_vectors_number": int(mask.sum())})
+
+        queries = _normalize(np.asarray(search_vecs, dtype=np.float32).reshape(len(search_vecs), dimension))
+        results: list[list[tuple[int, float]]] = []
+        for start in range(0, len(queries), _QUERY_BATCH_SIZE):
+            chunk_ids, distances = shard.distances(queries[start : start + _QUERY_BATCH_SIZE], mask)
+            results.extend(
+                _top_k(chunk_ids, distances[:, query_index], limit=limit, distance_threshold=distance_threshold)
+                for query_index in range(distances.shape[1])
+            )
+        return results
+
+    def _get_refreshed_shard(self, *, table_name: str, dimension: int) -> "_ShardIndex":
+        shard = self._shards.get(table_name)
+        if shard is None:
+            shard = _ShardIndex.load(self._index_dir / table_name, dimension=dimension, store_id=self._get_store_id())
+            self._shards[table_name] = shard
+
+        version = self._read_version(table_name)
+        if version != shard.version:
+            self._refresh(shard, table_name=table_name)
+            shard.version = version
+        return shard
+
+    def _get_store_id(self) -> str:
+        """Get the identity of the database, which is generated again whenever the database is created.
+
+        Returns:
+            The identity of the database of the connection.
+        """
+        if self._store_id is None:
+            row = self._conn.execute("SELECT store_id FROM store_identity").fetchone()
+            self._store_id = row[0] if row else ""
+        return self._store_id
+
+    def _read_version(self, table_name: str) -> tuple[Any, ...]:
+        """Identify the state of the shard and of the context hashes, to detect when the index must be refreshed.
+
+        Chunk and context hash ids are never re-used, and chunks are only moved to newly created context hashes.
+
+        Returns:
+            The number of vectors of the shard and of context hashes, and their highest ids.
+        """
+        row = self._conn.execute(
+            f"""
+            SELECT
+                (SELECT count(*) FROM {table_name}),
+                (SELECT max(chunk_id) FROM {table_name}),
+                (SELECT count(*) FROM datasource_context_hash),
+                (SELECT max(datasource_context_hash_id) FROM datasource_context_hash)
+            """
+        ).fetchone()
+        return tuple(row) if row else ()
+
+    @perf.perf_span("numpy_vector_search.refresh")
+    def _refresh(self, shard: "_ShardIndex", *, table_name: str) -> None:
+        metadata = self._conn.execute(
+            f"""
+            SELECT
+                e.chunk_id,
+                c.datasource_context_hash_id,
+                COALESCE(list_position(?, c.chunk_type), 0) - 1 AS chunk_type_code
+            FROM
+                {table_name} e
+                JOIN chunk c ON e.chunk_id = c.chunk_id
+            """,
+            [list(_CHUNK_TYPE_CODES)],
+        ).fetch_arrow_table()
+        chunk_ids = metadata.column("chunk_id").to_numpy().astype(np.int64)
+        context_hash_ids = metadata.column("datasource_context_hash_id").to_numpy().astype(np.int64)
+        chunk_type_codes = metadata.column("chunk_type_code").to_numpy().astype(np.int8)
+
+        missing_chunk_ids = np.setdiff1d(chunk_ids, shard.chunk_ids)
+        if len(missing_chunk_ids):
+            shard.add_segment(missing_chunk_ids, self._read_vectors(table_name, missing_chunk_ids, shard.dimension))
+
+        shard.align(chunk_ids=chunk_ids, context_hash_ids=context_hash_ids, chunk_type_codes=chunk_type_codes)
+        if len(shard.segments) > _MAX_SEGMENTS or shard.dead_ratio > _MAX_DEAD_RATIO:
+            shard.compact()
+
+        perf.add_attributes({"added_vectors_number": len(missing_chunk_ids), "segments_number": len(shard.segments)})
+
+    def _read_vectors(self, table_name: str, chunk_ids: np.ndarray, dimension: int) -> np.ndarray:
+        view_name = "__tmp_missing_chunk_ids"
+        self._conn.register(view_name, pyarrow.table({"chunk_id": pyarrow.array(chunk_ids, type=pyarrow.int64())}))
+        try:
+            vectors = self._conn.execute(
+                f"""
+                SELECT
+                    e.chunk_id,
+                    e.vec
+                FROM
+                    {self._get_vectors_table_name(table_name)} e
+                    JOIN {view_name} m ON e.chunk_id = m.chunk_id
+                ORDER BY
+                    e.chunk_id
+                """
+            ).fetch_arrow_table()
+        finally:
+            self._conn.unregister(view_name)
+
+        flat = vectors.column("vec").combine_chunks().flatten().to_numpy(zero_copy_only=False)
+        return _normalize(flat.astype(np.float32, copy=False).reshape(-1, dimension))
+
+    def _get_vectors_table_name(self, table_name: str) -> str:
+        """Get the table holding the full precision vectors of a shard: INT8 shards keep them in a table of their own.
+
+        Returns:
+            The name of the table having the `chunk_id` and `vec` columns.
+        """
+        if table_name not in self._vectors_table_names:
+            registered_shard = self._registry_repo.get_by_table_name(table_name=table_name)
+            is_int8 = registered_shard is not None and registered_shard.storage_format == EmbeddingStorageFormat.INT8
+            self._vectors_table_names[table_name] = int8_vectors_table_name(table_name) if is_int8 else table_name
+        return self._vectors_table_names[table_name]
+
+    def _get_context_hash_ids(self, datasource_context_hashes: list[DatasourceContextHash]) -> np.ndarray:
+        if not datasource_context_hashes:
+            return np.empty(0, dtype=np.int64)
+
+        view_name = "__tmp_allowed_hashes"
+        allowed_hashes = pyarrow.table(
+            {
+                "datasource_id": [str(h.datasource_id) for h in datasource_context_hashes],
+                "hash": [h.hash for h in datasource_context_hashes],
+                "hash_algorithm": [h.hash_algorithm for h in datasource_context_hashes],
+            }
+        )
+        self._conn.register(view_name, allowed_hashes)
+        try:
+            rows = self._conn.execute(
+                f"""
+                SELECT
+                    h.datasource_context_hash_id
+                FROM
+                    datasource_context_hash h
+                    JOIN {view_name} ah
+                        ON h.datasource_id = ah.datasource_id
+                        AND h.hash = ah.hash
+                        AND h.hash_algorithm = ah.hash_algorithm
+                """
+            ).fetchall()
+        finally:
+            self._conn.unregister(view_name)
+        return np.asarray([row[0] for row in rows], dtype=np.int64)
+
+
+@dataclass
+class _Segment:
+    name: str
+    vectors: np.ndarray
+    chunk_ids: np.ndarray
+
+
+@dataclass
+class _ShardIndex:
+    directory: Path
+    dimension: int
+    store_id: str
+    segments: list[_Segment] = field(default_factory=list)
+    version: tuple[Any, ...] | None = None
+    # Aligned with the concatenation of the segments
+    chunk_ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    live: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=bool))
+    context_hash_ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    chunk_type_codes: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int8))
+
+    @classmethod
+    def load(cls, directory: Path, *, dimension: int, store_id: str) -> "_ShardIndex":
+        """Memory-map the segments persisted by a previous search, ignoring the ones that were not fully written.
+
+        The segments persisted for another database, or before the segments were tied to a database, are deleted.
+
+        Returns:
+            The shard index, with the vectors of the loaded segments.
+        """
+        shard = cls(directory=directory, dimension=dimension, store_id=store_id)
+        if directory.exists() and _read_store_id(directory) != store_id:
+            logger.debug("Dropping the vector index segments of %s, built for another database", directory.name)
+            shutil.rmtree(directory)
+
+        if directory.exists():
+            for chunk_ids_path in sorted(directory.glob(f"*{_CHUNK_IDS_SUFFIX}")):
+                name = chunk_ids_path.name.removesuffix(_CHUNK_IDS_SUFFIX)
+                try:
+                    vectors = np.load(directory / f"{name}{_VECTORS_SUFFIX}", mmap_mode="r")
+                    chunk_ids = np.load(chunk_ids_path)
+                except (OSError, ValueError):
+                    logger.debug("Ignoring the unreadable vector index segment %s", name, exc_info=True)
+                    continue
+                if vectors.shape != (len(chunk_ids), dimension):
+                    continue
+                shard.segments.append(_Segment(name=name, vectors=vectors, chunk_ids=chunk_ids))
+
+        shard.chunk_ids = np.concatenate([s.chunk_ids for s in shard.segments] or [shard.chunk_ids])
+        return shard
+
+    @property
+    def dead_ratio(self) -> float:
+        return 1.0 - (self.live.sum() / len(self.live)) if len(self.live) else 0.0
+
+    def add_segment(self, chunk_ids: np.ndarray, vectors: np.ndarray) -> None:
+        self.segments.append(self._write_segment(chunk_ids, vectors))
+        self.chunk_ids = np.concatenate([self.chunk_ids, chunk_ids])
+
+    def align(self, *, chunk_ids: np.ndarray, context_hash_ids: np.ndarray, chunk_type_codes: np.ndarray) -> None:
+        """Set the metadata of the indexed vectors from the chunks currently in the shard.
+
+        Vectors of chunks that were deleted, or indexed twice by concurrent searches, are marked as not live.
+        """
+        self.live = np.zeros(len(self.chunk_ids), dtype=bool)
+        self.context_hash_ids = np.full(len(self.chunk_ids), -1, dtype=np.int64)
+        self.chunk_type_codes = np.full(len(self.chunk_ids), _NO_CHUNK_TYPE_CODE, dtype=np.int8)
+        if not len(chunk_ids) or not len(self.chunk_ids):
+            return
+
+        order = np.argsort(chunk_ids)
+        positions = np.minimum(np.searchsorted(chunk_ids[order], self.chunk_ids), len(chunk_ids) - 1)
+        rows = order[positions]
+
+        first_occurrence = np.zeros(len(self.chunk_ids), dtype=bool)
+        first_occurrence[np.unique(self.chunk_ids, return_index=True)[1]] = True
+
+        self.live = (chunk_ids[rows] == self.chunk_ids) & first_occurrence
+        self.context_hash_ids[self.live] = context_hash_ids[rows[self.live]]
+        self.chunk_type_codes[self.live] = chunk_type_codes[rows[self.live]]
+
+    def compact(self) -> None:
+        """Merge the live vectors of all the segments into a single one."""
+        old_segments = self.segments
+        live_vectors = np.concatenate([s.vectors for s in old_segments])[self.live]
+        live = self.live
+
+        self.segments = [self._write_segment(self.chunk_ids[live], live_vectors)]
+        self.chunk_ids = self.chunk_ids[live]
+        self.context_hash_ids = self.context_hash_ids[live]
+        self.chunk_type_codes = self.chunk_type_codes[live]
+        self.live = np.ones(len(self.chunk_ids), dtype=bool)
+
+        for segment in old_segments:
+            for suffix in (_CHUNK_IDS_SUFFIX, _VECTORS_SUFFIX):
+                (self.directory / f"{segment.name}{suffix}").unlink(missing_ok=True)
+
+    def distances(self, queries: np.ndarray, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Compute the cosine distances between the normalized queries and the allowed vectors.
+
+        Returns:
+            The ids of the allowed chunks, and their distance to each query, as a (chunks, queries) matrix.
+        """
+        chunk_ids: list[np.ndarray] = []
+        distances: list[np.ndarray] = []
+        gather = mask.sum() < _GATHER_RATIO * len(mask)
+        offset = 0
+        for segment in self.segments:
+            segment_mask = mask[offset : offset + len(segment.chunk_ids)]
+            offset += len(segment.chunk_ids)
+            if not segment_mask.any():
+                continue
+
+            if gather:
+                similarities = segment.vectors[segment_mask] @ queries.T
+            else:
+                similarities = (segment.vectors @ queries.T)[segment_mask]
+            chunk_ids.append(segment.chunk_ids[segment_mask])
+            distances.append(1.0 - similarities)
+
+        if not chunk_ids:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(queries)), dtype=np.float32)
+        return np.concatenate(chunk_ids), np.concatenate(distances)
+
+    def _write_segment(self, chunk_ids: np.ndarray, vectors: np.ndarray) -> _Segment:
+        """Persist a segment, writing its chunk ids last: a segment without them is ignored when loading."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not (self.directory / _STORE_ID_FILE_NAME).exists():
+            (self.directory / _STORE_ID_FILE_NAME).write_text(self.store_id)
+        name = uuid.uuid4().hex
+        for suffix, array in ((_VECTORS_SUFFIX, vectors), (_CHUNK_IDS_SUFFIX, chunk_ids)):
+            tmp_path = self.directory / f"{name}{suffix}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, self.directory / f"{name}{suffix}")
+
+        return _Segment(
+            name=name,
+            vectors=np.load(self.directory / f"{name}{_VECTORS_SUFFIX}", mmap_mode="r"),
+            chunk_ids=chunk_ids,
+        )
+
+
+def _read_store_id(directory: Path) -> str | None:
+    try:
+        return (directory / _STORE_ID_FILE_NAME).read_text()
+    except OSError:
+        return None
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _top_k(
+    chunk_ids: np.ndarray, distances: np.ndarray, *, limit: int, distance_threshold: float
+) -> list[tuple[int, float]]:
+    candidates = np.flatnonzero(distances < distance_threshold)
+    if len(candidates) > limit:
+        # Keep the ties of the limit-th distance, so that they are ordered by chunk id like in the DuckDB search
+        kth_distance = np.partition(distances[candidates], limit - 1)[limit - 1]
+        candidates = candidates[distances[candidates] <= kth_distance]
+
+    ordered = candidates[np.lexsort((chunk_ids[candidates], distances[candidates]))][:limit]
+    return [(int(chunk_ids[i]), float(distances[i])) for i in ordered]
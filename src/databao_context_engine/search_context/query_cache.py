@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+# Query vectors are a few KB, so this bounds the cache to a few MB
+DEFAULT_QUERY_CACHE_MAX_ENTRIES = 1024
+# Past this age, a query rewrite is generated again: the answers of the LLM are not deterministic
+DEFAULT_QUERY_CACHE_TTL_SECONDS = 60.0 * 60.0
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+@dataclass(frozen=True)
+class QueryCacheStats:
+    hits: int
+    misses: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class _LruCache(Generic[_K, _V]):
+    def __init__(self, *, max_entries: int, ttl_seconds: float):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[_K, tuple[float, _V]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def stats(self) -> QueryCacheStats:
+        return QueryCacheStats(hits=self._hits, misses=self._misses)
+
+    def get(self, key: _K) -> _V | None:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self._ttl_seconds:
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def put(self, key: _K, value: _V) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class SearchQueryCache:
+    """In-memory cache of the vectors of the searched texts and of the query rewrites.
+
+    Agents often repeat the same searches: serving them from this cache saves an embedding request to Ollama, and an
+    LLM generation in the REWRITE_QUERY mode. Both caches are least-recently-used caches with a time-to-live, and are
+    keyed by the model producing their values.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_QUERY_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_QUERY_CACHE_TTL_SECONDS,
+    ):
+        self._lock = threading.Lock()
+        self._embeddings: _LruCache[tuple[str, str, str], tuple[float, ...]] = _LruCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds
+        )
+        self._rewrites: _LruCache[tuple[str, str, str], str] = _LruCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds
+        )
+
+    @property
+    def embedding_stats(self) -> QueryCacheStats:
+        """Number of hits and misses of the embeddings cache since it was created."""
+        with self._lock:
+            return self._embeddings.stats
+
+    @property
+    def rewrite_stats(self) -> QueryCacheStats:
+        """Number of hits and misses of the query rewrites cache since it was created."""
+        with self._lock:
+            return self._rewrites.stats
+
+    def get_embedding(self, *, embedder: str, model_id: str, text: str) -> Sequence[float] | None:
+        with self._lock:
+            return self._embeddings.get((embedder, model_id, text))
+
+    def put_embedding(self, *, embedder: str, model_id: str, text: str, vec: Sequence[float]) -> None:
+        with self._lock:
+            self._embeddings.put((embedder, model_id, text), tuple(vec))
+
+    def get_rewrite(self, *, prompter: str, model_id: str, text: str) -> str | None:
+        with self._lock:
+            return self._rewrites.get((prompter, model_id, text))
+
+    def put_rewrite(self, *, prompter: str, model_id: str, text: str, rewritten_text: str) -> None:
+        with self._lock:
+            self._rewrites.put((prompter, model_id, text), rewritten_text)
@@ -1,5 +1,5 @@
-from databao_context_engine.build_sources.build_service import BuildService
 from databao_context_engine.datasources.datasource_context import (
+    DatasourceContextHash,
     get_all_datasource_context_hashes,
     get_datasource_context_hashes,
 )
@@ -9,30 +9,50 @@ from databao_context_engine.search_context.chunk_search_repository import ChunkT
 from databao_context_engine.search_context.search_service import RAG_MODE, ContextSearchMode, SearchContextService
 
 
+def get_searched_context_hashes(
+    project_layout: ProjectLayout, datasource_ids: list[DatasourceId] | None
+) -> list[DatasourceContextHash]:
+    return (
+        get_datasource_context_hashes(project_layout, datasource_ids)
+        if datasource_ids
+        else get_all_datasource_context_hashes(project_layout)
+    )
+
+
 def run_context_search(
     *,
-    project_layout: ProjectLayout,
     search_context_service: SearchContextService,
-    build_service: BuildService,
+    datasource_context_hashes: list[DatasourceContextHash],
     search_text: str,
     limit: int | None,
-    datasource_ids: list[DatasourceId] | None,
     rag_mode: RAG_MODE,
     context_search_mode: ContextSearchMode,
     chunk_types: list[ChunkType] | None = None,
 ):
-    context_hashes = (
-        get_datasource_context_hashes(project_layout, datasource_ids)
-        if datasource_ids
-        else get_all_datasource_context_hashes(project_layout)
+    return search_context_service.search(
+        search_text=search_text,
+        limit=limit,
+        datasource_context_hashes=datasource_context_hashes,
+        rag_mode=rag_mode,
+        context_search_mode=context_search_mode,
+        chunk_types=chunk_types,
     )
 
-    build_service.index_context_if_necessary(datasource_context_hashes=context_hashes)
 
-    return search_context_service.search(
-        search_text=search_text,
+def run_context_search_many(
+    *,
+    search_context_service: SearchContextService,
+    datasource_context_hashes: list[DatasourceContextHash],
+    search_texts: list[str],
+    limit: int | None,
+    rag_mode: RAG_MODE,
+    context_search_mode: ContextSearchMode,
+    chunk_types: list[ChunkType] | None = None,
+):
+    return search_context_service.search_many(
+        search_texts=search_texts,
         limit=limit,
-        datasource_context_hashes=context_hashes,
+        datasource_context_hashes=datasource_context_hashes,
         rag_mode=rag_mode,
         context_search_mode=context_search_mode,
         chunk_types=chunk_types,
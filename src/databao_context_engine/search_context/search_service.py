@@ -11,6 +11,7 @@ from databao_context_engine.search_context.chunk_search_repository import (
     ChunkType,
     SearchResult,
 )
+from databao_context_engine.search_context.query_cache import SearchQueryCache
 from databao_context_engine.services.embedding_shard_resolver import EmbeddingShardResolver
 
 logger = logging.getLogger(__name__)
@@ -36,11 +37,25 @@ class SearchContextService:
         shard_resolver: EmbeddingShardResolver,
         embedding_provider: EmbeddingProvider,
         prompt_provider: PromptProvider | None,
+        query_cache: SearchQueryCache | None = None,
     ):
         self._shard_resolver = shard_resolver
         self._provider = embedding_provider
         self._chunk_search_repo = chunk_search_repo
         self._prompt_provider = prompt_provider
+        self._query_cache = query_cache
+
+    def warm_up(self) -> None:
+        """Load the index used by vector searches, so that the first search doesn't pay for it."""
+        try:
+            table_name, dimension = self._shard_resolver.resolve(
+                embedder=self._provider.embedder, embedding_model_details=self._provider.embedding_model_details
+            )
+        except ValueError:
+            logger.debug("No embeddings were indexed yet for the embedding model, nothing to warm up")
+            return
+
+        self._chunk_search_repo.warm_up(table_name=table_name, dimension=dimension)
 
     @perf.perf_span(
         "search_context.do_search",
@@ -109,14 +124,7 @@ class SearchContextService:
             embedder=self._provider.embedder, embedding_model_details=self._provider.embedding_model_details
         )
 
-        match rag_mode:
-            case RAG_MODE.QUERY_WITH_INSTRUCTION:
-                task_description = "Generate an embedding aware of the named entities such as to be useful for a semantic search on database table and column names"
-                embeddable_query = f"Instruct: {task_description}\nQuery:{text}"
-            case RAG_MODE.REWRITE_QUERY:
-                embeddable_query = self._rewrite_search_query(text)
-            case _:
-                embeddable_query = text
+        embeddable_query = self._get_embeddable_query(text, rag_mode)
 
         with perf.span(
             "search_context.embed_search_text",
@@ -125,7 +133,7 @@ class SearchContextService:
                 "model_dim": self._provider.embedding_model_details.model_dim,
             },
         ):
-            search_vec: Sequence[float] = self._provider.embed(embeddable_query)
+            search_vec = self._embed_search_text(embeddable_query)
 
         match context_search_mode:
             case ContextSearchMode.VECTOR_SEARCH:
@@ -148,8 +156,166 @@ class SearchContextService:
                     chunk_types=chunk_types,
                 )
 
+    @perf.perf_span(
+        "search_context.do_search_many",
+        attrs=lambda *_, search_texts, rag_mode, **__: {
+            "rag_mode": rag_mode.value,
+            "queries_number": len(search_texts),
+        },
+    )
+    def search_many(
+        self,
+        *,
+        search_texts: list[str],
+        datasource_context_hashes: list[DatasourceContextHash],
+        limit: int | None = None,
+        rag_mode: RAG_MODE,
+        context_search_mode: ContextSearchMode,
+        chunk_types: list[ChunkType] | None = None,
+    ) -> list[list[SearchResult]]:
+        """Search several texts at once.
+
+        The texts are embedded in a single batch, and their vector searches are run in a single query. Keyword and
+        hybrid searches still run one query per text.
+
+        Returns:
+            The search results of each text, in the same order as `search_texts`.
+        """
+        if limit is None:
+            limit = 10
+
+        if context_search_mode == ContextSearchMode.KEYWORD_SEARCH or not search_texts:
+            return [
+                self._do_search(
+                    text=search_text,
+                    datasource_context_hashes=datasource_context_hashes,
+                    limit=limit,
+                    rag_mode=rag_mode,
+                    context_search_mode=context_search_mode,
+                    chunk_types=chunk_types,
+                )
+                for search_text in search_texts
+            ]
+
+        table_name, dimension = self._shard_resolver.resolve(
+            embedder=self._provider.embedder, embedding_model_details=self._provider.embedding_model_details
+        )
+
+        embeddable_queries = [self._get_embeddable_query(text, rag_mode) for text in search_texts]
+
+        with perf.span(
+            "search_context.embed_search_texts",
+            attrs={
+                "model_id": self._provider.embedding_model_details.model_id,
+                "model_dim": self._provider.embedding_model_details.model_dim,
+                "queries_number": len(embeddable_queries),
+            },
+        ):
+            search_vecs = self._embed_search_texts(embeddable_queries)
+
+        match context_search_mode:
+            case ContextSearchMode.VECTOR_SEARCH:
+                search_results = self._chunk_search_repo.search_chunks_by_vector_similarity_many(
+                    table_name=table_name,
+                    search_vecs=search_vecs,
+                    dimension=dimension,
+                    limit=limit,
+                    datasource_context_hashes=datasource_context_hashes,
+                    chunk_types=chunk_types,
+                )
+            case ContextSearchMode.HYBRID_SEARCH:
+                search_results = [
+                    self._chunk_search_repo.search_chunks_with_hybrid_search(
+                        table_name=table_name,
+                        search_vec=search_vec,
+                        search_text=embeddable_query if rag_mode == RAG_MODE.REWRITE_QUERY else text,
+                        dimension=dimension,
+                        limit=limit,
+                        datasource_context_hashes=datasource_context_hashes,
+                        chunk_types=chunk_types,
+                    )
+                    for text, embeddable_query, search_vec in zip(
+                        search_texts, embeddable_queries, search_vecs, strict=True
+                    )
+                ]
+
+        logger.debug(
+            f"Found {sum(len(results) for results in search_results)} search results for {len(search_texts)} queries"
+        )
+        return search_results
+
+    def _get_embeddable_query(self, text: str, rag_mode: RAG_MODE) -> str:
+        match rag_mode:
+            case RAG_MODE.QUERY_WITH_INSTRUCTION:
+                task_description = "Generate an embedding aware of the named entities such as to be useful for a semantic search on database table and column names"
+                return f"Instruct: {task_description}\nQuery:{text}"
+            case RAG_MODE.REWRITE_QUERY:
+                return self._rewrite_search_query(text)
+            case _:
+                return text
+
+    def _embed_search_texts(self, texts: list[str]) -> list[Sequence[float]]:
+        """Embed the texts that are not cached yet in a single batch, embedding each distinct text only once."""
+        embedder = self._provider.embedder
+        model_id = self._provider.embedding_model_details.model_id
+
+        search_vecs: dict[str, Sequence[float]] = {}
+        if self._query_cache is not None:
+            for text in texts:
+                cached_vec = self._query_cache.get_embedding(embedder=embedder, model_id=model_id, text=text)
+                if cached_vec is not None:
+                    search_vecs[text] = cached_vec
+
+        missing_texts = list(dict.fromkeys(text for text in texts if text not in search_vecs))
+        if missing_texts:
+            for text, vec in zip(missing_texts, self._provider.embed_many(missing_texts), strict=True):
+                search_vecs[text] = vec
+                if self._query_cache is not None:
+                    self._query_cache.put_embedding(embedder=embedder, model_id=model_id, text=text, vec=vec)
+
+        perf.set_attribute("embedded_texts_number", len(missing_texts))
+        return [search_vecs[text] for text in texts]
+
+    def _embed_search_text(self, text: str) -> Sequence[float]:
+        if self._query_cache is None:
+            return self._provider.embed(text)
+
+        embedder = self._provider.embedder
+        model_id = self._provider.embedding_model_details.model_id
+        search_vec = self._query_cache.get_embedding(embedder=embedder, model_id=model_id, text=text)
+        if search_vec is None:
+            search_vec = self._provider.embed(text)
+            self._query_cache.put_embedding(embedder=embedder, model_id=model_id, text=text, vec=search_vec)
+            perf.set_attribute("query_cache.hit", False)
+        else:
+            perf.set_attribute("query_cache.hit", True)
+
+        perf.set_attribute("query_cache.hit_ratio", round(self._query_cache.embedding_stats.hit_ratio, 3))
+        return search_vec
+
     @perf.perf_span("search_context.rewrite_query")
     def _rewrite_search_query(self, text: str) -> str:
+        if self._query_cache is None or self._prompt_provider is None:
+            return self._do_rewrite_search_query(text)
+
+        prompter = self._prompt_provider.prompter
+        model_id = self._prompt_provider.model_id
+        rewritten_text = self._query_cache.get_rewrite(prompter=prompter, model_id=model_id, text=text)
+        if rewritten_text is None:
+            rewritten_text = self._do_rewrite_search_query(text)
+            # When no named entity could be extracted, the next search tries again
+            if rewritten_text != text:
+                self._query_cache.put_rewrite(
+                    prompter=prompter, model_id=model_id, text=text, rewritten_text=rewritten_text
+                )
+            perf.set_attribute("query_cache.hit", False)
+        else:
+            perf.set_attribute("query_cache.hit", True)
+
+        perf.set_attribute("query_cache.hit_ratio", round(self._query_cache.rewrite_stats.hit_ratio, 3))
+        return rewritten_text
+
+    def _do_rewrite_search_query(self, text: str) -> str:
         extracted_named_entities = self._extract_named_entities_from_text(text)
 
         return f"{text}\n{extracted_named_entities}" if extracted_named_entities else text
@@ -1,9 +1,17 @@
+import logging
 import os
+import threading
+from dataclasses import dataclass
+from importlib.util import find_spec
+from pathlib import Path
+from types import TracebackType
 
 from duckdb import DuckDBPyConnection
 
 import databao_context_engine.perf.core as perf
+from databao_context_engine.build_sources.build_service import BuildService
 from databao_context_engine.build_sources.build_wiring import create_build_service
+from databao_context_engine.datasources.datasource_context import DatasourceContextHash
 from databao_context_engine.datasources.types import DatasourceId
 from databao_context_engine.llm.embeddings.provider import EmbeddingProvider
 from databao_context_engine.llm.factory import (
@@ -14,23 +22,32 @@ from databao_context_engine.llm.factory import (
 from databao_context_engine.llm.prompts.provider import PromptProvider
 from databao_context_engine.plugins.plugin_loader import DatabaoContextPluginLoader
 from databao_context_engine.project.layout import ProjectLayout
-from databao_context_engine.search_context.chunk_search_repository import ChunkSearchRepository, ChunkType, SearchResult
-from databao_context_engine.search_context.search_runner import run_context_search
+from databao_context_engine.search_context.chunk_search_repository import (
+    ChunkSearchRepository,
+    ChunkType,
+    SearchResult,
+    VectorSearchBackend,
+)
+from databao_context_engine.search_context.query_cache import SearchQueryCache
+from databao_context_engine.search_context.search_runner import (
+    get_searched_context_hashes,
+    run_context_search,
+    run_context_search_many,
+)
 from databao_context_engine.search_context.search_service import RAG_MODE, ContextSearchMode, SearchContextService
 from databao_context_engine.services.factories import create_shard_resolver
-from databao_context_engine.storage.connection import open_duckdb_connection
+from databao_context_engine.storage.connection import (
+    connect_duckdb,
+    open_duckdb_connection,
+    register_read_only_releaser,
+    unregister_read_only_releaser,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_SESSION_IDLE_TIMEOUT_SECONDS = 60.0
 
 
-@perf.perf_run(
-    operation="search_context",
-    attrs=lambda *, search_text, limit, datasource_ids, context_search_mode, **_: {
-        "search_text_length": len(search_text),
-        "limit": limit,
-        "datasources_number": len(datasource_ids) if datasource_ids else -1,
-        "context_search_mode": context_search_mode.value,
-    },
-)
-@perf.perf_span("search_context.total")
 def search_context(
     project_layout: ProjectLayout,
     plugin_loader: DatabaoContextPluginLoader,
@@ -39,33 +56,403 @@ def search_context(
     datasource_ids: list[DatasourceId] | None,
     context_search_mode: ContextSearchMode,
     chunk_types: list[ChunkType] | None = None,
+    session: "SearchContextSession | None" = None,
 ) -> list[SearchResult]:
-    with open_duckdb_connection(project_layout.db_path) as conn:
-        ollama_service = create_ollama_service()
-        embedding_provider = create_ollama_embedding_provider(
-            ollama_service, model_details=project_layout.project_config.ollama_embedding_model_details
+    """Search the context of the project.
+
+    The search goes through the given session, which keeps the database open for the next searches. Without a
+    session, the database is opened for this search only.
+
+    Returns:
+        The search results, sorted by score.
+    """
+    if session is not None:
+        return session.search(
+            search_text=search_text,
+            limit=limit,
+            datasource_ids=datasource_ids,
+            context_search_mode=context_search_mode,
+            chunk_types=chunk_types,
+        )
+
+    with SearchContextSession(project_layout=project_layout, plugin_loader=plugin_loader) as one_off_session:
+        return one_off_session.search(
+            search_text=search_text,
+            limit=limit,
+            datasource_ids=datasource_ids,
+            context_search_mode=context_search_mode,
+            chunk_types=chunk_types,
         )
-        rag_mode = _get_rag_mode()
-        prompt_provider = create_ollama_prompt_provider(ollama_service) if rag_mode == RAG_MODE.REWRITE_QUERY else None
 
-        search_context_service = _create_search_context_service(
-            conn, embedding_provider=embedding_provider, prompt_provider=prompt_provider
+
+def search_context_many(
+    project_layout: ProjectLayout,
+    plugin_loader: DatabaoContextPluginLoader,
+    search_texts: list[str],
+    limit: int | None,
+    datasource_ids: list[DatasourceId] | None,
+    context_search_mode: ContextSearchMode,
+    chunk_types: list[ChunkType] | None = None,
+    session: "SearchContextSession | None" = None,
+) -> list[list[SearchResult]]:
+    """Search several texts at once in the context of the project.
+
+    Like `search_context`, the search goes through the given session, or through a session opened for this search
+    only.
+
+    Returns:
+        The search results of each text, sorted by score, in the same order as `search_texts`.
+    """
+    if session is not None:
+        return session.search_many(
+            search_texts=search_texts,
+            limit=limit,
+            datasource_ids=datasource_ids,
+            context_search_mode=context_search_mode,
+            chunk_types=chunk_types,
         )
-        build_service = create_build_service(
-            conn, project_layout=project_layout, plugin_loader=plugin_loader, should_enrich_context=False
+
+    with SearchContextSession(project_layout=project_layout, plugin_loader=plugin_loader) as one_off_session:
+        return one_off_session.search_many(
+            search_texts=search_texts,
+            limit=limit,
+            datasource_ids=datasource_ids,
+            context_search_mode=context_search_mode,
+            chunk_types=chunk_types,
         )
-        return run_context_search(
-            project_layout=project_layout,
-            search_context_service=search_context_service,
-            build_service=build_service,
+
+
+@dataclass
+class _OpenedSearchContext:
+    conn: DuckDBPyConnection
+    rag_mode: RAG_MODE
+    search_context_service: SearchContextService
+    build_service: BuildService
+    store_version: tuple[tuple[int, int, int] | None, ...]
+
+
+class SearchContextSession:
+    """Keeps the index database and the services needed to search it open between searches.
+
+    Opening the database loads the search extensions and the persisted HNSW index, and creating the services connects
+    to Ollama: doing it for every search is most of the latency of a search. A session opens everything on its first
+    search and keeps it for the next ones.
+
+    The database is opened read-only, so that several processes can search it at once. It is only opened read-write
+    for the time needed to index the contexts that are missing from it, and it is closed whenever something else in
+    this process opens the database read-write. DuckDB still prevents other processes from writing to a database
+    while it is open: the session therefore closes the database once it has been idle for `idle_timeout_seconds`, so
+    that e.g. `dce build` can run between two bursts of searches. The database is also re-opened if its files changed
+    since the previous search (e.g. they were deleted and built again).
+
+    The vectors of the searched texts and the query rewrites are cached for the whole life of the session, including
+    when the database is closed between two bursts of searches.
+
+    A session can be used from several threads: searches are serialized.
+    """
+
+    def __init__(
+        self,
+        *,
+        project_layout: ProjectLayout,
+        plugin_loader: DatabaoContextPluginLoader,
+        idle_timeout_seconds: float = DEFAULT_SEARCH_SESSION_IDLE_TIMEOUT_SECONDS,
+    ):
+        self._project_layout = project_layout
+        self._plugin_loader = plugin_loader
+        self._idle_timeout_seconds = idle_timeout_seconds
+        self._lock = threading.Lock()
+        self._opened: _OpenedSearchContext | None = None
+        self._idle_timer: threading.Timer | None = None
+        self._query_cache = SearchQueryCache()
+
+    def __enter__(self) -> "SearchContextSession":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def search(
+        self,
+        *,
+        search_text: str,
+        limit: int | None,
+        datasource_ids: list[DatasourceId] | None,
+        context_search_mode: ContextSearchMode,
+        chunk_types: list[ChunkType] | None = None,
+    ) -> list[SearchResult]:
+        return _search_in_session(
+            project_layout=self._project_layout,
+            session=self,
             search_text=search_text,
             limit=limit,
             datasource_ids=datasource_ids,
-            rag_mode=rag_mode,
             context_search_mode=context_search_mode,
             chunk_types=chunk_types,
         )
 
+    def search_many(
+        self,
+        *,
+        search_texts: list[str],
+        limit: int | None,
+        datasource_ids: list[DatasourceId] | None,
+        context_search_mode: ContextSearchMode,
+        chunk_types: list[ChunkType] | None = None,
+    ) -> list[list[SearchResult]]:
+        return _search_many_in_session(
+            project_layout=self._project_layout,
+            session=self,
+            search_texts=search_texts,
+            limit=limit,
+            datasource_ids=datasource_ids,
+            context_search_mode=context_search_mode,
+            chunk_types=chunk_types,
+        )
+
+    def warm_up(self) -> None:
+        """Open the database and load the search indexes, if the project was already indexed."""
+        if not self._project_layout.db_path.exists():
+            return
+
+        with self._lock:
+            self._cancel_idle_timer()
+            try:
+                self._get_opened().search_context_service.warm_up()
+            finally:
+                self._after_use()
+
+    def close(self) -> None:
+        with self._lock:
+            self._cancel_idle_timer()
+            self._close_opened()
+
+    def _search(
+        self,
+        *,
+        search_text: str,
+        limit: int | None,
+        datasource_ids: list[DatasourceId] | None,
+        context_search_mode: ContextSearchMode,
+        chunk_types: list[ChunkType] | None,
+    ) -> list[SearchResult]:
+        with self._lock:
+            self._cancel_idle_timer()
+            try:
+                context_hashes = get_searched_context_hashes(self._project_layout, datasource_ids)
+                opened = self._index_context_if_necessary(context_hashes)
+                return run_context_search(
+                    search_context_service=opened.search_context_service,
+                    datasource_context_hashes=context_hashes,
+                    search_text=search_text,
+                    limit=limit,
+                    rag_mode=opened.rag_mode,
+                    context_search_mode=context_search_mode,
+                    chunk_types=chunk_types,
+                )
+            finally:
+                self._after_use()
+
+    def _search_many(
+        self,
+        *,
+        search_texts: list[str],
+        limit: int | None,
+        datasource_ids: list[DatasourceId] | None,
+        context_search_mode: ContextSearchMode,
+        chunk_types: list[ChunkType] | None,
+    ) -> list[list[SearchResult]]:
+        with self._lock:
+            self._cancel_idle_timer()
+            try:
+                context_hashes = get_searched_context_hashes(self._project_layout, datasource_ids)
+                opened = self._index_context_if_necessary(context_hashes)
+                return run_context_search_many(
+                    search_context_service=opened.search_context_service,
+                    datasource_context_hashes=context_hashes,
+                    search_texts=search_texts,
+                    limit=limit,
+                    rag_mode=opened.rag_mode,
+                    context_search_mode=context_search_mode,
+                    chunk_types=chunk_types,
+                )
+            finally:
+                self._after_use()
+
+    def _get_opened(self) -> _OpenedSearchContext:
+        db_path = self._project_layout.db_path
+        if self._opened is not None and self._opened.store_version != _read_store_version(db_path):
+            logger.debug("The index database changed since the last search, re-opening it")
+            self._close_opened()
+
+        if self._opened is None:
+            self._opened = self._open(db_path)
+            register_read_only_releaser(db_path, self.close)
+
+        return self._opened
+
+    def _index_context_if_necessary(
+        self, datasource_context_hashes: list[DatasourceContextHash]
+    ) -> _OpenedSearchContext:
+        """Index the searched contexts that are missing from the database, with a connection opened only to do so.
+
+        Returns:
+            The opened search context, re-opened if contexts were indexed.
+        """
+        opened = self._get_opened()
+        if not opened.build_service.get_contexts_not_indexed(datasource_context_hashes):
+            return opened
+
+        # The database cannot be opened read-write in this process while it is open read-only
+        self._close_opened()
+        with open_duckdb_connection(self._project_layout.db_path) as conn:
+            create_build_service(
+                conn,
+                project_layout=self._project_layout,
+                plugin_loader=self._plugin_loader,
+                should_enrich_context=False,
+            ).index_context_if_necessary(datasource_context_hashes=datasource_context_hashes)
+
+        return self._get_opened()
+
+    @perf.perf_span("search_context.open_session")
+    def _open(self, db_path: Path) -> _OpenedSearchContext:
+        conn = connect_duckdb(db_path, read_only=True)
+        try:
+            ollama_service = create_ollama_service()
+            embedding_provider = create_ollama_embedding_provider(
+                ollama_service, model_details=self._project_layout.project_config.ollama_embedding_model_details
+            )
+            rag_mode = _get_rag_mode()
+            prompt_provider = (
+                create_ollama_prompt_provider(ollama_service) if rag_mode == RAG_MODE.REWRITE_QUERY else None
+            )
+
+            return _OpenedSearchContext(
+                conn=conn,
+                rag_mode=rag_mode,
+                search_context_service=_create_search_context_service(
+                    conn,
+                    embedding_provider=embedding_provider,
+                    prompt_provider=prompt_provider,
+                    query_cache=self._query_cache,
+                    vector_backend=_create_vector_search_backend(conn, project_layout=self._project_layout),
+                ),
+                build_service=create_build_service(
+                    conn,
+                    project_layout=self._project_layout,
+                    plugin_loader=self._plugin_loader,
+                    should_enrich_context=False,
+                ),
+                store_version=_read_store_version(db_path),
+            )
+        except BaseException:
+            conn.close()
+            raise
+
+    def _after_use(self) -> None:
+        if self._opened is None:
+            return
+
+        self._idle_timer = threading.Timer(self._idle_timeout_seconds, self._close_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _close_if_idle(self) -> None:
+        with self._lock:
+            if self._idle_timer is not threading.current_thread():
+                # The session was used again since this timer was started
+                return
+            self._idle_timer = None
+            self._close_opened()
+
+    def _cancel_idle_timer(self) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _close_opened(self) -> None:
+        if self._opened is not None:
+            unregister_read_only_releaser(self._project_layout.db_path, self.close)
+            self._opened.conn.close()
+            self._opened = None
+
+
+@perf.perf_run(
+    operation="search_context",
+    attrs=lambda *, search_text, limit, datasource_ids, context_search_mode, **_: {
+        "search_text_length": len(search_text),
+        "limit": limit,
+        "datasources_number": len(datasource_ids) if datasource_ids else -1,
+        "context_search_mode": context_search_mode.value,
+    },
+)
+@perf.perf_span("search_context.total")
+def _search_in_session(
+    *,
+    project_layout: ProjectLayout,
+    session: SearchContextSession,
+    search_text: str,
+    limit: int | None,
+    datasource_ids: list[DatasourceId] | None,
+    context_search_mode: ContextSearchMode,
+    chunk_types: list[ChunkType] | None,
+) -> list[SearchResult]:
+    return session._search(
+        search_text=search_text,
+        limit=limit,
+        datasource_ids=datasource_ids,
+        context_search_mode=context_search_mode,
+        chunk_types=chunk_types,
+    )
+
+
+@perf.perf_run(
+    operation="search_context_many",
+    attrs=lambda *, search_texts, limit, datasource_ids, context_search_mode, **_: {
+        "queries_number": len(search_texts),
+        "limit": limit,
+        "datasources_number": len(datasource_ids) if datasource_ids else -1,
+        "context_search_mode": context_search_mode.value,
+    },
+)
+@perf.perf_span("search_context_many.total")
+def _search_many_in_session(
+    *,
+    project_layout: ProjectLayout,
+    session: SearchContextSession,
+    search_texts: list[str],
+    limit: int | None,
+    datasource_ids: list[DatasourceId] | None,
+    context_search_mode: ContextSearchMode,
+    chunk_types: list[ChunkType] | None,
+) -> list[list[SearchResult]]:
+    return session._search_many(
+        search_texts=search_texts,
+        limit=limit,
+        datasource_ids=datasource_ids,
+        context_search_mode=context_search_mode,
+        chunk_types=chunk_types,
+    )
+
+
+def _read_store_version(db_path: Path) -> tuple[tuple[int, int, int] | None, ...]:
+    """Identify the current state of the database files, to detect when they were changed by someone else."""
+    version: list[tuple[int, int, int] | None] = []
+    for path in (db_path, db_path.with_name(db_path.name + ".wal")):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            version.append(None)
+        else:
+            version.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
 
 def _get_rag_mode() -> RAG_MODE:
     rag_mode_env_var = os.environ.get("DATABAO_CONTEXT_RAG_MODE")
@@ -83,8 +470,10 @@ def _create_search_context_service(
     *,
     embedding_provider: EmbeddingProvider,
     prompt_provider: PromptProvider | None,
+    query_cache: SearchQueryCache | None = None,
+    vector_backend: VectorSearchBackend | None = None,
 ) -> SearchContextService:
-    chunk_search_repo = _create_chunk_search_repository(conn)
+    chunk_search_repo = _create_chunk_search_repository(conn, vector_backend=vector_backend)
     shard_resolver = create_shard_resolver(conn)
 
     return SearchContextService(
@@ -92,8 +481,31 @@ def _create_search_context_service(
         shard_resolver=shard_resolver,
         embedding_provider=embedding_provider,
         prompt_provider=prompt_provider,
+        query_cache=query_cache,
     )
 
 
-def _create_chunk_search_repository(conn: DuckDBPyConnection) -> ChunkSearchRepository:
-    return ChunkSearchRepository(conn)
+def _create_chunk_search_repository(
+    conn: DuckDBPyConnection, *, vector_backend: VectorSearchBackend | None = None
+) -> ChunkSearchRepository:
+    return ChunkSearchRepository(conn, vector_backend=vector_backend)
+
+
+def _create_vector_search_backend(
+    conn: DuckDBPyConnection, *, project_layout: ProjectLayout
+) -> VectorSearchBackend | None:
+    backend_env_var = os.environ.get("DCE_VECTOR_SEARCH_BACKEND")
+    if not backend_env_var or backend_env_var.lower() == "duckdb":
+        return None
+
+    if backend_env_var.lower() != "numpy":
+        logger.warning("Ignoring invalid DCE_VECTOR_SEARCH_BACKEND value: %s", backend_env_var)
+        return None
+
+    if find_spec("numpy") is None:
+        logger.warning("NumPy is not installed, the vector searches will run in DuckDB")
+        return None
+
+    from databao_context_engine.search_context.numpy_vector_search import NumpyVectorSearchBackend
+
+    return NumpyVectorSearchBackend(conn, index_dir=project_layout.vector_index_dir)
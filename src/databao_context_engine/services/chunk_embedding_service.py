@@ -6,6 +6,7 @@ from databao_context_engine.llm.embeddings.provider import EmbeddingProvider
 from databao_context_engine.pluginlib.build_plugin import EmbeddableChunk
 from databao_context_engine.progress.progress import ProgressCallback, ProgressEmitter, ProgressStep
 from databao_context_engine.serialization.yaml import to_yaml_string
+from databao_context_engine.services.embedding_cache import EmbeddingCache
 from databao_context_engine.services.embedding_shard_resolver import EmbeddingShardResolver
 from databao_context_engine.services.models import ChunkEmbedding
 from databao_context_engine.services.persistence_service import PersistenceService
@@ -20,10 +21,12 @@ class ChunkEmbeddingService:
         persistence_service: PersistenceService,
         embedding_provider: EmbeddingProvider,
         shard_resolver: EmbeddingShardResolver,
+        embedding_cache: EmbeddingCache | None = None,
     ):
         self._persistence_service = persistence_service
         self._embedding_provider = embedding_provider
         self._shard_resolver = shard_resolver
+        self._embedding_cache = embedding_cache
 
     def embed_chunks(
         self,
@@ -45,6 +48,33 @@ class ChunkEmbeddingService:
         if not chunks:
             return
 
+        chunk_embeddings = self.embed(chunks=chunks, datasource_id=datasource_id, progress=progress)
+
+        self.persist(
+            chunk_embeddings=chunk_embeddings,
+            context_hash=context_hash,
+            full_type=full_type,
+            datasource_id=datasource_id,
+            override=override,
+            progress=progress,
+        )
+
+    def embed(
+        self,
+        *,
+        chunks: list[EmbeddableChunk],
+        datasource_id: str,
+        progress: ProgressCallback | None = None,
+    ) -> list[ChunkEmbedding]:
+        """Embed plugin chunks without persisting them.
+
+        This doesn't use the connection of the persistence service: the vectors already computed are read from and
+        written to the embedding cache, which has its own DuckDB connection and serializes its accesses to it. So this
+        can run concurrently with the persistence of other chunks, without holding the lock that guards the latter.
+
+        Returns:
+            The chunks along with their embedded vector, in the same order as the chunks.
+        """
         emitter = ProgressEmitter(progress)
 
         logger.debug(f"Embedding {len(chunks)} chunks for datasource {datasource_id}")
@@ -61,7 +91,7 @@ class ChunkEmbeddingService:
             step=ProgressStep.EMBEDDING,
         )
 
-        enriched_embeddings: list[ChunkEmbedding] = [
+        return [
             ChunkEmbedding(
                 original_chunk=chunk,
                 vec=vec,
@@ -71,13 +101,27 @@ class ChunkEmbeddingService:
             for chunk, vec, display_text, embedding_text in zip(chunks, vecs, chunk_display_texts, embedding_texts)
         ]
 
+    def persist(
+        self,
+        *,
+        chunk_embeddings: list[ChunkEmbedding],
+        context_hash: DatasourceContextHash,
+        full_type: str,
+        datasource_id: str,
+        override: bool = False,
+        progress: ProgressCallback | None = None,
+    ) -> None:
+        """Persist chunks that were already embedded, along with their vectors, in a single transaction."""
+        if not chunk_embeddings:
+            return
+
         table_name = self._shard_resolver.resolve_or_create(
             embedder=self._embedding_provider.embedder,
             embedding_model_details=self._embedding_provider.embedding_model_details,
         )
 
         self._persistence_service.write_chunks_and_embeddings(
-            chunk_embeddings=enriched_embeddings,
+            chunk_embeddings=chunk_embeddings,
             table_name=table_name,
             full_type=full_type,
             datasource_id=datasource_id,
@@ -85,14 +129,27 @@ class ChunkEmbeddingService:
             override=override,
         )
 
-        emitter.datasource_step_completed(
+        ProgressEmitter(progress).datasource_step_completed(
             datasource_id=datasource_id,
             step=ProgressStep.PERSISTENCE,
         )
 
     @perf.perf_span("embedding.embed_many")
     def _embed_many(self, embedding_texts: list[str]) -> list[list[float]]:
-        return self._embedding_provider.embed_many(embedding_texts)
+        if self._embedding_cache is None:
+            return self._embedding_provider.embed_many(embedding_texts)
+
+        return self._embedding_cache.embed_many(embedding_provider=self._embedding_provider, texts=embedding_texts)
+
+    def evict_embedding_cache(self) -> int:
+        if self._embedding_cache is None:
+            return 0
+
+        return self._embedding_cache.evict()
 
     def is_context_already_indexed(self, context_hash: DatasourceContextHash) -> bool:
         return self._persistence_service.has_datasource_context_hash(context_hash=context_hash)
+
+    def get_contexts_not_indexed(self, context_hashes: list[DatasourceContextHash]) -> list[DatasourceContextHash]:
+        indexed_context_hashes = set(self._persistence_service.get_indexed_datasource_context_hashes(context_hashes))
+        return [context_hash for context_hash in context_hashes if context_hash not in indexed_context_hashes]
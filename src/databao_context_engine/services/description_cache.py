@@ -0,0 +1,177 @@
+import logging
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import xxhash
+from typing_extensions import override
+
+from databao_context_engine.llm.descriptions.provider import DescriptionProvider
+from databao_context_engine.storage.repositories.description_cache_repository import DescriptionCacheRepository
+
+logger = logging.getLogger(__name__)
+
+# Descriptions are a few hundred bytes, so this bounds the cache to a few dozens of MB
+DEFAULT_DESCRIPTION_CACHE_MAX_ENTRIES = 100_000
+# Past this age, a description is generated again, to benefit from model or prompt improvements
+DEFAULT_DESCRIPTION_CACHE_TTL = timedelta(days=90)
+
+
+@dataclass(frozen=True)
+class DescriptionCacheStats:
+    hits: int
+    misses: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class DescriptionCache:
+    """Persistent cache of the descriptions generated by a description provider, addressed by the hash of the prompt.
+
+    Descriptions are generated concurrently during an enrichment, so every access to the repository is serialized.
+    The expired and least recently used descriptions are only evicted by `evict`, once per build, so that the
+    concurrent lookups are not blocked by the sort of the whole cache after every generated description.
+    """
+
+    def __init__(
+        self,
+        *,
+        repo: DescriptionCacheRepository,
+        max_entries: int = DEFAULT_DESCRIPTION_CACHE_MAX_ENTRIES,
+        ttl: timedelta = DEFAULT_DESCRIPTION_CACHE_TTL,
+    ):
+        self._repo = repo
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def stats(self) -> DescriptionCacheStats:
+        """Number of hits and misses of the cache since it was created."""
+        with self._lock:
+            return DescriptionCacheStats(hits=self._hits, misses=self._misses)
+
+    def get(self, *, describer: str, model_id: str, prompt: str) -> str | None:
+        """Look up the description generated for the given prompt.
+
+        Returns:
+            The cached description, or None if the prompt has not been described yet or its description has expired.
+        """
+        with self._lock:
+            description = self._repo.get(
+                describer=describer,
+                model_id=model_id,
+                prompt_hash=_hash_prompt(prompt),
+                created_after=datetime.now() - self._ttl,
+            )
+            if description is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return description
+
+    def put(self, *, describer: str, model_id: str, prompt: str, description: str) -> None:
+        with self._lock:
+            self._repo.put(
+                describer=describer, model_id=model_id, prompt_hash=_hash_prompt(prompt), description=description
+            )
+
+    def evict(self) -> int:
+        """Delete the expired descriptions, then the least recently used ones past `max_entries`.
+
+        Expired descriptions are never served by `get`, so the cache only needs to be bounded, not evicted right away.
+
+        Returns:
+            The number of evicted descriptions.
+        """
+        with self._lock:
+            evicted = self._repo.delete_created_before(created_before=datetime.now() - self._ttl)
+            evicted += self._repo.evict_least_recently_used(max_entries=self._max_entries)
+        if evicted:
+            logger.debug("Evicted %d descriptions from the description cache", evicted)
+        return evicted
+
+
+class CachingDescriptionProvider(DescriptionProvider):
+    """Description provider serving the descriptions already generated by `description_provider` from a cache.
+
+    Every text is cached under the prompt `describe` would use for it, including the texts described together by
+    `describe_many`: the same text is then served from the cache whether it's described alone or in a batch.
+    """
+
+    def __init__(self, description_provider: DescriptionProvider, *, cache: DescriptionCache):
+        self._description_provider = description_provider
+        self._cache = cache
+
+    @property
+    def describer(self) -> str:
+        return self._description_provider.describer
+
+    @property
+    def model_id(self) -> str:
+        return self._description_provider.model_id
+
+    @property
+    def cache_stats(self) -> DescriptionCacheStats:
+        return self._cache.stats
+
+    def evict_cache(self) -> int:
+        return self._cache.evict()
+
+    @override
+    def describe(self, text: str, context: str) -> str:
+        prompt = self.default_description_prompt(text=text, context=context)
+        cached_description = self._get_cached(prompt)
+        if cached_description is not None:
+            return cached_description
+
+        description = self._description_provider.describe(text=text, context=context)
+        self._put_cached(prompt, description)
+        return description
+
+    @override
+    def describe_many(self, texts: Sequence[str], context: str) -> list[str | None]:
+        prompts = [self.default_description_prompt(text=text, context=context) for text in texts]
+        descriptions = [self._get_cached(prompt) for prompt in prompts]
+
+        missing_indexes = [index for index, description in enumerate(descriptions) if description is None]
+        if not missing_indexes:
+            return descriptions
+
+        generated_descriptions = self._description_provider.describe_many(
+            texts=[texts[index] for index in missing_indexes], context=context
+        )
+
+        for index, description in zip(missing_indexes, generated_descriptions, strict=True):
+            descriptions[index] = description
+            if description is not None:
+                self._put_cached(prompts[index], description)
+
+        return descriptions
+
+    @override
+    def prompt_for_description(self, prompt: str) -> str:
+        cached_description = self._get_cached(prompt)
+        if cached_description is not None:
+            return cached_description
+
+        description = self._description_provider.prompt_for_description(prompt)
+        self._put_cached(prompt, description)
+        return description
+
+    def _get_cached(self, prompt: str) -> str | None:
+        return self._cache.get(describer=self.describer, model_id=self.model_id, prompt=prompt)
+
+    def _put_cached(self, prompt: str, description: str) -> None:
+        if description:
+            self._cache.put(describer=self.describer, model_id=self.model_id, prompt=prompt, description=description)
+
+
+def _hash_prompt(prompt: str) -> str:
+    return xxhash.xxh3_128_hexdigest(prompt.encode("utf-8"))
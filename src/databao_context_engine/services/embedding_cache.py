@@ -0,0 +1,96 @@
+import logging
+import threading
+
+import xxhash
+
+import databao_context_engine.perf.core as perf
+from databao_context_engine.llm.embeddings.provider import EmbeddingProvider
+from databao_context_engine.storage.repositories.embedding_cache_repository import EmbeddingCacheRepository
+
+logger = logging.getLogger(__name__)
+
+# A 768 dimensions vector takes ~3KB, so this bounds the cache to less than 1GB
+DEFAULT_EMBEDDING_CACHE_MAX_ENTRIES = 250_000
+
+
+class EmbeddingCache:
+    """Persistent cache of the vectors computed by an embedding provider, addressed by the hash of the embedded text.
+
+    Rebuilding a context usually changes only a few of its chunks, so most of the texts to embed have already been
+    embedded by a previous build and don't need to be sent to the embedding provider again.
+
+    Chunks are embedded outside of the lock guarding the database during a build, so the repository gets its own DuckDB
+    connection (see `create_embedding_cache`). A connection can't be used by several threads at once: every access to
+    the repository is serialized, but not the calls to the embedding provider.
+    """
+
+    def __init__(
+        self,
+        *,
+        repo: EmbeddingCacheRepository,
+        max_entries: int = DEFAULT_EMBEDDING_CACHE_MAX_ENTRIES,
+    ):
+        self._repo = repo
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def embed_many(self, *, embedding_provider: EmbeddingProvider, texts: list[str]) -> list[list[float]]:
+        """Embed all texts, only calling the embedding provider for the texts that are not cached yet.
+
+        Returns:
+            One vector per text, in the same order as the texts.
+
+        Raises:
+            ValueError: If the embedding provider did not return one vector per text to embed.
+        """
+        embedder = embedding_provider.embedder
+        model_id = embedding_provider.embedding_model_details.model_id
+
+        text_hashes = [_hash_text(text) for text in texts]
+        with self._lock:
+            vecs_by_hash = self._repo.get_many(embedder=embedder, model_id=model_id, text_hashes=list(set(text_hashes)))
+        hits = sum(1 for text_hash in text_hashes if text_hash in vecs_by_hash)
+
+        # The same text can appear several times (e.g. identical columns in different tables): embed it only once
+        missing_texts_by_hash = {
+            text_hash: text for text_hash, text in zip(text_hashes, texts) if text_hash not in vecs_by_hash
+        }
+        if missing_texts_by_hash:
+            missing_hashes = list(missing_texts_by_hash)
+            missing_vecs = embedding_provider.embed_many(list(missing_texts_by_hash.values()))
+            if len(missing_vecs) != len(missing_hashes):
+                raise ValueError(f"provider returned {len(missing_vecs)} vectors for {len(missing_hashes)} texts")
+
+            with self._lock:
+                self._repo.put_many(embedder=embedder, model_id=model_id, text_hashes=missing_hashes, vecs=missing_vecs)
+            vecs_by_hash.update(zip(missing_hashes, missing_vecs))
+
+        perf.add_attributes(
+            {
+                "embedding_cache.hits": hits,
+                "embedding_cache.misses": len(texts) - hits,
+                "embedding_cache.embedded": len(missing_texts_by_hash),
+            }
+        )
+        logger.debug("Embedding cache: %d hits, %d misses", hits, len(texts) - hits)
+
+        return [vecs_by_hash[text_hash] for text_hash in text_hashes]
+
+    def evict(self) -> int:
+        """Delete the least recently used vectors past `max_entries`.
+
+        The cache only needs to be bounded, so this is done once the texts of a whole build have been embedded rather
+        than after every call to `embed_many`.
+
+        Returns:
+            The number of evicted vectors.
+        """
+        with self._lock:
+            evicted = self._repo.evict_least_recently_used(max_entries=self._max_entries)
+        if evicted:
+            logger.debug("Evicted %d vectors from the embedding cache", evicted)
+        return evicted
+
+
+def _hash_text(text: str) -> str:
+    return xxhash.xxh3_128_hexdigest(text.encode("utf-8"))
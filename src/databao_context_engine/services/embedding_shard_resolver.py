@@ -1,11 +1,20 @@
+import logging
+
 import duckdb
 
 from databao_context_engine.llm.config import EmbeddingModelDetails
 from databao_context_engine.services.table_name_policy import TableNamePolicy
+from databao_context_engine.storage.embedding_storage_format import (
+    EmbeddingStorageFormat,
+    int8_codes_sql,
+    int8_vectors_table_name,
+)
 from databao_context_engine.storage.repositories.embedding_model_registry_repository import (
     EmbeddingModelRegistryRepository,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class EmbeddingShardResolver:
     def __init__(
@@ -14,10 +23,12 @@ class EmbeddingShardResolver:
         conn: duckdb.DuckDBPyConnection,
         registry_repo: EmbeddingModelRegistryRepository,
         table_name_policy: TableNamePolicy | None = None,
+        storage_format: EmbeddingStorageFormat = EmbeddingStorageFormat.FLOAT32,
     ):
         self._conn = conn
         self._registry = registry_repo
         self._policy = table_name_policy or TableNamePolicy()
+        self._storage_format = storage_format
 
     def resolve(self, *, embedder: str, embedding_model_details: EmbeddingModelDetails) -> tuple[str, int]:
         row = self._registry.get(embedder=embedder, model_id=embedding_model_details.model_id)
@@ -26,12 +37,25 @@ class EmbeddingShardResolver:
         return row.table_name, row.dim
 
     def resolve_or_create(self, *, embedder: str, embedding_model_details: EmbeddingModelDetails) -> str:
+        """Get the embedding shard table of a model, creating it in the configured storage format if needed.
+
+        The full precision vectors are stored in every format, so an existing shard is converted when it was created
+        with another storage format.
+
+        Returns:
+            The name of the embedding shard table.
+
+        Raises:
+            ValueError: If the model is already registered with another dimension.
+        """
         row = self._registry.get(embedder=embedder, model_id=embedding_model_details.model_id)
         if row:
             if row.dim != embedding_model_details.model_dim:
                 raise ValueError(
                     f"Model already registered with dim={row.dim}, requested dim={embedding_model_details.model_dim}"
                 )
+            if row.storage_format != self._storage_format:
+                self._convert_storage_format(row.table_name, row.dim, row.storage_format)
             return row.table_name
 
         table_name = self._policy.build(
@@ -44,6 +68,7 @@ class EmbeddingShardResolver:
             model_id=embedding_model_details.model_id,
             dim=embedding_model_details.model_dim,
             table_name=table_name,
+            storage_format=self._storage_format,
         )
 
         return table_name
@@ -52,16 +77,94 @@ class EmbeddingShardResolver:
         self._conn.execute("LOAD vss;")
         self._conn.execute("SET hnsw_enable_experimental_persistence = true;")
 
+        is_int8 = self._storage_format == EmbeddingStorageFormat.INT8
+
+        # There is no foreign key to chunk: DuckDB would prevent moving an embedded chunk to another
+        # datasource_context_hash (see V07__add_chunk_identity.py)
         self._conn.execute(
             f"""
             CREATE TABLE IF NOT EXISTS {table_name} (
-                chunk_id BIGINT NOT NULL REFERENCES chunk(chunk_id),
-                vec FLOAT[{dim}] NOT NULL,
+                chunk_id BIGINT NOT NULL,
+                {f"code TINYINT[{dim}] NOT NULL" if is_int8 else f"vec FLOAT[{dim}] NOT NULL"},
                 created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
                 PRIMARY KEY (chunk_id)
             )
             """
         )
+        if is_int8:
+            self._create_int8_vectors_table(table_name, dim)
+        else:
+            self._create_index(table_name)
+
+    def _create_int8_vectors_table(self, table_name: str, dim: int) -> None:
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {int8_vectors_table_name(table_name)} (
+                chunk_id BIGINT NOT NULL,
+                vec FLOAT[{dim}] NOT NULL,
+                PRIMARY KEY (chunk_id)
+            )
+            """
+        )
+
+    def _convert_storage_format(
+        self, table_name: str, dim: int, current_storage_format: EmbeddingStorageFormat
+    ) -> None:
+        logger.info(
+            "Converting the embedding shard %s from %s to %s",
+            table_name,
+            current_storage_format.value,
+            self._storage_format.value,
+        )
+        self._conn.execute("LOAD vss;")
+        self._conn.execute("SET hnsw_enable_experimental_persistence = true;")
+
+        vectors_table_name = int8_vectors_table_name(table_name)
+        if self._storage_format == EmbeddingStorageFormat.INT8:
+            self._conn.execute(f"DROP INDEX IF EXISTS emb_hnsw_{table_name};")
+            self._create_int8_vectors_table(table_name, dim)
+            self._conn.execute(
+                f"INSERT INTO {vectors_table_name} (chunk_id, vec) SELECT chunk_id, vec FROM {table_name}"
+            )
+            self._conn.execute(f"ALTER TABLE {table_name} ADD COLUMN code TINYINT[{dim}]")
+            self._conn.execute(f"UPDATE {table_name} SET code = {int8_codes_sql('vec', dimension=dim)}")
+            self._conn.execute(f"ALTER TABLE {table_name} ALTER COLUMN code SET NOT NULL")
+            self._conn.execute(f"ALTER TABLE {table_name} DROP COLUMN vec")
+        else:
+            self._conn.execute(f"ALTER TABLE {table_name} ADD COLUMN vec FLOAT[{dim}]")
+            self._conn.execute(
+                f"""
+                UPDATE {table_name} e
+                SET vec = v.vec
+                FROM {vectors_table_name} v
+                WHERE e.chunk_id = v.chunk_id
+                """
+            )
+            self._conn.execute(f"ALTER TABLE {table_name} ALTER COLUMN vec SET NOT NULL")
+            self._conn.execute(f"ALTER TABLE {table_name} DROP COLUMN code")
+            self._conn.execute(f"DROP TABLE {vectors_table_name}")
+            self._create_index(table_name)
+
+        self._registry.update_storage_format(table_name=table_name, storage_format=self._storage_format)
+
+    def rebuild_index(self, table_name: str) -> None:
+        """Re-create the HNSW index of an embedding shard table from its current rows.
+
+        Deleted vectors are only marked as deleted in an HNSW index: rebuilding it after deleting many rows makes it
+        smaller and faster to search. INT8 shards have no HNSW index, so there is nothing to rebuild for them.
+        """
+        TableNamePolicy.validate_table_name(table_name=table_name)
+
+        registered_shard = self._registry.get_by_table_name(table_name=table_name)
+        if registered_shard is not None and registered_shard.storage_format == EmbeddingStorageFormat.INT8:
+            return
+
+        self._conn.execute("LOAD vss;")
+        self._conn.execute("SET hnsw_enable_experimental_persistence = true;")
+        self._conn.execute(f"DROP INDEX IF EXISTS emb_hnsw_{table_name};")
+        self._create_index(table_name)
+
+    def _create_index(self, table_name: str) -> None:
         self._conn.execute(
             f"""
             CREATE INDEX IF NOT EXISTS emb_hnsw_{table_name} ON {table_name} USING HNSW (vec) WITH (metric='cosine');
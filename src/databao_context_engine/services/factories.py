@@ -1,31 +1,60 @@
+import logging
+import os
+
 from duckdb import DuckDBPyConnection
 
 from databao_context_engine.llm.embeddings.provider import EmbeddingProvider
 from databao_context_engine.services.chunk_embedding_service import ChunkEmbeddingService
+from databao_context_engine.services.description_cache import DescriptionCache
+from databao_context_engine.services.embedding_cache import EmbeddingCache
 from databao_context_engine.services.embedding_shard_resolver import EmbeddingShardResolver
+from databao_context_engine.services.garbage_collection_service import GarbageCollectionService
 from databao_context_engine.services.persistence_service import PersistenceService
 from databao_context_engine.services.table_name_policy import TableNamePolicy
+from databao_context_engine.storage.embedding_storage_format import EmbeddingStorageFormat
 from databao_context_engine.storage.repositories.factories import (
     create_chunk_repository,
     create_datasource_context_hash_repository,
+    create_description_cache_repository,
+    create_embedding_cache_repository,
     create_embedding_repository,
     create_registry_repository,
 )
 
+logger = logging.getLogger(__name__)
+
 
 def create_shard_resolver(conn: DuckDBPyConnection, policy: TableNamePolicy | None = None) -> EmbeddingShardResolver:
     return EmbeddingShardResolver(
-        conn=conn, registry_repo=create_registry_repository(conn), table_name_policy=policy or TableNamePolicy()
+        conn=conn,
+        registry_repo=create_registry_repository(conn),
+        table_name_policy=policy or TableNamePolicy(),
+        storage_format=_get_embedding_storage_format(),
     )
 
 
-def create_persistence_service(conn: DuckDBPyConnection, *, model_dim: int) -> PersistenceService:
+def _get_embedding_storage_format() -> EmbeddingStorageFormat:
+    env_var = os.environ.get("DCE_EMBEDDING_STORAGE_FORMAT")
+    if env_var:
+        try:
+            return EmbeddingStorageFormat(env_var.lower())
+        except ValueError:
+            logger.warning("Ignoring invalid DCE_EMBEDDING_STORAGE_FORMAT value: %s", env_var)
+
+    return EmbeddingStorageFormat.FLOAT32
+
+
+def create_persistence_service(
+    conn: DuckDBPyConnection, *, model_dim: int, keep_previous_context_hashes: int = 0
+) -> PersistenceService:
     return PersistenceService(
         conn=conn,
         datasource_context_hash_repo=create_datasource_context_hash_repository(conn),
         chunk_repo=create_chunk_repository(conn),
         embedding_repo=create_embedding_repository(conn),
         dim=model_dim,
+        registry_repo=create_registry_repository(conn),
+        keep_previous_context_hashes=keep_previous_context_hashes,
     )
 
 
@@ -33,11 +62,39 @@ def create_chunk_embedding_service(
     conn: DuckDBPyConnection,
     *,
     embedding_provider: EmbeddingProvider,
+    keep_previous_context_hashes: int = 0,
 ) -> ChunkEmbeddingService:
     resolver = create_shard_resolver(conn)
-    persistence = create_persistence_service(conn, model_dim=embedding_provider.embedding_model_details.model_dim)
+    persistence = create_persistence_service(
+        conn,
+        model_dim=embedding_provider.embedding_model_details.model_dim,
+        keep_previous_context_hashes=keep_previous_context_hashes,
+    )
     return ChunkEmbeddingService(
         persistence_service=persistence,
         embedding_provider=embedding_provider,
         shard_resolver=resolver,
+        embedding_cache=create_embedding_cache(conn),
+    )
+
+
+def create_embedding_cache(conn: DuckDBPyConnection) -> EmbeddingCache:
+    # The cache gets its own DuckDB connection to the same database: embedding happens concurrently with the
+    # persistence of other datasources during a build (see build_runner), and a connection can't be shared by threads
+    return EmbeddingCache(repo=create_embedding_cache_repository(conn.cursor()))
+
+
+def create_description_cache(conn: DuckDBPyConnection) -> DescriptionCache:
+    # Like the embedding cache, with its own connection since descriptions are generated by the enrichment threads
+    return DescriptionCache(repo=create_description_cache_repository(conn.cursor()))
+
+
+def create_garbage_collection_service(conn: DuckDBPyConnection) -> GarbageCollectionService:
+    return GarbageCollectionService(
+        conn,
+        datasource_context_hash_repo=create_datasource_context_hash_repository(conn),
+        chunk_repo=create_chunk_repository(conn),
+        embedding_repo=create_embedding_repository(conn),
+        registry_repo=create_registry_repository(conn),
+        shard_resolver=create_shard_resolver(conn),
     )
@@ -0,0 +1,177 @@
+import logging
+import time
+from collections.abc import Collection
+from dataclasses import dataclass
+
+import duckdb
+
+import databao_context_engine.perf.core as perf
+from databao_context_engine.datasources.datasource_context import DatasourceContextHash
+from databao_context_engine.services.embedding_shard_resolver import EmbeddingShardResolver
+from databao_context_engine.storage.repositories.chunk_repository import ChunkRepository
+from databao_context_engine.storage.repositories.datasource_context_repository import DatasourceContextHashRepository
+from databao_context_engine.storage.repositories.embedding_model_registry_repository import (
+    EmbeddingModelRegistryRepository,
+)
+from databao_context_engine.storage.repositories.embedding_repository import EmbeddingRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GarbageCollectionResult:
+    """Summary of a garbage collection of the index database.
+
+    Attributes:
+        deleted_context_hashes: Number of stale datasource context hashes deleted.
+        deleted_chunks: Number of chunks deleted.
+        deleted_embeddings: Number of vectors deleted from the embedding shard tables.
+        bytes_before: Size of the data stored in the database before the garbage collection.
+        bytes_after: Size of the data stored in the database after the garbage collection.
+        query_seconds_before: Duration of a query joining every vector to its chunk and context hash, before the
+            garbage collection.
+        query_seconds_after: Duration of the same query, after the garbage collection.
+    """
+
+    deleted_context_hashes: int
+    deleted_chunks: int
+    deleted_embeddings: int
+    bytes_before: int
+    bytes_after: int
+    query_seconds_before: float
+    query_seconds_after: float
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        return max(self.bytes_before - self.bytes_after, 0)
+
+
+class GarbageCollectionService:
+    def __init__(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        *,
+        datasource_context_hash_repo: DatasourceContextHashRepository,
+        chunk_repo: ChunkRepository,
+        embedding_repo: EmbeddingRepository,
+        registry_repo: EmbeddingModelRegistryRepository,
+        shard_resolver: EmbeddingShardResolver,
+    ):
+        self._conn = conn
+        self._datasource_context_hash_repo = datasource_context_hash_repo
+        self._chunk_repo = chunk_repo
+        self._embedding_repo = embedding_repo
+        self._registry_repo = registry_repo
+        self._shard_resolver = shard_resolver
+
+    @perf.perf_span(
+        "gc.collect",
+        attrs=lambda self, *, keep_previous_hashes=0, **_: {"keep_previous_hashes": keep_previous_hashes},
+    )
+    def collect(
+        self,
+        *,
+        keep_previous_hashes: int = 0,
+        existing_datasource_ids: Collection[str] | None = None,
+        current_context_hashes: Collection[DatasourceContextHash] = (),
+    ) -> GarbageCollectionResult:
+        """Delete the stale context hashes of every datasource, with their chunks and vectors.
+
+        For each datasource, the current context hash and the `keep_previous_hashes` most recently indexed other ones
+        are kept. The current context hash is the one given in `current_context_hashes`, i.e. the hash of the context
+        file, and otherwise the most recently indexed one. Context hashes that lost part of their chunks are never kept.
+        When `existing_datasource_ids` is given, all the context hashes of the datasources that are not in it are
+        deleted as well. Vectors and keyword index entries of chunks that don't exist anymore are deleted too. The HNSW
+        index of every embedding shard table that lost rows is then rebuilt, and the database is checkpointed so that
+        the freed blocks can be reused.
+
+        Returns:
+            A summary of what was deleted and of the space reclaimed.
+        """
+        table_names = [registered_model.table_name for registered_model in self._registry_repo.list()]
+
+        bytes_before = self._used_bytes()
+        query_seconds_before = self._time_search_join(table_names)
+
+        stale_context_hashes = self._datasource_context_hash_repo.list_all_but_latest(
+            keep_latest=keep_previous_hashes + 1,
+            current_hashes=[
+                (str(context_hash.datasource_id), context_hash.hash_algorithm, context_hash.hash)
+                for context_hash in current_context_hashes
+            ],
+        )
+        if existing_datasource_ids is not None:
+            stale_context_hash_ids = {context_hash.datasource_context_hash_id for context_hash in stale_context_hashes}
+            stale_context_hashes += [
+                context_hash
+                for context_hash in self._datasource_context_hash_repo.list()
+                if context_hash.datasource_id not in existing_datasource_ids
+                and context_hash.datasource_context_hash_id not in stale_context_hash_ids
+            ]
+        deleted_embeddings_by_table = dict.fromkeys(table_names, 0)
+        deleted_chunks = 0
+        # Given that there is a foreign key from chunk to datasource_context_hash, the order of operations is important.
+        for context_hash in stale_context_hashes:
+            for table_name in table_names:
+                deleted_embeddings_by_table[table_name] += self._embedding_repo.delete_by_datasource_context_hash_id(
+                    table_name=table_name, datasource_context_hash_id=context_hash.datasource_context_hash_id
+                )
+            deleted_chunks += self._chunk_repo.delete_by_datasource_context_hash_id(
+                datasource_context_hash_id=context_hash.datasource_context_hash_id
+            )
+            self._datasource_context_hash_repo.delete(
+                datasource_context_hash_id=context_hash.datasource_context_hash_id
+            )
+
+        for table_name in table_names:
+            deleted_embeddings_by_table[table_name] += self._embedding_repo.delete_orphans(table_name=table_name)
+        self._chunk_repo.delete_keyword_index_orphans()
+
+        self._compact(
+            table_names=[table_name for table_name, deleted in deleted_embeddings_by_table.items() if deleted > 0]
+        )
+
+        result = GarbageCollectionResult(
+            deleted_context_hashes=len(stale_context_hashes),
+            deleted_chunks=deleted_chunks,
+            deleted_embeddings=sum(deleted_embeddings_by_table.values()),
+            bytes_before=bytes_before,
+            bytes_after=self._used_bytes(),
+            query_seconds_before=query_seconds_before,
+            query_seconds_after=self._time_search_join(table_names),
+        )
+        perf.add_attributes(
+            {
+                "deleted_context_hashes": result.deleted_context_hashes,
+                "deleted_chunks": result.deleted_chunks,
+                "deleted_embeddings": result.deleted_embeddings,
+                "bytes_reclaimed": result.bytes_reclaimed,
+            }
+        )
+        logger.debug("Garbage collection done: %s", result)
+        return result
+
+    @perf.perf_span("gc.compact")
+    def _compact(self, *, table_names: list[str]) -> None:
+        for table_name in table_names:
+            self._shard_resolver.rebuild_index(table_name)
+        self._conn.execute("CHECKPOINT;")
+
+    def _used_bytes(self) -> int:
+        row = self._conn.execute(
+            """
+            SELECT
+                used_blocks * block_size
+            FROM
+                pragma_database_size()
+            WHERE
+                database_name = current_database()
+            """
+        ).fetchone()
+        return int(row[0]) if row and row[0] is not None else 0
+
+    def _time_search_join(self, table_names: list[str]) -> float:
+        started_at = time.perf_counter()
+        for table_name in table_names:
+            self._embedding_repo.count_searchable(table_name=table_name)
+        return time.perf_counter() - started_at
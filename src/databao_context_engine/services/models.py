@@ -1,6 +1,8 @@
 from collections.abc import Sequence
 from dataclasses import dataclass
 
+import xxhash
+
 from databao_context_engine.pluginlib.build_plugin import EmbeddableChunk
 
 
@@ -14,3 +16,17 @@ class ChunkEmbedding:
     @property
     def keyword_indexable_text(self) -> str:
         return self.original_chunk.keyword_indexable_text or self.original_chunk.embeddable_text
+
+    @property
+    def content_hash(self) -> str:
+        """A hash of everything persisted for this chunk, used to recognize unchanged chunks when re-indexing."""
+        return xxhash.xxh3_128_hexdigest(
+            "\x00".join(
+                [
+                    self.original_chunk.type or "",
+                    self.embedded_text,
+                    self.display_text,
+                    self.keyword_indexable_text,
+                ]
+            ).encode("utf-8")
+        )
@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 import duckdb
 
 import databao_context_engine.perf.core as perf
@@ -5,6 +7,9 @@ from databao_context_engine.datasources.datasource_context import DatasourceCont
 from databao_context_engine.services.models import ChunkEmbedding
 from databao_context_engine.storage.repositories.chunk_repository import ChunkRepository
 from databao_context_engine.storage.repositories.datasource_context_repository import DatasourceContextHashRepository
+from databao_context_engine.storage.repositories.embedding_model_registry_repository import (
+    EmbeddingModelRegistryRepository,
+)
 from databao_context_engine.storage.repositories.embedding_repository import EmbeddingRepository
 from databao_context_engine.storage.transaction import transaction
 
@@ -18,12 +23,16 @@ class PersistenceService:
         embedding_repo: EmbeddingRepository,
         *,
         dim: int,
+        registry_repo: EmbeddingModelRegistryRepository | None = None,
+        keep_previous_context_hashes: int = 0,
     ):
         self._conn = conn
         self._datasource_context_hash_repo = datasource_context_hash_repo
         self._chunk_repo = chunk_repo
         self._embedding_repo = embedding_repo
         self._dim = dim
+        self._registry_repo = registry_repo
+        self._keep_previous_context_hashes = keep_previous_context_hashes
 
     @perf.perf_span(
         "persistence.write_chunks_and_embeddings",
@@ -47,6 +56,14 @@ class PersistenceService:
 
         If override is True, delete existing chunks and embeddings for the datasource before persisting.
 
+        Otherwise, the chunks are diffed against the latest context hash previously indexed for the datasource: chunks
+        with the same key and content as a previous chunk are moved to the new context hash, keeping their vector and
+        their keyword index entries, and only new or changed chunks are inserted. The previous context hash is marked as
+        incomplete in the same transaction, so that it's never considered as indexed with only part of its chunks, then
+        deleted with the chunks that were not reused. When previous context hashes are kept
+        (`keep_previous_context_hashes`), nothing is moved and every chunk is inserted instead, so that the previous
+        context hash stays complete until the garbage collection.
+
         Raises:
             ValueError: If chunk_embeddings is an empty list.
 
@@ -59,23 +76,64 @@ class PersistenceService:
         # and re-inserting related rows. It also does not support on delete cascade yet.
         if override:
             self._delete_existing_context_hash(context_hash, table_name)
+        else:
+            # The context hash may still exist without all its chunks, if it was indexed then replaced by a newer one,
+            # and the write of the latter was interrupted before deleting it
+            self._delete_existing_context_hash(context_hash, table_name, only_if_incomplete=True)
+
+        if override or self._keep_previous_context_hashes > 0:
+            previous_datasource_context_hash = None
+        else:
+            previous_datasource_context_hash = self._datasource_context_hash_repo.get_latest_by_datasource_id(
+                datasource_id=str(context_hash.datasource_id),
+                excluded_hash_algorithm=context_hash.hash_algorithm,
+                excluded_hash=context_hash.hash,
+            )
 
         with transaction(self._conn):
             datasource_context_hash_id = self._insert_datasource_context_hash(context_hash)
 
-            chunk_ids = self._insert_chunks(
-                full_type=full_type,
-                datasource_id=datasource_id,
-                datasource_context_hash_id=datasource_context_hash_id,
-                chunk_embeddings=chunk_embeddings,
-            )
-            self._insert_embeddings(
+            new_chunk_embeddings = chunk_embeddings
+            if previous_datasource_context_hash is not None:
+                reused_chunk_ids, new_chunk_embeddings = self._match_unchanged_chunks(
+                    previous_datasource_context_hash_id=previous_datasource_context_hash.datasource_context_hash_id,
+                    full_type=full_type,
+                    table_name=table_name,
+                    chunk_embeddings=chunk_embeddings,
+                )
+                self._move_unchanged_chunks(
+                    chunk_ids=reused_chunk_ids, datasource_context_hash_id=datasource_context_hash_id
+                )
+                perf.set_attribute("reused_chunk_count", len(reused_chunk_ids))
+                # DuckDB can't delete the context hash in the transaction that moved its chunks, see the foreign key
+                # limitations above
+                self._datasource_context_hash_repo.mark_incomplete(
+                    datasource_context_hash_id=previous_datasource_context_hash.datasource_context_hash_id
+                )
+
+            perf.set_attribute("inserted_chunk_count", len(new_chunk_embeddings))
+            if new_chunk_embeddings:
+                chunk_ids = self._insert_chunks(
+                    full_type=full_type,
+                    datasource_id=datasource_id,
+                    datasource_context_hash_id=datasource_context_hash_id,
+                    chunk_embeddings=new_chunk_embeddings,
+                )
+                self._insert_embeddings(
+                    table_name=table_name,
+                    chunk_ids=chunk_ids,
+                    chunk_embeddings=new_chunk_embeddings,
+                )
+
+        if previous_datasource_context_hash is not None:
+            self._delete_datasource_context_hash_and_chunks(
+                datasource_context_hash_id=previous_datasource_context_hash.datasource_context_hash_id,
                 table_name=table_name,
-                chunk_ids=chunk_ids,
-                chunk_embeddings=chunk_embeddings,
             )
 
-    def _delete_existing_context_hash(self, context_hash: DatasourceContextHash, table_name: str):
+    def _delete_existing_context_hash(
+        self, context_hash: DatasourceContextHash, table_name: str, *, only_if_incomplete: bool = False
+    ):
         """Delete a context hash (if it exists) and all embeddings and chunks linked to it."""
         existing_datasource_context_hash = self._datasource_context_hash_repo.get_by_datasource_id_and_hash(
             datasource_id=str(context_hash.datasource_id),
@@ -83,31 +141,81 @@ class PersistenceService:
             hash_=context_hash.hash,
         )
 
-        if existing_datasource_context_hash:
-            # Given that there is a foreign key from embedding to chunk and from chunk to datasource_context_hash,
-            # the order of operations is important.
-            self._delete_existing_embeddings(
-                table_name=table_name,
+        if existing_datasource_context_hash and not (
+            only_if_incomplete and existing_datasource_context_hash.is_complete
+        ):
+            self._delete_datasource_context_hash_and_chunks(
                 datasource_context_hash_id=existing_datasource_context_hash.datasource_context_hash_id,
+                table_name=table_name,
             )
-            self._delete_existing_chunks(
-                datasource_context_hash_id=existing_datasource_context_hash.datasource_context_hash_id
-            )
-            self._delete_datasource_context_hash(
-                datasource_context_hash_id=existing_datasource_context_hash.datasource_context_hash_id
+
+    def _delete_datasource_context_hash_and_chunks(self, *, datasource_context_hash_id: int, table_name: str) -> None:
+        # Given that there is a foreign key from chunk to datasource_context_hash, the order of operations is important.
+        self._delete_existing_embeddings(table_name=table_name, datasource_context_hash_id=datasource_context_hash_id)
+        self._delete_existing_chunks(datasource_context_hash_id=datasource_context_hash_id)
+        self._delete_datasource_context_hash(datasource_context_hash_id=datasource_context_hash_id)
+
+    @perf.perf_span("persistence.diff.match_unchanged_chunks")
+    def _match_unchanged_chunks(
+        self,
+        *,
+        previous_datasource_context_hash_id: int,
+        full_type: str,
+        table_name: str,
+        chunk_embeddings: list[ChunkEmbedding],
+    ) -> tuple[list[int], list[ChunkEmbedding]]:
+        """Split the chunks between the ones already indexed under the previous context hash and the new ones.
+
+        Chunks are matched on their key and content hash. Identical chunks are matched one to one, so that a chunk
+        appearing twice is only reused twice if it was indexed twice.
+
+        Returns:
+            The ids of the previous chunks to reuse, and the chunk embeddings that must be inserted.
+        """
+        previous_chunk_ids_by_identity: dict[tuple[str | None, str | None], list[int]] = defaultdict(list)
+        for chunk_id, chunk_key, content_hash in self._chunk_repo.list_embedded_chunk_identities(
+            datasource_context_hash_id=previous_datasource_context_hash_id,
+            full_type=full_type,
+            table_name=table_name,
+        ):
+            previous_chunk_ids_by_identity[(chunk_key, content_hash)].append(chunk_id)
+
+        reused_chunk_ids: list[int] = []
+        new_chunk_embeddings: list[ChunkEmbedding] = []
+        for chunk_embedding in chunk_embeddings:
+            previous_chunk_ids = previous_chunk_ids_by_identity.get(
+                (chunk_embedding.original_chunk.key, chunk_embedding.content_hash)
             )
+            if previous_chunk_ids:
+                reused_chunk_ids.append(previous_chunk_ids.pop())
+            else:
+                new_chunk_embeddings.append(chunk_embedding)
+
+        return reused_chunk_ids, new_chunk_embeddings
+
+    @perf.perf_span("persistence.diff.move_unchanged_chunks")
+    def _move_unchanged_chunks(self, *, chunk_ids: list[int], datasource_context_hash_id: int) -> None:
+        self._chunk_repo.move_to_datasource_context_hash(
+            chunk_ids=chunk_ids, datasource_context_hash_id=datasource_context_hash_id
+        )
 
     @perf.perf_span("persistence.override.delete_embeddings")
     def _delete_existing_embeddings(self, *, table_name: str, datasource_context_hash_id: int) -> None:
-        self._embedding_repo.delete_by_datasource_context_hash_id(
-            table_name=table_name, datasource_context_hash_id=datasource_context_hash_id
-        )
+        # The chunks of the context hash may have been embedded with other models, in other shard tables
+        table_names = {table_name}
+        if self._registry_repo is not None:
+            table_names.update(registered_model.table_name for registered_model in self._registry_repo.list())
+
+        for shard_table_name in sorted(table_names):
+            self._embedding_repo.delete_by_datasource_context_hash_id(
+                table_name=shard_table_name, datasource_context_hash_id=datasource_context_hash_id
+            )
 
     @perf.perf_span("persistence.override.delete_chunks")
     def _delete_existing_chunks(self, *, datasource_context_hash_id: int) -> None:
         self._chunk_repo.delete_by_datasource_context_hash_id(datasource_context_hash_id=datasource_context_hash_id)
 
-    @perf.perf_span("persistence.override.delete_chunks")
+    @perf.perf_span("persistence.override.delete_datasource_context_hash")
     def _delete_datasource_context_hash(self, *, datasource_context_hash_id: int) -> None:
         self._datasource_context_hash_repo.delete(
             datasource_context_hash_id=datasource_context_hash_id,
@@ -136,7 +244,14 @@ class PersistenceService:
             datasource_id=datasource_id,
             datasource_context_hash_id=datasource_context_hash_id,
             chunk_contents=[
-                (ce.embedded_text, ce.display_text, ce.keyword_indexable_text, ce.original_chunk.type)
+                (
+                    ce.embedded_text,
+                    ce.display_text,
+                    ce.keyword_indexable_text,
+                    ce.original_chunk.type,
+                    ce.original_chunk.key,
+                    ce.content_hash,
+                )
                 for ce in chunk_embeddings
             ],
         )
@@ -154,11 +269,24 @@ class PersistenceService:
         )
 
     def has_datasource_context_hash(self, context_hash: DatasourceContextHash) -> bool:
-        return (
-            self._datasource_context_hash_repo.get_by_datasource_id_and_hash(
-                datasource_id=str(context_hash.datasource_id),
-                hash_algorithm=context_hash.hash_algorithm,
-                hash_=context_hash.hash,
-            )
-            is not None
+        existing_datasource_context_hash = self._datasource_context_hash_repo.get_by_datasource_id_and_hash(
+            datasource_id=str(context_hash.datasource_id),
+            hash_algorithm=context_hash.hash_algorithm,
+            hash_=context_hash.hash,
+        )
+        return existing_datasource_context_hash is not None and existing_datasource_context_hash.is_complete
+
+    def get_indexed_datasource_context_hashes(
+        self, context_hashes: list[DatasourceContextHash]
+    ) -> list[DatasourceContextHash]:
+        existing_hashes = self._datasource_context_hash_repo.list_existing_hashes(
+            hashes=[
+                (str(context_hash.datasource_id), context_hash.hash_algorithm, context_hash.hash)
+                for context_hash in context_hashes
+            ]
         )
+        return [
+            context_hash
+            for context_hash in context_hashes
+            if (str(context_hash.datasource_id), context_hash.hash_algorithm, context_hash.hash) in existing_hashes
+        ]
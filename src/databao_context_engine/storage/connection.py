@@ -1,13 +1,19 @@
 import logging
+import threading
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator
+from typing import Callable, Iterator
 
 import duckdb
 from duckdb import DuckDBPyConnection
 
 logger = logging.getLogger(__name__)
 
+# DuckDB refuses to open a database read-write in a process where it is already open read-only: the holders of
+# long-lived read-only connections register how to close them, so that they are closed before
+_read_only_releasers: dict[str, list[Callable[[], None]]] = {}
+_read_only_releasers_lock = threading.Lock()
+
 
 @contextmanager
 def open_duckdb_connection(db_path: str | Path) -> Iterator[DuckDBPyConnection]:
@@ -23,8 +29,27 @@ def open_duckdb_connection(db_path: str | Path) -> Iterator[DuckDBPyConnection]:
         The opened DuckDB connection.
 
     """
+    conn = connect_duckdb(db_path)
+
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def connect_duckdb(db_path: str | Path, *, read_only: bool = False) -> DuckDBPyConnection:
+    """Open a DuckDB connection with search extensions enabled, to be closed by the caller.
+
+    Prefer `open_duckdb_connection` unless the connection must outlive the current block. Opening a read-write
+    connection first closes the read-only connections registered with `register_read_only_releaser`.
+
+    Returns:
+        The opened DuckDB connection.
+    """
     path = str(db_path)
-    conn = duckdb.connect(path)
+    if not read_only:
+        release_read_only_connections(db_path)
+    conn = duckdb.connect(path, read_only=read_only)
     logger.debug(f"Connected to DuckDB database at {path}")
 
     try:
@@ -33,8 +58,37 @@ def open_duckdb_connection(db_path: str | Path) -> Iterator[DuckDBPyConnection]:
         conn.execute("INSTALL vss;")
         conn.execute("LOAD vss;")
         conn.execute("SET hnsw_enable_experimental_persistence = true;")
-
-        logger.debug("Loaded full-text and vector search extensions")
-        yield conn
-    finally:
+    except BaseException:
         conn.close()
+        raise
+
+    logger.debug("Loaded full-text and vector search extensions")
+    return conn
+
+
+def register_read_only_releaser(db_path: str | Path, release: Callable[[], None]) -> None:
+    """Register how to close a long-lived read-only connection, when the database must be opened read-write."""
+    with _read_only_releasers_lock:
+        _read_only_releasers.setdefault(_releasers_key(db_path), []).append(release)
+
+
+def unregister_read_only_releaser(db_path: str | Path, release: Callable[[], None]) -> None:
+    with _read_only_releasers_lock:
+        releasers = _read_only_releasers.get(_releasers_key(db_path), [])
+        if release in releasers:
+            releasers.remove(release)
+
+
+def release_read_only_connections(db_path: str | Path) -> None:
+    """Close the registered read-only connections to a database, before it is opened read-write."""
+    with _read_only_releasers_lock:
+        releasers = list(_read_only_releasers.get(_releasers_key(db_path), []))
+
+    # Called without holding the lock: releasing a connection unregisters it
+    for release in releasers:
+        logger.debug("Closing a read-only connection to open the database read-write")
+        release()
+
+
+def _releasers_key(db_path: str | Path) -> str:
+    return str(Path(db_path).resolve())
@@ -0,0 +1,44 @@
+from enum import Enum
+
+
+class EmbeddingStorageFormat(str, Enum):
+    """How the vectors of an embedding shard table are stored, recorded in `embedding_model_registry`.
+
+    FLOAT32 shards only store the vectors, and are searched with an HNSW index.
+
+    INT8 shards only store each vector as 8-bit codes, in a `code` column: the vector scaled so that its largest
+    absolute value is 127, then rounded. The codes are 4 times smaller than the vectors, so searches first scan them
+    for the nearest candidates, then re-rank those with the full precision vectors. Those are kept apart, in the table
+    named by `int8_vectors_table_name`, and only read by chunk_id. The cosine distance doesn't depend on the scale of
+    the vectors, so it doesn't need to be stored. INT8 shards have no HNSW index: it would hold another copy of every
+    full precision vector.
+    """
+
+    FLOAT32 = "float32"
+    INT8 = "int8"
+
+
+def int8_vectors_table_name(table_name: str) -> str:
+    """Get the name of the table holding the full precision vectors of an INT8 shard.
+
+    Returns:
+        The name of the table, matching the `TableNamePolicy`.
+    """
+    return f"{table_name}__vectors"
+
+
+def int8_codes_sql(vec_sql: str, *, dimension: int) -> str:
+    """Build the SQL expression computing the INT8 codes of a vector.
+
+    Returns:
+        An expression of type `TINYINT[dimension]`.
+    """
+    # The largest absolute value is computed once per vector, as the parameter of the outer lambda
+    return f"""
+        CAST(
+            list_transform(
+                [list_max(list_transform(CAST({vec_sql} AS FLOAT[]), x -> abs(x)))],
+                max_abs -> list_transform(CAST({vec_sql} AS FLOAT[]), x -> round(x * 127 / greatest(max_abs, 1e-30)))
+            )[1] AS TINYINT[{dimension}]
+        )
+    """
@@ -0,0 +1,27 @@
+"""SQL building blocks for the incremental BM25 keyword index.
+
+The keyword index is stored in the `keyword_index_term` (postings) and `keyword_index_document` (document lengths)
+tables. Tokenization and scoring mirror DuckDB's FTS extension (`PRAGMA create_fts_index` + `match_bm25`), so that
+scores stay identical to the ones we used to get from a full FTS index rebuild.
+"""
+
+BM25_K = 1.2
+BM25_B = 0.75
+
+_TOKENIZER_REGEX = r"""[0-9!@#$%^&*()_+={}\[\]:;<>,.?~\\/\|''"`-]+"""
+
+
+def tokenize_sql(text_sql: str) -> str:
+    """Return a SQL expression splitting `text_sql` into a list of lowercase tokens.
+
+    Returns:
+        The SQL expression, to be wrapped in `unnest(...)` to get one token per row.
+    """
+    return (
+        f"string_split_regex(regexp_replace(lower(strip_accents(CAST({text_sql} AS VARCHAR))), "
+        f"'{_TOKENIZER_REGEX}', ' ', 'g'), '\\s+')"
+    )
+
+
+def stem_sql(token_sql: str) -> str:
+    return f"stem({token_sql}, 'porter')"
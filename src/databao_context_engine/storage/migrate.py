@@ -10,6 +10,8 @@ from typing import Callable, LiteralString
 
 import duckdb
 
+from databao_context_engine.storage.connection import release_read_only_connections
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +27,7 @@ def migrate(db_path: str | Path, migration_files: list[Path] | None = None) -> N
     db.parent.mkdir(parents=True, exist_ok=True)
     logger.debug("Running migrations on database: %s", db)
 
+    release_read_only_connections(db)
     migration_manager = _MigrationManager(db, migration_files)
     migration_manager.migrate()
     logger.debug("Migration complete")
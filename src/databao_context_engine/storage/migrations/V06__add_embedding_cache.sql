@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    embedder      TEXT NOT NULL,
+    model_id      TEXT NOT NULL,
+    text_hash     TEXT NOT NULL,
+    vec           FLOAT[] NOT NULL,
+    created_at    TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_used_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (embedder, model_id, text_hash)
+);
@@ -0,0 +1,34 @@
+from duckdb import DuckDBPyConnection
+
+from databao_context_engine.services.table_name_policy import TableNamePolicy
+
+
+def before_migration(conn: DuckDBPyConnection) -> None:
+    """Re-create the embedding shard tables without their foreign key to chunk.
+
+    DuckDB rejects updating the datasource_context_hash_id of a chunk while its chunk_id is referenced by a foreign key,
+    which prevents re-indexing a datasource without deleting and re-inserting all of its embeddings.
+    """
+    conn.execute("LOAD vss;")
+    conn.execute("SET hnsw_enable_experimental_persistence = true;")
+
+    rows = conn.execute("SELECT table_name, dim FROM embedding_model_registry").fetchall()
+    for table_name, dim in rows:
+        TableNamePolicy.validate_table_name(table_name=table_name)
+        conn.execute(f"CREATE TABLE {table_name}__v07 AS SELECT chunk_id, vec, created_at FROM {table_name}")
+        conn.execute(f"DROP TABLE {table_name}")
+        conn.execute(
+            f"""
+            CREATE TABLE {table_name} (
+                chunk_id BIGINT NOT NULL,
+                vec FLOAT[{int(dim)}] NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (chunk_id)
+            )
+            """
+        )
+        conn.execute(f"INSERT INTO {table_name} SELECT chunk_id, vec, created_at FROM {table_name}__v07")
+        conn.execute(f"DROP TABLE {table_name}__v07")
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS emb_hnsw_{table_name} ON {table_name} USING HNSW (vec) WITH (metric='cosine')"
+        )
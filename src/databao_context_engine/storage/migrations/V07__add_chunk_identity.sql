@@ -0,0 +1,5 @@
+-- Stable identity of a chunk, used to recognize unchanged chunks when re-indexing a datasource.
+-- See V07__add_chunk_identity.py for the removal of the foreign key from embedding shard tables to chunk, which
+-- prevents moving unchanged chunks to a new datasource_context_hash
+ALTER TABLE chunk ADD COLUMN IF NOT EXISTS chunk_key TEXT;
+ALTER TABLE chunk ADD COLUMN IF NOT EXISTS content_hash TEXT;
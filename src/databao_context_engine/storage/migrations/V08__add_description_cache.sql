@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS description_cache (
+    describer     TEXT NOT NULL,
+    model_id      TEXT NOT NULL,
+    prompt_hash   TEXT NOT NULL,
+    description   TEXT NOT NULL,
+    created_at    TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_used_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (describer, model_id, prompt_hash)
+);
@@ -0,0 +1 @@
+ALTER TABLE embedding_model_registry ADD COLUMN IF NOT EXISTS storage_format TEXT DEFAULT 'float32';
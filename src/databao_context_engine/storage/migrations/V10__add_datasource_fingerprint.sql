@@ -0,0 +1,6 @@
+CREATE TABLE IF NOT EXISTS datasource_fingerprint (
+    datasource_id TEXT NOT NULL PRIMARY KEY,
+    fingerprint   TEXT NOT NULL,
+    context_hash  TEXT NOT NULL,
+    built_at      TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
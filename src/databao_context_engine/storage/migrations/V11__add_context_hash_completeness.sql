@@ -0,0 +1,3 @@
+-- A context hash whose unchanged chunks were moved to a newer context hash only keeps part of its chunks until it is
+-- deleted: it must not be considered as indexed anymore
+ALTER TABLE datasource_context_hash ADD COLUMN IF NOT EXISTS is_complete BOOLEAN DEFAULT TRUE;
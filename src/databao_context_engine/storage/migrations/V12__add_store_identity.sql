@@ -0,0 +1,9 @@
+-- Identifies the database: the data derived from it and kept outside of it, like the segments of the NumPy vector
+-- index, must be dropped when it is rebuilt, since the chunk ids of a new database are assigned again from 1
+CREATE TABLE IF NOT EXISTS store_identity (
+    store_id   TEXT NOT NULL PRIMARY KEY,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO store_identity (store_id)
+SELECT CAST(uuid() AS TEXT) WHERE NOT EXISTS (SELECT 1 FROM store_identity);
@@ -3,6 +3,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+from databao_context_engine.storage.embedding_storage_format import EmbeddingStorageFormat
+
 
 @dataclass(frozen=True)
 class DatasourceContextHashDTO:
@@ -11,6 +13,15 @@ class DatasourceContextHashDTO:
     hash_algorithm: str
     hash: str
     hashed_at: datetime
+    is_complete: bool = True
+
+
+@dataclass(frozen=True)
+class DatasourceFingerprintDTO:
+    datasource_id: str
+    fingerprint: str
+    context_hash: str
+    built_at: datetime
 
 
 @dataclass(frozen=True)
@@ -24,6 +35,8 @@ class ChunkDTO:
     created_at: datetime
     datasource_context_hash_id: int
     chunk_type: str | None = None
+    chunk_key: str | None = None
+    content_hash: str | None = None
 
 
 @dataclass(frozen=True)
@@ -33,6 +46,7 @@ class EmbeddingModelRegistryDTO:
     dim: int
     table_name: str
     created_at: datetime
+    storage_format: EmbeddingStorageFormat = EmbeddingStorageFormat.FLOAT32
 
 
 @dataclass(frozen=True)
@@ -5,7 +5,9 @@ from _duckdb import ConstraintException
 
 import databao_context_engine.perf.core as perf
 from databao_context_engine.plugins.duckdb_tools import fetchall_dicts, fetchone_dicts
+from databao_context_engine.services.table_name_policy import TableNamePolicy
 from databao_context_engine.storage.exceptions.exceptions import IntegrityError
+from databao_context_engine.storage.keyword_index import stem_sql, tokenize_sql
 from databao_context_engine.storage.models import ChunkDTO
 
 
@@ -50,7 +52,7 @@ class ChunkRepository:
             if row is None:
                 raise RuntimeError("chunk creation returned no object")
 
-            self._refresh_fts_index()
+            self._index_keywords([int(row["chunk_id"])])
             return self._row_to_dto(row)
         except ConstraintException as e:
             raise IntegrityError from e
@@ -107,6 +109,7 @@ class ChunkRepository:
             return self.get(chunk_id)
 
         params.append(chunk_id)
+        self._unindex_keywords([chunk_id])
         self._conn.execute(
             f"""
             UPDATE
@@ -119,10 +122,11 @@ class ChunkRepository:
             params,
         )
 
-        self._refresh_fts_index()
+        self._index_keywords([chunk_id])
         return self.get(chunk_id)
 
     def delete(self, chunk_id: int) -> int:
+        self._unindex_keywords([chunk_id])
         row = self._conn.execute(
             """
             DELETE FROM
@@ -135,11 +139,11 @@ class ChunkRepository:
             [chunk_id],
         )
 
-        self._refresh_fts_index()
         return 1 if row else 0
 
     def delete_by_datasource_id(self, *, datasource_id: str) -> int:
-        deleted = self._conn.execute(
+        self._unindex_keywords_where("datasource_id = ?", [datasource_id])
+        row = self._conn.execute(
             """
             DELETE FROM
                 chunk
@@ -147,12 +151,12 @@ class ChunkRepository:
                 datasource_id = ?
             """,
             [datasource_id],
-        ).rowcount
-        self._refresh_fts_index()
-        return int(deleted or 0)
+        ).fetchone()
+        return int(row[0]) if row else 0
 
     def delete_by_datasource_context_hash_id(self, *, datasource_context_hash_id: int) -> int:
-        deleted = self._conn.execute(
+        self._unindex_keywords_where("datasource_context_hash_id = ?", [datasource_context_hash_id])
+        row = self._conn.execute(
             """
             DELETE FROM
                 chunk
@@ -160,9 +164,32 @@ class ChunkRepository:
                 datasource_context_hash_id = ?
             """,
             [datasource_context_hash_id],
-        ).rowcount
-        self._refresh_fts_index()
-        return int(deleted or 0)
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def delete_keyword_index_orphans(self) -> int:
+        """Remove the keyword (BM25) index entries of chunks that don't exist anymore.
+
+        Returns:
+            The number of documents removed from the keyword index.
+        """
+        self._conn.execute(
+            """
+            DELETE FROM
+                keyword_index_term
+            WHERE
+                chunk_id NOT IN (SELECT chunk_id FROM chunk)
+            """
+        )
+        row = self._conn.execute(
+            """
+            DELETE FROM
+                keyword_index_document
+            WHERE
+                chunk_id NOT IN (SELECT chunk_id FROM chunk)
+            """
+        ).fetchone()
+        return int(row[0]) if row else 0
 
     def list(self) -> list[ChunkDTO]:
         rows = fetchall_dicts(
@@ -183,13 +210,18 @@ class ChunkRepository:
         *,
         full_type: str,
         datasource_id: str,
-        chunk_contents: Sequence[Tuple[str, Optional[str], str, Optional[str]]],
+        chunk_contents: Sequence[Tuple[str, Optional[str], str, Optional[str], Optional[str], Optional[str]]],
         datasource_context_hash_id: int,
     ) -> Sequence[int]:
-        values_sql = ", ".join(["(?, ?, ?, ?, ?, ?, ?)"] * len(chunk_contents))
+        """Insert chunks given as (embeddable_text, display_text, keyword_index_text, chunk_type, chunk_key, content_hash).
+
+        Returns:
+            The ids of the inserted chunks, in the order of `chunk_contents`.
+        """
+        values_sql = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?)"] * len(chunk_contents))
         sql = f"""
             INSERT INTO
-                chunk(full_type, chunk_type, datasource_id, embeddable_text, display_text, keyword_index_text, datasource_context_hash_id)
+                chunk(full_type, chunk_type, datasource_id, embeddable_text, display_text, keyword_index_text, datasource_context_hash_id, chunk_key, content_hash)
             VALUES
                 {values_sql}
             RETURNING
@@ -197,7 +229,7 @@ class ChunkRepository:
         """
 
         params: list[Any] = []
-        for embeddable_text, display_text, keyword_index_text, chunk_type in chunk_contents:
+        for embeddable_text, display_text, keyword_index_text, chunk_type, chunk_key, content_hash in chunk_contents:
             params.extend(
                 [
                     full_type,
@@ -207,23 +239,150 @@ class ChunkRepository:
                     display_text,
                     keyword_index_text,
                     datasource_context_hash_id,
+                    chunk_key,
+                    content_hash,
                 ]
             )
 
         rows = self._conn.execute(sql, params).fetchall()
+        chunk_ids = [int(r[0]) for r in rows]
+
+        self._index_keywords(chunk_ids)
+
+        return chunk_ids
 
-        self._refresh_fts_index()
+    def list_embedded_chunk_identities(
+        self, *, datasource_context_hash_id: int, full_type: str, table_name: str
+    ) -> Sequence[Tuple[int, Optional[str], Optional[str]]]:
+        """List the (chunk_id, chunk_key, content_hash) of the chunks of a context hash having a vector in `table_name`.
+
+        Returns:
+            The identities of the chunks, ordered by chunk_id.
+        """
+        TableNamePolicy.validate_table_name(table_name=table_name)
+
+        rows = self._conn.execute(
+            f"""
+            SELECT
+                c.chunk_id,
+                c.chunk_key,
+                c.content_hash
+            FROM
+                chunk c
+                JOIN {table_name} e ON e.chunk_id = c.chunk_id
+            WHERE
+                c.datasource_context_hash_id = ?
+                AND c.full_type = ?
+                AND c.content_hash IS NOT NULL
+            ORDER BY
+                c.chunk_id
+            """,
+            [datasource_context_hash_id, full_type],
+        ).fetchall()
+        return [(int(chunk_id), chunk_key, content_hash) for chunk_id, chunk_key, content_hash in rows]
 
-        return [int(r[0]) for r in rows]
+    def move_to_datasource_context_hash(self, *, chunk_ids: Sequence[int], datasource_context_hash_id: int) -> int:
+        """Attach existing chunks to another context hash.
 
-    @perf.perf_span("chunk_repo.refresh_keyword_index")
-    def _refresh_fts_index(self) -> None:
-        """Refreshs the Full Text Search index on the chunks in DuckDB.
+        Neither the content of the chunks nor their vectors change, so the keyword index is left untouched.
 
-        This function needs to be called each time there are any changes in the chunk table.
-        The FTS index is unfortunately not a standard index and needs to be rebuilt manually with each change.
+        Returns:
+            The number of moved chunks.
         """
-        self._conn.execute(f"PRAGMA create_fts_index('chunk', 'chunk_id', '{self._BM25_CHUNK_COLUMN}', overwrite=1);")
+        if not chunk_ids:
+            return 0
+
+        row = self._conn.execute(
+            """
+            UPDATE
+                chunk
+            SET
+                datasource_context_hash_id = ?
+            WHERE
+                chunk_id IN (SELECT unnest(?))
+            """,
+            [datasource_context_hash_id, list(chunk_ids)],
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    @perf.perf_span(
+        "chunk_repo.index_keywords",
+        attrs=lambda self, chunk_ids: {"chunk_count": len(chunk_ids)},
+    )
+    def _index_keywords(self, chunk_ids: Sequence[int]) -> None:
+        """Add the given chunks to the keyword (BM25) index.
+
+        Only the postings of these chunks are computed: the cost is proportional to the number of chunks written,
+        not to the size of the chunk table.
+        """
+        if not chunk_ids:
+            return
+
+        self._conn.execute(
+            f"""
+            INSERT INTO
+                keyword_index_term(term, chunk_id, tf)
+            WITH tokens AS (
+                SELECT
+                    c.chunk_id,
+                    unnest({tokenize_sql(f"c.{self._BM25_CHUNK_COLUMN}")}) AS token
+                FROM
+                    chunk c
+                WHERE
+                    c.chunk_id IN (SELECT unnest(?))
+            )
+            SELECT
+                {stem_sql("t.token")} AS term,
+                t.chunk_id,
+                count(*) AS tf
+            FROM
+                tokens t
+            WHERE
+                t.token <> ''
+                AND t.token NOT IN (SELECT word FROM keyword_index_stopword)
+            GROUP BY
+                term,
+                t.chunk_id
+            """,
+            [list(chunk_ids)],
+        )
+        self._conn.execute(
+            """
+            INSERT INTO
+                keyword_index_document(chunk_id, length)
+            SELECT
+                c.chunk_id,
+                COALESCE(sum(t.tf), 0) AS length
+            FROM
+                chunk c
+                LEFT JOIN keyword_index_term t ON t.chunk_id = c.chunk_id
+            WHERE
+                c.chunk_id IN (SELECT unnest(?))
+            GROUP BY
+                c.chunk_id
+            """,
+            [list(chunk_ids)],
+        )
+
+    def _unindex_keywords(self, chunk_ids: Sequence[int]) -> None:
+        self._unindex_keywords_where("chunk_id IN (SELECT unnest(?))", [list(chunk_ids)])
+
+    @perf.perf_span("chunk_repo.unindex_keywords")
+    def _unindex_keywords_where(self, chunk_filter_sql: str, params: Sequence[Any]) -> None:
+        """Remove the chunks matching the filter from the keyword (BM25) index.
+
+        This must be called before the chunks themselves are deleted.
+        """
+        for table in ("keyword_index_term", "keyword_index_document"):
+            self._conn.execute(
+                f"""
+                DELETE FROM
+                    {table}
+                WHERE
+                    chunk_id IN (SELECT chunk_id FROM chunk WHERE {chunk_filter_sql})
+                """,
+                params,
+            )
 
     @staticmethod
     def _row_to_dto(row: dict[str, Any]) -> ChunkDTO:
@@ -231,6 +390,8 @@ class ChunkRepository:
             chunk_id=int(row["chunk_id"]),
             full_type=row["full_type"],
             chunk_type=row["chunk_type"],
+            chunk_key=row.get("chunk_key"),
+            content_hash=row.get("content_hash"),
             datasource_id=row["datasource_id"],
             embeddable_text=row["embeddable_text"],
             display_text=row["display_text"],
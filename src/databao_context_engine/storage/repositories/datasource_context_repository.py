@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Sequence
 
 from duckdb import ConstraintException, DuckDBPyConnection
 
@@ -35,6 +35,51 @@ class DatasourceContextHashRepository:
         except ConstraintException as e:
             raise IntegrityError from e
 
+    def list_all_but_latest(
+        self, *, keep_latest: int, current_hashes: Sequence[tuple[str, str, str]] = ()
+    ) -> list[DatasourceContextHashDTO]:
+        """List the context hashes that are not among the `keep_latest` most recent complete ones of their datasource.
+
+        The current context hash of a datasource, given as (datasource_id, hash_algorithm, hash) in `current_hashes`,
+        is the most recent one whatever when it was indexed: a context file can be reverted to a context hash indexed
+        before others. The other context hashes are ranked from the most recently indexed. Incomplete context hashes are
+        always listed.
+
+        Returns:
+            The older and the incomplete context hashes, oldest first.
+        """
+        rows = fetchall_dicts(
+            cur=self._conn,
+            sql="""
+            WITH current_hashes AS (
+                SELECT
+                    unnest(CAST(? AS TEXT[])) AS datasource_id,
+                    unnest(CAST(? AS TEXT[])) AS hash_algorithm,
+                    unnest(CAST(? AS TEXT[])) AS hash
+            )
+            SELECT
+                h.*
+            FROM
+                datasource_context_hash h
+                LEFT JOIN current_hashes c USING (datasource_id, hash_algorithm, hash)
+            QUALIFY
+                h.is_complete IS FALSE
+                OR row_number() OVER (
+                    PARTITION BY h.datasource_id, h.is_complete IS NOT FALSE
+                    ORDER BY c.hash IS NOT NULL DESC, h.datasource_context_hash_id DESC
+                ) > ?
+            ORDER BY
+                h.datasource_context_hash_id
+            """,
+            params=[
+                [h[0] for h in current_hashes],
+                [h[1] for h in current_hashes],
+                [h[2] for h in current_hashes],
+                keep_latest,
+            ],
+        )
+        return [self._row_to_dto(r) for r in rows]
+
     def list(self) -> list[DatasourceContextHashDTO]:
         rows = fetchall_dicts(
             cur=self._conn,
@@ -68,6 +113,72 @@ class DatasourceContextHashRepository:
         )
         return self._row_to_dto(row) if row else None
 
+    def list_existing_hashes(self, *, hashes: Sequence[tuple[str, str, str]]) -> set[tuple[str, str, str]]:
+        """Return which of the given (datasource_id, hash_algorithm, hash) are indexed, in a single query.
+
+        Returns:
+            The subset of `hashes` that exist in the table with all their chunks.
+        """
+        if not hashes:
+            return set()
+
+        rows = self._conn.execute(
+            """
+            SELECT
+                h.datasource_id,
+                h.hash_algorithm,
+                h.hash
+            FROM
+                datasource_context_hash h
+                JOIN (
+                    SELECT
+                        unnest(?) AS datasource_id,
+                        unnest(?) AS hash_algorithm,
+                        unnest(?) AS hash
+                ) requested USING (datasource_id, hash_algorithm, hash)
+            WHERE
+                h.is_complete IS NOT FALSE
+            """,
+            [[h[0] for h in hashes], [h[1] for h in hashes], [h[2] for h in hashes]],
+        ).fetchall()
+        return {(str(datasource_id), str(hash_algorithm), str(hash_)) for datasource_id, hash_algorithm, hash_ in rows}
+
+    def get_latest_by_datasource_id(
+        self, *, datasource_id: str, excluded_hash_algorithm: str, excluded_hash: str
+    ) -> DatasourceContextHashDTO | None:
+        row = fetchone_dicts(
+            cur=self._conn,
+            sql="""
+            SELECT
+                *
+            FROM
+                datasource_context_hash
+            WHERE
+                datasource_id = ?
+                AND NOT (hash_algorithm = ? AND hash = ?)
+                AND is_complete IS NOT FALSE
+            ORDER BY
+                datasource_context_hash_id DESC
+            LIMIT 1
+            """,
+            params=[datasource_id, excluded_hash_algorithm, excluded_hash],
+        )
+        return self._row_to_dto(row) if row else None
+
+    def mark_incomplete(self, *, datasource_context_hash_id: int) -> None:
+        """Mark a context hash as no longer holding all its chunks, so that it isn't considered as indexed anymore."""
+        self._conn.execute(
+            """
+            UPDATE
+                datasource_context_hash
+            SET
+                is_complete = FALSE
+            WHERE
+                datasource_context_hash_id = ?
+            """,
+            [datasource_context_hash_id],
+        )
+
     def delete(self, *, datasource_context_hash_id: int) -> int:
         row = self._conn.execute(
             """
@@ -108,4 +219,5 @@ class DatasourceContextHashRepository:
             hash_algorithm=row["hash_algorithm"],
             hash=row["hash"],
             hashed_at=row["hashed_at"],
+            is_complete=row["is_complete"] is not False,
         )
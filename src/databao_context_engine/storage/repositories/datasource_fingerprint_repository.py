@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import Any
+
+from duckdb import DuckDBPyConnection
+
+from databao_context_engine.plugins.duckdb_tools import fetchone_dicts
+from databao_context_engine.storage.models import DatasourceFingerprintDTO
+
+
+class DatasourceFingerprintRepository:
+    def __init__(self, conn: DuckDBPyConnection):
+        self._conn = conn
+
+    def get(self, *, datasource_id: str) -> DatasourceFingerprintDTO | None:
+        row = fetchone_dicts(
+            cur=self._conn,
+            sql="""
+            SELECT
+                *
+            FROM
+                datasource_fingerprint
+            WHERE
+                datasource_id = ?
+            """,
+            params=[datasource_id],
+        )
+        return self._row_to_dto(row) if row else None
+
+    def put(self, *, datasource_id: str, fingerprint: str, context_hash: str) -> DatasourceFingerprintDTO:
+        """Record the fingerprint of a datasource, replacing the one recorded by its previous build.
+
+        Returns:
+            The recorded fingerprint.
+
+        Raises:
+            RuntimeError: If the database didn't return the recorded fingerprint.
+        """
+        row = fetchone_dicts(
+            cur=self._conn,
+            sql="""
+            INSERT OR REPLACE INTO
+                datasource_fingerprint(datasource_id, fingerprint, context_hash, built_at)
+            VALUES
+                (?, ?, ?, ?)
+            RETURNING
+                *
+            """,
+            params=[datasource_id, fingerprint, context_hash, datetime.now()],
+        )
+        if row is None:
+            raise RuntimeError("datasource_fingerprint creation returned no object")
+
+        return self._row_to_dto(row)
+
+    @staticmethod
+    def _row_to_dto(row: dict[str, Any]) -> DatasourceFingerprintDTO:
+        return DatasourceFingerprintDTO(
+            datasource_id=row["datasource_id"],
+            fingerprint=row["fingerprint"],
+            context_hash=row["context_hash"],
+            built_at=row["built_at"],
+        )
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import duckdb
+
+
+class DescriptionCacheRepository:
+    def __init__(self, conn: duckdb.DuckDBPyConnection):
+        self._conn = conn
+
+    def get(self, *, describer: str, model_id: str, prompt_hash: str, created_after: datetime) -> str | None:
+        """Look up the cached description of the given prompt hash, and mark it as used.
+
+        Descriptions cached before `created_after` are considered expired and are ignored.
+
+        Returns:
+            The cached description, or None if the prompt hash is not in the cache.
+        """
+        row = self._conn.execute(
+            """
+            UPDATE
+                description_cache
+            SET
+                last_used_at = ?
+            WHERE
+                describer = ?
+                AND model_id = ?
+                AND prompt_hash = ?
+                AND created_at >= ?
+            RETURNING
+                description
+            """,
+            [datetime.now(), describer, model_id, prompt_hash, created_after],
+        ).fetchone()
+
+        return str(row[0]) if row else None
+
+    def put(self, *, describer: str, model_id: str, prompt_hash: str, description: str) -> None:
+        """Add a description to the cache, replacing the description already cached for the same prompt hash."""
+        now = datetime.now()
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO description_cache (
+                describer, model_id, prompt_hash, description, created_at, last_used_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [describer, model_id, prompt_hash, description, now, now],
+        )
+
+    def count(self) -> int:
+        row = self._conn.execute("SELECT COUNT(*) FROM description_cache").fetchone()
+        return int(row[0]) if row else 0
+
+    def delete_created_before(self, *, created_before: datetime) -> int:
+        """Delete the descriptions cached before `created_before`.
+
+        Returns:
+            The number of deleted descriptions.
+        """
+        row = self._conn.execute(
+            """
+            DELETE FROM
+                description_cache
+            WHERE
+                created_at < ?
+            """,
+            [created_before],
+        ).fetchone()
+        # DuckDB returns the number of deleted rows as the result of a DELETE
+        return int(row[0]) if row else 0
+
+    def evict_least_recently_used(self, *, max_entries: int) -> int:
+        """Delete the least recently used descriptions until at most `max_entries` are left in the cache.
+
+        Returns:
+            The number of deleted descriptions.
+        """
+        row = self._conn.execute(
+            """
+            DELETE FROM
+                description_cache
+            WHERE
+                rowid IN (
+                    SELECT
+                        rowid
+                    FROM
+                        description_cache
+                    ORDER BY
+                        last_used_at DESC,
+                        created_at DESC
+                    OFFSET ?
+                )
+            """,
+            [max_entries],
+        ).fetchone()
+        return int(row[0]) if row else 0
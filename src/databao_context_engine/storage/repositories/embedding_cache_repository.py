@@ -0,0 +1,127 @@
+from array import array
+from collections.abc import Sequence
+from datetime import datetime
+
+import duckdb
+import pyarrow  # type: ignore[import-untyped]
+
+
+class EmbeddingCacheRepository:
+    def __init__(self, conn: duckdb.DuckDBPyConnection):
+        self._conn = conn
+
+    def get_many(self, *, embedder: str, model_id: str, text_hashes: Sequence[str]) -> dict[str, list[float]]:
+        """Look up the cached vectors of the given text hashes, and mark them as used.
+
+        Returns:
+            The cached vectors by text hash. Text hashes that are not in the cache are missing from the result.
+        """
+        if not text_hashes:
+            return {}
+
+        rows = self._conn.execute(
+            """
+            SELECT
+                text_hash,
+                vec
+            FROM
+                embedding_cache
+            WHERE
+                embedder = ?
+                AND model_id = ?
+                AND text_hash IN (SELECT unnest(?))
+            """,
+            [embedder, model_id, list(text_hashes)],
+        ).fetchall()
+        vecs = {str(text_hash): list(vec) for text_hash, vec in rows}
+
+        if vecs:
+            self._conn.execute(
+                """
+                UPDATE
+                    embedding_cache
+                SET
+                    last_used_at = ?
+                WHERE
+                    embedder = ?
+                    AND model_id = ?
+                    AND text_hash IN (SELECT unnest(?))
+                """,
+                [datetime.now(), embedder, model_id, list(vecs)],
+            )
+
+        return vecs
+
+    def put_many(
+        self,
+        *,
+        embedder: str,
+        model_id: str,
+        text_hashes: Sequence[str],
+        vecs: Sequence[Sequence[float]],
+    ) -> None:
+        """Add vectors to the cache, ignoring the text hashes that are already cached.
+
+        Like `EmbeddingRepository.bulk_insert`, the rows are ingested from an Arrow table, which is a lot faster than
+        binding each float from Python.
+        """
+        if not text_hashes:
+            return
+
+        flat = array("f")
+        offsets = [0]
+        for vec in vecs:
+            flat.extend(vec)
+            offsets.append(len(flat))
+
+        tbl = pyarrow.table(
+            {
+                "text_hash": pyarrow.array(text_hashes, type=pyarrow.string()),
+                "vec": pyarrow.ListArray.from_arrays(pyarrow.array(offsets, type=pyarrow.int32()), pyarrow.array(flat)),
+            }
+        )
+
+        view_name = "__tmp_embedding_cache"
+        self._conn.register(view_name, tbl)
+        try:
+            self._conn.execute(
+                f"""
+                INSERT OR IGNORE INTO embedding_cache (embedder, model_id, text_hash, vec)
+                SELECT ?, ?, text_hash, vec
+                FROM {view_name}
+                """,
+                [embedder, model_id],
+            )
+        finally:
+            self._conn.unregister(view_name)
+
+    def count(self) -> int:
+        row = self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()
+        return int(row[0]) if row else 0
+
+    def evict_least_recently_used(self, *, max_entries: int) -> int:
+        """Delete the least recently used vectors until at most `max_entries` are left in the cache.
+
+        Returns:
+            The number of deleted vectors.
+        """
+        row = self._conn.execute(
+            """
+            DELETE FROM
+                embedding_cache
+            WHERE
+                rowid IN (
+                    SELECT
+                        rowid
+                    FROM
+                        embedding_cache
+                    ORDER BY
+                        last_used_at DESC,
+                        created_at DESC
+                    OFFSET ?
+                )
+            """,
+            [max_entries],
+        ).fetchone()
+        # DuckDB returns the number of deleted rows as the result of a DELETE
+        return int(row[0]) if row else 0
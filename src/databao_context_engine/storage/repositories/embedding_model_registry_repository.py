@@ -2,8 +2,9 @@ from typing import Any, Optional
 
 import duckdb
 
-from databao_context_engine.plugins.duckdb_tools import fetchone_dicts
+from databao_context_engine.plugins.duckdb_tools import fetchall_dicts, fetchone_dicts
 from databao_context_engine.services.table_name_policy import TableNamePolicy
+from databao_context_engine.storage.embedding_storage_format import EmbeddingStorageFormat
 from databao_context_engine.storage.models import EmbeddingModelRegistryDTO
 
 
@@ -18,19 +19,20 @@ class EmbeddingModelRegistryRepository:
         model_id: str,
         dim: int,
         table_name: str,
+        storage_format: EmbeddingStorageFormat = EmbeddingStorageFormat.FLOAT32,
     ) -> EmbeddingModelRegistryDTO:
         TableNamePolicy.validate_table_name(table_name=table_name)
         row = fetchone_dicts(
             cur=self._conn,
             sql="""
         INSERT INTO
-            embedding_model_registry(embedder, model_id, dim, table_name)
+            embedding_model_registry(embedder, model_id, dim, table_name, storage_format)
         VALUES
-            (?, ?, ?, ?)
+            (?, ?, ?, ?, ?)
         RETURNING
             *
         """,
-            params=[embedder, model_id, dim, table_name],
+            params=[embedder, model_id, dim, table_name, storage_format.value],
         )
         if row is None:
             raise RuntimeError("Embedding_model_registry creatuib returned no object")
@@ -57,6 +59,48 @@ class EmbeddingModelRegistryRepository:
         )
         return self._row_to_dto(row) if row else None
 
+    def get_by_table_name(self, *, table_name: str) -> Optional[EmbeddingModelRegistryDTO]:
+        row = fetchone_dicts(
+            cur=self._conn,
+            sql="""
+        SELECT
+            *
+        FROM
+            embedding_model_registry
+        WHERE
+            table_name = ?
+        """,
+            params=[table_name],
+        )
+        return self._row_to_dto(row) if row else None
+
+    def update_storage_format(self, *, table_name: str, storage_format: EmbeddingStorageFormat) -> None:
+        self._conn.execute(
+            """
+            UPDATE
+                embedding_model_registry
+            SET
+                storage_format = ?
+            WHERE
+                table_name = ?
+            """,
+            [storage_format.value, table_name],
+        )
+
+    def list(self) -> list[EmbeddingModelRegistryDTO]:
+        rows = fetchall_dicts(
+            cur=self._conn,
+            sql="""
+        SELECT
+            *
+        FROM
+            embedding_model_registry
+        ORDER BY
+            table_name
+        """,
+        )
+        return [self._row_to_dto(r) for r in rows]
+
     def delete(
         self,
         *,
@@ -85,4 +129,5 @@ class EmbeddingModelRegistryRepository:
             dim=int(row["dim"]),
             table_name=str(row["table_name"]),
             created_at=row["created_at"],
+            storage_format=EmbeddingStorageFormat(row["storage_format"] or EmbeddingStorageFormat.FLOAT32),
         )
@@ -7,13 +7,27 @@ from _duckdb import ConstraintException
 
 from databao_context_engine.plugins.duckdb_tools import fetchall_dicts, fetchone_dicts
 from databao_context_engine.services.table_name_policy import TableNamePolicy
+from databao_context_engine.storage.embedding_storage_format import (
+    EmbeddingStorageFormat,
+    int8_codes_sql,
+    int8_vectors_table_name,
+)
 from databao_context_engine.storage.exceptions.exceptions import IntegrityError
 from databao_context_engine.storage.models import EmbeddingDTO
+from databao_context_engine.storage.repositories.embedding_model_registry_repository import (
+    EmbeddingModelRegistryRepository,
+)
 
 
 class EmbeddingRepository:
-    def __init__(self, conn: duckdb.DuckDBPyConnection):
+    def __init__(
+        self, conn: duckdb.DuckDBPyConnection, *, registry_repo: EmbeddingModelRegistryRepository | None = None
+    ):
         self._conn = conn
+        self._registry_repo = registry_repo or EmbeddingModelRegistryRepository(conn)
+        # The storage format of a shard only changes when the EmbeddingShardResolver converts it, before a build writes
+        # to it, so it is looked up once per table
+        self._int8_dimensions: dict[str, int | None] = {}
 
     def create(
         self,
@@ -25,21 +39,13 @@ class EmbeddingRepository:
         try:
             TableNamePolicy.validate_table_name(table_name=table_name)
 
-            row = fetchone_dicts(
-                cur=self._conn,
-                sql=f"""
-                INSERT INTO
-                    {table_name} (chunk_id, vec)
-                VALUES
-                    (?, ?)
-                RETURNING
-                    *
-                """,
-                params=[chunk_id, vec],
+            self._insert(
+                table_name, source_sql="(SELECT CAST(? AS BIGINT) AS chunk_id, ? AS vec)", params=[chunk_id, list(vec)]
             )
-            if row is None:
+            created = self.get(table_name=table_name, chunk_id=chunk_id)
+            if created is None:
                 raise RuntimeError("Embedding creation returned no object")
-            return self._row_to_dto(row)
+            return created
         except ConstraintException as e:
             raise IntegrityError from e
 
@@ -52,7 +58,7 @@ class EmbeddingRepository:
             SELECT 
                 *
             FROM 
-                {table_name}
+                {self._build_embeddings_sql(table_name)}
             WHERE 
                 chunk_id = ?
             """,
@@ -68,10 +74,11 @@ class EmbeddingRepository:
         vec: Sequence[float],
     ) -> Optional[EmbeddingDTO]:
         TableNamePolicy.validate_table_name(table_name=table_name)
+        int8_dimension = self._get_int8_dimension(table_name)
         self._conn.execute(
             f"""
             UPDATE 
-                {table_name}
+                {table_name if int8_dimension is None else int8_vectors_table_name(table_name)}
             SET 
                 vec = ?
             WHERE 
@@ -79,31 +86,33 @@ class EmbeddingRepository:
             """,
             [list(vec), chunk_id],
         )
+        if int8_dimension is not None:
+            self._conn.execute(
+                f"""
+                UPDATE
+                    {table_name} e
+                SET
+                    code = {int8_codes_sql("v.vec", dimension=int8_dimension)}
+                FROM
+                    {int8_vectors_table_name(table_name)} v
+                WHERE
+                    e.chunk_id = v.chunk_id
+                    AND e.chunk_id = ?
+                """,
+                [chunk_id],
+            )
         return self.get(table_name=table_name, chunk_id=chunk_id)
 
     def delete(self, *, table_name: str, chunk_id: int) -> int:
         TableNamePolicy.validate_table_name(table_name=table_name)
-        row = self._conn.execute(
-            f"""
-            DELETE FROM 
-                {table_name}
-            WHERE 
-                chunk_id = ?
-            RETURNING 
-                chunk_id
-            """,
-            [chunk_id],
-        ).fetchone()
-        return 1 if row else 0
+        return self._delete_where(table_name, condition_sql="chunk_id = ?", params=[chunk_id])
 
     def delete_by_datasource_id(self, *, table_name: str, datasource_id: str) -> int:
         TableNamePolicy.validate_table_name(table_name=table_name)
 
-        deleted = self._conn.execute(
-            f"""
-            DELETE FROM
-                {table_name}
-            WHERE
+        return self._delete_where(
+            table_name,
+            condition_sql="""
                 chunk_id IN (
                     SELECT
                         chunk_id
@@ -113,18 +122,15 @@ class EmbeddingRepository:
                         datasource_id = ?
                 )
             """,
-            [datasource_id],
-        ).rowcount
-        return int(deleted or 0)
+            params=[datasource_id],
+        )
 
     def delete_by_datasource_context_hash_id(self, *, table_name: str, datasource_context_hash_id: int) -> int:
         TableNamePolicy.validate_table_name(table_name=table_name)
 
-        deleted = self._conn.execute(
-            f"""
-            DELETE FROM
-                {table_name}
-            WHERE
+        return self._delete_where(
+            table_name,
+            condition_sql="""
                 chunk_id IN (
                     SELECT
                         chunk_id
@@ -134,9 +140,48 @@ class EmbeddingRepository:
                         datasource_context_hash_id = ?
                 )
             """,
-            [datasource_context_hash_id],
-        ).rowcount
-        return int(deleted or 0)
+            params=[datasource_context_hash_id],
+        )
+
+    def delete_orphans(self, *, table_name: str) -> int:
+        """Delete the vectors whose chunk doesn't exist anymore.
+
+        Returns:
+            The number of deleted vectors.
+        """
+        TableNamePolicy.validate_table_name(table_name=table_name)
+
+        return self._delete_where(
+            table_name,
+            condition_sql="""
+                chunk_id NOT IN (
+                    SELECT
+                        chunk_id
+                    FROM
+                        chunk
+                )
+            """,
+        )
+
+    def count_searchable(self, *, table_name: str) -> int:
+        """Count the vectors reachable by a search, i.e. attached to a chunk of an existing context hash.
+
+        Returns:
+            The number of searchable vectors.
+        """
+        TableNamePolicy.validate_table_name(table_name=table_name)
+
+        row = self._conn.execute(
+            f"""
+            SELECT
+                count(*)
+            FROM
+                {table_name} e
+                JOIN chunk c ON e.chunk_id = c.chunk_id
+                JOIN datasource_context_hash h ON c.datasource_context_hash_id = h.datasource_context_hash_id
+            """
+        ).fetchone()
+        return int(row[0]) if row else 0
 
     def list(self, table_name: str) -> list[EmbeddingDTO]:
         TableNamePolicy.validate_table_name(table_name=table_name)
@@ -146,7 +191,7 @@ class EmbeddingRepository:
         SELECT
             *
         FROM                
-            {table_name}
+            {self._build_embeddings_sql(table_name)}
         ORDER BY 
             chunk_id DESC
         """,
@@ -181,15 +226,80 @@ class EmbeddingRepository:
         view_name = "__tmp_embeddings"
         self._conn.register(view_name, tbl)
         try:
+            self._insert(table_name, source_sql=view_name)
+        finally:
+            self._conn.unregister(view_name)
+
+    def _insert(self, table_name: str, *, source_sql: str, params: Sequence[Any] | None = None) -> None:
+        """Insert the `chunk_id` and `vec` columns of a source, as vectors or as the codes of INT8 shards."""
+        int8_dimension = self._get_int8_dimension(table_name)
+        if int8_dimension is None:
             self._conn.execute(
                 f"""
                 INSERT INTO {table_name} (chunk_id, vec)
                 SELECT chunk_id, vec
-                FROM {view_name}
-                """
+                FROM {source_sql}
+                """,
+                params,
             )
-        finally:
-            self._conn.unregister(view_name)
+            return
+
+        self._conn.execute(
+            f"""
+            INSERT INTO {int8_vectors_table_name(table_name)} (chunk_id, vec)
+            SELECT chunk_id, vec
+            FROM {source_sql}
+            """,
+            params,
+        )
+        self._conn.execute(
+            f"""
+            INSERT INTO {table_name} (chunk_id, code)
+            SELECT chunk_id, {int8_codes_sql("vec", dimension=int8_dimension)}
+            FROM {source_sql}
+            """,
+            params,
+        )
+
+    def _delete_where(self, table_name: str, *, condition_sql: str, params: Sequence[Any] | None = None) -> int:
+        """Delete the vectors matching a condition on their chunk_id, along with the full precision vectors of INT8 shards.
+
+        Returns:
+            The number of deleted vectors.
+        """
+        row = self._conn.execute(f"DELETE FROM {table_name} WHERE {condition_sql}", params).fetchone()
+        if self._get_int8_dimension(table_name) is not None:
+            self._conn.execute(f"DELETE FROM {int8_vectors_table_name(table_name)} WHERE {condition_sql}", params)
+        return int(row[0]) if row else 0
+
+    def _build_embeddings_sql(self, table_name: str) -> str:
+        """Build the relation of the `chunk_id`, `vec` and `created_at` of a shard, whatever its storage format.
+
+        Returns:
+            The table name, or a subquery joining the codes of an INT8 shard to its full precision vectors.
+        """
+        if self._get_int8_dimension(table_name) is None:
+            return table_name
+
+        return f"""(
+            SELECT
+                e.chunk_id,
+                v.vec,
+                e.created_at
+            FROM
+                {table_name} e
+                JOIN {int8_vectors_table_name(table_name)} v ON e.chunk_id = v.chunk_id
+        )"""
+
+    def _get_int8_dimension(self, table_name: str) -> int | None:
+        if table_name not in self._int8_dimensions:
+            registered_shard = self._registry_repo.get_by_table_name(table_name=table_name)
+            self._int8_dimensions[table_name] = (
+                registered_shard.dim
+                if registered_shard is not None and registered_shard.storage_format == EmbeddingStorageFormat.INT8
+                else None
+            )
+        return self._int8_dimensions[table_name]
 
     @staticmethod
     def _row_to_dto(row: dict[str, Any]) -> EmbeddingDTO:
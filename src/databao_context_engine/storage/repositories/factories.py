@@ -2,6 +2,11 @@ from duckdb import DuckDBPyConnection
 
 from databao_context_engine.storage.repositories.chunk_repository import ChunkRepository
 from databao_context_engine.storage.repositories.datasource_context_repository import DatasourceContextHashRepository
+from databao_context_engine.storage.repositories.datasource_fingerprint_repository import (
+    DatasourceFingerprintRepository,
+)
+from databao_context_engine.storage.repositories.description_cache_repository import DescriptionCacheRepository
+from databao_context_engine.storage.repositories.embedding_cache_repository import EmbeddingCacheRepository
 from databao_context_engine.storage.repositories.embedding_model_registry_repository import (
     EmbeddingModelRegistryRepository,
 )
@@ -22,3 +27,15 @@ def create_embedding_repository(conn: DuckDBPyConnection) -> EmbeddingRepository
 
 def create_registry_repository(conn: DuckDBPyConnection) -> EmbeddingModelRegistryRepository:
     return EmbeddingModelRegistryRepository(conn)
+
+
+def create_embedding_cache_repository(conn: DuckDBPyConnection) -> EmbeddingCacheRepository:
+    return EmbeddingCacheRepository(conn)
+
+
+def create_description_cache_repository(conn: DuckDBPyConnection) -> DescriptionCacheRepository:
+    return DescriptionCacheRepository(conn)
+
+
+def create_datasource_fingerprint_repository(conn: DuckDBPyConnection) -> DatasourceFingerprintRepository:
+    return DatasourceFingerprintRepository(conn)
@@ -1,3 +1,5 @@
+import json
+import threading
 from datetime import datetime
 
 import pytest
@@ -9,7 +11,10 @@ from databao_context_engine.datasources.datasource_context import DatasourceCont
 from databao_context_engine.datasources.types import PreparedConfig, PreparedFile
 from databao_context_engine.pluginlib.build_plugin import DatasourceType
 from databao_context_engine.plugins.plugin_loader import NoPluginFoundForDatasource
+from databao_context_engine.progress.progress import ProgressKind
+from databao_context_engine.project.layout import get_performance_logs_file
 from databao_context_engine.serialization.yaml import to_yaml_string
+from databao_context_engine.storage.models import DatasourceFingerprintDTO
 
 
 def _result(name: str = "files/demo.md", typ: str = "files/md", context: dict | None = None) -> BuiltDatasourceContext:
@@ -40,7 +45,9 @@ def _context(datasource_path: str, context: str = "a") -> DatasourceContext:
 
 @pytest.fixture
 def mock_build_service(mocker):
-    return mocker.Mock(name="BuildService")
+    build_service = mocker.Mock(name="BuildService")
+    build_service.get_source_fingerprint.return_value = None
+    return build_service
 
 
 @pytest.fixture
@@ -95,7 +102,7 @@ def test_build_skips_source_without_plugin(stub_sources, stub_prepare, mock_buil
     assert len(results) == 1
     assert results[0].datasource_id == datasource_id
     assert results[0].status == DatasourceStatus.SKIPPED
-    mock_build_service.index_built_context.assert_not_called()
+    mock_build_service.chunk_built_context.assert_not_called()
 
 
 def test_build_processes_file_source_and_exports_and_indexes(
@@ -137,12 +144,55 @@ def test_build_processes_file_source_and_exports_and_indexes(
 
     mock_build_service.build_context.assert_called_once()
 
-    mock_build_service.index_built_context.assert_called_once()
-    index_call = mock_build_service.index_built_context.call_args
-    assert index_call.kwargs["built_context"] == built_context
-    assert index_call.kwargs["context_hash"].datasource_id == datasource_id
-    assert index_call.kwargs["context_hash"].hash_algorithm == "XXH3_128"
-    assert index_call.kwargs["context_hash"].hashed_at > now_before_test
+    mock_build_service.chunk_built_context.assert_called_once()
+    chunk_call = mock_build_service.chunk_built_context.call_args
+    assert chunk_call.kwargs["built_context"] == built_context
+    assert chunk_call.kwargs["context_hash"].datasource_id == datasource_id
+    assert chunk_call.kwargs["context_hash"].hash_algorithm == "XXH3_128"
+    assert chunk_call.kwargs["context_hash"].hashed_at > now_before_test
+
+    mock_build_service.embed_chunks.assert_called_once_with(
+        built_context=built_context,
+        chunks=mock_build_service.chunk_built_context.return_value,
+        progress=None,
+    )
+    mock_build_service.persist_chunk_embeddings.assert_called_once_with(
+        built_context=built_context,
+        context_hash=chunk_call.kwargs["context_hash"],
+        chunk_embeddings=mock_build_service.embed_chunks.return_value,
+        progress=None,
+    )
+    mock_build_service.evict_embedding_cache.assert_called_once_with()
+
+
+def test_build_does_not_embed_when_there_is_nothing_to_index(
+    stub_sources, stub_prepare, mock_build_service, project_layout
+):
+    datasource_id = _datasource_id("files/indexed.md")
+    stub_sources([datasource_id])
+    stub_prepare(
+        [
+            PreparedFile(
+                datasource_id=datasource_id,
+                datasource_type=DatasourceType(full_type="files/md"),
+            )
+        ]
+    )
+    mock_build_service.build_context.return_value = _result(name="files/indexed.md")
+    mock_build_service.chunk_built_context.return_value = []
+
+    results = build_runner.build(
+        project_layout=project_layout,
+        build_service=mock_build_service,
+        datasource_ids=None,
+        should_index=True,
+        should_enrich_context=False,
+    )
+
+    assert [result.status for result in results] == [DatasourceStatus.OK]
+    assert results[0].context_file_path == datasource_id.absolute_path_to_context_file(project_layout)
+    mock_build_service.embed_chunks.assert_not_called()
+    mock_build_service.persist_chunk_embeddings.assert_not_called()
 
 
 def test_build_skips_indexing_when_disabled(stub_sources, stub_prepare, mock_build_service, project_layout):
@@ -168,7 +218,7 @@ def test_build_skips_indexing_when_disabled(stub_sources, stub_prepare, mock_bui
 
     assert len(results) == 1
     assert results[0].status == DatasourceStatus.OK
-    mock_build_service.index_built_context.assert_not_called()
+    mock_build_service.chunk_built_context.assert_not_called()
 
 
 def test_build_enriches_before_export_and_index(stub_sources, stub_prepare, mock_build_service, project_layout):
@@ -201,10 +251,10 @@ def test_build_enriches_before_export_and_index(stub_sources, stub_prepare, mock
     assert "enriched: true" in written_text
     assert "raw: true" not in written_text
     mock_build_service.enrich_built_context.assert_called_once_with(built_context=built_context, progress=None)
-    mock_build_service.index_built_context.assert_called_once()
-    index_call = mock_build_service.index_built_context.call_args
-    assert index_call.kwargs["built_context"] == enriched_context
-    assert index_call.kwargs["context_hash"].datasource_id == datasource_id
+    mock_build_service.chunk_built_context.assert_called_once()
+    chunk_call = mock_build_service.chunk_built_context.call_args
+    assert chunk_call.kwargs["built_context"] == enriched_context
+    assert chunk_call.kwargs["context_hash"].datasource_id == datasource_id
 
 
 def test_build_returns_failed_result_and_continues_on_service_exception(
@@ -241,6 +291,126 @@ def test_build_returns_failed_result_and_continues_on_service_exception(
     assert results[1].datasource_id == datasource_b
 
 
+def test_build_runs_datasources_in_parallel_and_serializes_indexing(
+    stub_sources, mocker, mock_build_service, project_layout
+):
+    datasource_ids = [_datasource_id(f"files/{name}.md") for name in ("a", "b", "c")]
+    stub_sources(datasource_ids)
+    mocker.patch.object(
+        build_runner,
+        "prepare_source",
+        side_effect=lambda _project_layout, datasource_id: PreparedFile(
+            datasource_id=datasource_id, datasource_type=DatasourceType(full_type="files/md")
+        ),
+    )
+
+    # Every build waits for the others: this would time out if datasources were built sequentially
+    all_building = threading.Barrier(len(datasource_ids), timeout=5)
+
+    def build_context(*, prepared_source, progress, incremental):
+        all_building.wait()
+        return _result(name=str(prepared_source.datasource_id))
+
+    concurrent_indexing = 0
+    max_concurrent_indexing = 0
+    counter_lock = threading.Lock()
+
+    def persist_chunk_embeddings(**_):
+        nonlocal concurrent_indexing, max_concurrent_indexing
+        with counter_lock:
+            concurrent_indexing += 1
+            max_concurrent_indexing = max(max_concurrent_indexing, concurrent_indexing)
+        threading.Event().wait(0.05)
+        with counter_lock:
+            concurrent_indexing -= 1
+
+    mock_build_service.build_context.side_effect = build_context
+    mock_build_service.persist_chunk_embeddings.side_effect = persist_chunk_embeddings
+    events = []
+
+    results = build_runner.build(
+        project_layout=project_layout,
+        build_service=mock_build_service,
+        datasource_ids=None,
+        should_index=True,
+        should_enrich_context=False,
+        progress=events.append,
+        max_parallel_datasources=3,
+    )
+
+    assert [result.datasource_id for result in results] == datasource_ids
+    assert all(result.status == DatasourceStatus.OK for result in results)
+    assert max_concurrent_indexing == 1
+
+    finished = [event for event in events if event.kind == ProgressKind.DATASOURCE_FINISHED]
+    assert sorted(event.datasource_index for event in finished) == [1, 2, 3]
+    assert {event.datasource_id for event in finished} == {str(datasource_id) for datasource_id in datasource_ids}
+
+    records = [
+        json.loads(line) for line in get_performance_logs_file(project_layout.project_dir).read_text().splitlines()
+    ]
+    build_span = next(record for record in records if record.get("name") == "build.total")
+    datasource_spans = [record for record in records if record.get("name") == "datasource.total"]
+    assert {span["datasource_id"] for span in datasource_spans} == {
+        str(datasource_id) for datasource_id in datasource_ids
+    }
+    assert all(span["parent_span_id"] == build_span["span_id"] for span in datasource_spans)
+
+
+def test_build_introspects_next_datasource_while_embedding(stub_sources, mocker, mock_build_service, project_layout):
+    datasource_a = _datasource_id("files/a.md")
+    datasource_b = _datasource_id("files/b.md")
+    stub_sources([datasource_a, datasource_b])
+    mocker.patch.object(
+        build_runner,
+        "prepare_source",
+        side_effect=lambda _project_layout, datasource_id: PreparedFile(
+            datasource_id=datasource_id, datasource_type=DatasourceType(full_type="files/md")
+        ),
+    )
+
+    b_is_introspected = threading.Event()
+    a_is_embedding = threading.Event()
+
+    def build_context(*, prepared_source, progress, incremental):
+        if prepared_source.datasource_id == datasource_b:
+            # B can only be introspected while A is being embedded
+            assert a_is_embedding.wait(timeout=5)
+            b_is_introspected.set()
+        return _result(name=str(prepared_source.datasource_id))
+
+    def embed_chunks(*, built_context, chunks, progress):
+        if built_context.datasource_id == str(datasource_a):
+            a_is_embedding.set()
+            assert b_is_introspected.wait(timeout=5)
+        return []
+
+    mock_build_service.build_context.side_effect = build_context
+    mock_build_service.embed_chunks.side_effect = embed_chunks
+
+    results = build_runner.build(
+        project_layout=project_layout,
+        build_service=mock_build_service,
+        datasource_ids=None,
+        should_index=True,
+        should_enrich_context=False,
+    )
+
+    assert [(result.datasource_id, result.status) for result in results] == [
+        (datasource_a, DatasourceStatus.OK),
+        (datasource_b, DatasourceStatus.OK),
+    ]
+    assert mock_build_service.persist_chunk_embeddings.call_count == 2
+
+    records = [
+        json.loads(line) for line in get_performance_logs_file(project_layout.project_dir).read_text().splitlines()
+    ]
+    build_span = next(record for record in records if record.get("name") == "build.total")
+    stages = build_span["attrs"]["pipeline_stages"]
+    assert list(stages) == ["introspect", "export", "chunk", "embed", "persist"]
+    assert all(stage["items"] == 2 for stage in stages.values())
+
+
 def test_run_indexing_returns_ok_result(mock_build_service, project_layout):
     ctx = DatasourceContext(
         datasource_id=_datasource_id("files/one.md"),
@@ -262,6 +432,7 @@ def test_run_indexing_returns_ok_result(mock_build_service, project_layout):
     assert len(results) == 1
     assert results[0].status == DatasourceStatus.OK
     mock_build_service.index_datasource_context.assert_called_once_with(context=ctx, progress=None)
+    mock_build_service.evict_embedding_cache.assert_called_once_with()
 
 
 def test_run_indexing_returns_failed_result_and_continues_on_exception(mock_build_service, project_layout):
@@ -355,6 +526,78 @@ def test_build_skips_disabled_config_source(stub_sources, stub_prepare, mock_bui
     }
 
 
+def test_build_skips_unchanged_datasource(stub_sources, stub_prepare, mock_build_service, project_layout):
+    datasource_id = _datasource_id("databases/unchanged.yaml")
+    stub_sources([datasource_id])
+    stub_prepare(
+        [
+            PreparedConfig(
+                datasource_id=datasource_id,
+                datasource_type=DatasourceType(full_type="databases/duckdb"),
+                config={"type": "databases/duckdb"},
+                datasource_name="unchanged",
+            )
+        ]
+    )
+    built_at = datetime(2026, 1, 1)
+    mock_build_service.get_source_fingerprint.return_value = "fingerprint"
+    mock_build_service.find_unchanged_build.return_value = DatasourceFingerprintDTO(
+        datasource_id=str(datasource_id), fingerprint="fingerprint", context_hash="hash", built_at=built_at
+    )
+
+    results = build_runner.build(
+        project_layout=project_layout,
+        build_service=mock_build_service,
+        datasource_ids=None,
+        should_index=True,
+        should_enrich_context=False,
+    )
+
+    assert len(results) == 1
+    assert results[0].status == DatasourceStatus.OK
+    assert results[0].context_built_at == built_at
+    assert results[0].context_file_path == datasource_id.absolute_path_to_context_file(project_layout)
+    mock_build_service.find_unchanged_build.assert_called_once_with(
+        datasource_id=datasource_id, fingerprint="fingerprint", should_index=True
+    )
+    mock_build_service.build_context.assert_not_called()
+    mock_build_service.chunk_built_context.assert_not_called()
+    mock_build_service.record_source_fingerprint.assert_not_called()
+
+
+def test_build_records_fingerprint_of_forced_build(stub_sources, stub_prepare, mock_build_service, project_layout):
+    datasource_id = _datasource_id("databases/forced.yaml")
+    stub_sources([datasource_id])
+    stub_prepare(
+        [
+            PreparedConfig(
+                datasource_id=datasource_id,
+                datasource_type=DatasourceType(full_type="databases/duckdb"),
+                config={"type": "databases/duckdb"},
+                datasource_name="forced",
+            )
+        ]
+    )
+    mock_build_service.get_source_fingerprint.return_value = "fingerprint"
+    mock_build_service.build_context.return_value = _result(name="databases/forced.yaml", typ="databases/duckdb")
+
+    results = build_runner.build(
+        project_layout=project_layout,
+        build_service=mock_build_service,
+        datasource_ids=None,
+        should_index=False,
+        should_enrich_context=False,
+        force=True,
+    )
+
+    assert results[0].status == DatasourceStatus.OK
+    mock_build_service.find_unchanged_build.assert_not_called()
+    assert mock_build_service.build_context.call_args.kwargs["incremental"] is False
+    record_call = mock_build_service.record_source_fingerprint.call_args
+    assert record_call.kwargs["fingerprint"] == "fingerprint"
+    assert record_call.kwargs["context_hash"].datasource_id == datasource_id
+
+
 def test_run_enrich_context_returns_ok_result(project_layout, mock_build_service):
     datasource_id = _datasource_id("files/enrich.md")
     context = _context("files/enrich.md", context=to_yaml_string({"type": "files/md"}))
@@ -7,11 +7,15 @@ from pydantic import BaseModel
 
 from databao_context_engine import DatasourceContext, DatasourceId
 from databao_context_engine.build_sources.build_service import BuildService
+from databao_context_engine.build_sources.export_results import export_build_result
 from databao_context_engine.build_sources.plugin_execution import BuiltDatasourceContext
-from databao_context_engine.datasources.datasource_context import DatasourceContextHash
+from databao_context_engine.datasources.datasource_context import DatasourceContextHash, hash_context_file
 from databao_context_engine.datasources.types import PreparedConfig, PreparedDatasource
 from databao_context_engine.pluginlib.build_plugin import DatasourceType, DefaultBuildDatasourcePlugin
 from databao_context_engine.plugins.plugin_loader import DatabaoContextPluginLoader, NoPluginFoundForDatasource
+from databao_context_engine.storage.repositories.datasource_fingerprint_repository import (
+    DatasourceFingerprintRepository,
+)
 from tests.utils.dummy_build_plugin import DummyDefaultDatasourcePlugin, DummyEnrichableDatasourcePlugin
 
 
@@ -75,6 +79,19 @@ class TypedDummyPlugin(DefaultBuildDatasourcePlugin):
         return []
 
 
+class IncrementalDummyPlugin(TypedDummyPlugin):
+    id = "tests/incremental_dummy"
+    name = "Incremental Dummy Plugin"
+
+    def supported_types(self) -> set[str]:
+        return {"incremental_dummy"}
+
+    def update_context(
+        self, full_type: str, datasource_name: str, file_config: dict[str, Any], previous_context: Any
+    ) -> Any:
+        return {"title": f"updated:{previous_context.title}"}
+
+
 @pytest.fixture
 def chunk_embed_svc(mocker):
     return mocker.Mock(name="ChunkEmbeddingService")
@@ -126,6 +143,24 @@ def test_build_context_bubbles_execute_plugin_error(svc, mocker):
         svc.build_context(prepared_source=prepared)
 
 
+def test_build_context_incremental_gives_the_previous_context_to_the_plugin(chunk_embed_svc, project_layout):
+    plugin_loader = DatabaoContextPluginLoader(
+        plugins_by_type={DatasourceType(full_type="incremental_dummy"): IncrementalDummyPlugin()}
+    )
+    svc = BuildService(
+        project_layout=project_layout, chunk_embedding_service=chunk_embed_svc, plugin_loader=plugin_loader
+    )
+    prepared = mk_prepared_config(path="dummy/source.yaml", full_type="incremental_dummy")
+
+    # Without a previous context, the context is built from scratch
+    first_build = svc.build_context(prepared_source=prepared, incremental=True)
+    assert first_build.context == {"title": "demo"}
+    export_build_result(project_layout.output_dir, first_build)
+
+    assert svc.build_context(prepared_source=prepared, incremental=True).context == {"title": "updated:demo"}
+    assert svc.build_context(prepared_source=prepared).context == {"title": "demo"}
+
+
 def test_build_context_raises_when_plugin_is_missing(svc):
     prepared = mk_prepared_config(path="dummy/source.yaml", full_type="missing_plugin")
 
@@ -218,6 +253,25 @@ def test_index_built_context_embeds_using_datasource_type_lookup(svc, chunk_embe
     )
 
 
+def test_chunk_built_context_returns_no_chunks_when_already_indexed(svc, chunk_embed_svc):
+    built_context = mk_result(name="dummy/source.yaml", typ="dummy_default", result={"ok": True})
+    context_hash = DatasourceContextHash(
+        datasource_id=DatasourceId.from_string_repr("dummy/source.yaml"),
+        hash="hash-123",
+        hash_algorithm="XXH3_128",
+        hashed_at=datetime.now(),
+    )
+
+    chunk_embed_svc.is_context_already_indexed.return_value = False
+    assert svc.chunk_built_context(built_context=built_context, context_hash=context_hash) == (
+        DummyDefaultDatasourcePlugin().divide_context_into_chunks({"ok": True})
+    )
+
+    chunk_embed_svc.is_context_already_indexed.return_value = True
+    assert svc.chunk_built_context(built_context=built_context, context_hash=context_hash) == []
+    chunk_embed_svc.embed_chunks.assert_not_called()
+
+
 def test_index_datasource_context_no_chunks_skips_embed(svc, chunk_embed_svc):
     ctx = mk_context(
         path="dummy/enrichable.yaml",
@@ -322,7 +376,7 @@ def test_index_context_if_necessary_reindexes_only_stale_contexts(svc, chunk_emb
         context_hash=stale_hash,
     )
 
-    chunk_embed_svc.is_context_already_indexed.side_effect = [False, True]
+    chunk_embed_svc.get_contexts_not_indexed.return_value = [stale_hash]
     get_datasource_context = mocker.patch(
         "databao_context_engine.build_sources.build_service.get_datasource_context",
         return_value=context,
@@ -331,5 +385,65 @@ def test_index_context_if_necessary_reindexes_only_stale_contexts(svc, chunk_emb
 
     svc.index_context_if_necessary([stale_hash, fresh_hash])
 
+    chunk_embed_svc.get_contexts_not_indexed.assert_called_once_with([stale_hash, fresh_hash])
     get_datasource_context.assert_called_once_with(svc._project_layout, stale_hash.datasource_id)
     index_datasource_context.assert_called_once_with(context=context, force_index=True)
+    chunk_embed_svc.evict_embedding_cache.assert_called_once_with()
+
+
+def test_get_source_fingerprint_covers_the_config_of_the_datasource(
+    chunk_embed_svc, project_layout, plugin_loader, conn, mocker
+):
+    svc = BuildService(
+        project_layout=project_layout,
+        chunk_embedding_service=chunk_embed_svc,
+        plugin_loader=plugin_loader,
+        fingerprint_repo=DatasourceFingerprintRepository(conn),
+    )
+    prepared = mk_prepared_config(path="dummy/source.yaml", full_type="dummy_default")
+
+    assert svc.get_source_fingerprint(prepared_source=prepared, should_enrich_context=False) is None
+
+    mocker.patch.object(DummyDefaultDatasourcePlugin, "get_source_fingerprint", return_value="catalog-fingerprint")
+    fingerprint = svc.get_source_fingerprint(prepared_source=prepared, should_enrich_context=False)
+
+    assert fingerprint is not None
+    assert svc.get_source_fingerprint(prepared_source=prepared, should_enrich_context=False) == fingerprint
+    assert svc.get_source_fingerprint(prepared_source=prepared, should_enrich_context=True) != fingerprint
+    other_config = mk_prepared_config(
+        path="dummy/source.yaml", full_type="dummy_default", config={"type": "dummy_default", "name": "other"}
+    )
+    assert svc.get_source_fingerprint(prepared_source=other_config, should_enrich_context=False) != fingerprint
+
+
+def test_find_unchanged_build_requires_the_same_fingerprint_and_context(
+    chunk_embed_svc, project_layout, plugin_loader, conn
+):
+    svc = BuildService(
+        project_layout=project_layout,
+        chunk_embedding_service=chunk_embed_svc,
+        plugin_loader=plugin_loader,
+        fingerprint_repo=DatasourceFingerprintRepository(conn),
+    )
+    datasource_id = DatasourceId.from_string_repr("dummy/source.yaml")
+    context_path = datasource_id.absolute_path_to_context_file(project_layout)
+    context_path.parent.mkdir(parents=True, exist_ok=True)
+    context_path.write_text("context: v1")
+    chunk_embed_svc.is_context_already_indexed.return_value = True
+
+    assert svc.find_unchanged_build(datasource_id=datasource_id, fingerprint="fp", should_index=True) is None
+
+    svc.record_source_fingerprint(
+        context_hash=hash_context_file(datasource_id=datasource_id, context_path=context_path), fingerprint="fp"
+    )
+    previous_build = svc.find_unchanged_build(datasource_id=datasource_id, fingerprint="fp", should_index=True)
+    assert previous_build is not None
+    assert previous_build.fingerprint == "fp"
+    assert svc.find_unchanged_build(datasource_id=datasource_id, fingerprint="other", should_index=True) is None
+
+    chunk_embed_svc.is_context_already_indexed.return_value = False
+    assert svc.find_unchanged_build(datasource_id=datasource_id, fingerprint="fp", should_index=True) is None
+    assert svc.find_unchanged_build(datasource_id=datasource_id, fingerprint="fp", should_index=False) is not None
+
+    context_path.write_text("context: v2")
+    assert svc.find_unchanged_build(datasource_id=datasource_id, fingerprint="fp", should_index=False) is None
@@ -1,12 +1,23 @@
+from datetime import date, datetime
+
 import pytest
 
-from databao_context_engine.build_sources.context_loader import load_database_built_context
+from databao_context_engine.build_sources import context_loader
+from databao_context_engine.build_sources.context_loader import (
+    DatabaseContextCache,
+    deserialize_built_context,
+    load_database_built_context,
+)
+from databao_context_engine.build_sources.context_sidecar import get_context_sidecar_path
+from databao_context_engine.build_sources.export_results import export_build_result
 from databao_context_engine.build_sources.plugin_execution import BuiltDatasourceContext
+from databao_context_engine.datasources.datasource_context import get_datasource_context
 from databao_context_engine.datasources.types import DatasourceId
 from databao_context_engine.plugins.databases.databases_types import (
     DatabaseCatalog,
     DatabaseIntrospectionResult,
     DatabaseSchema,
+    DatabaseTable,
 )
 from databao_context_engine.plugins.plugin_loader import DatabaoContextPluginLoader
 from databao_context_engine.serialization.yaml import to_yaml_string
@@ -65,3 +76,89 @@ def test_load_database_built_context_rejects_non_database_context(project_layout
             plugin_loader=DatabaoContextPluginLoader(),
             datasource_id=datasource_id,
         )
+
+
+def test_database_context_cache_parses_the_context_file_again_only_when_it_changed(project_layout, mocker):
+    datasource_id = DatasourceId.from_string_repr("databases/warehouse.yaml")
+    given_output_dir_with_built_contexts(
+        project_layout, [(datasource_id, _database_context_yaml(datasource_id, ["a"]))]
+    )
+    load = mocker.spy(context_loader, "load_database_built_context")
+    cache = DatabaseContextCache(project_layout=project_layout, plugin_loader=DatabaoContextPluginLoader())
+
+    first = cache.get(datasource_id)
+    assert cache.get(datasource_id) is first
+    assert load.call_count == 1
+    assert list(first.table_index) == [("analytics", "public", "a")]
+
+    given_output_dir_with_built_contexts(
+        project_layout, [(datasource_id, _database_context_yaml(datasource_id, ["a", "b"]))]
+    )
+
+    assert list(cache.get(datasource_id).table_index) == [("analytics", "public", "a"), ("analytics", "public", "b")]
+    assert load.call_count == 2
+
+
+def test_deserialize_built_context_reads_the_sidecar_in_sync_with_the_context_file(project_layout, monkeypatch, mocker):
+    monkeypatch.setenv("DCE_CONTEXT_SIDECAR", "1")
+    datasource_id = DatasourceId.from_string_repr("databases/warehouse.yaml")
+    samples = [{"id": 1, "created_at": datetime(2024, 1, 2, 3, 4, 5), "day": date(2024, 1, 2), "raw": b"\x00\x01"}]
+    built = BuiltDatasourceContext(
+        datasource_id=str(datasource_id),
+        datasource_type="sqlite",
+        context=DatabaseIntrospectionResult(
+            catalogs=[
+                DatabaseCatalog(
+                    name="analytics",
+                    schemas=[
+                        DatabaseSchema(
+                            name="public", tables=[DatabaseTable(name="orders", columns=[], samples=samples)]
+                        )
+                    ],
+                )
+            ]
+        ),
+    )
+    context_path = export_build_result(project_layout.output_dir, built)
+    assert get_context_sidecar_path(context_path).is_file()
+    load_yaml = mocker.spy(context_loader, "load_yaml")
+
+    from_sidecar = deserialize_built_context(
+        context=get_datasource_context(project_layout, datasource_id),
+        context_type=DatabaseIntrospectionResult,
+        project_layout=project_layout,
+    )
+    assert from_sidecar == built
+    load_yaml.assert_not_called()
+
+    # Once the context file changes, the sidecar is out of sync and the YAML is read instead
+    context_path.write_text(context_path.read_text().replace("orders", "invoices"))
+    from_yaml = deserialize_built_context(
+        context=get_datasource_context(project_layout, datasource_id),
+        context_type=DatabaseIntrospectionResult,
+        project_layout=project_layout,
+    )
+    assert from_yaml.context.catalogs[0].schemas[0].tables[0].name == "invoices"
+    load_yaml.assert_called_once()
+
+
+def _database_context_yaml(datasource_id: DatasourceId, table_names: list[str]) -> str:
+    return to_yaml_string(
+        BuiltDatasourceContext(
+            datasource_id=str(datasource_id),
+            datasource_type="sqlite",
+            context=DatabaseIntrospectionResult(
+                catalogs=[
+                    DatabaseCatalog(
+                        name="analytics",
+                        schemas=[
+                            DatabaseSchema(
+                                name="public",
+                                tables=[DatabaseTable(name=name, columns=[], samples=[]) for name in table_names],
+                            )
+                        ],
+                    )
+                ]
+            ),
+        )
+    )
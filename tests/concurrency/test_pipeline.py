@@ -0,0 +1,116 @@
+import threading
+from contextvars import ContextVar
+
+import pytest
+
+from databao_context_engine.concurrency import PipelineStage, run_pipeline
+
+_current_item: ContextVar[int | None] = ContextVar("current_item", default=None)
+
+
+def test_run_pipeline_runs_every_item_through_every_stage():
+    processed: list[tuple[str, int]] = []
+
+    def record(stage_name):
+        def process(item: int) -> bool:
+            processed.append((stage_name, item))
+            return True
+
+        return process
+
+    stats = run_pipeline(
+        [1, 2, 3],
+        [PipelineStage(name="first", process=record("first")), PipelineStage(name="second", process=record("second"))],
+        queue_size=1,
+    )
+
+    assert [item for stage_name, item in processed if stage_name == "first"] == [1, 2, 3]
+    assert [item for stage_name, item in processed if stage_name == "second"] == [1, 2, 3]
+    assert [(stage.name, stage.items) for stage in stats] == [("first", 3), ("second", 3)]
+
+
+def test_run_pipeline_drops_items_when_a_stage_returns_false():
+    second_stage_items: list[int] = []
+
+    def second_stage(item: int) -> bool:
+        second_stage_items.append(item)
+        return True
+
+    stats = run_pipeline(
+        range(6),
+        [
+            PipelineStage(name="only_even", process=lambda item: item % 2 == 0, workers=3),
+            PipelineStage(name="second", process=second_stage),
+        ],
+        queue_size=2,
+    )
+
+    assert sorted(second_stage_items) == [0, 2, 4]
+    assert [stage.items for stage in stats] == [6, 3]
+
+
+def test_run_pipeline_overlaps_stages():
+    second_item_started = threading.Event()
+
+    def first_stage(item: int) -> bool:
+        if item == 2:
+            second_item_started.set()
+        return True
+
+    def second_stage(item: int) -> bool:
+        # Would time out if the first stage waited for the second one to be done with the first item
+        if item == 1:
+            assert second_item_started.wait(timeout=5)
+        return True
+
+    run_pipeline(
+        [1, 2],
+        [PipelineStage(name="first", process=first_stage), PipelineStage(name="second", process=second_stage)],
+        queue_size=1,
+    )
+
+
+def test_run_pipeline_shares_the_context_of_an_item_between_stages():
+    seen: dict[int, int | None] = {}
+
+    def first_stage(item: int) -> bool:
+        _current_item.set(item)
+        return True
+
+    def second_stage(item: int) -> bool:
+        seen[item] = _current_item.get()
+        return True
+
+    run_pipeline(
+        range(5),
+        [
+            PipelineStage(name="first", process=first_stage, workers=2),
+            PipelineStage(name="second", process=second_stage, workers=2),
+        ],
+        queue_size=1,
+    )
+
+    assert seen == {item: item for item in range(5)}
+    assert _current_item.get() is None
+
+
+def test_run_pipeline_raises_the_first_error_after_processing_the_other_items():
+    processed: list[int] = []
+
+    def failing_stage(item: int) -> bool:
+        if item == 1:
+            raise RuntimeError("boom")
+        return True
+
+    def last_stage(item: int) -> bool:
+        processed.append(item)
+        return True
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_pipeline(
+            [0, 1, 2],
+            [PipelineStage(name="failing", process=failing_stage), PipelineStage(name="last", process=last_stage)],
+            queue_size=1,
+        )
+
+    assert processed == [0, 2]
@@ -84,13 +84,14 @@ def resolver(conn, registry_repo):
 
 
 @pytest.fixture
-def persistence(conn, datasource_context_hash_repo, chunk_repo, embedding_repo):
+def persistence(conn, datasource_context_hash_repo, chunk_repo, embedding_repo, registry_repo):
     return PersistenceService(
         conn=conn,
         datasource_context_hash_repo=datasource_context_hash_repo,
         chunk_repo=chunk_repo,
         embedding_repo=embedding_repo,
         dim=768,
+        registry_repo=registry_repo,
     )
 
 
@@ -101,7 +102,7 @@ def table_name(conn):
     conn.execute("SET hnsw_enable_experimental_persistence = true;")
     conn.execute(f"""
         CREATE TABLE IF NOT EXISTS {name} (
-            chunk_id BIGINT NOT NULL REFERENCES chunk(chunk_id),
+            chunk_id BIGINT NOT NULL,
             vec        FLOAT[768] NOT NULL,
             created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
             PRIMARY KEY (chunk_id)
@@ -0,0 +1,62 @@
+import os
+import time
+
+import pytest
+
+from databao_context_engine.datasources import datasource_context
+from databao_context_engine.datasources.datasource_context import hash_context_file
+from databao_context_engine.datasources.types import DatasourceId
+
+_DATASOURCE_ID = DatasourceId.from_string_repr("dummy/my_datasource.yaml")
+
+
+@pytest.fixture(autouse=True)
+def empty_hash_cache():
+    datasource_context._context_hash_cache.clear()
+    yield
+    datasource_context._context_hash_cache.clear()
+
+
+def test_hash_context_file_reuses_the_hash_of_an_unchanged_file(tmp_path, mocker):
+    context_path = tmp_path / "my_datasource.yaml"
+    _write_old_file(context_path, "context: 1")
+    hash_file = mocker.spy(datasource_context, "_hash_file")
+
+    first_hash = hash_context_file(_DATASOURCE_ID, context_path)
+    second_hash = hash_context_file(_DATASOURCE_ID, context_path)
+
+    assert second_hash == first_hash
+    assert hash_file.call_count == 1
+
+
+def test_hash_context_file_hashes_again_a_modified_file(tmp_path):
+    context_path = tmp_path / "my_datasource.yaml"
+    _write_old_file(context_path, "context: 1", age_seconds=60)
+    first_hash = hash_context_file(_DATASOURCE_ID, context_path)
+
+    _write_old_file(context_path, "context: 2", age_seconds=30)
+    second_hash = hash_context_file(_DATASOURCE_ID, context_path)
+
+    assert second_hash.hash != first_hash.hash
+
+
+def test_hash_context_file_does_not_cache_recently_modified_files(tmp_path, mocker):
+    context_path = tmp_path / "my_datasource.yaml"
+    context_path.write_text("context: 1")
+    hash_file = mocker.spy(datasource_context, "_hash_file")
+
+    hash_context_file(_DATASOURCE_ID, context_path)
+    hash_context_file(_DATASOURCE_ID, context_path)
+
+    assert hash_file.call_count == 2
+
+
+def test_hash_context_file_raises_for_a_missing_file(tmp_path):
+    with pytest.raises(ValueError, match="Context file not found"):
+        hash_context_file(_DATASOURCE_ID, tmp_path / "missing.yaml")
+
+
+def _write_old_file(path, content: str, age_seconds: int = 60) -> None:
+    path.write_text(content)
+    old_time = time.time() - age_seconds
+    os.utime(path, (old_time, old_time))
@@ -166,13 +166,16 @@ def test_reindexing_done_when_context_has_changed(
 
     with open_duckdb_connection(project_layout.db_path) as conn:
         context_hashes_in_db = DatasourceContextHashRepository(conn).list()
-        assert len(context_hashes_in_db) == 2
-        assert sqlite1_initial_hash in context_hashes_in_db
-        assert {context_hash.datasource_id for context_hash in context_hashes_in_db} == {
-            sqlite1_initial_hash.datasource_id,
-        }
+        assert len(context_hashes_in_db) == 1
+        sqlite1_new_hash = context_hashes_in_db[0]
+        assert sqlite1_new_hash.datasource_id == sqlite1_initial_hash.datasource_id
+        assert sqlite1_new_hash.hash != sqlite1_initial_hash.hash
+
+        # The chunks of the unchanged tables are kept and moved to the new context hash
         new_chunks = ChunkRepository(conn).list()
-        assert all(initial_chunk in new_chunks for initial_chunk in initial_chunks)
         assert {chunk.datasource_context_hash_id for chunk in new_chunks} == {
-            context_hash.datasource_context_hash_id for context_hash in context_hashes_in_db
+            sqlite1_new_hash.datasource_context_hash_id
         }
+        new_chunk_ids_by_key = {chunk.chunk_key: chunk.chunk_id for chunk in new_chunks}
+        assert {chunk.chunk_key: chunk.chunk_id for chunk in initial_chunks}.items() <= new_chunk_ids_by_key.items()
+        assert any(chunk_key.endswith(".products") for chunk_key in new_chunk_ids_by_key if chunk_key)
@@ -1,5 +1,7 @@
+import time
 from pathlib import Path
 
+import duckdb
 import pytest
 
 from databao_context_engine import (
@@ -8,7 +10,9 @@ from databao_context_engine import (
     SQLiteConfigFile,
     SQLiteConnectionConfig,
 )
+from databao_context_engine.plugins.plugin_loader import DatabaoContextPluginLoader
 from databao_context_engine.project.layout import ProjectLayout
+from databao_context_engine.search_context import search_wiring
 from databao_context_engine.search_context.search_service import ContextSearchMode
 from databao_context_engine.storage.connection import open_duckdb_connection
 from databao_context_engine.storage.repositories.chunk_repository import ChunkRepository
@@ -244,3 +248,132 @@ def test_search_context_fails_when_requested_datasource_has_no_context_file(
             datasource_ids=[missing_datasource_id],
             context_search_mode=ContextSearchMode.KEYWORD_SEARCH,
         )
+
+
+def test_search_context_keeps_the_database_open_between_searches(
+    mocker, project_layout: ProjectLayout, tmp_path: Path, use_fake_embedding_provider
+) -> None:
+    sqlite1_path = tmp_path / "sqlite1.db"
+    create_sqlite_with_base_schema(sqlite1_path)
+    given_datasource_config_file(
+        project_layout,
+        "my_sqlite1",
+        SQLiteConfigFile(
+            name="my_sqlite1", connection=SQLiteConnectionConfig(database_path=str(sqlite1_path))
+        ).model_dump(),
+    )
+    domain_manager = DatabaoContextDomainManager(domain_dir=project_layout.project_dir)
+    domain_manager.build_context()
+    engine = domain_manager.get_engine_for_domain()
+
+    connect_spy = mocker.spy(search_wiring, "connect_duckdb")
+
+    for search_text in ("users", "email"):
+        assert engine.search_context(search_text, context_search_mode=ContextSearchMode.KEYWORD_SEARCH)
+    assert connect_spy.call_count == 1
+
+    # The database is re-opened once it was changed by someone else
+    execute_sqlite_queries(sqlite1_path, "CREATE TABLE products (product_id INTEGER NOT NULL);")
+    domain_manager.build_context()
+    assert engine.search_context("users", context_search_mode=ContextSearchMode.KEYWORD_SEARCH)
+    assert engine.search_context("products", context_search_mode=ContextSearchMode.KEYWORD_SEARCH)
+    assert connect_spy.call_count == 2
+
+    engine.close()
+
+
+def test_search_context_many_returns_the_results_of_each_text(
+    project_layout: ProjectLayout, tmp_path: Path, use_fake_embedding_provider
+) -> None:
+    sqlite1_path = tmp_path / "sqlite1.db"
+    create_sqlite_with_base_schema(sqlite1_path)
+    given_datasource_config_file(
+        project_layout,
+        "my_sqlite1",
+        SQLiteConfigFile(
+            name="my_sqlite1", connection=SQLiteConnectionConfig(database_path=str(sqlite1_path))
+        ).model_dump(),
+    )
+    domain_manager = DatabaoContextDomainManager(domain_dir=project_layout.project_dir)
+    domain_manager.build_context()
+    engine = domain_manager.get_engine_for_domain()
+
+    for context_search_mode in ContextSearchMode:
+        results_per_text = engine.search_context_many(
+            ["users", "email"], limit=100, context_search_mode=context_search_mode
+        )
+
+        assert len(results_per_text) == 2
+        for search_text, results in zip(["users", "email"], results_per_text):
+            single_results = engine.search_context(search_text, limit=100, context_search_mode=context_search_mode)
+            assert results
+            assert sorted(result.context_result for result in results) == sorted(
+                result.context_result for result in single_results
+            )
+
+    engine.close()
+
+
+def test_search_context_session_closes_the_database_when_idle(
+    mocker, project_layout: ProjectLayout, tmp_path: Path, use_fake_embedding_provider
+) -> None:
+    sqlite1_path = tmp_path / "sqlite1.db"
+    create_sqlite_with_base_schema(sqlite1_path)
+    given_datasource_config_file(
+        project_layout,
+        "my_sqlite1",
+        SQLiteConfigFile(
+            name="my_sqlite1", connection=SQLiteConnectionConfig(database_path=str(sqlite1_path))
+        ).model_dump(),
+    )
+    domain_manager = DatabaoContextDomainManager(domain_dir=project_layout.project_dir)
+    domain_manager.build_context()
+
+    connect_spy = mocker.spy(search_wiring, "connect_duckdb")
+    with search_wiring.SearchContextSession(
+        project_layout=project_layout, plugin_loader=DatabaoContextPluginLoader(), idle_timeout_seconds=0.05
+    ) as session:
+        session.search(
+            search_text="users", limit=None, datasource_ids=None, context_search_mode=ContextSearchMode.KEYWORD_SEARCH
+        )
+        conn = connect_spy.spy_return
+
+        time.sleep(0.5)
+
+        with pytest.raises(duckdb.ConnectionException):
+            conn.execute("SELECT 1")
+
+
+def test_search_context_session_keeps_the_database_open_read_only(
+    mocker, project_layout: ProjectLayout, tmp_path: Path, use_fake_embedding_provider
+) -> None:
+    sqlite1_path = tmp_path / "sqlite1.db"
+    create_sqlite_with_base_schema(sqlite1_path)
+    given_datasource_config_file(
+        project_layout,
+        "my_sqlite1",
+        SQLiteConfigFile(
+            name="my_sqlite1", connection=SQLiteConnectionConfig(database_path=str(sqlite1_path))
+        ).model_dump(),
+    )
+    domain_manager = DatabaoContextDomainManager(domain_dir=project_layout.project_dir)
+    domain_manager.build_context(should_index=False)
+
+    connect_spy = mocker.spy(search_wiring, "connect_duckdb")
+    with search_wiring.SearchContextSession(
+        project_layout=project_layout, plugin_loader=DatabaoContextPluginLoader()
+    ) as session:
+        # The missing context is indexed through a connection of its own, then the database is re-opened read-only
+        assert session.search(
+            search_text="users", limit=None, datasource_ids=None, context_search_mode=ContextSearchMode.KEYWORD_SEARCH
+        )
+        assert [call.kwargs for call in connect_spy.call_args_list] == [{"read_only": True}, {"read_only": True}]
+        with pytest.raises(duckdb.InvalidInputException, match="read-only"):
+            connect_spy.spy_return.execute("CREATE TABLE not_allowed (i INTEGER)")
+
+        # Writing to the database from this process closes the connection of the session
+        domain_manager.build_context()
+        assert session.search(
+            search_text="users", limit=None, datasource_ids=None, context_search_mode=ContextSearchMode.KEYWORD_SEARCH
+        )
+        assert connect_spy.call_count == 3
@@ -1,9 +1,13 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock
 
 import pytest
 
-from databao_context_engine.llm.config import EmbeddingModelDetails
+from databao_context_engine.llm.config import EmbeddingModelDetails, OllamaConfig
 from databao_context_engine.llm.embeddings.ollama import OllamaEmbeddingProvider
+from databao_context_engine.llm.errors import OllamaPermanentError, OllamaTransientError
 from databao_context_engine.llm.service import OllamaService
 
 
@@ -32,3 +36,133 @@ def test_embed_raises_on_wrong_dim():
 
     with pytest.raises(ValueError, match="provider returned dim=1 but expected 2"):
         provider.embed("x")
+
+
+def _fake_vec(text: str) -> list[float]:
+    return [float(len(text)), 0.0]
+
+
+def test_embed_many_keeps_order_of_concurrent_batches():
+    service = Mock(spec=OllamaService)
+    service.embed_many.side_effect = lambda *, model, texts: [_fake_vec(text) for text in texts]
+    provider = OllamaEmbeddingProvider(
+        service=service,
+        model_details=EmbeddingModelDetails(model_id="m", model_dim=2),
+        embed_batch_size=2,
+        max_in_flight_batches=3,
+    )
+    texts = ["a" * length for length in range(1, 10)]
+
+    vecs = provider.embed_many(texts)
+
+    assert vecs == [_fake_vec(text) for text in texts]
+    assert sorted(len(call.kwargs["texts"]) for call in service.embed_many.call_args_list) == [1, 2, 2, 2, 2]
+
+
+def test_embed_many_splits_batches_on_token_budget():
+    service = Mock(spec=OllamaService)
+    service.embed_many.side_effect = lambda *, model, texts: [_fake_vec(text) for text in texts]
+    provider = OllamaEmbeddingProvider(
+        service=service,
+        model_details=EmbeddingModelDetails(model_id="m", model_dim=2),
+        embed_batch_token_budget=10,
+        max_in_flight_batches=1,
+    )
+
+    # Respectively 3, 3, 3, 26 and 1 estimated tokens
+    texts = ["a" * 8, "b" * 8, "c" * 8, "d" * 100, "e"]
+    provider.embed_many(texts)
+
+    assert [call.kwargs["texts"] for call in service.embed_many.call_args_list] == [
+        texts[0:3],
+        texts[3:4],
+        texts[4:5],
+    ]
+
+
+def test_embed_many_retries_transient_errors():
+    service = Mock(spec=OllamaService)
+    service.embed_many.side_effect = [OllamaTransientError("busy"), OllamaTransientError("busy"), [[1.0, 2.0]]]
+    provider = OllamaEmbeddingProvider(
+        service=service,
+        model_details=EmbeddingModelDetails(model_id="m", model_dim=2),
+        retry_backoff_seconds=0,
+    )
+
+    assert provider.embed_many(["x"]) == [[1.0, 2.0]]
+    assert service.embed_many.call_count == 3
+
+
+def test_embed_many_gives_up_after_max_retries():
+    service = Mock(spec=OllamaService)
+    service.embed_many.side_effect = OllamaTransientError("busy")
+    provider = OllamaEmbeddingProvider(
+        service=service,
+        model_details=EmbeddingModelDetails(model_id="m", model_dim=2),
+        max_retries=2,
+        retry_backoff_seconds=0,
+    )
+
+    with pytest.raises(OllamaTransientError):
+        provider.embed_many(["x"])
+    assert service.embed_many.call_count == 3
+
+
+def test_embed_many_does_not_retry_permanent_errors():
+    service = Mock(spec=OllamaService)
+    service.embed_many.side_effect = OllamaPermanentError("bad request")
+    provider = OllamaEmbeddingProvider(
+        service=service,
+        model_details=EmbeddingModelDetails(model_id="m", model_dim=2),
+        retry_backoff_seconds=0,
+    )
+
+    with pytest.raises(OllamaPermanentError):
+        provider.embed_many(["x"])
+    assert service.embed_many.call_count == 1
+
+
+@pytest.fixture
+def stub_ollama_server():
+    """A local HTTP server answering /api/embed, only once `in_flight` requests are being processed at the same time."""
+
+    class StubOllamaServer(ThreadingHTTPServer):
+        in_flight = threading.Barrier(3, timeout=5)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.server.in_flight.wait()  # type: ignore[attr-defined]
+
+            body = json.dumps({"embeddings": [_fake_vec(text) for text in payload["input"]]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = StubOllamaServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_embed_many_sends_batches_concurrently_to_ollama(stub_ollama_server):
+    service = OllamaService(OllamaConfig(host="127.0.0.1", port=stub_ollama_server.server_address[1], timeout=10))
+    provider = OllamaEmbeddingProvider(
+        service=service,
+        model_details=EmbeddingModelDetails(model_id="m", model_dim=2),
+        embed_batch_size=4,
+        max_in_flight_batches=3,
+    )
+    texts = [f"text {'x' * i}" for i in range(12)]
+
+    # The stub server blocks until 3 requests are in flight: this would time out if batches were sent one by one
+    vecs = provider.embed_many(texts)
+
+    assert vecs == [_fake_vec(text) for text in texts]
@@ -53,6 +53,15 @@ def test_embed_permanent_error_includes_body():
     assert "server blew up" in str(ei.value)
 
 
+def test_embed_busy_server_raises_transienterror():
+    session = _StubSession()
+    session.set_next_post(_StubResponse(status=503, json_obj={"error": "server busy"}, text="server busy"))
+    service = OllamaService(OllamaConfig(host="x"), session=session)
+
+    with pytest.raises(OllamaTransientError, match="server busy"):
+        service.embed_many(model="m", texts=["t"])
+
+
 def test_embed_malformed_json_raises_valueerror():
     session = _StubSession()
     session.set_next_post(_StubResponse(status=200, json_obj=json.JSONDecodeError("err", "doc", 0)))
@@ -209,6 +218,17 @@ def test_describe_happy_path():
     assert body["options"] == {"temperature": 0.1}
 
 
+def test_prompt_with_json_format_asks_ollama_for_json():
+    session = _StubSession()
+    session.set_next_post(_StubResponse(status=200, json_obj={"response": '{"1": "first"}'}))
+    service = OllamaService(OllamaConfig(host="host"), session=session)
+
+    answer = service.prompt(model="llama3", prompt="Describe the items", json_format=True)
+
+    assert answer == '{"1": "first"}'
+    assert session.calls[0]["json"]["format"] == "json"
+
+
 def test_describe_missing_response_raises_valueerror():
     session = _StubSession()
     session.set_next_post(_StubResponse(status=200, json_obj={"not_response": "x"}))
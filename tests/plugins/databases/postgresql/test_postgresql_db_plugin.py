@@ -367,6 +367,7 @@ def test_postgres_plugin_divide_into_chunks():
     assert chunks == unordered(
         EmbeddableChunk(
             type="table",
+            key="test.custom.test",
             embeddable_text="test is a database table with 2 columns. Here is the full list of columns for the table: id, name. best table",
             content=DatabaseTableChunkContent(
                 catalog_name="test",
@@ -384,6 +385,7 @@ def test_postgres_plugin_divide_into_chunks():
         ),
         EmbeddableChunk(
             type="column",
+            key="test.custom.test.id",
             embeddable_text="id is a column with type int4 in the table test. It can not contain null values",
             content=DatabaseColumnChunkContent(
                 catalog_name="test",
@@ -394,6 +396,7 @@ def test_postgres_plugin_divide_into_chunks():
         ),
         EmbeddableChunk(
             type="column",
+            key="test.custom.test.name",
             embeddable_text="name is a column with type varchar in the table test. It can contain null values",
             content=DatabaseColumnChunkContent(
                 catalog_name="test",
@@ -1,3 +1,5 @@
+import threading
+
 from databao_context_engine.plugins.databases.context_enricher import enrich_database_context
 from databao_context_engine.plugins.databases.databases_types import (
     DatabaseCatalog,
@@ -6,6 +8,12 @@ from databao_context_engine.plugins.databases.databases_types import (
     DatabaseSchema,
     DatabaseTable,
 )
+from databao_context_engine.progress.progress import (
+    ProgressEmitter,
+    ProgressEvent,
+    ProgressStep,
+    reporting_step_progress,
+)
 from tests.utils.fakes import FakeDescriptionProvider
 
 
@@ -94,3 +102,117 @@ def test_enrich_database_context_keeps_original_values_on_description_failure():
     assert schema.description == "fake-desc::main"
     assert catalog.description == "fake-desc::default"
     assert len(provider.calls) == 4
+
+
+def test_enrich_database_context_describes_tables_with_their_fresh_column_descriptions():
+    context = _build_context(with_existing_descriptions=False)
+    provider = FakeDescriptionProvider()
+
+    enrich_database_context(context, provider)
+
+    described_texts = [text for text, _ in provider.calls]
+    assert described_texts[1:] == ["users", "main", "default"]
+    _, table_prompt_context = provider.calls[1]
+    assert "description: 'fake-desc::name: id" in table_prompt_context
+
+
+def test_enrich_database_context_describes_columns_of_different_tables_concurrently():
+    context = DatabaseIntrospectionResult(
+        catalogs=[
+            DatabaseCatalog(
+                name="default",
+                schemas=[
+                    DatabaseSchema(
+                        name="main",
+                        tables=[
+                            DatabaseTable(
+                                name=f"table_{i}",
+                                columns=[DatabaseColumn(name=f"column_{i}", type="INTEGER", nullable=False)],
+                                samples=[],
+                            )
+                            for i in range(2)
+                        ],
+                    )
+                ],
+            )
+        ]
+    )
+    # Would time out if the column of the second table was only described after the one of the first table
+    both_columns_described = threading.Barrier(2, timeout=5)
+
+    class ConcurrentColumnsDescriptionProvider(FakeDescriptionProvider):
+        def describe(self, text: str, context: str) -> str:
+            if text.startswith("name: column_"):
+                both_columns_described.wait()
+            return super().describe(text, context)
+
+    provider = ConcurrentColumnsDescriptionProvider()
+
+    enriched = enrich_database_context(context, provider, max_parallel_descriptions=2)
+
+    assert [table.columns[0].description for table in enriched.catalogs[0].schemas[0].tables] == [
+        "fake-desc::name: column_0\ntype: INTEGER\nnullable: false\n",
+        "fake-desc::name: column_1\ntype: INTEGER\nnullable: false\n",
+    ]
+
+
+def test_enrich_database_context_describes_the_columns_of_a_table_with_a_single_prompt():
+    context = _build_context(with_existing_descriptions=False)
+    table = context.catalogs[0].schemas[0].tables[0]
+    table.columns.append(DatabaseColumn(name="email", type="VARCHAR", nullable=True))
+    provider = BatchDescriptionProvider(answer='{"1": "The user id.", "2": "The user email."}')
+
+    enriched = enrich_database_context(context, provider)
+
+    enriched_columns = enriched.catalogs[0].schemas[0].tables[0].columns
+    assert [column.description for column in enriched_columns] == ["The user id.", "The user email."]
+    assert len(provider.batch_prompts) == 1
+    assert [text for text, _ in provider.calls] == ["users", "main", "default"]
+
+
+def test_enrich_database_context_describes_columns_one_by_one_when_the_batch_answer_is_incomplete():
+    context = _build_context(with_existing_descriptions=False)
+    table = context.catalogs[0].schemas[0].tables[0]
+    table.columns.append(DatabaseColumn(name="email", type="VARCHAR", nullable=True))
+    provider = BatchDescriptionProvider(answer='Sure! {"1": "The user id."}')
+
+    enriched = enrich_database_context(context, provider)
+
+    enriched_columns = enriched.catalogs[0].schemas[0].tables[0].columns
+    assert enriched_columns[0].description == "The user id."
+    assert enriched_columns[1].description == "fake-desc::name: email\ntype: VARCHAR\nnullable: true\n"
+    assert [text for text, _ in provider.calls] == [
+        "name: email\ntype: VARCHAR\nnullable: true\n",
+        "users",
+        "main",
+        "default",
+    ]
+
+
+class BatchDescriptionProvider(FakeDescriptionProvider):
+    def __init__(self, *, answer: str):
+        super().__init__()
+        self.batch_prompts: list[str] = []
+        self._answer = answer
+
+    def prompt_for_description(self, prompt: str) -> str:
+        self.batch_prompts.append(prompt)
+        return self._answer
+
+
+def test_enrich_database_context_reports_progress():
+    events: list[ProgressEvent] = []
+    context = _build_context(with_existing_descriptions=False)
+
+    with reporting_step_progress(
+        ProgressEmitter(events.append), datasource_id="my_db", step=ProgressStep.CONTEXT_ENRICHMENT
+    ):
+        enrich_database_context(context, FakeDescriptionProvider())
+
+    assert [(event.current_units_completed, event.current_units_total) for event in events] == [
+        (1, 4),
+        (2, 4),
+        (3, 4),
+        (4, 4),
+    ]
+    assert {(event.datasource_id, event.step) for event in events} == {("my_db", ProgressStep.CONTEXT_ENRICHMENT)}
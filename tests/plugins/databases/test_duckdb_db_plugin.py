@@ -1,17 +1,29 @@
 import contextlib
+import threading
+import time
 from pathlib import Path
 from typing import Any, Mapping, Sequence
 
 import duckdb
 import pytest
+from pydantic import ValidationError
 
 from databao_context_engine.pluginlib.build_plugin import DatasourceType
-from databao_context_engine.pluginlib.plugin_utils import execute_datasource_plugin
+from databao_context_engine.pluginlib.plugin_utils import (
+    execute_datasource_plugin,
+    execute_sql_for_datasource,
+    get_source_fingerprint_for_datasource,
+)
+from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionLimits, SqlTruncationReason
+from databao_context_engine.plugins.databases.base_db_plugin import MAX_PARALLEL_CATALOGS
 from databao_context_engine.plugins.databases.databases_types import (
     CardinalityBucket,
     DatabaseIntrospectionResult,
 )
+from databao_context_engine.plugins.databases.duckdb.config_file import DuckDBConfigFile
+from databao_context_engine.plugins.databases.duckdb.duckdb_connector import DuckDBConnector
 from databao_context_engine.plugins.databases.duckdb.duckdb_db_plugin import DuckDbPlugin
+from databao_context_engine.plugins.databases.duckdb.duckdb_introspector import DuckDBIntrospector
 from tests.plugins.databases.database_contracts import (
     CheckConstraintExists,
     ColumnIs,
@@ -341,6 +353,235 @@ def test_duckdb_table_and_column_statistics(duckdb_with_demo_schema: Path):
         )
 
 
+def test_duckdb_run_sql_truncates_the_result_to_the_limits(duckdb_with_demo_schema: Path):
+    plugin = DuckDbPlugin()
+    config = _create_config_file_from_container(duckdb_with_demo_schema)
+
+    def run_sql(limits: SqlExecutionLimits | None):
+        return execute_sql_for_datasource(
+            plugin,
+            DatasourceType(full_type=config["type"]),
+            config,
+            "SELECT i AS ID, repeat('x', 100) AS text FROM range(1000000) t(i) ORDER BY i",
+            limits=limits,
+        )
+
+    by_rows = run_sql(SqlExecutionLimits(max_rows=3))
+    assert by_rows.columns == ["id", "text"]
+    assert [row[0] for row in by_rows.rows] == [0, 1, 2]
+    assert by_rows.truncated_by == SqlTruncationReason.MAX_ROWS
+
+    by_bytes = run_sql(SqlExecutionLimits(max_rows=100, max_bytes=1000))
+    assert len(by_bytes.rows) == 9
+    assert by_bytes.truncated_by == SqlTruncationReason.MAX_BYTES
+
+    not_truncated = run_sql(SqlExecutionLimits(max_rows=1000000))
+    assert len(not_truncated.rows) == 1000000
+    assert not not_truncated.truncated
+
+
+def test_duckdb_run_sql_cancels_the_query_after_the_timeout(duckdb_with_demo_schema: Path):
+    plugin = DuckDbPlugin()
+    config = _create_config_file_from_container(duckdb_with_demo_schema)
+
+    with pytest.raises(TimeoutError):
+        execute_sql_for_datasource(
+            plugin,
+            DatasourceType(full_type=config["type"]),
+            config,
+            "SELECT count(*) FROM range(1000000000) a, range(1000) b WHERE (a.range * b.range) % 7 = 3",
+            limits=SqlExecutionLimits(timeout_seconds=0.2),
+        )
+
+
+def test_duckdb_fingerprint_changes_with_the_schemas_in_scope(duckdb_with_demo_schema: Path):
+    plugin = DuckDbPlugin()
+    config = {
+        **_create_config_file_from_container(duckdb_with_demo_schema),
+        "introspection-scope": {"exclude": [{"schemas": "other"}]},
+    }
+
+    def fingerprint() -> str | None:
+        return get_source_fingerprint_for_datasource(plugin, DatasourceType(full_type=config["type"]), config)
+
+    initial_fingerprint = fingerprint()
+    assert initial_fingerprint is not None
+    assert fingerprint() == initial_fingerprint
+
+    execute_duckdb_queries(duckdb_with_demo_schema, "CREATE SCHEMA other", "CREATE TABLE other.ignored (id INTEGER)")
+    assert fingerprint() == initial_fingerprint
+
+    execute_duckdb_queries(duckdb_with_demo_schema, "ALTER TABLE custom.users ADD COLUMN age INTEGER")
+    altered_fingerprint = fingerprint()
+    assert altered_fingerprint != initial_fingerprint
+
+    execute_duckdb_queries(duckdb_with_demo_schema, "COMMENT ON COLUMN custom.users.age IS 'In years'")
+    assert fingerprint() != altered_fingerprint
+
+
+def test_duckdb_update_context_only_introspects_the_changed_schemas(duckdb_with_demo_schema: Path, mocker):
+    execute_duckdb_queries(duckdb_with_demo_schema, "CREATE SCHEMA other", "CREATE TABLE other.kept (id INTEGER)")
+    plugin = DuckDbPlugin()
+    config = _create_config_file_from_container(duckdb_with_demo_schema)
+    datasource_type = DatasourceType(full_type=config["type"])
+
+    previous_result = execute_datasource_plugin(plugin, datasource_type, config, "file_name")
+    assert isinstance(previous_result, DatabaseIntrospectionResult)
+    previous_schemas = {schema.name: schema for schema in previous_result.catalogs[0].schemas}
+
+    execute_duckdb_queries(duckdb_with_demo_schema, "ALTER TABLE custom.users ADD COLUMN age INTEGER")
+    collect_catalog_model = mocker.spy(plugin._introspector, "collect_catalog_model")
+
+    result = execute_datasource_plugin(plugin, datasource_type, config, "file_name", previous_context=previous_result)
+    assert isinstance(result, DatabaseIntrospectionResult)
+
+    collect_catalog_model.assert_called_once()
+    introspected_schemas = collect_catalog_model.call_args.args[2]
+    assert "custom" in introspected_schemas
+    assert "other" not in introspected_schemas
+    schemas = {schema.name: schema for schema in result.catalogs[0].schemas}
+    assert list(schemas) == list(previous_schemas)
+    assert schemas["other"] is previous_schemas["other"]
+    assert schemas["custom"].fingerprint != previous_schemas["custom"].fingerprint
+    assert_contract(result, [ColumnIs("test_db", "custom", "users", "age", type="INTEGER")])
+
+
+class _OneFilePerCatalogConnector(DuckDBConnector):
+    """Connects to a different DuckDB file for each catalog, and records how many connections are open at once."""
+
+    def __init__(self, catalog_files: Mapping[str, Path]):
+        self._catalog_files = catalog_files
+        self._lock = threading.Lock()
+        self._open_connections = 0
+        self.max_open_connections = 0
+
+    @contextlib.contextmanager
+    def connect(self, file_config: DuckDBConfigFile, *, catalog: str | None = None):
+        database_path = self._catalog_files[catalog] if catalog else next(iter(self._catalog_files.values()))
+        with self._lock:
+            self._open_connections += 1
+            self.max_open_connections = max(self.max_open_connections, self._open_connections)
+        try:
+            with contextlib.closing(duckdb.connect(database=str(database_path), read_only=True)) as conn:
+                # Give the other catalogs time to be introspected at the same time
+                time.sleep(0.05)
+                yield conn
+        finally:
+            with self._lock:
+                self._open_connections -= 1
+
+
+class _MultiCatalogIntrospector(DuckDBIntrospector):
+    def _get_catalogs(self, connection, file_config: DuckDBConfigFile) -> list[str]:
+        return list(self._connector._catalog_files)  # type: ignore[attr-defined]
+
+
+def test_duckdb_introspects_catalogs_in_parallel_in_a_deterministic_order(tmp_path: Path):
+    catalog_files = {name: tmp_path / f"{name}.duckdb" for name in ("zeta", "alpha", "mid")}
+    for name, db_file in catalog_files.items():
+        execute_duckdb_queries(db_file, f"CREATE TABLE {name}_table (id INTEGER, label VARCHAR)")
+
+    def introspect(max_parallel_catalogs: int) -> tuple[DatabaseIntrospectionResult, int]:
+        connector = _OneFilePerCatalogConnector(catalog_files)
+        config = DuckDBConfigFile.model_validate(
+            {
+                **_create_config_file_from_container(catalog_files["zeta"]),
+                "max-parallel-catalogs": max_parallel_catalogs,
+            }
+        )
+        result = _MultiCatalogIntrospector(connector).introspect_database(config)
+        return result, connector.max_open_connections
+
+    sequential_result, sequential_connections = introspect(1)
+    parallel_result, parallel_connections = introspect(2)
+
+    assert [catalog.name for catalog in parallel_result.catalogs] == ["zeta", "alpha", "mid"]
+    assert parallel_result == sequential_result
+    assert sequential_connections == 1
+    assert parallel_connections == 2
+
+
+def test_duckdb_samples_tables_in_parallel_on_their_own_connections(tmp_path: Path):
+    db_file = tmp_path / "test_db.duckdb"
+    execute_duckdb_queries(
+        db_file,
+        *(f"CREATE TABLE table_{i} AS SELECT range AS id, 'row ' || range AS label FROM range(10)" for i in range(6)),
+    )
+
+    def introspect(sampling: Mapping[str, Any]) -> tuple[DatabaseIntrospectionResult, int]:
+        connector = _OneFilePerCatalogConnector({"test_db": db_file})
+        config = DuckDBConfigFile.model_validate({**_create_config_file_from_container(db_file), "sampling": sampling})
+        result = _MultiCatalogIntrospector(connector).introspect_database(config)
+        return result, connector.max_open_connections
+
+    sequential_result, sequential_connections = introspect({})
+    parallel_result, parallel_connections = introspect({"max_parallel_tables": 3})
+
+    assert parallel_result == sequential_result
+    assert_contract(parallel_result, [SamplesCountIs("test_db", "main", f"table_{i}", count=5) for i in range(6)])
+    assert sequential_connections == 1
+    assert parallel_connections == 3
+
+
+def test_duckdb_catalogs_and_sampled_tables_share_the_connection_cap(tmp_path: Path):
+    catalog_files = {name: tmp_path / f"{name}.duckdb" for name in ("first", "second", "third")}
+    for db_file in catalog_files.values():
+        execute_duckdb_queries(
+            db_file, *(f"CREATE TABLE table_{i} AS SELECT range AS id FROM range(10)" for i in range(4))
+        )
+
+    connector = _OneFilePerCatalogConnector(catalog_files)
+    config = DuckDBConfigFile.model_validate(
+        {
+            **_create_config_file_from_container(catalog_files["first"]),
+            "max-parallel-catalogs": 3,
+            "max-connections": 4,
+            "sampling": {"max_parallel_tables": 4},
+        }
+    )
+    result = _MultiCatalogIntrospector(connector).introspect_database(config)
+
+    assert connector.max_open_connections <= 4
+    assert_contract(
+        result,
+        [SamplesCountIs(catalog, "main", f"table_{i}", count=5) for catalog in catalog_files for i in range(4)],
+    )
+
+
+def test_duckdb_sampling_gives_up_on_tables_past_the_timeout(temp_duckdb_file: Path):
+    execute_duckdb_queries(
+        temp_duckdb_file,
+        "CREATE TABLE fast AS SELECT range AS id FROM range(10)",
+        "CREATE VIEW slow AS SELECT sum(hash(range)) AS total FROM range(100000000000)",
+    )
+    plugin = DuckDbPlugin()
+    config = {
+        **_create_config_file_from_container(temp_duckdb_file),
+        "sampling": {"max_parallel_tables": 2, "table_timeout_seconds": 0.5},
+    }
+
+    started_at = time.monotonic()
+    result = execute_datasource_plugin(plugin, DatasourceType(full_type=config["type"]), config, "file_name")
+
+    assert time.monotonic() - started_at < 30
+    assert isinstance(result, DatabaseIntrospectionResult)
+    assert_contract(
+        result,
+        [
+            SamplesCountIs("test_db", "main", "fast", count=5),
+            SamplesCountIs("test_db", "main", "slow", count=0),
+        ],
+    )
+
+
+def test_duckdb_config_caps_the_parallel_catalogs(temp_duckdb_file: Path):
+    config = _create_config_file_from_container(temp_duckdb_file)
+
+    assert DuckDBConfigFile.model_validate(config).max_parallel_catalogs == 1
+    with pytest.raises(ValidationError):
+        DuckDBConfigFile.model_validate({**config, "max-parallel-catalogs": MAX_PARALLEL_CATALOGS + 1})
+
+
 def _create_config_file_from_container(
     duckdb_path: Path, datasource_name: str | None = "file_name", enable_profiling: bool = False
 ) -> Mapping[str, Any]:
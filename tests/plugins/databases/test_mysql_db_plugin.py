@@ -1,4 +1,5 @@
 import contextlib
+import time
 from typing import Any, Mapping, Sequence
 
 import pymysql
@@ -6,7 +7,8 @@ import pytest
 from testcontainers.mysql import MySqlContainer  # type: ignore
 
 from databao_context_engine.pluginlib.build_plugin import DatasourceType
-from databao_context_engine.pluginlib.plugin_utils import execute_datasource_plugin
+from databao_context_engine.pluginlib.plugin_utils import execute_datasource_plugin, execute_sql_for_datasource
+from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionLimits, SqlTruncationReason
 from databao_context_engine.plugins.databases.databases_types import CardinalityBucket, DatabaseIntrospectionResult
 from databao_context_engine.plugins.databases.mysql.mysql_db_plugin import MySQLDbPlugin
 from databao_context_engine.plugins.databases.mysql.mysql_introspector import MySQLIntrospector
@@ -676,6 +678,42 @@ def test_mysql_high_cardinality_statistics(mysql_container_with_demo_schema, cre
         )
 
 
+def test_mysql_run_sql_does_not_read_the_rest_of_a_truncated_result(mysql_container_with_demo_schema):
+    plugin = MySQLDbPlugin()
+    config = _create_config_file_from_container(mysql_container_with_demo_schema)
+
+    started_at = time.monotonic()
+    result = execute_sql_for_datasource(
+        plugin,
+        DatasourceType(full_type=config["type"]),
+        config,
+        # Millions of rows, which take far longer to transfer than to kill the query
+        "SELECT a.*, b.* FROM information_schema.columns a CROSS JOIN information_schema.columns b",
+        limits=SqlExecutionLimits(max_rows=5),
+    )
+
+    assert time.monotonic() - started_at < 30
+    assert len(result.rows) == 5
+    assert result.truncated_by == SqlTruncationReason.MAX_ROWS
+
+
+def test_mysql_run_sql_kills_the_query_after_the_timeout(mysql_container_with_demo_schema):
+    plugin = MySQLDbPlugin()
+    config = _create_config_file_from_container(mysql_container_with_demo_schema)
+
+    started_at = time.monotonic()
+    with pytest.raises(TimeoutError):
+        execute_sql_for_datasource(
+            plugin,
+            DatasourceType(full_type=config["type"]),
+            config,
+            "SELECT SLEEP(60)",
+            limits=SqlExecutionLimits(timeout_seconds=1),
+        )
+
+    assert time.monotonic() - started_at < 30
+
+
 def _create_config_file_from_container(
     mysql: MySqlContainer, datasource_name: str | None = "file_name", enable_profiling: bool = False
 ) -> Mapping[str, Any]:
@@ -7,7 +7,8 @@ import pytest
 
 from databao_context_engine import SQLiteConfigFile, SQLiteConnectionConfig
 from databao_context_engine.pluginlib.build_plugin import DatasourceType
-from databao_context_engine.pluginlib.plugin_utils import execute_datasource_plugin
+from databao_context_engine.pluginlib.plugin_utils import execute_datasource_plugin, execute_sql_for_datasource
+from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionLimits, SqlTruncationReason
 from databao_context_engine.plugins.databases.databases_types import (
     DatabaseCatalog,
     DatabaseColumn,
@@ -345,6 +346,57 @@ def test_sqlite_samples_in_big(sqlite_with_demo_schema: Path):
         assert_contract(result, [SamplesCountIs("default", "main", "users", count=limit)])
 
 
+def test_sqlite_samples_tables_in_parallel(temp_sqlite_file: Path):
+    execute_sqlite_queries(
+        temp_sqlite_file,
+        *(f"CREATE TABLE table_{i} (id INTEGER PRIMARY KEY, label TEXT)" for i in range(6)),
+        *(f"INSERT INTO table_{i} (label) VALUES ('row')" for i in range(6)),
+    )
+    config = {
+        "type": "sqlite",
+        "name": "file_name",
+        "connection": {"database_path": str(temp_sqlite_file)},
+        "sampling": {"max_parallel_tables": 4},
+    }
+
+    result = execute_datasource_plugin(SQLiteDbPlugin(), DatasourceType(full_type="sqlite"), config, "file_name")
+
+    assert isinstance(result, DatabaseIntrospectionResult)
+    assert_contract(result, [SamplesCountIs("default", "main", f"table_{i}", count=1) for i in range(6)])
+
+
+def test_sqlite_run_sql_truncates_the_result_to_max_rows(sqlite_with_demo_schema: Path):
+    rows = [{"user_id": i, "name": f"name{i}", "email": f"user{i}@example.com", "is_active": 1} for i in range(1, 100)]
+
+    with seed_rows_sqlite(sqlite_with_demo_schema, "users", rows):
+        plugin = SQLiteDbPlugin()
+        config = _create_config_file_from_sqlite(sqlite_with_demo_schema)
+        result = execute_sql_for_datasource(
+            plugin,
+            DatasourceType(full_type=config["type"]),
+            config,
+            "SELECT user_id, name FROM users WHERE user_id > ? ORDER BY user_id",
+            params=[10],
+            limits=SqlExecutionLimits(max_rows=2),
+        )
+
+    assert result.columns == ["user_id", "name"]
+    assert result.rows == [(11, "name11"), (12, "name12")]
+    assert result.truncated_by == SqlTruncationReason.MAX_ROWS
+
+
+def test_sqlite_run_sql_returns_the_columns_of_an_empty_result(sqlite_with_demo_schema: Path):
+    plugin = SQLiteDbPlugin()
+    config = _create_config_file_from_sqlite(sqlite_with_demo_schema)
+    result = execute_sql_for_datasource(
+        plugin, DatasourceType(full_type=config["type"]), config, "SELECT user_id, name FROM users"
+    )
+
+    assert result.columns == ["user_id", "name"]
+    assert result.rows == []
+    assert not result.truncated
+
+
 def test_sqlite_plugin_enrich_context():
     plugin = SQLiteDbPlugin()
 
@@ -2,16 +2,22 @@ import pytest
 
 from databao_context_engine import DatasourceId
 from databao_context_engine.datasources.datasource_context import DatasourceContextHash
+from databao_context_engine.llm.config import EmbeddingModelDetails
 from databao_context_engine.pluginlib.build_plugin import DatasourceType
 from databao_context_engine.search_context.chunk_search_repository import (
     ChunkSearchRepository,
     KeywordSearchScore,
+    RrfScore,
     SearchResult,
 )
+from databao_context_engine.services.embedding_shard_resolver import EmbeddingShardResolver
+from databao_context_engine.storage.embedding_storage_format import EmbeddingStorageFormat
 from tests.utils.factories import (
+    make_chunk,
     make_chunk_and_embedding,
     make_chunk_and_embedding_for_datasource_context_hash,
     make_datasource_context_hash,
+    make_embedding,
 )
 
 DIM = 768
@@ -317,6 +323,247 @@ def test_search_over_multiple_datasources_with_datasource_filter(
     )
 
 
+def test_similarity_widens_the_probe_when_filters_exclude_the_nearest_vectors(
+    conn, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name, mocker
+):
+    included_hash = _make_filtered_out_neighbours_and_included_chunk(
+        datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+    )
+    repo = ChunkSearchRepository(conn)
+    probe = mocker.spy(repo, "_probe_vector_candidates")
+
+    results = repo.search_chunks_by_vector_similarity(
+        table_name=table_name,
+        search_vec=[1.0] + [0.0] * (DIM - 1),
+        dimension=DIM,
+        limit=1,
+        datasource_context_hashes=[_to_datasource_context_hash(included_hash)],
+    )
+
+    assert [result.display_text for result in results] == ["included-match"]
+    assert [call.kwargs["probe_limit"] for call in probe.call_args_list] == [4, 16, 64]
+
+
+def test_similarity_only_disables_the_late_materialization_around_the_probe(
+    conn, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name, mocker
+):
+    included_hash = _make_filtered_out_neighbours_and_included_chunk(
+        datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+    )
+    default_setting = conn.execute("SELECT current_setting('late_materialization_max_rows')").fetchone()
+    conn_spy = mocker.MagicMock(wraps=conn)
+
+    ChunkSearchRepository(conn_spy).search_chunks_by_vector_similarity(
+        table_name=table_name,
+        search_vec=[1.0] + [0.0] * (DIM - 1),
+        dimension=DIM,
+        limit=1,
+        datasource_context_hashes=[_to_datasource_context_hash(included_hash)],
+    )
+
+    statements = [" ".join(call.args[0].split()) for call in conn_spy.execute.call_args_list]
+    probe_indexes = [i for i, statement in enumerate(statements) if statement.startswith("WITH probe AS")]
+    assert probe_indexes
+    for i in probe_indexes:
+        assert statements[i - 1] == "SET SESSION late_materialization_max_rows = 0"
+        assert statements[i + 1] == "RESET SESSION late_materialization_max_rows"
+    assert conn.execute("SELECT current_setting('late_materialization_max_rows')").fetchone() == default_setting
+
+
+def test_similarity_falls_back_to_an_exact_scan_for_very_selective_filters(
+    conn, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name, mocker
+):
+    included_hash = _make_filtered_out_neighbours_and_included_chunk(
+        datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+    )
+    mocker.patch.object(ChunkSearchRepository, "_MAX_VECTOR_PROBE_LIMIT", 8)
+    repo = ChunkSearchRepository(conn)
+    exact_scan = mocker.spy(repo, "_get_exact_vector_candidates")
+
+    results = repo.search_chunks_by_vector_similarity(
+        table_name=table_name,
+        search_vec=[1.0] + [0.0] * (DIM - 1),
+        dimension=DIM,
+        limit=1,
+        datasource_context_hashes=[_to_datasource_context_hash(included_hash)],
+    )
+
+    assert [result.display_text for result in results] == ["included-match"]
+    exact_scan.assert_called_once()
+
+
+def test_similarity_many_ranks_the_chunks_of_each_vector(
+    conn, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+):
+    context_hash = make_datasource_context_hash(datasource_context_hash_repo, datasource_id="databases/test_db.yaml")
+    for i in range(3):
+        _make_chunk_with_vector(
+            chunk_repo,
+            embedding_repo,
+            table_name,
+            datasource_context_hash=context_hash,
+            display_text=f"chunk-{i}",
+            vec=[1.0, 0.4 * i] + [0.0] * (DIM - 2),
+        )
+    repo = ChunkSearchRepository(conn)
+    search_vecs = [[1.0, 1.0] + [0.0] * (DIM - 2), [1.0] + [0.0] * (DIM - 1)]
+
+    results = repo.search_chunks_by_vector_similarity_many(
+        table_name=table_name,
+        search_vecs=search_vecs,
+        dimension=DIM,
+        limit=2,
+        datasource_context_hashes=[_to_datasource_context_hash(context_hash)],
+    )
+
+    assert [[result.display_text for result in query_results] for query_results in results] == [
+        ["chunk-2", "chunk-1"],
+        ["chunk-0", "chunk-1"],
+    ]
+    for search_vec, query_results in zip(search_vecs, results):
+        single_results = repo.search_chunks_by_vector_similarity(
+            table_name=table_name,
+            search_vec=search_vec,
+            dimension=DIM,
+            limit=2,
+            datasource_context_hashes=[_to_datasource_context_hash(context_hash)],
+        )
+        assert [result.chunk_id for result in query_results] == [result.chunk_id for result in single_results]
+        assert [result.score.score for result in query_results] == pytest.approx(
+            [result.score.score for result in single_results]
+        )
+
+
+def test_similarity_many_honors_datasource_filter(
+    conn, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+):
+    included_hash = _make_filtered_out_neighbours_and_included_chunk(
+        datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+    )
+    repo = ChunkSearchRepository(conn)
+
+    results = repo.search_chunks_by_vector_similarity_many(
+        table_name=table_name,
+        search_vecs=[[1.0] + [0.0] * (DIM - 1), [0.0, 1.0] + [0.0] * (DIM - 2), [0.0] * (DIM - 1) + [1.0]],
+        dimension=DIM,
+        limit=5,
+        datasource_context_hashes=[_to_datasource_context_hash(included_hash)],
+    )
+
+    assert [[result.display_text for result in query_results] for query_results in results] == [
+        ["included-match"],
+        ["included-match"],
+        [],
+    ]
+
+
+def test_int8_shard_search_re_ranks_the_code_candidates_with_the_full_precision_vectors(
+    conn, datasource_context_hash_repo, chunk_repo, embedding_repo, registry_repo, table_name, mocker
+):
+    int8_table_name = EmbeddingShardResolver(
+        conn=conn, registry_repo=registry_repo, storage_format=EmbeddingStorageFormat.INT8
+    ).resolve_or_create(embedder="tests", embedding_model_details=EmbeddingModelDetails(model_id="int8", model_dim=DIM))
+    context_hash = make_datasource_context_hash(datasource_context_hash_repo, datasource_id="databases/test_db.yaml")
+    other_hash = make_datasource_context_hash(datasource_context_hash_repo, datasource_id="databases/other_db.yaml")
+    for i in range(30):
+        chunk = make_chunk(
+            chunk_repo,
+            datasource_context_hash_id=(context_hash if i % 3 else other_hash).datasource_context_hash_id,
+            full_type="f/type",
+            datasource_id=(context_hash if i % 3 else other_hash).datasource_id,
+            display_text=f"chunk-{i}",
+            keyword_index_text="customer orders" if i % 4 else "invoices",
+        )
+        vec = [1.0, 0.01 * i, 0.003 * (i % 7)] + [0.0] * (DIM - 3)
+        for shard_table_name in (table_name, int8_table_name):
+            embedding_repo.create(table_name=shard_table_name, chunk_id=chunk.chunk_id, vec=vec)
+    repo = ChunkSearchRepository(conn)
+    int8_search = mocker.spy(repo._int8_vector_search, "search")
+    search_vecs = [[1.0, 0.15] + [0.0] * (DIM - 2), [1.0, 0.0, 0.02] + [0.0] * (DIM - 3)]
+    search_kwargs = {
+        "dimension": DIM,
+        "limit": 4,
+        "datasource_context_hashes": [_to_datasource_context_hash(context_hash)],
+    }
+
+    for search_vec in search_vecs:
+        int8_results = repo.search_chunks_by_vector_similarity(
+            table_name=int8_table_name, search_vec=search_vec, **search_kwargs
+        )
+        float32_results = repo.search_chunks_by_vector_similarity(
+            table_name=table_name, search_vec=search_vec, **search_kwargs
+        )
+        assert [r.display_text for r in int8_results] == [r.display_text for r in float32_results]
+        assert [r.score.score for r in int8_results] == pytest.approx([r.score.score for r in float32_results])
+
+        int8_hybrid_results = repo.search_chunks_with_hybrid_search(
+            table_name=int8_table_name, search_vec=search_vec, search_text="customer", **search_kwargs
+        )
+        float32_hybrid_results = repo.search_chunks_with_hybrid_search(
+            table_name=table_name, search_vec=search_vec, search_text="customer", **search_kwargs
+        )
+        assert [r.display_text for r in int8_hybrid_results] == [r.display_text for r in float32_hybrid_results]
+
+    int8_many_results = repo.search_chunks_by_vector_similarity_many(
+        table_name=int8_table_name, search_vecs=search_vecs, **search_kwargs
+    )
+    float32_many_results = repo.search_chunks_by_vector_similarity_many(
+        table_name=table_name, search_vecs=search_vecs, **search_kwargs
+    )
+    assert [[r.display_text for r in results] for results in int8_many_results] == [
+        [r.display_text for r in results] for results in float32_many_results
+    ]
+    assert int8_search.call_count == 5
+
+
+def _make_filtered_out_neighbours_and_included_chunk(
+    datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+):
+    excluded_hash = make_datasource_context_hash(
+        datasource_context_hash_repo, datasource_id="databases/test_clickhouse_db.yaml", hash_="excluded-hash"
+    )
+    included_hash = make_datasource_context_hash(
+        datasource_context_hash_repo, datasource_id="databases/test_postgres_db.yaml", hash_="included-hash"
+    )
+    for i in range(20):
+        _make_chunk_with_vector(
+            chunk_repo,
+            embedding_repo,
+            table_name,
+            datasource_context_hash=excluded_hash,
+            display_text=f"excluded-{i}",
+            vec=[1.0] + [0.0] * (DIM - 1),
+        )
+    _make_chunk_with_vector(
+        chunk_repo,
+        embedding_repo,
+        table_name,
+        datasource_context_hash=included_hash,
+        display_text="included-match",
+        vec=[1.0, 0.3] + [0.0] * (DIM - 2),
+    )
+    return included_hash
+
+
+def _make_chunk_with_vector(chunk_repo, embedding_repo, table_name, *, datasource_context_hash, display_text, vec):
+    chunk = make_chunk(
+        chunk_repo,
+        datasource_context_hash_id=datasource_context_hash.datasource_context_hash_id,
+        full_type="f/type",
+        datasource_id=datasource_context_hash.datasource_id,
+        display_text=display_text,
+    )
+    make_embedding(
+        chunk_repo,
+        embedding_repo,
+        datasource_context_hash_id=datasource_context_hash.datasource_context_hash_id,
+        table_name=table_name,
+        chunk_id=chunk.chunk_id,
+        dim=DIM,
+        vec=vec,
+    )
+
+
 def _get_all_results_for_datasource_id(results: list[SearchResult], datasource_id: DatasourceId) -> list[SearchResult]:
     return [result for result in results if result.datasource_id == datasource_id]
 
@@ -380,8 +627,6 @@ def test_keyword_search_returns_results_ordered_by_bm25(
         embeddable_text="warehouse inventory status",
         display_text="non-relevance",
     )
-    conn.execute("PRAGMA create_fts_index('chunk', 'chunk_id', 'embeddable_text', overwrite=1);")
-
     repo = ChunkSearchRepository(conn)
     results = repo.search_chunks_by_keyword_relevance(
         query_text="customer profile",
@@ -441,8 +686,6 @@ def test_keyword_search_honors_datasource_filter(
         embeddable_text="customer retention details",
         display_text="included-match",
     )
-    conn.execute("PRAGMA create_fts_index('chunk', 'chunk_id', 'embeddable_text', overwrite=1);")
-
     repo = ChunkSearchRepository(conn)
     results = repo.search_chunks_by_keyword_relevance(
         query_text="customer retention",
@@ -455,6 +698,106 @@ def test_keyword_search_honors_datasource_filter(
     assert results[0].datasource_id == DatasourceId.from_string_repr("databases/test_postgres_db.yaml")
 
 
+def test_hybrid_search_fuses_vector_and_keyword_ranks(
+    conn, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+):
+    context_hash = make_datasource_context_hash(datasource_context_hash_repo, datasource_id="databases/test_db.yaml")
+    for i, keyword_text in enumerate(["customer orders", "customer", "invoices", "customer profile", "warehouse"]):
+        chunk = make_chunk(
+            chunk_repo,
+            datasource_context_hash_id=context_hash.datasource_context_hash_id,
+            full_type="f/type",
+            datasource_id=context_hash.datasource_id,
+            display_text=f"chunk-{i}",
+            keyword_index_text=keyword_text,
+        )
+        make_embedding(
+            chunk_repo,
+            embedding_repo,
+            datasource_context_hash_id=context_hash.datasource_context_hash_id,
+            table_name=table_name,
+            chunk_id=chunk.chunk_id,
+            dim=DIM,
+            vec=[1.0, 0.1 * i] + [0.0] * (DIM - 2),
+        )
+    repo = ChunkSearchRepository(conn)
+    search_kwargs = {
+        "datasource_context_hashes": [_to_datasource_context_hash(context_hash)],
+    }
+
+    results = repo.search_chunks_with_hybrid_search(
+        table_name=table_name,
+        search_vec=[1.0] + [0.0] * (DIM - 1),
+        search_text="customer orders",
+        dimension=DIM,
+        limit=2,
+        rrf_k=10,
+        candidate_multiplier=2,
+        **search_kwargs,
+    )
+
+    vector_results = repo.search_chunks_by_vector_similarity(
+        table_name=table_name, search_vec=[1.0] + [0.0] * (DIM - 1), dimension=DIM, limit=4, **search_kwargs
+    )
+    keyword_results = repo.search_chunks_by_keyword_relevance(query_text="customer orders", limit=4, **search_kwargs)
+    expected_scores: dict[int, float] = {}
+    for ranked_results in (vector_results, keyword_results):
+        for rank, result in enumerate(ranked_results, start=1):
+            expected_scores[result.chunk_id] = expected_scores.get(result.chunk_id, 0.0) + 1.0 / (10 + rank)
+    expected_chunk_ids = sorted(expected_scores, key=lambda chunk_id: expected_scores[chunk_id], reverse=True)[:2]
+
+    assert [result.chunk_id for result in results] == expected_chunk_ids
+    assert [result.display_text for result in results] == ["chunk-0", "chunk-1"]
+    assert all(isinstance(result.score, RrfScore) for result in results)
+    assert results[0].score.score == pytest.approx(expected_scores[results[0].chunk_id])
+
+
+def test_hybrid_search_widens_the_probe_when_filters_exclude_the_nearest_vectors(
+    conn, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name, mocker
+):
+    included_hash = _make_filtered_out_neighbours_and_included_chunk(
+        datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+    )
+    repo = ChunkSearchRepository(conn)
+    fuse = mocker.spy(repo, "_fuse_hybrid_candidates")
+
+    results = repo.search_chunks_with_hybrid_search(
+        table_name=table_name,
+        search_vec=[1.0] + [0.0] * (DIM - 1),
+        search_text="unknown words",
+        dimension=DIM,
+        limit=1,
+        datasource_context_hashes=[_to_datasource_context_hash(included_hash)],
+    )
+
+    assert [result.display_text for result in results] == ["included-match"]
+    assert [call.kwargs["probe_limit"] for call in fuse.call_args_list] == [12, 48]
+
+
+def test_hybrid_search_falls_back_to_an_exact_scan_for_very_selective_filters(
+    conn, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name, mocker
+):
+    included_hash = _make_filtered_out_neighbours_and_included_chunk(
+        datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+    )
+    mocker.patch.object(ChunkSearchRepository, "_MAX_VECTOR_PROBE_LIMIT", 8)
+    repo = ChunkSearchRepository(conn)
+    fuse = mocker.spy(repo, "_fuse_hybrid_candidates")
+
+    results = repo.search_chunks_with_hybrid_search(
+        table_name=table_name,
+        search_vec=[1.0] + [0.0] * (DIM - 1),
+        search_text="unknown words",
+        dimension=DIM,
+        limit=1,
+        candidate_multiplier=1,
+        datasource_context_hashes=[_to_datasource_context_hash(included_hash)],
+    )
+
+    assert [result.display_text for result in results] == ["included-match"]
+    assert [call.kwargs["probe_limit"] for call in fuse.call_args_list] == [4, None]
+
+
 def _to_datasource_context_hash(dto) -> DatasourceContextHash:
     return DatasourceContextHash(
         datasource_id=DatasourceId.from_string_repr(dto.datasource_id),
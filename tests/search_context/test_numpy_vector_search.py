@@ -0,0 +1,241 @@
+import duckdb
+import pytest
+
+from databao_context_engine import DatasourceId
+from databao_context_engine.datasources.datasource_context import DatasourceContextHash
+from databao_context_engine.llm.config import EmbeddingModelDetails
+from databao_context_engine.search_context.chunk_search_repository import ChunkSearchRepository, ChunkType
+from databao_context_engine.services.embedding_shard_resolver import EmbeddingShardResolver
+from databao_context_engine.storage.embedding_storage_format import EmbeddingStorageFormat
+from databao_context_engine.storage.migrate import migrate
+from databao_context_engine.storage.repositories.chunk_repository import ChunkRepository
+from databao_context_engine.storage.repositories.datasource_context_repository import DatasourceContextHashRepository
+from databao_context_engine.storage.repositories.embedding_model_registry_repository import (
+    EmbeddingModelRegistryRepository,
+)
+from databao_context_engine.storage.repositories.embedding_repository import EmbeddingRepository
+from tests.utils.factories import make_chunk, make_datasource_context_hash, make_embedding
+
+np = pytest.importorskip("numpy")
+
+from databao_context_engine.search_context.numpy_vector_search import NumpyVectorSearchBackend  # noqa: E402
+
+DIM = 768
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    return tmp_path / "vector_index"
+
+
+@pytest.fixture
+def backend(conn, index_dir) -> NumpyVectorSearchBackend:
+    return NumpyVectorSearchBackend(conn, index_dir=index_dir)
+
+
+@pytest.fixture
+def context_hash(datasource_context_hash_repo):
+    return make_datasource_context_hash(datasource_context_hash_repo, datasource_id="databases/test_db.yaml")
+
+
+def test_numpy_search_returns_the_same_results_as_duckdb(
+    conn, backend, context_hash, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+):
+    other_hash = make_datasource_context_hash(datasource_context_hash_repo, datasource_id="databases/other_db.yaml")
+    rng = np.random.default_rng(42)
+    for i in range(40):
+        _make_chunk_with_vector(
+            chunk_repo,
+            embedding_repo,
+            table_name,
+            datasource_context_hash=context_hash if i % 2 else other_hash,
+            display_text=f"chunk-{i}",
+            vec=(rng.normal(size=DIM) + np.eye(DIM)[0] * 20).tolist(),
+            chunk_type=ChunkType.TABLE.value if i % 3 else ChunkType.COLUMN.value,
+        )
+    search_vecs = [(rng.normal(size=DIM) + np.eye(DIM)[0] * 20).tolist() for _ in range(3)]
+    search_kwargs = {
+        "table_name": table_name,
+        "dimension": DIM,
+        "limit": 5,
+        "datasource_context_hashes": [_to_datasource_context_hash(context_hash)],
+        "chunk_types": [ChunkType.TABLE],
+    }
+
+    numpy_results = ChunkSearchRepository(conn, vector_backend=backend).search_chunks_by_vector_similarity_many(
+        search_vecs=search_vecs, **search_kwargs
+    )
+    duckdb_results = ChunkSearchRepository(conn).search_chunks_by_vector_similarity_many(
+        search_vecs=search_vecs, **search_kwargs
+    )
+
+    assert [[r.display_text for r in results] for results in numpy_results] == [
+        [r.display_text for r in results] for results in duckdb_results
+    ]
+    assert [[r.score.score for r in results] for results in numpy_results] == [
+        pytest.approx([r.score.score for r in results], abs=1e-5) for results in duckdb_results
+    ]
+    assert all(len(results) == 5 for results in numpy_results)
+
+
+def test_numpy_search_only_reads_the_new_vectors(
+    conn, backend, index_dir, context_hash, chunk_repo, embedding_repo, table_name, mocker
+):
+    _make_chunk_with_vector(
+        chunk_repo, embedding_repo, table_name, datasource_context_hash=context_hash, display_text="first"
+    )
+    assert _search(backend, table_name, context_hash) == ["first"]
+
+    second = _make_chunk_with_vector(
+        chunk_repo, embedding_repo, table_name, datasource_context_hash=context_hash, display_text="second"
+    )
+    read_vectors = mocker.spy(backend, "_read_vectors")
+    assert sorted(_search(backend, table_name, context_hash)) == ["first", "second"]
+    assert [call.args[1].tolist() for call in read_vectors.call_args_list] == [[second]]
+
+    # A new backend loads the persisted segments instead of reading the vectors again
+    reloaded_backend = NumpyVectorSearchBackend(conn, index_dir=index_dir)
+    reloaded_read_vectors = mocker.spy(reloaded_backend, "_read_vectors")
+    assert sorted(_search(reloaded_backend, table_name, context_hash)) == ["first", "second"]
+    reloaded_read_vectors.assert_not_called()
+
+
+def test_numpy_search_drops_the_segments_of_a_rebuilt_database(
+    conn, backend, index_dir, context_hash, chunk_repo, embedding_repo, registry_repo, tmp_path
+):
+    table_name = _create_shard(conn, registry_repo)
+    old_chunk_id = _make_chunk_with_vector(
+        chunk_repo, embedding_repo, table_name, datasource_context_hash=context_hash, display_text="old"
+    )
+    assert _search(backend, table_name, context_hash) == ["old"]
+
+    rebuilt_db_path = tmp_path / "rebuilt.duckdb"
+    migrate(rebuilt_db_path)
+    with duckdb.connect(str(rebuilt_db_path)) as rebuilt_conn:
+        assert _create_shard(rebuilt_conn, EmbeddingModelRegistryRepository(rebuilt_conn)) == table_name
+        rebuilt_hash = make_datasource_context_hash(
+            DatasourceContextHashRepository(rebuilt_conn), datasource_id="databases/test_db.yaml"
+        )
+        # The chunk ids of the rebuilt database are assigned again, but the vector of the chunk points elsewhere
+        rebuilt_chunk_id = _make_chunk_with_vector(
+            ChunkRepository(rebuilt_conn),
+            EmbeddingRepository(rebuilt_conn),
+            table_name,
+            datasource_context_hash=rebuilt_hash,
+            display_text="rebuilt",
+            vec=[0.0, 1.0] + [0.0] * (DIM - 2),
+        )
+        assert rebuilt_chunk_id == old_chunk_id
+
+        rebuilt_backend = NumpyVectorSearchBackend(rebuilt_conn, index_dir=index_dir)
+        assert _search(rebuilt_backend, table_name, rebuilt_hash) == []
+
+
+def test_numpy_search_follows_moved_and_deleted_chunks(
+    conn, backend, context_hash, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+):
+    kept = _make_chunk_with_vector(
+        chunk_repo, embedding_repo, table_name, datasource_context_hash=context_hash, display_text="kept"
+    )
+    deleted = _make_chunk_with_vector(
+        chunk_repo, embedding_repo, table_name, datasource_context_hash=context_hash, display_text="deleted"
+    )
+    assert sorted(_search(backend, table_name, context_hash)) == ["deleted", "kept"]
+
+    new_hash = make_datasource_context_hash(
+        datasource_context_hash_repo, datasource_id="databases/test_db.yaml", hash_="new-hash"
+    )
+    chunk_repo.move_to_datasource_context_hash(
+        chunk_ids=[kept], datasource_context_hash_id=new_hash.datasource_context_hash_id
+    )
+    embedding_repo.delete(table_name=table_name, chunk_id=deleted)
+    chunk_repo.delete(deleted)
+
+    assert _search(backend, table_name, context_hash) == []
+    assert _search(backend, table_name, new_hash) == ["kept"]
+
+
+def test_numpy_search_reads_the_full_precision_vectors_of_int8_shards(
+    conn, backend, context_hash, chunk_repo, embedding_repo, registry_repo
+):
+    int8_table_name = EmbeddingShardResolver(
+        conn=conn, registry_repo=registry_repo, storage_format=EmbeddingStorageFormat.INT8
+    ).resolve_or_create(embedder="tests", embedding_model_details=EmbeddingModelDetails(model_id="int8", model_dim=DIM))
+    _make_chunk_with_vector(
+        chunk_repo, embedding_repo, int8_table_name, datasource_context_hash=context_hash, display_text="exact"
+    )
+    _make_chunk_with_vector(
+        chunk_repo,
+        embedding_repo,
+        int8_table_name,
+        datasource_context_hash=context_hash,
+        display_text="far",
+        vec=[0.0, 1.0] + [0.0] * (DIM - 2),
+    )
+
+    results = ChunkSearchRepository(conn, vector_backend=backend).search_chunks_by_vector_similarity(
+        table_name=int8_table_name,
+        search_vec=[1.0] + [0.0] * (DIM - 1),
+        dimension=DIM,
+        limit=10,
+        datasource_context_hashes=[_to_datasource_context_hash(context_hash)],
+    )
+
+    assert [(r.display_text, r.score.score) for r in results] == [("exact", pytest.approx(0.0, abs=1e-6))]
+
+
+def _create_shard(conn, registry_repo) -> str:
+    return EmbeddingShardResolver(conn=conn, registry_repo=registry_repo).resolve_or_create(
+        embedder="tests", embedding_model_details=EmbeddingModelDetails(model_id="rebuilt", model_dim=DIM)
+    )
+
+
+def _search(backend, table_name, context_hash) -> list[str]:
+    repo = ChunkSearchRepository(backend._conn, vector_backend=backend)
+    results = repo.search_chunks_by_vector_similarity(
+        table_name=table_name,
+        search_vec=[1.0] + [0.0] * (DIM - 1),
+        dimension=DIM,
+        limit=10,
+        datasource_context_hashes=[_to_datasource_context_hash(context_hash)],
+    )
+    return [result.display_text for result in results]
+
+
+def _make_chunk_with_vector(
+    chunk_repo,
+    embedding_repo,
+    table_name,
+    *,
+    datasource_context_hash,
+    display_text,
+    vec=None,
+    chunk_type=None,
+) -> int:
+    chunk = make_chunk(
+        chunk_repo,
+        datasource_context_hash_id=datasource_context_hash.datasource_context_hash_id,
+        full_type="f/type",
+        datasource_id=datasource_context_hash.datasource_id,
+        display_text=display_text,
+        chunk_type=chunk_type,
+    )
+    make_embedding(
+        chunk_repo,
+        embedding_repo,
+        datasource_context_hash_id=datasource_context_hash.datasource_context_hash_id,
+        table_name=table_name,
+        chunk_id=chunk.chunk_id,
+        dim=DIM,
+        vec=vec or [1.0] + [0.0] * (DIM - 1),
+    )
+    return chunk.chunk_id
+
+
+def _to_datasource_context_hash(dto) -> DatasourceContextHash:
+    return DatasourceContextHash(
+        datasource_id=DatasourceId.from_string_repr(dto.datasource_id),
+        hash=dto.hash,
+        hash_algorithm=dto.hash_algorithm,
+        hashed_at=dto.hashed_at,
+    )
@@ -0,0 +1,38 @@
+from databao_context_engine.search_context import query_cache as query_cache_module
+from databao_context_engine.search_context.query_cache import SearchQueryCache
+
+
+def test_query_cache_is_keyed_by_model():
+    query_cache = SearchQueryCache()
+    query_cache.put_embedding(embedder="ollama", model_id="model-a", text="orders", vec=[1.0, 2.0])
+
+    assert query_cache.get_embedding(embedder="ollama", model_id="model-a", text="orders") == (1.0, 2.0)
+    assert query_cache.get_embedding(embedder="ollama", model_id="model-b", text="orders") is None
+    assert query_cache.get_embedding(embedder="ollama", model_id="model-a", text="customers") is None
+    assert query_cache.embedding_stats.hits == 1
+    assert query_cache.embedding_stats.misses == 2
+
+
+def test_query_cache_evicts_least_recently_used_entries():
+    query_cache = SearchQueryCache(max_entries=2)
+    query_cache.put_rewrite(prompter="ollama", model_id="m", text="a", rewritten_text="A")
+    query_cache.put_rewrite(prompter="ollama", model_id="m", text="b", rewritten_text="B")
+    query_cache.get_rewrite(prompter="ollama", model_id="m", text="a")
+
+    query_cache.put_rewrite(prompter="ollama", model_id="m", text="c", rewritten_text="C")
+
+    assert query_cache.get_rewrite(prompter="ollama", model_id="m", text="a") == "A"
+    assert query_cache.get_rewrite(prompter="ollama", model_id="m", text="b") is None
+    assert query_cache.get_rewrite(prompter="ollama", model_id="m", text="c") == "C"
+
+
+def test_query_cache_expires_entries(mocker):
+    monotonic = mocker.patch.object(query_cache_module.time, "monotonic", return_value=100.0)
+    query_cache = SearchQueryCache(ttl_seconds=10.0)
+    query_cache.put_embedding(embedder="ollama", model_id="m", text="orders", vec=[1.0])
+
+    monotonic.return_value = 109.0
+    assert query_cache.get_embedding(embedder="ollama", model_id="m", text="orders") == (1.0,)
+
+    monotonic.return_value = 111.0
+    assert query_cache.get_embedding(embedder="ollama", model_id="m", text="orders") is None
@@ -11,6 +11,7 @@ from databao_context_engine.search_context.chunk_search_repository import (
     SearchResult,
     VectorSearchScore,
 )
+from databao_context_engine.search_context.query_cache import SearchQueryCache
 from databao_context_engine.search_context.search_service import RAG_MODE, ContextSearchMode, SearchContextService
 
 
@@ -225,6 +226,167 @@ def test_retrieve_vector_mode_calls_vector_search():
     assert result == expected
 
 
+def test_search_reuses_cached_query_vectors():
+    chunk_search_repo = Mock()
+    shard_resolver = Mock()
+    provider = Mock()
+
+    shard_resolver.resolve.return_value = ("tbl", 2)
+    provider.embedder = "ollama"
+    provider.embedding_model_details = EmbeddingModelDetails.default()
+    provider.embed.side_effect = lambda text: [float(len(text)), 0.0]
+    chunk_search_repo.search_chunks_by_vector_similarity.return_value = []
+
+    query_cache = SearchQueryCache()
+    retrieve_service = SearchContextService(
+        chunk_search_repo=chunk_search_repo,
+        shard_resolver=shard_resolver,
+        embedding_provider=provider,
+        prompt_provider=None,
+        query_cache=query_cache,
+    )
+    datasource_context_hashes = [_make_datasource_context_hash("full/vec.yaml")]
+
+    for search_text in ["orders", "orders", "customers"]:
+        retrieve_service.search(
+            search_text=search_text,
+            datasource_context_hashes=datasource_context_hashes,
+            rag_mode=RAG_MODE.RAW_QUERY,
+            context_search_mode=ContextSearchMode.VECTOR_SEARCH,
+        )
+
+    assert [c.args[0] for c in provider.embed.call_args_list] == ["orders", "customers"]
+    assert [c.kwargs["search_vec"] for c in chunk_search_repo.search_chunks_by_vector_similarity.call_args_list] == [
+        [6.0, 0.0],
+        (6.0, 0.0),
+        [9.0, 0.0],
+    ]
+    assert query_cache.embedding_stats.hits == 1
+    assert query_cache.embedding_stats.misses == 2
+
+
+def test_search_reuses_cached_query_rewrites():
+    chunk_search_repo = Mock()
+    shard_resolver = Mock()
+    provider = Mock()
+    prompt_provider = Mock()
+
+    provider.embedder = "ollama"
+    provider.embedding_model_details = EmbeddingModelDetails.default()
+    prompt_provider.prompter = "ollama"
+    prompt_provider.model_id = "llama3.2:1b"
+    prompt_provider.prompt.side_effect = [Exception("LLM unavailable"), '"orders": "Table"']
+    chunk_search_repo.search_chunks_by_keyword_relevance.return_value = []
+
+    query_cache = SearchQueryCache()
+    retrieve_service = SearchContextService(
+        chunk_search_repo=chunk_search_repo,
+        shard_resolver=shard_resolver,
+        embedding_provider=provider,
+        prompt_provider=prompt_provider,
+        query_cache=query_cache,
+    )
+    datasource_context_hashes = [_make_datasource_context_hash("full/kw.yaml")]
+
+    for _ in range(3):
+        retrieve_service.search(
+            search_text="all orders",
+            datasource_context_hashes=datasource_context_hashes,
+            rag_mode=RAG_MODE.REWRITE_QUERY,
+            context_search_mode=ContextSearchMode.KEYWORD_SEARCH,
+        )
+
+    assert prompt_provider.prompt.call_count == 2
+    assert [c.kwargs["query_text"] for c in chunk_search_repo.search_chunks_by_keyword_relevance.call_args_list] == [
+        "all orders",
+        'all orders\n"orders": "Table"',
+        'all orders\n"orders": "Table"',
+    ]
+    assert query_cache.rewrite_stats.hits == 1
+
+
+def test_search_many_embeds_the_texts_in_one_batch():
+    chunk_search_repo = Mock()
+    shard_resolver = Mock()
+    provider = Mock()
+
+    shard_resolver.resolve.return_value = ("tbl", 2)
+    provider.embedder = "ollama"
+    provider.embedding_model_details = EmbeddingModelDetails.default()
+    provider.embed.return_value = [1.0, 0.0]
+    provider.embed_many.side_effect = lambda texts: [[float(len(text)), 0.0] for text in texts]
+    chunk_search_repo.search_chunks_by_vector_similarity.return_value = []
+    expected: list[list[SearchResult]] = [[], [], []]
+    chunk_search_repo.search_chunks_by_vector_similarity_many.return_value = expected
+
+    retrieve_service = SearchContextService(
+        chunk_search_repo=chunk_search_repo,
+        shard_resolver=shard_resolver,
+        embedding_provider=provider,
+        prompt_provider=None,
+        query_cache=SearchQueryCache(),
+    )
+    datasource_context_hashes = [_make_datasource_context_hash("full/vec.yaml")]
+    retrieve_service.search(
+        search_text="users",
+        datasource_context_hashes=datasource_context_hashes,
+        rag_mode=RAG_MODE.RAW_QUERY,
+        context_search_mode=ContextSearchMode.VECTOR_SEARCH,
+    )
+
+    result = retrieve_service.search_many(
+        search_texts=["orders", "users", "orders"],
+        limit=3,
+        datasource_context_hashes=datasource_context_hashes,
+        rag_mode=RAG_MODE.RAW_QUERY,
+        context_search_mode=ContextSearchMode.VECTOR_SEARCH,
+    )
+
+    provider.embed_many.assert_called_once_with(["orders"])
+    chunk_search_repo.search_chunks_by_vector_similarity_many.assert_called_once_with(
+        table_name="tbl",
+        search_vecs=[[6.0, 0.0], (1.0, 0.0), [6.0, 0.0]],
+        dimension=2,
+        limit=3,
+        datasource_context_hashes=datasource_context_hashes,
+        chunk_types=None,
+    )
+    assert result == expected
+
+
+def test_search_many_runs_a_hybrid_search_per_text():
+    chunk_search_repo = Mock()
+    shard_resolver = Mock()
+    provider = Mock()
+
+    shard_resolver.resolve.return_value = ("tbl", 2)
+    provider.embedder = "ollama"
+    provider.embedding_model_details = EmbeddingModelDetails.default()
+    provider.embed_many.return_value = [[0.1, 0.2], [0.3, 0.4]]
+    chunk_search_repo.search_chunks_with_hybrid_search.return_value = []
+
+    retrieve_service = SearchContextService(
+        chunk_search_repo=chunk_search_repo,
+        shard_resolver=shard_resolver,
+        embedding_provider=provider,
+        prompt_provider=None,
+    )
+
+    result = retrieve_service.search_many(
+        search_texts=["orders", "users"],
+        datasource_context_hashes=[_make_datasource_context_hash("full/a.yaml")],
+        rag_mode=RAG_MODE.RAW_QUERY,
+        context_search_mode=ContextSearchMode.HYBRID_SEARCH,
+    )
+
+    provider.embed_many.assert_called_once_with(["orders", "users"])
+    assert [
+        (c.kwargs["search_text"], c.kwargs["search_vec"])
+        for c in chunk_search_repo.search_chunks_with_hybrid_search.call_args_list
+    ] == [("orders", [0.1, 0.2]), ("users", [0.3, 0.4])]
+    assert result == [[], []]
+
+
 def _make_datasource_context_hash(datasource_id: str) -> DatasourceContextHash:
     return DatasourceContextHash(
         datasource_id=DatasourceId.from_string_repr(datasource_id),
@@ -0,0 +1,106 @@
+import dataclasses
+
+import pytest
+
+from databao_context_engine.plugins.databases.context_enricher import enrich_database_context
+from databao_context_engine.plugins.databases.databases_types import (
+    DatabaseCatalog,
+    DatabaseColumn,
+    DatabaseIntrospectionResult,
+    DatabaseSchema,
+    DatabaseTable,
+)
+from databao_context_engine.services.description_cache import CachingDescriptionProvider, DescriptionCache
+from databao_context_engine.storage.repositories.description_cache_repository import DescriptionCacheRepository
+from tests.utils.fakes import FakeDescriptionProvider
+
+
+@pytest.fixture
+def description_cache(conn) -> DescriptionCache:
+    return DescriptionCache(repo=DescriptionCacheRepository(conn))
+
+
+def test_describe_only_calls_provider_for_cache_misses(description_cache):
+    provider = FakeDescriptionProvider()
+    caching_provider = CachingDescriptionProvider(provider, cache=description_cache)
+
+    assert caching_provider.describe(text="users", context="ctx") == "fake-desc::users"
+    assert caching_provider.describe(text="users", context="ctx") == "fake-desc::users"
+    assert caching_provider.describe(text="users", context="other ctx") == "fake-desc::users"
+
+    assert provider.calls == [("users", "ctx"), ("users", "other ctx")]
+    assert caching_provider.cache_stats.hits == 1
+    assert caching_provider.cache_stats.misses == 2
+
+
+def test_describe_many_only_describes_cache_misses(description_cache):
+    provider = FakeDescriptionProvider()
+    caching_provider = CachingDescriptionProvider(provider, cache=description_cache)
+    caching_provider.describe(text="id", context="ctx")
+    provider.calls.clear()
+
+    assert caching_provider.describe_many(texts=["id", "name", "email"], context="ctx") == [
+        "fake-desc::id",
+        "fake-desc::name",
+        "fake-desc::email",
+    ]
+
+    assert [text for text, _ in provider.calls] == ["name", "email"]
+
+
+def test_describe_does_not_cache_failures(description_cache):
+    provider = FakeDescriptionProvider(fail_at={0})
+    caching_provider = CachingDescriptionProvider(provider, cache=description_cache)
+
+    with pytest.raises(RuntimeError):
+        caching_provider.describe(text="users", context="ctx")
+
+    assert caching_provider.describe(text="users", context="ctx") == "fake-desc::users"
+    assert len(provider.calls) == 2
+
+
+def test_cache_evicts_entries_above_max_entries(conn):
+    repo = DescriptionCacheRepository(conn)
+    caching_provider = CachingDescriptionProvider(
+        FakeDescriptionProvider(), cache=DescriptionCache(repo=repo, max_entries=2)
+    )
+
+    for text in ("a", "b", "c"):
+        caching_provider.describe(text=text, context="ctx")
+    assert repo.count() == 3
+
+    assert caching_provider.evict_cache() == 1
+    assert repo.count() == 2
+    assert caching_provider.describe(text="c", context="ctx") == "fake-desc::c"
+    assert caching_provider.cache_stats.hits == 1
+
+
+def test_re_enriching_after_adding_a_table_only_describes_that_table(description_cache):
+    context = DatabaseIntrospectionResult(catalogs=[DatabaseCatalog(name="default", schemas=[_schema("users")])])
+    enrich_database_context(context, CachingDescriptionProvider(FakeDescriptionProvider(), cache=description_cache))
+
+    provider = FakeDescriptionProvider()
+    catalog = context.catalogs[0]
+    enrich_database_context(
+        dataclasses.replace(context, catalogs=[dataclasses.replace(catalog, schemas=[_schema("users", "orders")])]),
+        CachingDescriptionProvider(provider, cache=description_cache),
+    )
+
+    # The new table changes the prompts of its schema and catalog, but not the ones of the other table
+    assert sorted(text for text, _ in provider.calls) == sorted(
+        ["default", "main", "orders", "name: order_id\ntype: INTEGER\nnullable: false\n"]
+    )
+
+
+def _schema(*table_names: str) -> DatabaseSchema:
+    return DatabaseSchema(
+        name="main",
+        tables=[
+            DatabaseTable(
+                name=table_name,
+                columns=[DatabaseColumn(name=f"{table_name[:-1]}_id", type="INTEGER", nullable=False)],
+                samples=[],
+            )
+            for table_name in table_names
+        ],
+    )
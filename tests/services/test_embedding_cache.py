@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+from databao_context_engine.llm.config import EmbeddingModelDetails
+from databao_context_engine.llm.embeddings.provider import EmbeddingProvider
+from databao_context_engine.services.embedding_cache import EmbeddingCache
+from databao_context_engine.storage.repositories.embedding_cache_repository import EmbeddingCacheRepository
+
+
+@pytest.fixture
+def embedding_provider():
+    provider = Mock(spec=EmbeddingProvider)
+    provider.embedder = "tests"
+    provider.embedding_model_details = EmbeddingModelDetails(model_id="model:v1", model_dim=1)
+    provider.embed_many.side_effect = lambda texts: [[float(len(text))] for text in texts]
+    return provider
+
+
+@pytest.fixture
+def embedding_cache_repo(conn) -> EmbeddingCacheRepository:
+    return EmbeddingCacheRepository(conn)
+
+
+def test_embed_many_only_embeds_cache_misses(embedding_provider, embedding_cache_repo):
+    cache = EmbeddingCache(repo=embedding_cache_repo)
+
+    assert cache.embed_many(embedding_provider=embedding_provider, texts=["a", "bb"]) == [[1.0], [2.0]]
+    assert cache.embed_many(embedding_provider=embedding_provider, texts=["ccc", "bb", "a"]) == [[3.0], [2.0], [1.0]]
+
+    assert [call.args[0] for call in embedding_provider.embed_many.call_args_list] == [["a", "bb"], ["ccc"]]
+
+
+def test_embed_many_embeds_duplicated_texts_once(embedding_provider, embedding_cache_repo):
+    cache = EmbeddingCache(repo=embedding_cache_repo)
+
+    assert cache.embed_many(embedding_provider=embedding_provider, texts=["a", "a", "bb"]) == [[1.0], [1.0], [2.0]]
+
+    embedding_provider.embed_many.assert_called_once_with(["a", "bb"])
+
+
+def test_embed_many_does_not_call_provider_when_everything_is_cached(embedding_provider, embedding_cache_repo):
+    cache = EmbeddingCache(repo=embedding_cache_repo)
+    cache.embed_many(embedding_provider=embedding_provider, texts=["a"])
+    embedding_provider.embed_many.reset_mock()
+
+    assert cache.embed_many(embedding_provider=embedding_provider, texts=["a"]) == [[1.0]]
+
+    embedding_provider.embed_many.assert_not_called()
+
+
+def test_embed_many_can_be_called_concurrently_on_its_own_connection(embedding_provider, conn):
+    cache = EmbeddingCache(repo=EmbeddingCacheRepository(conn.cursor()))
+    texts_per_call = [[f"text-{i}-{j}" for j in range(20)] + ["shared"] for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(
+                lambda texts: cache.embed_many(embedding_provider=embedding_provider, texts=texts), texts_per_call
+            )
+        )
+
+    assert results == [[[float(len(text))] for text in texts] for texts in texts_per_call]
+    assert EmbeddingCacheRepository(conn).count() == 8 * 20 + 1
+
+
+def test_evict_deletes_entries_above_max_entries(embedding_provider, embedding_cache_repo):
+    cache = EmbeddingCache(repo=embedding_cache_repo, max_entries=2)
+
+    cache.embed_many(embedding_provider=embedding_provider, texts=["a", "bb", "ccc"])
+    assert embedding_cache_repo.count() == 3
+
+    assert cache.evict() == 1
+    assert embedding_cache_repo.count() == 2
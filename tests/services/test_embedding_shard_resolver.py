@@ -3,6 +3,8 @@ import pytest
 from databao_context_engine.llm.config import EmbeddingModelDetails
 from databao_context_engine.services.embedding_shard_resolver import EmbeddingShardResolver
 from databao_context_engine.services.table_name_policy import TableNamePolicy
+from databao_context_engine.storage.embedding_storage_format import EmbeddingStorageFormat
+from databao_context_engine.storage.repositories.embedding_repository import EmbeddingRepository
 
 
 def test_resolve_existing_returns_table_name_and_dimension(conn, registry_repo):
@@ -73,6 +75,66 @@ def test_table_name_policy_replaces_unsafe_chars(conn, resolver):
     assert table_name.endswith("__256")
 
 
+def test_resolve_or_create_creates_int8_shard_without_hnsw_index(conn, registry_repo):
+    resolver = EmbeddingShardResolver(
+        conn=conn, registry_repo=registry_repo, storage_format=EmbeddingStorageFormat.INT8
+    )
+
+    table_name = resolver.resolve_or_create(
+        embedder="tests", embedding_model_details=EmbeddingModelDetails(model_id="int8:v1", model_dim=4)
+    )
+
+    assert _column_types(conn, table_name) == {"chunk_id": "BIGINT", "code": "TINYINT[4]", "created_at": "TIMESTAMP"}
+    assert _column_types(conn, f"{table_name}__vectors") == {"chunk_id": "BIGINT", "vec": "FLOAT[4]"}
+    assert not _hnsw_index_exists(conn, table_name)
+    got = registry_repo.get(embedder="tests", model_id="int8:v1")
+    assert got is not None
+    assert got.storage_format == EmbeddingStorageFormat.INT8
+
+
+def test_resolve_or_create_converts_existing_shard_to_the_configured_storage_format(
+    conn, registry_repo, resolver, embedding_repo
+):
+    model_details = EmbeddingModelDetails(model_id="convert:v1", model_dim=4)
+    table_name = resolver.resolve_or_create(embedder="tests", embedding_model_details=model_details)
+    embedding_repo.bulk_insert(table_name=table_name, chunk_ids=[1, 2], vecs=[[0.5, -1.0, 0.25, 0.0], [0.0] * 4], dim=4)
+
+    int8_resolver = EmbeddingShardResolver(
+        conn=conn, registry_repo=registry_repo, storage_format=EmbeddingStorageFormat.INT8
+    )
+    assert int8_resolver.resolve_or_create(embedder="tests", embedding_model_details=model_details) == table_name
+
+    assert not _hnsw_index_exists(conn, table_name)
+    assert "vec" not in _column_types(conn, table_name)
+    assert conn.execute(f"SELECT chunk_id, code FROM {table_name} ORDER BY chunk_id").fetchall() == [
+        (1, (64, -127, 32, 0)),
+        (2, (0, 0, 0, 0)),
+    ]
+    assert [(e.chunk_id, e.vec) for e in EmbeddingRepository(conn).list(table_name)] == [
+        (2, [0.0, 0.0, 0.0, 0.0]),
+        (1, [0.5, -1.0, 0.25, 0.0]),
+    ]
+    assert registry_repo.get_by_table_name(table_name=table_name).storage_format == EmbeddingStorageFormat.INT8
+
+    assert resolver.resolve_or_create(embedder="tests", embedding_model_details=model_details) == table_name
+
+    assert _hnsw_index_exists(conn, table_name)
+    assert "code" not in _column_types(conn, table_name)
+    assert not _column_types(conn, f"{table_name}__vectors")
+    assert conn.execute(f"SELECT chunk_id, vec FROM {table_name} ORDER BY chunk_id").fetchall() == [
+        (1, (0.5, -1.0, 0.25, 0.0)),
+        (2, (0.0, 0.0, 0.0, 0.0)),
+    ]
+    assert registry_repo.get_by_table_name(table_name=table_name).storage_format == EmbeddingStorageFormat.FLOAT32
+
+
+def _column_types(conn, table_name: str) -> dict[str, str]:
+    rows = conn.execute(
+        "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = ?", [table_name]
+    ).fetchall()
+    return dict(rows)
+
+
 def _table_exists(conn, name: str) -> bool:
     rows = conn.execute("SELECT 1 FROM duckdb_tables() WHERE table_name = ?", [name]).fetchall()
     return bool(rows)
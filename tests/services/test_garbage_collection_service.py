@@ -0,0 +1,163 @@
+from datetime import datetime
+
+import pytest
+
+from databao_context_engine.datasources.datasource_context import DatasourceContextHash
+from databao_context_engine.datasources.types import DatasourceId
+from databao_context_engine.pluginlib.build_plugin import EmbeddableChunk
+from databao_context_engine.services.garbage_collection_service import GarbageCollectionService
+from databao_context_engine.services.models import ChunkEmbedding
+from databao_context_engine.services.persistence_service import PersistenceService
+
+
+@pytest.fixture
+def gc_service(conn, datasource_context_hash_repo, chunk_repo, embedding_repo, registry_repo, resolver, table_name):
+    registry_repo.create(embedder="tests", model_id="dummy-model", dim=768, table_name=table_name)
+    return GarbageCollectionService(
+        conn,
+        datasource_context_hash_repo=datasource_context_hash_repo,
+        chunk_repo=chunk_repo,
+        embedding_repo=embedding_repo,
+        registry_repo=registry_repo,
+        shard_resolver=resolver,
+    )
+
+
+def test_collect_keeps_only_the_latest_context_hash_of_each_datasource(
+    conn, gc_service, persistence, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+):
+    for hash_ in ("hash-1", "hash-2", "hash-3"):
+        _write(persistence, table_name, "ds1.yaml", hash_, texts=[f"{hash_} A", f"{hash_} B"])
+    _write(persistence, table_name, "ds2.yaml", "hash-x", texts=["X"])
+
+    result = gc_service.collect()
+
+    assert {(h.datasource_id, h.hash) for h in datasource_context_hash_repo.list()} == {
+        ("ds1.yaml", "hash-3"),
+        ("ds2.yaml", "hash-x"),
+    }
+    remaining_chunks = chunk_repo.list()
+    assert sorted(c.embeddable_text for c in remaining_chunks) == ["X", "hash-3 A", "hash-3 B"]
+    assert {e.chunk_id for e in embedding_repo.list(table_name=table_name)} == {c.chunk_id for c in remaining_chunks}
+    assert {row[0] for row in conn.execute("SELECT chunk_id FROM keyword_index_document").fetchall()} == {
+        c.chunk_id for c in remaining_chunks
+    }
+
+    assert result.deleted_context_hashes == 2
+    assert result.deleted_chunks == 4
+    assert result.deleted_embeddings == 4
+    assert result.bytes_reclaimed >= 0
+
+
+def test_collect_keeps_previous_context_hashes(
+    gc_service, persistence, datasource_context_hash_repo, embedding_repo, table_name
+):
+    for hash_ in ("hash-1", "hash-2", "hash-3"):
+        _write(persistence, table_name, "ds1.yaml", hash_, texts=[hash_])
+
+    result = gc_service.collect(keep_previous_hashes=1)
+
+    assert [h.hash for h in datasource_context_hash_repo.list()] == ["hash-3", "hash-2"]
+    assert len(embedding_repo.list(table_name=table_name)) == 2
+    assert result.deleted_context_hashes == 1
+
+
+def test_collect_keeps_complete_previous_context_hashes_of_incremental_writes(
+    conn, gc_service, datasource_context_hash_repo, chunk_repo, embedding_repo, registry_repo, table_name
+):
+    persistence = PersistenceService(
+        conn=conn,
+        datasource_context_hash_repo=datasource_context_hash_repo,
+        chunk_repo=chunk_repo,
+        embedding_repo=embedding_repo,
+        dim=768,
+        registry_repo=registry_repo,
+        keep_previous_context_hashes=1,
+    )
+    for hash_ in ("hash-1", "hash-2", "hash-3"):
+        _write(persistence, table_name, "ds1.yaml", hash_, texts=["shared", hash_], override=False)
+
+    gc_service.collect(keep_previous_hashes=1)
+
+    assert [h.hash for h in datasource_context_hash_repo.list()] == ["hash-3", "hash-2"]
+    assert sorted(c.embeddable_text for c in chunk_repo.list()) == ["hash-2", "hash-3", "shared", "shared"]
+
+
+def test_collect_keeps_the_current_context_hash_after_a_revert(
+    gc_service, persistence, datasource_context_hash_repo, chunk_repo, table_name
+):
+    for hash_ in ("hash-1", "hash-2"):
+        _write(persistence, table_name, "ds1.yaml", hash_, texts=[hash_])
+
+    result = gc_service.collect(current_context_hashes=[_context_hash("ds1.yaml", "hash-1")])
+
+    assert [h.hash for h in datasource_context_hash_repo.list()] == ["hash-1"]
+    assert [c.embeddable_text for c in chunk_repo.list()] == ["hash-1"]
+    assert result.deleted_context_hashes == 1
+
+
+def test_collect_deletes_incomplete_context_hashes(gc_service, persistence, datasource_context_hash_repo, table_name):
+    for hash_ in ("hash-1", "hash-2"):
+        _write(persistence, table_name, "ds1.yaml", hash_, texts=[hash_])
+    incomplete = datasource_context_hash_repo.get_by_datasource_id_and_hash(
+        datasource_id="ds1.yaml", hash_algorithm="test-algorithm", hash_="hash-1"
+    )
+    assert incomplete is not None
+    datasource_context_hash_repo.mark_incomplete(datasource_context_hash_id=incomplete.datasource_context_hash_id)
+
+    result = gc_service.collect(keep_previous_hashes=1)
+
+    assert [h.hash for h in datasource_context_hash_repo.list()] == ["hash-2"]
+    assert result.deleted_context_hashes == 1
+
+
+def test_collect_deletes_the_context_hashes_of_removed_datasources(
+    gc_service, persistence, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+):
+    _write(persistence, table_name, "ds1.yaml", "hash-1", texts=["kept"])
+    _write(persistence, table_name, "removed.yaml", "hash-x", texts=["removed"])
+
+    result = gc_service.collect(existing_datasource_ids={"ds1.yaml"})
+
+    assert [(h.datasource_id, h.hash) for h in datasource_context_hash_repo.list()] == [("ds1.yaml", "hash-1")]
+    assert [c.embeddable_text for c in chunk_repo.list()] == ["kept"]
+    assert len(embedding_repo.list(table_name=table_name)) == 1
+    assert result.deleted_context_hashes == 1
+
+
+def test_collect_deletes_orphan_embeddings(gc_service, persistence, embedding_repo, table_name):
+    _write(persistence, table_name, "ds1.yaml", "hash-1", texts=["A"])
+    embedding_repo.create(table_name=table_name, chunk_id=999_999, vec=[0.5] * 768)
+
+    result = gc_service.collect()
+
+    assert 999_999 not in {e.chunk_id for e in embedding_repo.list(table_name=table_name)}
+    assert result.deleted_context_hashes == 0
+    assert result.deleted_embeddings == 1
+
+
+def _write(
+    persistence, table_name: str, datasource_id: str, hash_: str, *, texts: list[str], override: bool = True
+) -> None:
+    persistence.write_chunks_and_embeddings(
+        chunk_embeddings=[
+            ChunkEmbedding(
+                EmbeddableChunk(embeddable_text=text, content=text), [0.1] * 768, embedded_text=text, display_text=text
+            )
+            for text in texts
+        ],
+        table_name=table_name,
+        full_type="files/md",
+        datasource_id=datasource_id,
+        context_hash=_context_hash(datasource_id, hash_),
+        override=override,
+    )
+
+
+def _context_hash(datasource_id: str, hash_: str) -> DatasourceContextHash:
+    return DatasourceContextHash(
+        datasource_id=DatasourceId.from_string_repr(datasource_id),
+        hash=hash_,
+        hash_algorithm="test-algorithm",
+        hashed_at=datetime.now(),
+    )
@@ -12,6 +12,7 @@ from databao_context_engine.datasources.datasource_context import DatasourceCont
 from databao_context_engine.datasources.types import DatasourceId
 from databao_context_engine.pluginlib.build_plugin import EmbeddableChunk
 from databao_context_engine.services.models import ChunkEmbedding
+from databao_context_engine.services.persistence_service import PersistenceService
 
 
 def test_write_chunks_and_embeddings(persistence, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name):
@@ -325,5 +326,239 @@ def test_write_chunks_and_embeddings_override_replaces_datasource_rows(
     assert len(embedding_rows) == len(ds1_rows) + len(ds2_rows)
 
 
+def test_write_chunks_and_embeddings_reuses_unchanged_chunks_of_previous_hash(
+    conn, persistence, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+):
+    datasource_id = DatasourceId.from_string_repr("db.yaml")
+    persistence.write_chunks_and_embeddings(
+        chunk_embeddings=[
+            _table_chunk_embedding("db.public.orders", "orders", 0.0),
+            _table_chunk_embedding("db.public.users", "users", 1.0),
+            _table_chunk_embedding("db.public.legacy", "legacy", 2.0),
+        ],
+        table_name=table_name,
+        full_type="databases/postgres",
+        datasource_id=str(datasource_id),
+        context_hash=DatasourceContextHash(
+            datasource_id=datasource_id, hash="hash-1", hash_algorithm="test-algorithm", hashed_at=datetime.now()
+        ),
+    )
+    chunk_ids_before = {c.chunk_key: c.chunk_id for c in chunk_repo.list()}
+
+    persistence.write_chunks_and_embeddings(
+        chunk_embeddings=[
+            _table_chunk_embedding("db.public.orders", "orders", 0.0),
+            _table_chunk_embedding("db.public.users", "users and their emails", 3.0),
+            _table_chunk_embedding("db.public.invoices", "invoices", 4.0),
+        ],
+        table_name=table_name,
+        full_type="databases/postgres",
+        datasource_id=str(datasource_id),
+        context_hash=DatasourceContextHash(
+            datasource_id=datasource_id, hash="hash-2", hash_algorithm="test-algorithm", hashed_at=datetime.now()
+        ),
+    )
+
+    saved_hash = datasource_context_hash_repo.list()
+    assert [h.hash for h in saved_hash] == ["hash-2"]
+
+    saved = chunk_repo.list()
+    assert {c.datasource_context_hash_id for c in saved} == {saved_hash[0].datasource_context_hash_id}
+    assert {c.chunk_key: c.embeddable_text for c in saved} == {
+        "db.public.orders": "orders",
+        "db.public.users": "users and their emails",
+        "db.public.invoices": "invoices",
+    }
+    chunk_ids_after = {c.chunk_key: c.chunk_id for c in saved}
+    assert chunk_ids_after["db.public.orders"] == chunk_ids_before["db.public.orders"]
+    assert chunk_ids_after["db.public.users"] != chunk_ids_before["db.public.users"]
+
+    embeddings = embedding_repo.list(table_name=table_name)
+    assert {e.chunk_id for e in embeddings} == set(chunk_ids_after.values())
+
+    keyword_indexed_chunk_ids = {
+        row[0] for row in conn.execute("SELECT chunk_id FROM keyword_index_document").fetchall()
+    }
+    assert keyword_indexed_chunk_ids == set(chunk_ids_after.values())
+
+
+def test_write_chunks_and_embeddings_inserts_nothing_when_all_chunks_are_unchanged(
+    persistence, datasource_context_hash_repo, chunk_repo, embedding_repo, table_name
+):
+    datasource_id = DatasourceId.from_string_repr("db.yaml")
+    chunk_embeddings = [
+        _table_chunk_embedding("db.public.orders", "orders", 0.0),
+        _table_chunk_embedding("db.public.orders", "orders", 0.0),
+    ]
+    for hash_ in ("hash-1", "hash-2"):
+        persistence.write_chunks_and_embeddings(
+            chunk_embeddings=chunk_embeddings,
+            table_name=table_name,
+            full_type="databases/postgres",
+            datasource_id=str(datasource_id),
+            context_hash=DatasourceContextHash(
+                datasource_id=datasource_id, hash=hash_, hash_algorithm="test-algorithm", hashed_at=datetime.now()
+            ),
+        )
+    chunk_ids_before = {c.chunk_id for c in chunk_repo.list()}
+
+    persistence.write_chunks_and_embeddings(
+        chunk_embeddings=chunk_embeddings,
+        table_name=table_name,
+        full_type="databases/postgres",
+        datasource_id=str(datasource_id),
+        context_hash=DatasourceContextHash(
+            datasource_id=datasource_id, hash="hash-3", hash_algorithm="test-algorithm", hashed_at=datetime.now()
+        ),
+    )
+
+    assert [h.hash for h in datasource_context_hash_repo.list()] == ["hash-3"]
+    assert {c.chunk_id for c in chunk_repo.list()} == chunk_ids_before
+    assert len(chunk_ids_before) == 2
+    assert len(embedding_repo.list(table_name=table_name)) == 2
+
+
+def test_write_chunks_and_embeddings_indexes_a_reverted_context_again(
+    persistence, datasource_context_hash_repo, chunk_repo, table_name
+):
+    datasource_id = DatasourceId.from_string_repr("db.yaml")
+    hash_1, hash_2 = (
+        DatasourceContextHash(
+            datasource_id=datasource_id, hash=hash_, hash_algorithm="test-algorithm", hashed_at=datetime.now()
+        )
+        for hash_ in ("hash-1", "hash-2")
+    )
+    chunk_embeddings_1 = [
+        _table_chunk_embedding("db.public.orders", "orders", 0.0),
+        _table_chunk_embedding("db.public.users", "users", 1.0),
+        _table_chunk_embedding("db.public.legacy", "legacy", 2.0),
+    ]
+    write_kwargs = {"table_name": table_name, "full_type": "databases/postgres", "datasource_id": str(datasource_id)}
+
+    persistence.write_chunks_and_embeddings(chunk_embeddings=chunk_embeddings_1, context_hash=hash_1, **write_kwargs)
+    persistence.write_chunks_and_embeddings(
+        chunk_embeddings=[_table_chunk_embedding("db.public.orders", "orders", 0.0)],
+        context_hash=hash_2,
+        **write_kwargs,
+    )
+
+    assert not persistence.has_datasource_context_hash(hash_1)
+    assert persistence.get_indexed_datasource_context_hashes([hash_1, hash_2]) == [hash_2]
+
+    persistence.write_chunks_and_embeddings(chunk_embeddings=chunk_embeddings_1, context_hash=hash_1, **write_kwargs)
+
+    saved_hashes = datasource_context_hash_repo.list()
+    assert [h.hash for h in saved_hashes] == ["hash-1"]
+    assert sorted(c.embeddable_text for c in chunk_repo.list()) == ["legacy", "orders", "users"]
+    assert {c.datasource_context_hash_id for c in chunk_repo.list()} == {saved_hashes[0].datasource_context_hash_id}
+
+
+def test_write_chunks_and_embeddings_replaces_an_incomplete_context_hash(
+    persistence, datasource_context_hash_repo, chunk_repo, table_name
+):
+    datasource_id = DatasourceId.from_string_repr("db.yaml")
+    context_hash = DatasourceContextHash(
+        datasource_id=datasource_id, hash="hash-1", hash_algorithm="test-algorithm", hashed_at=datetime.now()
+    )
+    write_kwargs = {
+        "table_name": table_name,
+        "full_type": "databases/postgres",
+        "datasource_id": str(datasource_id),
+        "context_hash": context_hash,
+    }
+    persistence.write_chunks_and_embeddings(
+        chunk_embeddings=[_table_chunk_embedding("db.public.orders", "orders", 0.0)], **write_kwargs
+    )
+    # As left by a write of a newer context hash, interrupted after moving the chunks
+    datasource_context_hash_repo.mark_incomplete(
+        datasource_context_hash_id=datasource_context_hash_repo.list()[0].datasource_context_hash_id
+    )
+    assert not persistence.has_datasource_context_hash(context_hash)
+
+    persistence.write_chunks_and_embeddings(
+        chunk_embeddings=[_table_chunk_embedding("db.public.users", "users", 1.0)], **write_kwargs
+    )
+
+    assert persistence.has_datasource_context_hash(context_hash)
+    assert [c.embeddable_text for c in chunk_repo.list()] == ["users"]
+
+
+def test_write_chunks_and_embeddings_keeps_previous_context_hashes_complete(
+    conn, datasource_context_hash_repo, chunk_repo, embedding_repo, registry_repo, table_name
+):
+    persistence = PersistenceService(
+        conn=conn,
+        datasource_context_hash_repo=datasource_context_hash_repo,
+        chunk_repo=chunk_repo,
+        embedding_repo=embedding_repo,
+        dim=768,
+        registry_repo=registry_repo,
+        keep_previous_context_hashes=1,
+    )
+    datasource_id = DatasourceId.from_string_repr("db.yaml")
+    for hash_, texts in (("hash-1", ["orders", "users"]), ("hash-2", ["orders"])):
+        persistence.write_chunks_and_embeddings(
+            chunk_embeddings=[_table_chunk_embedding(f"db.public.{text}", text, 0.0) for text in texts],
+            table_name=table_name,
+            full_type="databases/postgres",
+            datasource_id=str(datasource_id),
+            context_hash=DatasourceContextHash(
+                datasource_id=datasource_id, hash=hash_, hash_algorithm="test-algorithm", hashed_at=datetime.now()
+            ),
+        )
+
+    texts_by_hash: dict[str, list[str]] = {}
+    hashes_by_id = {h.datasource_context_hash_id: h.hash for h in datasource_context_hash_repo.list()}
+    for chunk in chunk_repo.list():
+        texts_by_hash.setdefault(hashes_by_id[chunk.datasource_context_hash_id], []).append(chunk.embeddable_text)
+    assert {hash_: sorted(texts) for hash_, texts in texts_by_hash.items()} == {
+        "hash-1": ["orders", "users"],
+        "hash-2": ["orders"],
+    }
+    assert len(embedding_repo.list(table_name=table_name)) == 3
+
+
+def test_write_chunks_and_embeddings_override_deletes_the_embeddings_of_every_shard(
+    conn, persistence, registry_repo, chunk_repo, embedding_repo, table_name
+):
+    other_table_name = "embedding_tests__other_model__768"
+    conn.execute(f"CREATE TABLE {other_table_name} AS SELECT * FROM {table_name} LIMIT 0")
+    registry_repo.create(embedder="tests", model_id="other-model", dim=768, table_name=other_table_name)
+    datasource_id = DatasourceId.from_string_repr("db.yaml")
+    context_hash = DatasourceContextHash(
+        datasource_id=datasource_id, hash="hash-1", hash_algorithm="test-algorithm", hashed_at=datetime.now()
+    )
+    write_kwargs = {
+        "full_type": "databases/postgres",
+        "datasource_id": str(datasource_id),
+        "context_hash": context_hash,
+        "override": True,
+    }
+
+    # The same context embedded with another model, in another shard table
+    persistence.write_chunks_and_embeddings(
+        chunk_embeddings=[_table_chunk_embedding("db.public.orders", "orders", 0.0)],
+        table_name=other_table_name,
+        **write_kwargs,
+    )
+    persistence.write_chunks_and_embeddings(
+        chunk_embeddings=[_table_chunk_embedding("db.public.orders", "orders", 1.0)],
+        table_name=table_name,
+        **write_kwargs,
+    )
+
+    assert embedding_repo.list(table_name=other_table_name) == []
+    assert {e.chunk_id for e in embedding_repo.list(table_name=table_name)} == {c.chunk_id for c in chunk_repo.list()}
+
+
+def _table_chunk_embedding(key: str, text: str, fill: float) -> ChunkEmbedding:
+    return ChunkEmbedding(
+        EmbeddableChunk(type="table", key=key, embeddable_text=text, content=text),
+        _vec(fill),
+        embedded_text=text,
+        display_text=text,
+    )
+
+
 def _vec(fill: float, dim: int = 768) -> list[float]:
     return [fill] * dim
@@ -147,3 +147,81 @@ def test_delete_by_datasource_id(chunk_repo, datasource_context_hash_id):
     assert d2_c.chunk_id in remaining_ids
 
     assert {c.datasource_id for c in remaining} == {"ds2"}
+
+
+def test_bulk_insert_indexes_keywords_of_inserted_chunks(conn, chunk_repo, datasource_context_hash_id):
+    chunk_ids = chunk_repo.bulk_insert(
+        full_type="type/md",
+        datasource_id="ds1",
+        chunk_contents=[
+            ("e1", "d1", "Customers of the shop", None, None, None),
+            ("e2", "d2", "customer orders", "table", "db.public.orders", "h2"),
+            ("e3", "d3", None, "column", "db.public.orders.id", "h3"),
+        ],
+        datasource_context_hash_id=datasource_context_hash_id,
+    )
+
+    assert _keyword_index_terms(conn) == {
+        ("custom", chunk_ids[0], 1),
+        ("shop", chunk_ids[0], 1),
+        ("custom", chunk_ids[1], 1),
+        ("order", chunk_ids[1], 1),
+    }
+    assert _keyword_index_document_lengths(conn) == {chunk_ids[0]: 2, chunk_ids[1]: 2, chunk_ids[2]: 0}
+
+
+def test_update_reindexes_keywords(conn, chunk_repo, datasource_context_hash_id):
+    chunk = chunk_repo.create(
+        full_type="type/md",
+        datasource_id="ds1",
+        embeddable_text="e",
+        display_text="d",
+        keyword_index_text="orders",
+        datasource_context_hash_id=datasource_context_hash_id,
+    )
+
+    chunk_repo.update(chunk.chunk_id, keyword_index_text="revenue revenue")
+
+    assert _keyword_index_terms(conn) == {("revenu", chunk.chunk_id, 2)}
+    assert _keyword_index_document_lengths(conn) == {chunk.chunk_id: 2}
+
+
+def test_deletes_remove_chunks_from_keyword_index(conn, chunk_repo, datasource_context_hash_id):
+    kept = chunk_repo.create(
+        full_type="type/md",
+        datasource_id="ds2",
+        embeddable_text="e",
+        display_text="d",
+        keyword_index_text="invoices",
+        datasource_context_hash_id=datasource_context_hash_id,
+    )
+    deleted = chunk_repo.create(
+        full_type="type/md",
+        datasource_id="ds2",
+        embeddable_text="e",
+        display_text="d",
+        keyword_index_text="deleted",
+        datasource_context_hash_id=datasource_context_hash_id,
+    )
+    chunk_repo.create(
+        full_type="type/md",
+        datasource_id="ds1",
+        embeddable_text="e",
+        display_text="d",
+        keyword_index_text="other datasource",
+        datasource_context_hash_id=datasource_context_hash_id,
+    )
+
+    chunk_repo.delete(deleted.chunk_id)
+    chunk_repo.delete_by_datasource_id(datasource_id="ds1")
+
+    assert _keyword_index_terms(conn) == {("invoic", kept.chunk_id, 1)}
+    assert _keyword_index_document_lengths(conn) == {kept.chunk_id: 1}
+
+
+def _keyword_index_terms(conn) -> set[tuple[str, int, int]]:
+    return set(conn.execute("SELECT term, chunk_id, tf FROM keyword_index_term").fetchall())
+
+
+def _keyword_index_document_lengths(conn) -> dict[int, int]:
+    return dict(conn.execute("SELECT chunk_id, length FROM keyword_index_document").fetchall())
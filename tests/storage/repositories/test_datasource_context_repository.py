@@ -134,3 +134,24 @@ def test_insert_duplicate_hash_raises_integrity_error(datasource_context_hash_re
             hash_="abc123",
             hashed_at=hashed_at,
         )
+
+
+def test_list_existing_hashes_returns_only_the_indexed_hashes(datasource_context_hash_repo):
+    for datasource_id, hash_ in (("a.yaml", "hash-a"), ("b.yaml", "hash-b")):
+        datasource_context_hash_repo.insert(
+            datasource_id=datasource_id,
+            hash_algorithm="sha256",
+            hash_=hash_,
+            hashed_at=datetime(2025, 1, 1, 0, 0, 0),
+        )
+
+    existing = datasource_context_hash_repo.list_existing_hashes(
+        hashes=[
+            ("a.yaml", "sha256", "hash-a"),
+            ("b.yaml", "sha256", "stale-hash"),
+            ("c.yaml", "sha256", "hash-a"),
+        ]
+    )
+
+    assert existing == {("a.yaml", "sha256", "hash-a")}
+    assert datasource_context_hash_repo.list_existing_hashes(hashes=[]) == set()
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from databao_context_engine.storage.repositories.description_cache_repository import DescriptionCacheRepository
+
+
+@pytest.fixture
+def description_cache_repo(conn) -> DescriptionCacheRepository:
+    return DescriptionCacheRepository(conn)
+
+
+def _get(repo: DescriptionCacheRepository, prompt_hash: str, *, model_id: str = "model:v1") -> str | None:
+    return repo.get(
+        describer="tests", model_id=model_id, prompt_hash=prompt_hash, created_after=datetime.now() - timedelta(days=1)
+    )
+
+
+def test_put_and_get_roundtrip(description_cache_repo):
+    description_cache_repo.put(describer="tests", model_id="model:v1", prompt_hash="h1", description="A table")
+
+    assert _get(description_cache_repo, "h1") == "A table"
+    assert _get(description_cache_repo, "missing") is None
+    assert _get(description_cache_repo, "h1", model_id="model:v2") is None
+
+
+def test_put_replaces_the_cached_description(description_cache_repo):
+    description_cache_repo.put(describer="tests", model_id="model:v1", prompt_hash="h1", description="old")
+    description_cache_repo.put(describer="tests", model_id="model:v1", prompt_hash="h1", description="new")
+
+    assert description_cache_repo.count() == 1
+    assert _get(description_cache_repo, "h1") == "new"
+
+
+def test_get_ignores_expired_descriptions(conn, description_cache_repo):
+    description_cache_repo.put(describer="tests", model_id="model:v1", prompt_hash="h1", description="A table")
+    conn.execute("UPDATE description_cache SET created_at = TIMESTAMP '2020-01-01'")
+
+    assert _get(description_cache_repo, "h1") is None
+
+    assert description_cache_repo.delete_created_before(created_before=datetime.now() - timedelta(days=1)) == 1
+    assert description_cache_repo.count() == 0
+
+
+def test_evict_least_recently_used_keeps_most_recently_used(conn, description_cache_repo):
+    for prompt_hash in ("h1", "h2", "h3"):
+        description_cache_repo.put(
+            describer="tests", model_id="model:v1", prompt_hash=prompt_hash, description=prompt_hash
+        )
+    conn.execute("UPDATE description_cache SET last_used_at = TIMESTAMP '2020-01-01'")
+    _get(description_cache_repo, "h2")
+
+    assert description_cache_repo.evict_least_recently_used(max_entries=1) == 2
+
+    assert description_cache_repo.count() == 1
+    assert _get(description_cache_repo, "h2") == "h2"
@@ -0,0 +1,48 @@
+import pytest
+
+from databao_context_engine.storage.repositories.embedding_cache_repository import EmbeddingCacheRepository
+
+
+@pytest.fixture
+def embedding_cache_repo(conn) -> EmbeddingCacheRepository:
+    return EmbeddingCacheRepository(conn)
+
+
+def test_put_and_get_many_roundtrip(embedding_cache_repo):
+    embedding_cache_repo.put_many(
+        embedder="tests", model_id="model:v1", text_hashes=["h1", "h2"], vecs=[[1.0, 2.0], [3.0, 4.5]]
+    )
+
+    got = embedding_cache_repo.get_many(embedder="tests", model_id="model:v1", text_hashes=["h1", "h2", "missing"])
+
+    assert got == {"h1": [1.0, 2.0], "h2": [3.0, 4.5]}
+
+
+def test_get_many_is_scoped_by_embedder_and_model(embedding_cache_repo):
+    embedding_cache_repo.put_many(embedder="tests", model_id="model:v1", text_hashes=["h1"], vecs=[[1.0]])
+
+    assert embedding_cache_repo.get_many(embedder="tests", model_id="model:v2", text_hashes=["h1"]) == {}
+    assert embedding_cache_repo.get_many(embedder="other", model_id="model:v1", text_hashes=["h1"]) == {}
+
+
+def test_put_many_ignores_already_cached_hashes(embedding_cache_repo):
+    embedding_cache_repo.put_many(embedder="tests", model_id="model:v1", text_hashes=["h1"], vecs=[[1.0]])
+    embedding_cache_repo.put_many(embedder="tests", model_id="model:v1", text_hashes=["h1", "h2"], vecs=[[9.0], [2.0]])
+
+    assert embedding_cache_repo.count() == 2
+    assert embedding_cache_repo.get_many(embedder="tests", model_id="model:v1", text_hashes=["h1"]) == {"h1": [1.0]}
+
+
+def test_evict_least_recently_used_keeps_most_recently_used(conn, embedding_cache_repo):
+    embedding_cache_repo.put_many(
+        embedder="tests", model_id="model:v1", text_hashes=["h1", "h2", "h3"], vecs=[[1.0], [2.0], [3.0]]
+    )
+    conn.execute("UPDATE embedding_cache SET last_used_at = TIMESTAMP '2020-01-01'")
+    embedding_cache_repo.get_many(embedder="tests", model_id="model:v1", text_hashes=["h2"])
+
+    assert embedding_cache_repo.evict_least_recently_used(max_entries=1) == 2
+
+    assert embedding_cache_repo.count() == 1
+    assert embedding_cache_repo.get_many(embedder="tests", model_id="model:v1", text_hashes=["h1", "h2", "h3"]) == {
+        "h2": [2.0]
+    }
@@ -1,5 +1,8 @@
 import pytest
 
+from databao_context_engine.llm.config import EmbeddingModelDetails
+from databao_context_engine.services.embedding_shard_resolver import EmbeddingShardResolver
+from databao_context_engine.storage.embedding_storage_format import EmbeddingStorageFormat
 from databao_context_engine.storage.exceptions.exceptions import IntegrityError
 from databao_context_engine.storage.models import EmbeddingDTO
 from tests.utils.factories import make_chunk, make_datasource_context_hash
@@ -79,9 +82,13 @@ def test_list(embedding_repo, datasource_context_hash_repo, chunk_repo, table_na
     assert [e.chunk_id for e in rows] == [e2.chunk_id, e1.chunk_id]
 
 
-def test_create_with_missing_fk_raises(embedding_repo, table_name):
+def test_create_duplicate_chunk_id_raises(embedding_repo, datasource_context_hash_repo, chunk_repo, table_name):
+    datasource_context_hash = make_datasource_context_hash(datasource_context_hash_repo)
+    chunk = make_chunk(chunk_repo, datasource_context_hash_id=datasource_context_hash.datasource_context_hash_id)
+    embedding_repo.create(chunk_id=chunk.chunk_id, table_name=table_name, vec=_vec(0.0))
+
     with pytest.raises(IntegrityError):
-        embedding_repo.create(table_name=table_name, chunk_id=999_999, vec=_vec(0.0))
+        embedding_repo.create(chunk_id=chunk.chunk_id, table_name=table_name, vec=_vec(1.0))
 
 
 def test_update_with_missing_table_raises(embedding_repo):
@@ -138,3 +145,30 @@ def _vec(fill: float | None = None, *, pattern_start: float | None = None) -> li
         start = float(pattern_start)
         return [start + i for i in range(dim)]
     return [0.0] * dim
+
+
+def test_writes_to_int8_shard_compute_the_codes_of_the_vectors(conn, embedding_repo, registry_repo):
+    table_name = EmbeddingShardResolver(
+        conn=conn, registry_repo=registry_repo, storage_format=EmbeddingStorageFormat.INT8
+    ).resolve_or_create(embedder="tests", embedding_model_details=EmbeddingModelDetails(model_id="int8", model_dim=4))
+
+    embedding_repo.bulk_insert(table_name=table_name, chunk_ids=[1, 2], vecs=[[1.0, 2.0, 3.0, 4.0], [0.0] * 4], dim=4)
+    created = embedding_repo.create(table_name=table_name, chunk_id=3, vec=[0.5, -1.0, 0.25, 0.0])
+    embedding_repo.update(table_name=table_name, chunk_id=2, vec=[-2.0, 0.0, 0.0, 1.0])
+
+    assert created.vec == [0.5, -1.0, 0.25, 0.0]
+    assert conn.execute(f"SELECT chunk_id, code FROM {table_name} ORDER BY chunk_id").fetchall() == [
+        (1, (32, 64, 95, 127)),
+        (2, (-127, 0, 0, 64)),
+        (3, (64, -127, 32, 0)),
+    ]
+    assert [(e.chunk_id, e.vec) for e in embedding_repo.list(table_name)] == [
+        (3, [0.5, -1.0, 0.25, 0.0]),
+        (2, [-2.0, 0.0, 0.0, 1.0]),
+        (1, [1.0, 2.0, 3.0, 4.0]),
+    ]
+
+    assert embedding_repo.delete(table_name=table_name, chunk_id=3) == 1
+    assert embedding_repo.delete_orphans(table_name=table_name) == 2
+
+    assert conn.execute(f"SELECT count(*) FROM {table_name}__vectors").fetchone() == (0,)
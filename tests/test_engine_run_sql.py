@@ -7,7 +7,7 @@ from databao_context_engine.pluginlib.build_plugin import (
     DefaultBuildDatasourcePlugin,
     NotSupportedError,
 )
-from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionResult
+from databao_context_engine.pluginlib.sql.sql_types import SqlExecutionLimits, SqlExecutionResult
 from databao_context_engine.plugins.plugin_loader import DatabaoContextPluginLoader
 from tests.utils.project_creation import given_datasource_config_file
 
@@ -23,7 +23,12 @@ class DummySqlPlugin(DefaultBuildDatasourcePlugin):
         return {"ok": True}
 
     def run_sql(
-        self, file_config: dict, sql: str, params: list[object] | None = None, read_only: bool = True
+        self,
+        file_config: dict,
+        sql: str,
+        params: list[object] | None = None,
+        read_only: bool = True,
+        limits: SqlExecutionLimits | None = None,
     ) -> SqlExecutionResult:
         cols = ["a", "b"]
         row = (sql, tuple(params) if params is not None else None)
@@ -71,11 +76,16 @@ def test_engine_run_sql_params_passthrough(project_path):
 
     class CapturingSqlPlugin(DummySqlPlugin):
         def run_sql(
-            self, file_config: dict, sql: str, params: list[object] | None = None, read_only: bool = True
+            self,
+            file_config: dict,
+            sql: str,
+            params: list[object] | None = None,
+            read_only: bool = True,
+            limits: SqlExecutionLimits | None = None,
         ) -> SqlExecutionResult:
             received["sql"] = sql
             received["params"] = params
-            return super().run_sql(file_config, sql, params, read_only)
+            return super().run_sql(file_config, sql, params, read_only, limits)
 
     plugins_map = _plugins_map_with(CapturingSqlPlugin())
     engine = DatabaoContextEngine(domain_dir=project_path, plugin_loader=DatabaoContextPluginLoader(plugins_map))
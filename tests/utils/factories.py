@@ -105,6 +105,7 @@ def make_chunk_and_embedding_for_datasource_context_hash(
         datasource_id=datasource_id,
         embeddable_text=embeddable_text,
         display_text=display_text,
+        keyword_index_text=embeddable_text,
     )
     make_embedding(
         chunk_repo,
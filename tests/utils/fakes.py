@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from types import SimpleNamespace
@@ -64,10 +65,12 @@ class FakeDescriptionProvider(DescriptionProvider):
     def __init__(self, *, fail_at: set[int] | None = None):
         self.calls: list[tuple[str, str]] = []
         self._fail_at = set(fail_at or [])
+        self._lock = threading.Lock()
 
     def describe(self, text: str, context: str) -> str:
-        call_idx = len(self.calls)
-        self.calls.append((text, context))
+        with self._lock:
+            call_idx = len(self.calls)
+            self.calls.append((text, context))
 
         if call_idx in self._fail_at:
             raise RuntimeError("fake describe failure")